@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 """深度分析 Google Trends 页面"""
 from playwright.sync_api import sync_playwright
+import os
+import sys
 import time
-import re
-import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from trends_extractor import iter_html
+from trends_relevance import RelevanceFilter
 
 print('🔍 深度分析 Google Trends 页面结构...\n')
 
@@ -37,44 +41,35 @@ with sync_playwright() as p:
         f.write(html)
     print('💾 完整 HTML 已保存到 trends_full.html')
 
-    # 3. 分析 HTML 中的 JavaScript 数据
+    # 3. 流式提取 explore 搜索词和趋势条目（单次扫描）
     print('\n🔍 分析页面中的数据...')
 
-    # 查找可能的 JSON 数据块
-    json_patterns = [
-        (r'\[{[^\]]{20,200}\]', '嵌套数组'),
-        (r'\{[^{}]*"title"[^{}]*\}', '包含 title 的对象'),
-        (r'\{[^{}]*"query"[^{}]*\}', '包含 query 的对象'),
-        (r'"title"\s*:\s*"([^"]+)"', 'title 值'),
-        (r'"query"\s*:\s*"([^"]+)"', 'query 值'),
-        (r'"text"\s*:\s*"([^"]+)"', 'text 值'),
-    ]
-
     found_data = []
-    for pattern, desc in json_patterns:
-        matches = re.findall(pattern, html)
-        if matches:
-            print(f'\n✅ 找到 {len(matches)} 个 {desc}')
-            for i, match in enumerate(matches[:5], 1):
-                clean = match[:200].replace('\n', ' ')
-                print(f'   {i}. {clean}...')
-                found_data.append(match)
-
-    # 4. 尝试提取所有可能的关键词
+    trends = []
+    for event in iter_html(html):
+        if event['type'] == 'explore':
+            found_data.append(event['query'])
+        else:
+            trends.append(event)
+
+    if found_data:
+        print(f'\n✅ 找到 {len(found_data)} 个 explore 搜索词')
+        for i, query in enumerate(found_data[:5], 1):
+            print(f'   {i}. {query}')
+    if trends:
+        print(f'\n✅ 找到 {len(trends)} 个趋势条目')
+        for trend in trends[:5]:
+            print(f"   {trend['row']}. {trend['title']} ({trend['traffic'] or '-'})")
+
+    # 4. 过滤出可能与搜索相关的词
     print('\n🔍 提取可能的关键词...')
 
-    # 查找所有引号包围的文本（可能是搜索词）
-    quoted_text = re.findall(r'"([A-Za-z][A-Za-z0-9\s]{5,50})"', html)
-
-    # 过滤出可能与搜索相关的词
-    search_related = []
     filter_words = ['vacuum', 'dyson', 'shark', 'hoover', 'bissell', 'cleaner', 'robot']
-
-    for text in quoted_text:
-        text = text.strip()
-        if any(fw in text.lower() for fw in filter_words):
-            if text not in search_related and len(text) > 3:
-                search_related.append(text)
+    candidates = found_data + [trend['title'] for trend in trends if trend['title']]
+    search_related = [
+        text for text, _ in RelevanceFilter(filter_words).filter(t.strip() for t in candidates)
+        if len(text) > 3
+    ]
 
     if search_related:
         print(f'\n✅ 找到 {len(search_related)} 个可能与搜索相关的词:')
@@ -94,12 +89,8 @@ with sync_playwright() as p:
 
     # 查找包含我们关键词的行
     vacuum_keywords = ['vacuum', 'dyson', 'shark', 'hoover', 'bissell', 'roomba', 'cleaner']
-    relevant_lines = []
-
-    for line in body_text.split('\n'):
-        line_lower = line.lower()
-        if any(kw in line_lower for kw in vacuum_keywords):
-            relevant_lines.append(line.strip())
+    line_filter = RelevanceFilter(vacuum_keywords)
+    relevant_lines = [line.strip() for line in body_text.split('\n') if line_filter.is_relevant(line)]
 
     if relevant_lines:
         print(f'\n✅ 找到 {len(relevant_lines)} 行包含吸尘器关键词:')
@@ -118,7 +109,7 @@ print('\n' + '='*60)
 print('📊 分析总结:')
 print('='*60)
 print(f'✅ HTML 大小: {len(html)} 字节')
-print(f'✅ 提取的数据块: {len(found_data)} 个')
+print(f'✅ explore 搜索词: {len(found_data)} 个')
 print(f'✅ 搜索相关词: {len(search_related)} 个')
 print(f'✅ 吸尘器相关行: {len(relevant_lines)} 行')
 print('\n💡 请查看生成的文件:')
@@ -1,9 +1,45 @@
 #!/usr/bin/env python3
-"""调试 Google Trends 页面内容"""
-from playwright.sync_api import sync_playwright
+"""调试 Google Trends 页面内容
+
+用法:
+    python debug_trends.py                      # 打开浏览器抓取实时页面
+    python debug_trends.py trends_full.html     # 回放保存的快照（不启动浏览器）
+"""
+import os
+import sys
 import time
-import re
-import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from trends_extractor import iter_html, iter_snapshot
+
+
+def report(events):
+    """打印提取到的 explore 搜索词和趋势条目"""
+    queries = []
+    trends = []
+    for event in events:
+        if event['type'] == 'explore':
+            queries.append(event['query'])
+        else:
+            trends.append(event)
+
+    if queries:
+        print(f'\n✅ 找到 {len(queries)} 个 explore 搜索词:')
+        for i, query in enumerate(queries[:10], 1):
+            print(f'   {i}. {query}')
+
+    if trends:
+        print(f'\n✅ 找到 {len(trends)} 个趋势条目:')
+        for trend in trends[:10]:
+            print(f"   {trend['row']}. {trend['title']} ({trend['traffic'] or '-'})")
+
+
+if len(sys.argv) > 1:
+    print(f'🔍 回放快照: {sys.argv[1]}')
+    report(iter_snapshot(sys.argv[1]))
+    sys.exit(0)
+
+from playwright.sync_api import sync_playwright
 
 print('🔍 调试 Google Trends 页面...')
 
@@ -43,21 +79,8 @@ with sync_playwright() as p:
             f.write(f'{text} -> {href}\n')
     print(f'✅ 找到 {len(links)} 个链接，已保存到 trends_links.txt')
 
-    # 尝试各种 JSON 模式
-    patterns_to_try = [
-        (r'\["([^"]+)",\d+,\d+', 'JSON 数组'),
-        (r'"text"\s*:\s*"([^"]+)"', 'text 字段'),
-        (r'"title"\s*:\s*"([^"]+)"', 'title 字段'),
-        (r'"query"\s*:\s*"([^"]+)"', 'query 字段'),
-        (r'\\u003C[^>]*\\u003E([^\\]+)\\u003C', 'Unicode 转义'),
-    ]
-
-    for pattern, desc in patterns_to_try:
-        matches = re.findall(pattern, html)
-        if matches:
-            print(f'\n✅ 模式 "{desc}" 找到 {len(matches)} 个匹配:')
-            for i, match in enumerate(matches[:10], 1):
-                print(f'   {i}. {match}')
+    # 流式提取 explore 搜索词和趋势条目
+    report(iter_html(html))
 
     # 搜索 "vacuum", "dyson" 等关键词
     vacuum_kw = ['vacuum', 'dyson', 'shark', 'hoover', 'bissell', 'roomba']
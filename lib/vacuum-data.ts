@@ -27,6 +27,85 @@ export interface VacuumManual {
   faqs?: { question: string; answer: string; }[];
 }
 
+// 设置 GUIDE_BUNDLE（例如 .cache/corpus.bundle）时从 scripts/corpus_bundle.py 生成的单文件 bundle 读取：
+// 索引（<bundle>.idx）按 slug 排序，二分查找后按偏移只读出需要的那一篇。
+// slug 列表仍以 data/ 为准；bundle 之后新增或修改过的指南（mtime / 大小与索引不一致）按文件读取。
+// 构建前先运行 python3 scripts/corpus_bundle.py update；文件格式见该脚本。
+const BUNDLE_HEADER_SIZE = 24;  // magic(8) + generation(16)
+const INDEX_HEADER_SIZE = 32;   // magic(8) + generation(16) + 条目数(4) + slug 字符串区字节数(4)
+const INDEX_ENTRY_SIZE = 40;    // slug 偏移(4) + slug 长度(4) + JSON 偏移(8) + JSON 长度(4) + 填充(4) + mtime(8) + 大小(8)
+
+interface GuideBundle {
+  fd: number;
+  index: Buffer;
+  count: number;
+  strings: number;
+}
+
+let guideBundle: GuideBundle | null | undefined;
+
+function openGuideBundle(): GuideBundle | null {
+  if (guideBundle !== undefined) {
+    return guideBundle;
+  }
+  guideBundle = null;
+  const bundlePath = process.env.GUIDE_BUNDLE;
+  if (!bundlePath) {
+    return guideBundle;
+  }
+  try {
+    const index = fs.readFileSync(`${bundlePath}.idx`);
+    const fd = fs.openSync(bundlePath, 'r');
+    const header = Buffer.alloc(BUNDLE_HEADER_SIZE);
+    fs.readSync(fd, header, 0, BUNDLE_HEADER_SIZE, 0);
+    const valid = index.toString('latin1', 0, 8) === 'VGBIDX01'
+      && header.toString('latin1', 0, 8) === 'VGBUNDL1'
+      && index.subarray(8, 24).equals(header.subarray(8, 24));
+    if (!valid) {
+      fs.closeSync(fd);
+      console.warn(`GUIDE_BUNDLE 与索引不匹配，改为读取 data/: ${bundlePath}`);
+      return guideBundle;
+    }
+    const count = index.readUInt32LE(24);
+    guideBundle = { fd, index, count, strings: INDEX_HEADER_SIZE + count * INDEX_ENTRY_SIZE };
+  } catch (error) {
+    console.warn(`GUIDE_BUNDLE 不可用，改为读取 data/: ${error}`);
+  }
+  return guideBundle;
+}
+
+function bundleSlugAt(bundle: GuideBundle, i: number): Buffer {
+  const position = INDEX_HEADER_SIZE + i * INDEX_ENTRY_SIZE;
+  const start = bundle.strings + bundle.index.readUInt32LE(position);
+  return bundle.index.subarray(start, start + bundle.index.readUInt32LE(position + 4));
+}
+
+function readBundleGuide(bundle: GuideBundle, slug: string, stat: fs.BigIntStats): VacuumManual | null {
+  const key = Buffer.from(slug, 'utf8');
+  let lo = 0;
+  let hi = bundle.count;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    const order = Buffer.compare(bundleSlugAt(bundle, mid), key);
+    if (order < 0) {
+      lo = mid + 1;
+    } else if (order > 0) {
+      hi = mid;
+    } else {
+      const position = INDEX_HEADER_SIZE + mid * INDEX_ENTRY_SIZE;
+      if (bundle.index.readBigInt64LE(position + 24) !== stat.mtimeNs
+        || bundle.index.readBigInt64LE(position + 32) !== stat.size) {
+        return null;
+      }
+      const offset = Number(bundle.index.readBigUInt64LE(position + 8));
+      const payload = Buffer.alloc(bundle.index.readUInt32LE(position + 16));
+      fs.readSync(bundle.fd, payload, 0, payload.length, offset);
+      return JSON.parse(payload.toString('utf8'));
+    }
+  }
+  return null;
+}
+
 // lib/vacuum-data.ts 的 getAllModelSlugs 必须长这样：
 // 获取所有型号的 Slug (用于生成静态路径)
 export async function getAllModelSlugs() {
@@ -53,9 +132,18 @@ export async function getAllModelSlugs() {
 
 export async function getModelData(slug: string): Promise<VacuumManual | null> {
   const fullPath = path.join(dataDirectory, `${slug}.json`);
-  if (!fs.existsSync(fullPath)) {
+  const stat = fs.statSync(fullPath, { bigint: true, throwIfNoEntry: false });
+  if (!stat) {
     return null;
   }
+  const bundle = openGuideBundle();
+  if (bundle) {
+    // 不在 bundle 中或之后被修改过时返回 null，按文件读取
+    const guide = readBundleGuide(bundle, slug, stat);
+    if (guide) {
+      return guide;
+    }
+  }
   const fileContents = fs.readFileSync(fullPath, 'utf8');
   return JSON.parse(fileContents);
 }
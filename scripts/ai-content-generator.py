@@ -4,17 +4,34 @@ AI 驱动的智能内容生成器
 使用 AI API 生成高质量的维修指南内容
 """
 
-import json
+import asyncio
 import os
 import sys
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import time
-import subprocess
-import requests
+import argparse
 import random
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 
+import corpus_index
+import corpus_stats
+import git_publisher
+import guide_schema
+import guide_store
+import keyword_index
+import llm_client
+import model_parser
+import near_duplicates
+import notifier
+import slug_registry
+from log_writer import LogWriter
+import trend_store
+import trends_scraper
+import problem_templates
+from trends_relevance import filter_relevant
+
 # ============================================
 # 配置
 # ============================================
@@ -23,6 +40,21 @@ DATA_DIR = Path(__file__).parent.parent / "data"
 LOG_DIR = Path(__file__).parent.parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
+# Google Trends 抓取配置（可通过环境变量覆盖，TRENDS_URL_TEMPLATE 可指向本地快照服务器）
+TRENDS_SCRAPE_MODE = os.environ.get("TRENDS_SCRAPE_MODE", "async")
+TRENDS_REGIONS = [r.strip() for r in os.environ.get("TRENDS_REGIONS", "US,GB,CA").split(",") if r.strip()]
+TRENDS_REGION_TIMEOUT_MS = int(os.environ.get("TRENDS_REGION_TIMEOUT_MS", "30000"))
+TRENDS_URL_TEMPLATE = os.environ.get("TRENDS_URL_TEMPLATE", trends_scraper.TRENDS_URL_TEMPLATE)
+
+# 默认每天生成的文章数（--quota 覆盖）
+DAILY_QUOTA = 3
+
+# 问题模板注册表（PROBLEM_TEMPLATE_FILES 可加载额外的模板文件）
+TEMPLATES = problem_templates.get_registry()
+
+# Telegram 通知中最多列出的文章标题数（批量回填时避免消息过长）
+TELEGRAM_MAX_TITLES = 20
+
 # 热门搜索关键词数据库
 TRENDING_KEYWORDS = [
     # Dyson 高流量词
@@ -64,15 +96,12 @@ TRENDING_KEYWORDS = [
 # 日志函数
 # ============================================
 
+# 后台线程批量写入，按天轮转（LOG_LEVEL / LOG_FORMAT 等见 log_writer.py）
+LOGGER = LogWriter(LOG_DIR / "ai-generator-{date}.log")
+
 def log(message, level="INFO"):
     """记录日志"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_message = f"[{timestamp}] [{level}] {message}"
-    print(log_message)
-
-    log_file = LOG_DIR / f"ai-generator-{datetime.now().strftime('%Y%m%d')}.log"
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(log_message + '\n')
+    LOGGER.log(message, level)
 
 # ============================================
 # Telegram 通知函数
@@ -80,19 +109,17 @@ def log(message, level="INFO"):
 
 def send_telegram_notification(generated, skipped, keywords_today):
     """
-    发送 Telegram 通知
+    发送 Telegram 通知（scripts/notifier.py，不阻塞生成流程）
     需要设置环境变量 TELEGRAM_BOT_TOKEN 和 TELEGRAM_CHAT_ID
     """
-    bot_token = os.environ.get('TELEGRAM_BOT_TOKEN')
-    chat_id = os.environ.get('TELEGRAM_CHAT_ID')
-
-    if not bot_token or not chat_id:
+    if notifier.get_notifier(log) is None:
         log("未配置 TELEGRAM_BOT_TOKEN 或 TELEGRAM_CHAT_ID，跳过 Telegram 通知", "WARN")
         return
 
     try:
-        # 计算总文章数
-        total_files = len(list(DATA_DIR.glob("*.json"))) - 3  # 减去 vacuums.json, sharks.json, bissells.json
+        # 预先计算的语料统计（main 结束时已更新；已排除 vacuums.json 等聚合文件）
+        stats = corpus_stats.get_stats(DATA_DIR)
+        total_files = stats["guides"]
 
         # 构建消息（使用纯文本，避免 Markdown 格式问题）
         emoji = "✅" if generated > 0 else "ℹ️"
@@ -103,12 +130,13 @@ def send_telegram_notification(generated, skipped, keywords_today):
 🕐 时间: {datetime.now().strftime('%H:%M:%S')}
 ✅ 新生成: {generated} 篇
 ⏭️  跳过: {skipped} 篇
-📊 网站总文章数: {total_files} 篇"""
+📊 网站总文章数: {total_files} 篇
+❓ FAQ 覆盖率: {stats['faqs']['coverage']:.0%}，关键词 {stats['keywords']['total']} 个"""
 
         # 如果生成了新文章，添加详细信息
         if generated > 0:
             message += f"\n\n📝 今日生成的文章:\n"
-            for kw in keywords_today:
+            for kw in keywords_today[:TELEGRAM_MAX_TITLES]:
                 # 从关键词中提取更友好的中文标题
                 title = kw
                 if "battery life" in kw.lower():
@@ -126,23 +154,17 @@ def send_telegram_notification(generated, skipped, keywords_today):
                 elif "not working" in kw.lower():
                     title = kw.replace("not working", "无法工作")
                 message += f"• {title}\n"
+            if len(keywords_today) > TELEGRAM_MAX_TITLES:
+                message += f"… 等共 {len(keywords_today)} 篇\n"
         else:
             message += f"\n\n💡 今日所有文章已存在，未生成新内容"
 
         # 添加提示信息
         message += f"\n\n🔄 下次运行: 明天早上 8 点 (UTC-8)"
 
-        # 发送消息（不使用 parse_mode，使用纯文本）
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        data = {
-            "chat_id": chat_id,
-            "text": message
-        }
-
-        response = requests.post(url, json=data, timeout=10)
-        response.raise_for_status()
-
-        log("✅ Telegram 通知发送成功")
+        # 放入发送队列后立即返回（不使用 parse_mode，使用纯文本）；
+        # 后台线程负责合并、重试和 429 retry_after，结果写入日志
+        notifier.notify(message, log=log)
 
     except Exception as e:
         log(f"⚠️ Telegram 通知发送失败: {str(e)}", "WARN")
@@ -151,23 +173,61 @@ def send_telegram_notification(generated, skipped, keywords_today):
 # 🚀 高流量 (Traffic) - Google Trends 实时抓取
 # ============================================
 
-def fetch_google_trends_rss():
+def collect_trending_terms(candidates, method, found, region=None, observations=None):
+    """
+    批量过滤候选词，把相关的词加入 found，返回本批相关的词
+    传入 observations 时追加 (词, 地区, 在候选列表中的排名)，供趋势分数库记录
+    """
+    relevant_terms = set()
+    ranks = {term: rank for rank, term in enumerate(dict.fromkeys(candidates), 1)}
+    for term, matched in filter_relevant(candidates):
+        relevant_terms.add(term)
+        if observations is not None:
+            observations.append((term, region, ranks[term]))
+        if term not in found:
+            found.append(term)
+            log(f"   ✅ 发现趋势 ({method}): {term} [{', '.join(matched)}]", "INFO")
+    return relevant_terms
+
+def record_trend_observations(observations):
+    """把本次观察到的趋势写入分数库（失败不影响生成）"""
+    if not observations:
+        return
+    try:
+        with trend_store.TrendStore(trend_store_path()) as store:
+            store.record(observations)
+        log(f"   📈 已记录 {len(observations)} 条趋势观察", "INFO")
+    except Exception as e:
+        log(f"⚠️ 趋势观察记录失败: {str(e)}", "WARN")
+
+def log_unrelated_terms(candidates, relevant_terms):
+    """记录非吸尘器趋势用于调试"""
+    for term in candidates:
+        if term not in relevant_terms:
+            log(f"   📊 趋势 (非相关): {term}", "DEBUG")
+
+def fetch_google_trends_rss(mode=None, regions=None, timeout_ms=None):
     """
     从 Google Trends 网页直接抓取实时搜索趋势
     使用 Playwright 浏览器自动化，从 explore URLs 提取搜索词
-    专注于吸尘器相关的搜索查询
+    专注于吸尘器相关的搜索查询（相关性判断见 trends_relevance）
+
+    Args:
+        mode: "async"（各地区并发抓取，默认）或 "sync"（单页面逐个地区抓取）
+        regions: 地区代码列表，默认读取 TRENDS_REGIONS
+        timeout_ms: 单地区超时（毫秒），默认读取 TRENDS_REGION_TIMEOUT_MS
     """
+    mode = mode or TRENDS_SCRAPE_MODE
+    regions = regions or TRENDS_REGIONS
+    timeout_ms = timeout_ms or TRENDS_REGION_TIMEOUT_MS
+
+    if mode == "async":
+        return fetch_google_trends_async(regions, timeout_ms)
+
     vacuum_related_keywords = []
+    observations = []
 
     try:
-        # 吸尘器相关关键词列表
-        vacuum_keywords = [
-            'vacuum', 'dyson', 'shark', 'hoover', 'bissell', 'roomba',
-            'robot', 'cleaner', 'suction', 'carpet', 'floor',
-            'miele', 'samsung', 'tineco', 'lg', 'electrolux',
-            'battery', 'charging', 'repair', 'parts', 'filter'
-        ]
-
         log("🔍 正在使用 Playwright 浏览器抓取 Google Trends...", "INFO")
 
         # 使用 Playwright 启动无头浏览器
@@ -175,116 +235,44 @@ def fetch_google_trends_rss():
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
 
-            # 尝试多个地区
-            regions = ['US', 'GB', 'CA']
-
             for region in regions:
                 try:
-                    trends_url = f"https://trends.google.com/trends/trendingsearches/daily?geo={region}"
+                    trends_url = TRENDS_URL_TEMPLATE.format(region=region)
                     log(f"   🌐 访问 {region} 地区趋势...", "INFO")
 
                     # 访问页面
-                    page.goto(trends_url, timeout=30000)
+                    page.goto(trends_url, timeout=timeout_ms, wait_until='domcontentloaded')
 
-                    # 等待页面加载完成（更长的超时时间）
-                    page.wait_for_load_state('networkidle', timeout=30000)
-
-                    # 等待更长时间让 Angular.js 渲染趋势数据
-                    time.sleep(5)
+                    # 等待 Angular.js 渲染出趋势条目（不再固定 sleep）
+                    page.wait_for_selector(trends_scraper.READY_SELECTOR, state='attached', timeout=timeout_ms)
 
                     # 获取完整 HTML
                     html_content = page.content()
-                    import re
-                    from urllib.parse import unquote
 
                     # 方法 1: 从 explore URLs 提取搜索词 (新方法)
-                    explore_urls = re.findall(r'/trends/explore\?q=([^"&]+)', html_content)
+                    candidates = trends_scraper.extract_explore_terms(html_content)
 
-                    if explore_urls:
-                        log(f"   找到 {len(explore_urls)} 个 explore URLs", "INFO")
+                    if candidates:
+                        log(f"   找到 {len(candidates)} 个 explore URLs", "INFO")
 
-                        for url_encoded in explore_urls[:50]:  # 取前50个
-                            try:
-                                # URL 解码
-                                search_term = unquote(url_encoded.replace('+', ' '))
-
-                                # 清理搜索词
-                                clean_term = search_term.strip().title()
-
-                                if clean_term and len(clean_term) < 100:
-                                    term_lower = clean_term.lower()
-
-                                    # 检查是否与吸尘器相关（完整单词匹配）
-                                    # 使用正则表达式确保完整单词匹配，避免子字符串误匹配
-                                    import re
-                                    is_related = False
-                                    for kw in vacuum_keywords:
-                                        # 使用单词边界 \b 确保完整匹配
-                                        pattern = r'\b' + re.escape(kw) + r'\b'
-                                        if re.search(pattern, term_lower):
-                                            is_related = True
-                                            break
-
-                                    if is_related:
-                                        if clean_term not in vacuum_related_keywords:
-                                            vacuum_related_keywords.append(clean_term)
-                                            log(f"   ✅ 发现趋势 (URL): {clean_term}", "INFO")
-                                    else:
-                                        # 记录非吸尘器趋势用于调试
-                                        log(f"   📊 趋势 (非相关): {clean_term}", "DEBUG")
-
-                            except Exception as e:
-                                continue
+                        # 完整单词匹配，避免子字符串误匹配
+                        relevant_terms = collect_trending_terms(candidates, "URL", vacuum_related_keywords,
+                                                                region, observations)
+                        log_unrelated_terms(candidates, relevant_terms)
 
                     # 方法 2: 如果方法 1 没找到足够的词，尝试选择器方法
                     if len(vacuum_related_keywords) < 5:
                         log(f"   尝试选择器方法补充...", "INFO")
 
-                        selectors = [
-                            'a[ng-href*="explore"]',
-                            'div.feed-item',
-                            'md-list-item',
-                            'span[ng-bind]',
-                            '[class*="feed-list"]',
-                            '[class*="trending-search"]'
-                        ]
-
-                        for selector in selectors:
+                        candidates = []
+                        for selector in trends_scraper.FALLBACK_SELECTORS:
                             try:
-                                elements = page.query_selector_all(selector)
-
-                                if elements:
-                                    for elem in elements[:30]:
-                                        try:
-                                            text = elem.inner_text()
-
-                                            if text and len(text) < 100:
-                                                clean_text = text.strip().split('\n')[0].strip()
-
-                                                if clean_text:
-                                                    text_lower = clean_text.lower()
-                                                    # 使用完整单词匹配
-                                                    import re
-                                                    is_related = False
-                                                    for kw in vacuum_keywords:
-                                                        pattern = r'\b' + re.escape(kw) + r'\b'
-                                                        if re.search(pattern, text_lower):
-                                                            is_related = True
-                                                            break
-
-                                                    if is_related:
-                                                        if clean_text not in vacuum_related_keywords:
-                                                            vacuum_related_keywords.append(clean_text)
-                                                            log(f"   ✅ 发现趋势 (选择器): {clean_text}", "INFO")
-
-                                        except Exception:
-                                            continue
-
+                                texts = page.locator(selector).all_inner_texts()
+                                candidates.extend(trends_scraper.clean_selector_texts(texts))
                             except Exception:
                                 continue
 
-                    # 避免请求过快
-                    time.sleep(2)
+                        collect_trending_terms(candidates, "选择器", vacuum_related_keywords, region, observations)
 
                 except PlaywrightTimeout:
                     log(f"   ⚠️ {region} 地区超时", "WARN")
@@ -300,91 +288,58 @@ def fetch_google_trends_rss():
     except Exception as e:
         log(f"⚠️ Google Trends 抓取失败: {str(e)}", "WARN")
 
+    record_trend_observations(observations)
+    return vacuum_related_keywords
+
+def fetch_google_trends_async(regions, timeout_ms):
+    """
+    并发抓取各地区趋势（每个地区一个浏览器上下文）
+    先汇总所有地区的 explore 词，不足 5 个时再用选择器文本补充
+    """
+    vacuum_related_keywords = []
+    observations = []
+
+    try:
+        log(f"🔍 正在并发抓取 Google Trends ({', '.join(regions)})...", "INFO")
+
+        started = time.perf_counter()
+        results = trends_scraper.fetch_regions(regions, TRENDS_URL_TEMPLATE, timeout_ms)
+
+        for result in results:
+            if result["error"]:
+                log(f"   ⚠️ {result['region']} 地区: {result['error']}", "WARN")
+            log(f"   🌐 {result['region']}: 找到 {len(result['url_terms'])} 个 explore URLs "
+                f"({result['elapsed']:.1f}s)", "INFO")
+
+            relevant_terms = collect_trending_terms(result["url_terms"], "URL", vacuum_related_keywords,
+                                                    result["region"], observations)
+            log_unrelated_terms(result["url_terms"], relevant_terms)
+
+        if len(vacuum_related_keywords) < 5:
+            log(f"   尝试选择器方法补充...", "INFO")
+            for result in results:
+                collect_trending_terms(result["selector_terms"], "选择器", vacuum_related_keywords,
+                                       result["region"], observations)
+
+        log(f"✅ 从 Google Trends 获取了 {len(vacuum_related_keywords)} 个相关关键词 "
+            f"(耗时 {time.perf_counter() - started:.1f}s)", "INFO")
+
+    except Exception as e:
+        log(f"⚠️ Google Trends 抓取失败: {str(e)}", "WARN")
+
+    record_trend_observations(observations)
     return vacuum_related_keywords
 
 # ============================================
 # 💎 高质量 (Quality) - E-E-A-T 人设系统
 # ============================================
-
-# E-E-A-T 人设配置
-PERSONAS = {
-    "tech_expert": {
-        "name": "技术专家",
-        "tone": "专业、分析性、经验丰富",
-        "openings": [
-            "Last weekend, I spent 4 hours troubleshooting a {model}...",
-            "After testing 15 different {brand} units, I've found the pattern...",
-            "I've been repairing vacuum cleaners for 12 years, and here's what most people get wrong about {problem}...",
-            "Let me walk you through the exact repair process I use in my shop...",
-            "The service manual doesn't tell you this, but here's the real fix..."
-        ],
-        "phrases": [
-            "Based on my technical analysis...",
-            "The root cause is almost always...",
-            "Here's the professional solution...",
-            "Most DIY tutorials miss this critical step...",
-            "I've seen this issue hundreds of times..."
-        ]
-    },
-    "frustrated_user": {
-        "name": "愤怒用户",
-        "tone": "直接、情绪化、痛点共鸣",
-        "openings": [
-            "I was about to throw my {model} against the wall...",
-            "It happened AGAIN. Right in the middle of cleaning...",
-            "I'm so done with this {problem} issue. Here's how I finally fixed it...",
-            "After 3 repair shops couldn't fix it, I figured it out myself...",
-            "Warning: Don't make the same mistake I did with my {model}..."
-        ],
-        "phrases": [
-            "Here's what actually works (trust me, I tried everything)...",
-            "Skip the nonsense, here's the fix...",
-            "This will save you hours of frustration...",
-            "Why isn't this in the manual?!",
-            "Finally, a solution that actually lasts..."
-        ]
-    },
-    "product_analyst": {
-        "name": "产品分析师",
-        "tone": "客观、数据驱动、比较分析",
-        "openings": [
-            "In my comprehensive testing of 8 vacuum models...",
-            "After analyzing 500+ user complaints about {model}...",
-            "Let's cut through the marketing hype and look at the real data...",
-            "I've compared {brand} against 12 competitors, here's what stands out...",
-            "The design flaw behind this {problem} issue is actually fascinating..."
-        ],
-        "phrases": [
-            "The data clearly shows...",
-            "Based on extensive testing...",
-            "This is a known design limitation...",
-            "Here's the cost-benefit analysis...",
-            "Industry standards suggest..."
-        ]
-    }
-}
+# 人设、CTA、问题模板和 SEO 长尾词模板都在 problem_templates.py 中（懒编译，只渲染选中的类型）
 
 def get_persona_content(problem_type, brand, model, problem_desc):
     """
     根据问题类型选择最合适的人设，并生成真人体验口吻的内容
     """
-    # 根据问题类型智能选择人设
-    persona_mapping = {
-        "battery": "tech_expert",      # 电池问题用技术专家
-        "charging": "tech_expert",     # 充电问题用技术专家
-        "motor": "tech_expert",        # 电机问题用技术专家
-        "error_codes": "tech_expert",  # 错误代码用技术专家
-        "not_working": "frustrated_user",  # 无法工作用愤怒用户
-        "pulsing": "frustrated_user",  # 脉冲问题用愤怒用户
-        "leaking": "frustrated_user",  # 漏水用愤怒用户
-        "brush": "product_analyst",    # 刷头问题用分析师
-        "filter": "product_analyst",   # 滤网用分析师
-        "suction": "product_analyst",  # 吸力用分析师
-        "general": "tech_expert"       # 默认用技术专家
-    }
-
-    selected_persona = persona_mapping.get(problem_type, "tech_expert")
-    persona = PERSONAS[selected_persona]
+    selected_persona, persona = TEMPLATES.persona_for(problem_type)
 
     # 随机选择一个开场白
     opening_template = random.choice(persona["openings"])
@@ -392,12 +347,12 @@ def get_persona_content(problem_type, brand, model, problem_desc):
     # 构建真人体验口吻的开场
     full_model_name = f"{brand} {model}" if model else brand
 
-    # 替换模板中的占位符
-    opening = opening_template.format(
-        model=full_model_name,
-        brand=brand,
-        problem=problem_desc or "issue"
-    )
+    # 只渲染选中的开场白
+    opening = TEMPLATES.render_opening(opening_template, {
+        "model": full_model_name,
+        "brand": brand,
+        "problem": problem_desc or "issue"
+    })
 
     # 选择 2-3 个特色短语
     selected_phrases = random.sample(persona["phrases"], min(3, len(persona["phrases"])))
@@ -414,176 +369,26 @@ def get_persona_content(problem_type, brand, model, problem_desc):
 # 💰 高转化 (Conversion) - 动态 CTA 系统
 # ============================================
 
-# 动态 CTA 配置（根据问题类型和痛点定制）
-DYNAMIC_CTAS = {
-    "battery": {
-        "urgency": "high",
-        "cta_text": "⚡ Stop Waiting - Fix Your {model} Battery Today",
-        "cta_subtext": "Don't let a dead battery ruin your cleaning routine. Professional replacement ready to ship.",
-        "color": "red",
-        "icon": "🔋",
-        "pain_point": "Your vacuum won't hold a charge"
-    },
-    "charging": {
-        "urgency": "high",
-        "cta_text": "🔌 Fix Charging Issues - Get Your {model} Working Again",
-        "cta_subtext": "Stop dealing with the frustration of a vacuum that won't charge. We have the solution.",
-        "color": "orange",
-        "icon": "⚡",
-        "pain_point": "Your vacuum won't charge properly"
-    },
-    "not_charging": {
-        "urgency": "critical",
-        "cta_text": "🚨 Don't Wait - Your {model} Needs This Fix Now",
-        "cta_subtext": "Every day without your vacuum is a day your home isn't clean. Fast shipping available.",
-        "color": "red",
-        "icon": "⏰",
-        "pain_point": "Complete charging failure"
-    },
-    "brush": {
-        "urgency": "medium",
-        "cta_text": "🔄 Restore Full Cleaning Power - Replace Your Brush",
-        "cta_subtext": "A worn brush won't clean anything. Get genuine replacement for maximum performance.",
-        "color": "blue",
-        "icon": "🧹",
-        "pain_point": "Poor cleaning performance"
-    },
-    "filter": {
-        "urgency": "medium",
-        "cta_text": "🌬️ Breathe Easy - Replace Clogged Filters Today",
-        "cta_subtext": "Dirty filters reduce suction and damage your motor. Protect your investment.",
-        "color": "green",
-        "icon": "✨",
-        "pain_point": "Reduced suction and air quality"
-    },
-    "motor": {
-        "urgency": "high",
-        "cta_text": "💪 Professional Motor Replacement - Don't Risk Further Damage",
-        "cta_subtext": "A failing motor can destroy your vacuum. Expert replacement service available.",
-        "color": "red",
-        "icon": "⚙️",
-        "pain_point": "Motor failure or strange noises"
-    },
-    "suction": {
-        "urgency": "medium",
-        "cta_text": "📈 Restore Maximum Suction - Professional Parts Ready",
-        "cta_subtext": "Weak suction? We have the exact parts to restore your {model}'s power.",
-        "color": "blue",
-        "icon": "💨",
-        "pain_point": "Weak suction power"
-    },
-    "error_codes": {
-        "urgency": "high",
-        "cta_text": "🔧 Decoding Error {code}? We Have the Solution",
-        "cta_subtext": "Don't let mysterious error codes stop you. Expert diagnostics and parts available.",
-        "color": "orange",
-        "icon": "❓",
-        "pain_point": "Confusing error messages"
-    },
-    "attachment": {
-        "urgency": "low",
-        "cta_text": "🔗 Fix Attachment Issues - Get Your Tools Working",
-        "cta_subtext": "Loose or broken attachments? We have genuine replacements ready to ship.",
-        "color": "blue",
-        "icon": "🛠️",
-        "pain_point": "Attachments not working properly"
-    },
-    "belt": {
-        "urgency": "high",
-        "cta_text": "⚙️ Replace Worn Belt - Restore Full Performance",
-        "cta_subtext": "A broken belt means no cleaning. Fast replacement service available.",
-        "color": "orange",
-        "icon": "🔧",
-        "pain_point": "Brush not spinning"
-    },
-    "leaking": {
-        "urgency": "high",
-        "cta_text": "🛑 Stop the Leak - Fix Your {model} Now",
-        "cta_subtext": "Water damage can destroy your vacuum. Quick fixes available.",
-        "color": "red",
-        "icon": "💧",
-        "pain_point": "Water or liquid leaking"
-    },
-    "pulsing": {
-        "urgency": "high",
-        "cta_text": "⚡ Fix Pulsing Issue - Stop the Annoying On-Off Cycle",
-        "cta_subtext": "Pulsing means a sensor or blockage issue. We have the parts to fix it permanently.",
-        "color": "orange",
-        "icon": "📳",
-        "pain_point": "Vacuum keeps pulsing on and off"
-    },
-    "noise": {
-        "urgency": "medium",
-        "cta_text": "🔇 Silence Strange Noises - Protect Your Vacuum",
-        "cta_subtext": "Unusual noises mean wear or damage. Fix it before it becomes a costly repair.",
-        "color": "yellow",
-        "icon": "🔊",
-        "pain_point": "Loud or unusual noises"
-    },
-    "heating": {
-        "urgency": "high",
-        "cta_text": "🌡️ Overheating? Fix It Before Permanent Damage",
-        "cta_subtext": "Overheating can kill your motor. Quick diagnosis and repair available.",
-        "color": "red",
-        "icon": "🔥",
-        "pain_point": "Vacuum getting too hot"
-    },
-    "connectivity": {
-        "urgency": "low",
-        "cta_text": "📶 Fix Connection Issues - Get Smart Features Working",
-        "cta_subtext": "WiFi or app problems? We can help restore your smart vacuum's features.",
-        "color": "blue",
-        "icon": "📱",
-        "pain_point": "Can't connect to app or WiFi"
-    },
-    "mapping": {
-        "urgency": "low",
-        "cta_text": "🗺️ Fix Navigation Issues - Restore Smart Cleaning",
-        "cta_subtext": "Mapping problems? We have sensors and parts to get your robot vacuum back on track.",
-        "color": "blue",
-        "icon": "🤖",
-        "pain_point": "Robot vacuum navigation problems"
-    },
-    "general": {
-        "urgency": "low",
-        "cta_text": "🔧 Get Your {model} Running Like New",
-        "cta_subtext": "Whatever the issue, we have the parts and expertise to help.",
-        "color": "blue",
-        "icon": "✅",
-        "pain_point": "General performance issues"
-    }
-}
-
 def generate_dynamic_cta(problem_type, brand, model, error_code=None):
     """
     根据问题类型生成动态 CTA
     返回高度转化的行动号召内容
     """
-    # 获取 CTA 配置
-    cta_config = DYNAMIC_CTAS.get(problem_type, DYNAMIC_CTAS["general"])
-
     full_model_name = f"{brand} {model}" if model else brand
 
-    # 构建动态 CTA
-    # 注意：需要处理 {code} 占位符，因为 format() 会尝试替换所有花括号
+    # 没有 error_code 时去掉 {code} 留下的双空格
+    cta_config = TEMPLATES.render_cta(problem_type, {
+        "model": full_model_name,
+        "code": str(error_code) if error_code else ""
+    })
     cta_text = cta_config["cta_text"]
-    cta_subtext = cta_config["cta_subtext"]
-
-    # 先替换 {code} 占位符（如果提供了 error_code）
-    if error_code:
-        cta_text = cta_text.replace("{code}", str(error_code))
-    else:
-        # 如果没有 error_code，移除 {code} 或使用通用文本
-        cta_text = cta_text.replace("{code}", "").replace("  ", " ")
-
-    # 现在安全地使用 format() 替换 {model}
-    cta_text = cta_text.format(model=full_model_name)
-    cta_subtext = cta_subtext.format(model=full_model_name)
+    if not error_code:
+        cta_text = cta_text.replace("  ", " ")
 
     return {
         "urgency": cta_config["urgency"],
         "text": cta_text,
-        "subtext": cta_subtext,
+        "subtext": cta_config["cta_subtext"],
         "color": cta_config["color"],
         "icon": cta_config["icon"],
         "pain_point": cta_config["pain_point"]
@@ -593,27 +398,58 @@ def generate_dynamic_cta(problem_type, brand, model, error_code=None):
 # API 调用函数（可以接入各种 AI API）
 # ============================================
 
+AI_SYSTEM_PROMPT = ("You are a professional vacuum cleaner repair expert. Reply ONLY with a JSON object "
+                    'with the keys "title", "description", "causes" (list of strings) and "solutions" (list of strings).')
+
+# 未配置 OPENAI_API_KEY 时返回的演示数据
+AI_PLACEHOLDER = {
+    "title": "Common Vacuum Problem",
+    "description": "Generated by AI",
+    "causes": ["Cause 1", "Cause 2"],
+    "solutions": ["Solution 1", "Solution 2"]
+}
+
+def _ai_messages(prompt):
+    return [{"role": "system", "content": AI_SYSTEM_PROMPT}, {"role": "user", "content": prompt}]
+
 def call_ai_api(prompt, max_retries=3):
     """
-    调用 AI API 生成内容
-    支持多种 AI 服务：OpenAI、Claude、本地模型等
+    调用 AI API 生成内容（OpenAI 兼容接口，OPENAI_BASE_URL 可指向其他服务或本地替身服务器）
+    连接复用、限速、重试和响应缓存见 scripts/llm_client.py；失败时抛出 llm_client.LLMError
+    """
+    if not llm_client.configured():
+        log("未设置 OPENAI_API_KEY，返回演示数据", "WARNING")
+        return dict(AI_PLACEHOLDER)
+
+    client = llm_client.get_client()
+    hits = client.stats["cache_hits"]
+    start = time.perf_counter()
+    result = llm_client.run_sync(client.chat_json(_ai_messages(prompt), max_retries=max_retries, temperature=0.7))
+    cached = "（缓存命中）" if client.stats["cache_hits"] > hits else ""
+    log(f"调用 AI API 生成内容: {(time.perf_counter() - start) * 1000:.0f} ms{cached}")
+    return result
+
+def call_ai_api_batch(prompts, max_retries=3):
+    """
+    并发调用多个提示词（受 LLM_CONCURRENCY 和令牌桶限速约束），按顺序返回结果
+    单个失败的提示词结果为 llm_client.LLMError 实例，不影响其他结果
     """
-    # 这里可以接入真实的 AI API
-    # 目前返回模拟数据用于演示
+    if not llm_client.configured():
+        log("未设置 OPENAI_API_KEY，返回演示数据", "WARNING")
+        return [dict(AI_PLACEHOLDER) for _ in prompts]
 
-    log(f"调用 AI API 生成内容...")
+    client = llm_client.get_client()
 
-    # 模拟 API 调用延迟
-    time.sleep(1)
+    async def run_all():
+        return await asyncio.gather(*(client.chat_json(_ai_messages(prompt), max_retries=max_retries, temperature=0.7)
+                                      for prompt in prompts), return_exceptions=True)
 
-    # 返回模拟响应
-    # 实际使用时，替换为真实的 API 调用
-    return {
-        "title": "Common Vacuum Problem",
-        "description": "Generated by AI",
-        "causes": ["Cause 1", "Cause 2"],
-        "solutions": ["Solution 1", "Solution 2"]
-    }
+    results = llm_client.run_sync(run_all())
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, llm_client.LLMError):
+            raise result
+    log(llm_client.describe_summary(client.summary()))
+    return results
 
 # ============================================
 # 智能型号解析器
@@ -626,173 +462,9 @@ def parse_vacuum_model(keyword):
 
     注意: model 字段不包含品牌前缀，避免重复
     例如: "Miele C1" 返回 brand="Miele", model="C1"
+    品牌型号表见 model_parser.MODEL_TABLE（另外会加载 data/vacuums.json 中的型号）
     """
-    parts = keyword.split()
-
-    # 品牌型号数据库（常见模式）
-    brand_patterns = {
-        'Dyson': ['V', 'V7', 'V8', 'V10', 'V11', 'V12', 'V15', 'Cyclone', 'Digital Slim'],
-        'Shark': ['Navigator', 'Rocket', 'Apex', 'Ion', 'Vertex', 'Rotator', 'Stratos'],
-        'Bissell': ['Crosswave', 'Little Green', 'ProHeat', 'SpotClean', 'Pet Hair Eraser', 'PowerForce'],
-        'Roomba': ['i', 'e', 's', 'j', '600', '700', '800', '900', 'i7', 'i8', 'e5'],
-        'Roborock': ['S4', 'S5', 'S6', 'S7', 'S8', 'Q5', 'Q7', 'E4'],
-        'Ecovacs': ['Deebot', 'Ozmo', 'N79', 'S5', 'S6', 'S7'],
-        'Eufy': ['RoboVac', 'HomeVac', '11S', '30C', 'G30'],
-        'Hoover': ['WindTunnel', 'PowerDrive', 'React', 'ONE', 'Legacy'],
-        'Miele': ['C1', 'C2', 'C3', 'Complete', 'Classic', 'Full'],
-        'Tineco': ['iFloor', 'Dry', 'Wet', 'Smart', 'Floor ONE'],
-        'Samsung': ['Jet', '70', '75', '90', 'Stick', 'Cordless']
-    }
-
-    # 提取品牌
-    brand = parts[0] if parts else "Unknown"
-
-    # 智能提取型号和问题描述
-    model = ""
-    problem_desc = ""
-
-    # 常见型号模式（model 不包含品牌前缀）
-    if brand == 'Dyson':
-        # Dyson V7/V8/V10/V11/V12/V15（型号不包含品牌）
-        for i, part in enumerate(parts[1:], 1):
-            if part in ['V7', 'V8', 'V10', 'V11', 'V12', 'V15', 'V7+', 'V8+', 'V10+']:
-                model = part
-                if i < len(parts) - 1:
-                    problem_desc = " ".join(parts[i+1:])
-                break
-            elif part == 'Cyclone' or part == 'Digital':
-                # 组合型号（如 Cyclone V10）
-                model = part
-                if i < len(parts) - 1 and parts[i+1] in ['V7', 'V8', 'V10', 'V11', 'V12', 'V15']:
-                    model = f"{part} {parts[i+1]}"
-                    if i < len(parts) - 2:
-                        problem_desc = " ".join(parts[i+2:])
-                    break
-                else:
-                    if i < len(parts) - 1:
-                        problem_desc = " ".join(parts[i+1:])
-                    break
-        if not model:
-            model = "Vacuum"
-            problem_desc = " ".join(parts[1:])
-
-    elif brand == 'Shark':
-        # Shark Navigator/Rocket/Apex/Ion/Vertex
-        for i, part in enumerate(parts[1:], 1):
-            if part in brand_patterns.get('Shark', []):
-                model = part
-                if i < len(parts) - 1:
-                    problem_desc = " ".join(parts[i+1:])
-                break
-        if not model:
-            model = "Vacuum"
-            problem_desc = " ".join(parts[1:])
-
-    elif brand == 'Bissell':
-        # Bissell Crosswave/Little Green/ProHeat/SpotClean
-        for i, part in enumerate(parts[1:], 1):
-            if part in ['Crosswave', 'Little', 'ProHeat', 'SpotClean', 'Pet']:
-                if part == 'Little' and i < len(parts) - 1 and parts[i+1] == 'Green':
-                    model = "Little Green"
-                    if i < len(parts) - 2:
-                        problem_desc = " ".join(parts[i+2:])
-                    break
-                elif part == 'Pet' and i < len(parts) - 1 and parts[i+1] == 'Hair':
-                    model = "Pet Hair Eraser"
-                    if i < len(parts) - 2:
-                        problem_desc = " ".join(parts[i+2:])
-                    break
-                else:
-                    model = part
-                    if i < len(parts) - 1:
-                        problem_desc = " ".join(parts[i+1:])
-                    break
-        if not model:
-            model = "Cleaner"
-            problem_desc = " ".join(parts[1:])
-
-    elif brand == 'Roomba':
-        # Roomba i/e/s/j 系列 + 数字
-        for i, part in enumerate(parts[1:], 1):
-            if part in ['i', 'e', 's', 'j'] and i < len(parts) - 1:
-                model = f"{part} {parts[i+1]}"
-                if i < len(parts) - 2:
-                    problem_desc = " ".join(parts[i+2:])
-                break
-            elif part.isdigit() and 500 <= int(part) <= 1000:
-                model = part
-                if i < len(parts) - 1:
-                    problem_desc = " ".join(parts[i+1:])
-                break
-        if not model:
-            model = "Robot Vacuum"
-            problem_desc = " ".join(parts[1:])
-
-    elif brand == 'Samsung':
-        # Samsung Jet 70/75/90
-        for i, part in enumerate(parts[1:], 1):
-            if part == 'Jet' and i < len(parts) - 1:
-                next_part = parts[i+1]
-                if next_part in ['70', '75', '90', 'Stick', 'Cordless']:
-                    model = f"Jet {next_part}"
-                    if i < len(parts) - 2:
-                        problem_desc = " ".join(parts[i+2:])
-                    break
-            elif part == 'Jet':
-                model = "Jet"
-                if i < len(parts) - 1:
-                    problem_desc = " ".join(parts[i+1:])
-                break
-        if not model:
-            model = "Vacuum"
-            problem_desc = " ".join(parts[1:])
-
-    elif brand == 'Miele':
-        # Miele C1/C2/C3 + Complete/Classic
-        for i, part in enumerate(parts[1:], 1):
-            if part in ['C1', 'C2', 'C3']:
-                model = part
-                if i < len(parts) - 1:
-                    problem_desc = " ".join(parts[i+1:])
-                break
-            elif part in ['Complete', 'Classic', 'Full']:
-                model = part
-                if i < len(parts) - 1:
-                    problem_desc = " ".join(parts[i+1:])
-                break
-        if not model:
-            model = "Vacuum"
-            problem_desc = " ".join(parts[1:])
-
-    elif brand == 'Tineco':
-        # Tineco iFloor + 数字
-        for i, part in enumerate(parts[1:], 1):
-            if part == 'iFloor' and i < len(parts) - 1:
-                model = f"iFloor {parts[i+1]}"
-                if i < len(parts) - 2:
-                    problem_desc = " ".join(parts[i+2:])
-                break
-            elif part in ['Dry', 'Wet', 'Smart']:
-                model = part
-                if i < len(parts) - 1:
-                    problem_desc = " ".join(parts[i+1:])
-                break
-        if not model:
-            model = "Cleaner"
-            problem_desc = " ".join(parts[1:])
-
-    else:
-        # 默认处理
-        model = "Vacuum"
-        problem_desc = " ".join(parts[1:])
-
-    # 清理问题描述
-    if problem_desc:
-        problem_desc = problem_desc.strip()
-    else:
-        problem_desc = keyword
-
-    return brand, model, problem_desc
+    return model_parser.parse_vacuum_model(keyword)
 
 # ============================================
 # 智能问题类型检测
@@ -802,96 +474,30 @@ def detect_problem_type(keyword, problem_desc):
     """
     智能检测问题类型
     根据关键词和问题描述返回最匹配的问题类型
+    检测规则见 problem_matcher.DETECTION_RULES（按优先级排序，编译一次），
+    外部模板文件中的 detection 规则优先
     """
-    keyword_lower = keyword.lower()
-    desc_lower = problem_desc.lower()
-
-    # 优先级检测（按具体程度排序）
-    detection_rules = [
-        # 电池相关问题
-        (['battery', 'batteries', 'battery life', 'dead battery', 'replace battery'], 'battery'),
-        (['battery replacement', 'swap battery', 'change battery'], 'battery'),
-
-        # 充电相关问题
-        (['charging', 'charger', 'won\'t charge', 'not charging', 'charge indicator'], 'charging'),
-        (['charging problems', 'charging issues', 'charge port'], 'charging'),
-
-        # 错误代码
-        (['error', 'error code', 'error codes', 'flashing', 'beeping'], 'error_codes'),
-
-        # 吸力问题
-        (['suction', 'losing suction', 'low suction', 'no suction', 'weak suction'], 'suction'),
-        (['suction power', 'poor suction', 'suction problems'], 'suction'),
-
-        # 电源/开关问题
-        (['not working', 'won\'t turn on', 'won\'t start', 'won\'t power', 'power issues'], 'power'),
-        (['dead', 'no power', 'won\'t work', 'not starting'], 'power'),
-
-        # 刷毛相关问题
-        (['brush', 'brush roll', 'brushroll', 'brush not spinning'], 'brush'),
-        (['roller', 'rotating brush', 'spinning brush'], 'brush'),
-
-        # 滤网问题
-        (['filter', 'filters', 'filter cleaning', 'clogged filter'], 'filter'),
-        (['filter replacement', 'change filter', 'dirty filter'], 'filter'),
-
-        # 配件/附件问题
-        (['attachment', 'attachments', 'tools', 'accessories', 'wand', 'hose'], 'attachment'),
-        (['attachment issues', 'loose attachment', 'broken attachment'], 'attachment'),
-
-        # 电机问题
-        (['motor', 'motor replacement', 'burnt motor', 'motor noise'], 'motor'),
-        (['loud noise', 'grinding noise', 'screaming'], 'motor'),
-
-        # 皮带问题
-        (['belt', 'belt replacement', 'broken belt', 'drive belt'], 'belt'),
-        (['belt slip', 'loose belt'], 'belt'),
-
-        # WiFi/连接问题
-        (['wifi', 'wi-fi', 'connecting', 'connection', 'network'], 'connectivity'),
-        (['app', 'connection lost', 'won\'t connect'], 'connectivity'),
-
-        # 泄漏问题
-        (['leaking', 'leak', 'spitting', 'spraying'], 'leak'),
-
-        # 脉动问题
-        (['pulsing', 'pulse', 'surging'], 'pulsing'),
-
-        # 噪音问题
-        (['noise', 'noisy', 'loud', 'sound'], 'noise'),
-
-        # 加热问题
-        (['heating', 'heat', 'hot water', 'steam'], 'heating'),
-
-        # 地图问题（机器人吸尘器）
-        (['mapping', 'map', 'navigation', 'lost', 'stuck'], 'mapping')
-    ]
-
-    # 检测关键词
-    for keywords, problem_type in detection_rules:
-        for kw in keywords:
-            if kw in keyword_lower or kw in desc_lower:
-                return problem_type
-
-    # 默认返回通用类型
-    return 'general'
+    return TEMPLATES.classify(keyword, problem_desc)
 
 # ============================================
 # 智能内容生成器
 # ============================================
 
-def generate_smart_guide(keyword, trending_source="database"):
+def generate_smart_guide(keyword, trending_source="database", trending_score=None):
     """
     根据关键词智能生成维修指南
 
     Args:
         keyword: 搜索关键词
-        trending_source: 来源标识 ("database", "google_trends", "manual")
+        trending_source: 来源标识 ("database", "google_trends", "trend_history", "manual")
+        trending_score: 0-100 的趋势分数（不传时从趋势分数库查询）
     """
 
     log(f"🤖 正在生成内容: {keyword}")
     if trending_source == "google_trends":
         log(f"   🔥 来源: Google Trends (实时趋势)", "INFO")
+    elif trending_source == "trend_history":
+        log(f"   📈 来源: Trend History (历史趋势)", "INFO")
     elif trending_source == "database":
         log(f"   📊 来源: Database Rotation (热门轮转)", "INFO")
 
@@ -926,7 +532,7 @@ def generate_smart_guide(keyword, trending_source="database"):
         "generated_date": datetime.now().isoformat(),
         "source_keyword": keyword,
         "problem_type": problem_type,
-        "trending_score": calculate_trending_score(keyword),
+        "trending_score": calculate_trending_score(keyword) if trending_score is None else trending_score,
         "trending_source": trending_source,  # 添加来源标识
         "problems": [problem_data]
     }
@@ -956,526 +562,13 @@ def generate_problem_by_type(problem_type, brand, model, problem_desc, keyword):
     else:
         display_desc = f"issues with your {full_model_name}"
 
-    # 重新定义 model 为完整型号名称（用于模板中的 f-string）
-    # 这样所有模板都可以直接使用 {model} 而不需要修改
+    # 模板中的 {model} 是完整型号名称；只渲染选中的问题类型（未知类型使用 general）
     model = full_model_name
-
-    # 动态生成问题模板（避免 f-string 变量作用域问题）
-    problem_templates = {
-        "battery": {
-            "id": "battery-replacement",
-            "title": f"How to Replace {model} Battery",
-            "description": f"Step-by-step guide to replace the battery in your {model}. Restore runtime and performance with a new battery.",
-            "possible_causes": [
-                "Battery has degraded after 2-3 years of regular use",
-                "Battery cells have failed due to age or heat",
-                "Battery is not holding charge for more than 10 minutes",
-                "Charging cycles have exceeded the battery's lifespan",
-                "Battery has been stored at low charge for extended periods"
-            ],
-            "solution_steps": [
-                f"Purchase a genuine replacement battery compatible with {model}",
-                "Power off the vacuum completely and remove from charger",
-                f"Locate the battery compartment on your {model} (typically on the rear or bottom panel)",
-                "Use a suitable screwdriver to remove the battery cover screws",
-                "Carefully disconnect the old battery connector, noting the polarity",
-                "Remove the old battery and inspect the compartment for any damage",
-                "Install the new battery, ensuring correct polarity (+ and - alignment)",
-                "Secure the battery compartment cover and tighten all screws",
-                f"Charge your {model} for 4-6 hours before the first use"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Battery",
-                    "search_query": f"{model} battery"
-                }
-            ]
-        },
-        "charging": {
-            "id": "charging-issues",
-            "title": "Charging Problems & Solutions",
-            "description": f"Troubleshooting and fixing charging issues with {brand} {model}.",
-            "possible_causes": [
-                "Dirty charging contacts",
-                "Faulty charger or docking station",
-                "Battery cannot accept charge anymore",
-                "Charging port damage"
-            ],
-            "solution_steps": [
-                "Clean the metal contacts on both vacuum and charger",
-                "Try a different power outlet",
-                "Check if the charger LED indicator is working",
-                "Inspect the charging port for debris or damage",
-                "Test with a different charger if available",
-                f"If charger is faulty, replace with genuine {brand} charger"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Charger",
-                    "search_query": f"{model} charger replacement"
-                }
-            ]
-        },
-        "filter": {
-            "id": "filter-maintenance",
-            "title": "Filter Cleaning & Replacement",
-            "description": f"Proper filter maintenance for optimal performance of {brand} {model}.",
-            "possible_causes": [
-                "Filter is clogged with dust and debris",
-                "Filter hasn't been cleaned recently",
-                "Filter is damaged or torn",
-                "Using wrong filter type"
-            ],
-            "solution_steps": [
-                "Check the filter indicator light (if available)",
-                "Remove the pre-filter and post-filter",
-                "Tap the filter to remove loose dust",
-                "Rinse with cold water only (no soap)",
-                "Shake gently and let air dry for 24 hours",
-                "Replace if filter is damaged or performance doesn't improve"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Filter",
-                    "search_query": f"{model} filter"
-                }
-            ]
-        },
-        "power": {
-            "id": "power-issues",
-            "title": "Vacuum Won't Turn On or Start",
-            "description": f"Diagnosing why your {brand} {model} won't power on.",
-            "possible_causes": [
-                "Battery is completely drained",
-                "Battery is dead and needs replacement",
-                "Power button malfunction",
-                "Internal electrical fault"
-            ],
-            "solution_steps": [
-                "Charge the vacuum for at least 4 hours",
-                "Check all connections are secure",
-                "Test the power button responsiveness",
-                "Look for any error lights or beeps",
-                "If completely dead, battery replacement is likely needed"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Diagnostic Tool",
-                    "search_query": f"{model} troubleshooting"
-                }
-            ]
-        },
-        "brush": {
-            "id": "brush-roll-issues",
-            "title": "Brush Roll Not Spinning",
-            "description": f"Fixing brush roll problems on {brand} {model}.",
-            "possible_causes": [
-                "Debris tangled around brush roll",
-                "Brush roll belt is broken",
-                "Motor for brush roll failed",
-                "Obstruction preventing rotation"
-            ],
-            "solution_steps": [
-                "Turn off and unplug the vacuum",
-                "Remove the brush roll cover",
-                "Clean all hair and debris from brush roll",
-                "Check the belt for wear or damage",
-                "Test brush roll motor (if applicable)",
-                "Replace belt or brush roll if needed"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Brush Roll",
-                    "search_query": f"{model} brush roll replacement"
-                }
-            ]
-        },
-        "suction": {
-            "id": "low-suction",
-            "title": "Loss of Suction Power",
-            "description": f"Restoring suction power to your {brand} {model}.",
-            "possible_causes": [
-                "Clogged filters or dust bin",
-                "Blockage in the wand or hose",
-                "Brush roll not spinning",
-                "Dust bin is overfilled"
-            ],
-            "solution_steps": [
-                "Empty the dust bin completely",
-                "Clean or replace all filters",
-                "Check for blockages in the vacuum head",
-                "Inspect the wand and hose for clogs",
-                "Remove any debris from the air pathways",
-                "Test suction after each step"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Filter",
-                    "search_query": f"{model} suction problem"
-                }
-            ]
-        },
-        "connectivity": {
-            "id": "wifi-connectivity",
-            "title": "WiFi & App Connection Issues",
-            "description": f"Fixing connectivity problems with {brand} {model}.",
-            "possible_causes": [
-                "WiFi network changed",
-                "App needs update",
-                "Firmware outdated",
-                "Router interference"
-            ],
-            "solution_steps": [
-                "Ensure vacuum is in WiFi coverage area",
-                "Update the companion app to latest version",
-                "Reset vacuum's WiFi connection",
-                "Restart your router",
-                "Reconnect through the app step by step",
-                "Update vacuum firmware if available"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} App",
-                    "search_query": f"{model} app download"
-                }
-            ]
-        },
-        "error_codes": {
-            "id": "error-codes-troubleshooting",
-            "title": f"{model} Error Codes Explained",
-            "description": f"Understanding and resolving error codes on your {model}. Complete error code reference with solutions.",
-            "possible_causes": [
-                "Brush roll obstruction detected by sensors",
-                "Battery communication failure",
-                "Motor overload or overheating",
-                "Filter clogged or not properly installed",
-                "Internal sensor malfunction",
-                "PCB board error detected"
-            ],
-            "solution_steps": [
-                f"Turn off your {model} and wait 30 seconds",
-                "Check for any visible obstructions in the brush roll area",
-                "Remove and clean all filters thoroughly",
-                "Ensure the dust bin is properly installed and not overfilled",
-                "Check battery connections and terminals for corrosion",
-                "Look up the specific error code in the user manual",
-                f"If error persists after troubleshooting, contact {brand} support",
-                "Consider resetting the vacuum by removing the battery for 1 minute"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Filter",
-                    "search_query": f"{model} filter"
-                },
-                {
-                    "name": f"{model} Brush Roll",
-                    "search_query": f"{model} brush roll"
-                }
-            ]
-        },
-        "attachment": {
-            "id": "attachment-troubleshooting",
-            "title": f"{model} Attachment & Accessory Problems",
-            "description": f"Solving issues with attachments, tools, and accessories for your {model}. Fix loose or malfunctioning attachments.",
-            "possible_causes": [
-                "Attachment not properly locked into place",
-                "Connection mechanism is dirty or damaged",
-                "Accessory release button is stuck or broken",
-                "Wand or hose is clogged with debris",
-                "Electrical contacts are dirty or corroded",
-                "Attachment motor has failed"
-            ],
-            "solution_steps": [
-                f"Remove all attachments from your {model} and inspect them",
-                "Clean the connection points with a dry cloth",
-                "Check the release mechanism for debris or damage",
-                "Test each attachment individually to identify the problematic one",
-                "Lubricate moving parts if applicable (check manual first)",
-                "Ensure attachments are fully clicked into position",
-                "Inspect the electrical contacts for corrosion or dirt",
-                "Replace the attachment if the issue persists after cleaning"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Attachment",
-                    "search_query": f"{model} attachment"
-                },
-                {
-                    "name": f"{model} Wand or Hose",
-                    "search_query": f"{model} wand hose"
-                }
-            ]
-        },
-        "motor": {
-            "id": "motor-replacement",
-            "title": f"How to Replace {model} Motor",
-            "description": f"Complete motor replacement guide for {model}. Fix loud noises, burning smells, or complete motor failure.",
-            "possible_causes": [
-                "Motor bearings have worn out after years of use",
-                "Motor has overheated and windings are damaged",
-                "Foreign object damaged the motor fan or impeller",
-                "Water or liquid damage to motor electronics",
-                "Electrical surge or short circuit burned motor",
-                "Brushes have worn down (for brushed motors)"
-            ],
-            "solution_steps": [
-                f"Confirm the motor is the issue on your {model} (listen for unusual sounds)",
-                "Purchase a compatible replacement motor specific to {model}",
-                "Remove the battery and any external covers",
-                "Document all wire connections with photos before disconnecting",
-                "Carefully disconnect all motor electrical connectors",
-                "Remove mounting screws securing the motor housing",
-                f"Lift out the old motor from your {model} carefully",
-                "Install the new motor and reconnect all wires matching your photos",
-                "Reassemble in reverse order and test operation"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Motor",
-                    "search_query": f"{model} motor"
-                },
-                {
-                    "name": f"Motor Wiring Harness",
-                    "search_query": f"{model} wire harness"
-                }
-            ]
-        },
-        "belt": {
-            "id": "belt-replacement",
-            "title": f"How to Replace {model} Belt",
-            "description": f"Step-by-step belt replacement guide for {model}. Fix brush roll not spinning or loss of cleaning power.",
-            "possible_causes": [
-                "Belt has stretched or worn over time",
-                "Belt has broken due to age or obstruction",
-                "Belt slipped off the pulley due to debris",
-                "Belt melted from motor friction or overheating",
-                "Brush roll seized causing belt failure",
-                "Poor maintenance led to premature belt wear"
-            ],
-            "solution_steps": [
-                f"Purchase the correct replacement belt for {model}",
-                "Remove the battery and bottom plate from {model}",
-                "Remove the brush roll and set aside",
-                "Clean any debris or hair from the pulley area",
-                "Remove the old belt from both motor and brush roll pulleys",
-                "Install the new belt, ensuring proper tension",
-                "Verify the belt sits correctly in the pulley grooves",
-                "Reinstall the brush roll and test rotation",
-                "Reassemble the vacuum and test operation"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Belt",
-                    "search_query": f"{model} belt"
-                },
-                {
-                    "name": f"Brush Roll (recommended to replace together)",
-                    "search_query": f"{model} brush roll"
-                }
-            ]
-        },
-        "leak": {
-            "id": "leak-troubleshooting",
-            "title": f"{model} Leaking Water or Solution",
-            "description": f"Fixing leak issues on your {model}. Stop water or cleaning solution from dripping during use.",
-            "possible_causes": [
-                "Dirty tank cap seal or O-ring is damaged",
-                "Crack in the clean or dirty water tank",
-                "Overfilled tank causing overflow during operation",
-                "Loose hose connection inside the vacuum",
-                "Damaged spray nozzle or valve",
-                "Seal degraded on the brush nozzle assembly"
-            ],
-            "solution_steps": [
-                f"Empty both tanks from your {model} completely",
-                "Inspect tank caps for damaged or missing seals",
-                "Check both clean and dirty tanks for cracks or damage",
-                "Examine all hose connections for tightness",
-                "Test the spray trigger to see if it leaks continuously",
-                "Clean the spray nozzle with warm water to remove clogs",
-                "Replace the tank cap or nozzle assembly if damaged",
-                "Ensure tanks are not filled above the MAX line"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Tank Cap",
-                    "search_query": f"{model} tank cap"
-                },
-                {
-                    "name": f"{model} Spray Nozzle",
-                    "search_query": f"{model} spray nozzle"
-                }
-            ]
-        },
-        "pulsing": {
-            "id": "pulsing-troubleshooting",
-            "title": f"{model} Pulsing or Surging Power",
-            "description": f"Fixing pulsing, surging, or inconsistent power on your {model}. Understand why power fluctuates and how to resolve it.",
-            "possible_causes": [
-                "Dirty or clogged filters causing airflow restriction",
-                "Bin is overfilled restricting airflow",
-                "Brush roll is obstructed causing resistance changes",
-                "Motor is failing and power delivery is inconsistent",
-                "PCB board issue causing voltage fluctuations",
-                "Battery is failing and cannot deliver consistent power"
-            ],
-            "solution_steps": [
-                f"Empty and clean the dust bin on your {model}",
-                "Remove and clean all filters (let them dry completely for 24 hours)",
-                "Clean the brush roll and remove any tangled hair or debris",
-                "Check for any blockages in the air pathways",
-                "Test with a fully charged battery to rule out power issues",
-                "If pulsing continues, the motor or PCB may need replacement",
-                f"Contact {brand} support if the issue persists after cleaning"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Filter",
-                    "search_query": f"{model} filter"
-                },
-                {
-                    "name": f"{model} Replacement Motor",
-                    "search_query": f"{model} motor"
-                }
-            ]
-        },
-        "noise": {
-            "id": "noise-troubleshooting",
-            "title": f"{model} Making Loud or Unusual Noises",
-            "description": f"Diagnosing and fixing loud noises from your {model}. Grinding, screaming, rattling, or high-pitched sounds explained.",
-            "possible_causes": [
-                "Debris caught in the brush roll or impeller",
-                "Worn-out bearings in the motor or brush roll",
-                "Broken or damaged belt flopping around",
-                "Loose screws or components vibrating",
-                "Stone or hard object damaging internal parts",
-                "Motor armature rubbing against the housing"
-            ],
-            "solution_steps": [
-                f"Turn off your {model} immediately to prevent further damage",
-                "Remove the brush roll and clean thoroughly",
-                "Inspect the belt for signs of wear or damage",
-                "Check for any loose screws or components and tighten",
-                "Run the vacuum without the brush head to isolate the noise source",
-                "If noise comes from the main body, the motor may be failing",
-                "Contact manufacturer support for repair if motor related",
-                "Consider professional repair service for complex mechanical issues"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Brush Roll",
-                    "search_query": f"{model} brush roll"
-                },
-                {
-                    "name": f"{model} Belt",
-                    "search_query": f"{model} belt"
-                }
-            ]
-        },
-        "heating": {
-            "id": "heating-troubleshooting",
-            "title": f"{model} Not Heating Properly",
-            "description": f"Fixing heating issues on your {model}. Restore steam or hot water cleaning functionality.",
-            "possible_causes": [
-                "Heating element has burned out or failed",
-                "Thermal fuse has blown due to overheating",
-                "PCB board issue preventing heater activation",
-                "Water tank is empty or not properly seated",
-                "Scale or mineral buildup blocking heating element",
-                "Pump failure preventing water circulation to heater"
-            ],
-            "solution_steps": [
-                f"Ensure the water tank on your {model} is filled",
-                "Check that the tank is properly seated and detected",
-                "Clean the heating element with vinegar to remove scale buildup",
-                "Inspect the thermal fuse for continuity",
-                "Test the heater with a multimeter for power supply",
-                "Check all electrical connections to the heating element",
-                f"Replace the heating element or thermal fuse if defective",
-                "Run a descaling cycle if available on your model"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Heating Element",
-                    "search_query": f"{model} heater"
-                },
-                {
-                    "name": f"{model} Thermal Fuse",
-                    "search_query": f"{model} thermal fuse"
-                }
-            ]
-        },
-        "mapping": {
-            "id": "mapping-troubleshooting",
-            "title": f"{model} Navigation & Mapping Problems",
-            "description": f"Fixing mapping, navigation, and getting lost issues on your {model}. Restore proper cleaning path coverage.",
-            "possible_causes": [
-                "Wheel encoders are dirty or obstructed",
-                "Bumper sensors are not detecting obstacles properly",
-                "Cliff sensors are dirty or miscalibrated",
-                "Firmware needs updating for better navigation",
-                "Battery low causing navigation failures",
-                "Home base location has moved or is obstructed"
-            ],
-            "solution_steps": [
-                f"Clean all wheels and encoders on your {model} with a dry cloth",
-                "Wipe the bumper sensors and cliff sensors with a damp microfiber cloth",
-                f"Perform a factory reset on your {model} (this will clear the map)",
-                "Update to the latest firmware for improved navigation algorithms",
-                "Clear the home base area of obstacles",
-                f"Let your {model} complete a full mapping cycle in a small room first",
-                "Ensure adequate lighting for better camera and sensor performance",
-                "Check wheel performance - stuck wheels cause mapping errors"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Wheel Assembly",
-                    "search_query": f"{model} wheel"
-                },
-                {
-                    "name": f"{model} Sensor Array",
-                    "search_query": f"{model} sensors"
-                }
-            ]
-        },
-        "general": {
-            "id": "general-troubleshooting",
-            "title": f"How to Fix {display_desc}",
-            "description": f"Complete troubleshooting and repair guide for {display_desc}. Diagnostic steps, common problems, and professional solutions to restore your {model} to optimal performance.",
-            "possible_causes": [
-                f"Normal wear and tear on {model} components",
-                "Lack of regular maintenance and cleaning",
-                "Specific part failure or degradation",
-                "Usage beyond recommended capacity",
-                "Environmental factors (dust, moisture, temperature)",
-                "Age-related performance decline"
-            ],
-            "solution_steps": [
-                f"Identify the specific issue with your {model} - note any unusual sounds, lights, or behaviors",
-                "Consult the official user manual for model-specific troubleshooting guidance",
-                "Perform basic diagnostics: check filters, inspect brush rolls, test battery performance",
-                f"Clean all accessible parts of your {model} including filters, brush rolls, and dust bins",
-                "Ensure proper charging and battery health for cordless models",
-                "Inspect for visible damage, blockages, or worn parts that may need replacement",
-                "Test the vacuum after each troubleshooting step to isolate the problem",
-                f"If the issue persists, consider professional repair service or replacement parts for your {model}",
-                "Contact manufacturer support for warranty service or authorized repair centers"
-            ],
-            "required_parts": [
-                {
-                    "name": f"{model} Replacement Parts",
-                    "search_query": f"{model} parts"
-                },
-                {
-                    "name": f"{model} Maintenance Kit",
-                    "search_query": f"{model} filter"
-                }
-            ]
-        }
-    }
-
-    # 获取基础模板
-    problem_data = problem_templates.get(problem_type, problem_templates["general"])
+    problem_data = TEMPLATES.render_problem(problem_type, {
+        "brand": brand,
+        "model": model,
+        "display_desc": display_desc
+    })
 
     # ============================================
     # 🚀💎💰 集成三大核心功能到每个问题类型
@@ -1541,273 +634,9 @@ def generate_seo_keywords(keyword, brand, model, problem_desc=""):
         f"{model} guide"
     ]
 
-    # 智能长尾关键词生成器
-    def generate_problem_specific_keywords(desc):
-        """根据问题描述生成精准的长尾词"""
-        desc_lower = desc.lower()
-        keywords = []
-
-        # 注意：model 参数已经是完整型号名称（例如 "Miele C1"）
-        # 所以直接使用 model，不再添加 brand 前缀
-
-        # 问题类型 → 高流量长尾词映射
-        problem_keywords_map = {
-            # 电池问题
-            'battery': [
-                f"{model} battery replacement",
-                f"{model} battery not holding charge",
-                f"replace {model} battery",
-                f"{model} battery life",
-                f"where to buy {model} battery",
-                f"{model} dead battery",
-                f"how long does {model} battery last",
-                f"{model} battery cost",
-                f"{model} won't hold charge",
-                f"{model} battery indicator"
-            ],
-
-            # 充电问题
-            'charging': [
-                f"{model} not charging",
-                f"{model} charger problems",
-                f"{model} won't charge",
-                f"{model} charging light flashing",
-                f"replace {model} charger",
-                f"{model} charging dock issues",
-                f"{model} battery not charging",
-                f"fix {model} charging problems",
-                f"{model} charge indicator",
-                f"{model} charging slowly"
-            ],
-
-            # 错误代码
-            'error_codes': [
-                f"{model} error codes",
-                f"{model} error code list",
-                f"{model} flashing red light",
-                f"{model} beeping",
-                f"{model} error codes manual",
-                f"troubleshoot {model} error codes",
-                f"{model} error codes repair",
-                f"what does {model} error code mean",
-                f"{model} error codes not working",
-                f"fix {model} error codes"
-            ],
-
-            # 配件/附件问题
-            'attachment': [
-                f"{model} attachment not working",
-                f"{model} accessories problems",
-                f"{model} tools not fitting",
-                f"{model} attachment falls off",
-                f"replace {model} attachment",
-                f"{model} wand problems",
-                f"{model} hose replacement",
-                f"where to buy {model} attachments",
-                f"{model} attachment compatibility",
-                f"fix {model} attachment issues"
-            ],
-
-            # 电机问题
-            'motor': [
-                f"{model} motor replacement",
-                f"{model} motor noise",
-                f"{model} motor burning smell",
-                f"{model} motor not spinning",
-                f"replace {model} motor",
-                f"{model} motor repair cost",
-                f"how to replace {model} motor",
-                f"{model} motor problems",
-                f"{model} motor failure",
-                f"fix {model} motor"
-            ],
-
-            # 皮带问题
-            'belt': [
-                f"{model} belt replacement",
-                f"{model} broken belt",
-                f"{model} belt slipping",
-                f"replace {model} belt",
-                f"where to buy {model} belt",
-                f"how to change {model} belt",
-                f"{model} belt problems",
-                f"fix {model} belt",
-                f"{model} belt size",
-                f"{model} drive belt"
-            ],
-
-            # 漏水问题
-            'leak': [
-                f"{model} leaking water",
-                f"{model} leaking dirty water",
-                f"{model} water tank leaking",
-                f"fix {model} leak",
-                f"{model} leaking from bottom",
-                f"{model} seal replacement",
-                f"where is {model} leaking from",
-                f"{model} tank cap problems",
-                f"repair {model} water leak",
-                f"stop {model} leaking"
-            ],
-
-            # 吸力脉动问题
-            'pulsing': [
-                f"{model} pulsing",
-                f"{model} suction pulsating",
-                f"{model} revving up and down",
-                f"fix {model} pulsing",
-                f"{model} not constant suction",
-                f"{model} surging",
-                f"why does {model} pulse",
-                f"{model} pulsing and stopping",
-                f"troubleshoot {model} pulsing",
-                f"stop {model} from pulsing"
-            ],
-
-            # 噪音问题
-            'noise': [
-                f"{model} making loud noise",
-                f"{model} rattling noise",
-                f"{model} whistling sound",
-                f"{model} high pitched noise",
-                f"fix {model} noise",
-                f"{model} strange sounds",
-                f"{model} clicking noise",
-                f"{model} grinding noise",
-                f"why is {model} so loud",
-                f"reduce {model} noise"
-            ],
-
-            # 过热问题
-            'heating': [
-                f"{model} overheating",
-                f"{model} getting hot",
-                f"{model} burning smell",
-                f"fix {model} overheating",
-                f"{model} shuts off when hot",
-                f"{model} thermal protection",
-                f"{model} too hot to touch",
-                f"{model} heat issues",
-                f"prevent {model} overheating",
-                f"{model} temperature warning"
-            ],
-
-            # 导航/映射问题
-            'mapping': [
-                f"{model} mapping problems",
-                f"{model} not mapping house",
-                f"{model} lost map",
-                f"{model} navigation issues",
-                f"reset {model} map",
-                f"{model} not cleaning in straight lines",
-                f"{model} mapping errors",
-                f"fix {model} navigation",
-                f"{model} can't find home",
-                f"{model} cleaning pattern problems"
-            ],
-
-            # 连接性问题
-            'connectivity': [
-                f"{model} not connecting to wifi",
-                f"{model} app not working",
-                f"{model} bluetooth problems",
-                f"{model} offline",
-                f"fix {model} connection",
-                f"{model} can't connect to phone",
-                f"{model} network issues",
-                f"{model} app connection failed",
-                f"troubleshoot {model} connectivity",
-                f"reconnect {model} to wifi"
-            ],
-
-            # 刷条问题
-            'brushroll': [
-                f"{model} brush roll not spinning",
-                f"{model} brush roll replacement",
-                f"{model} brush bar stuck",
-                f"clean {model} brush roll",
-                f"{model} bristles worn",
-                f"replace {model} brush roll",
-                f"{model} brush roll removal",
-                f"fix {model} brush roll",
-                f"{model} roller not turning",
-                f"install {model} brush roll"
-            ],
-
-            # 滤网问题
-            'filter': [
-                f"{model} filter replacement",
-                f"{model} filter cleaning",
-                f"{model} hepa filter",
-                f"where to buy {model} filters",
-                f"clean {model} filter",
-                f"{model} filter indicator",
-                f"{model} pre-filter",
-                f"{model} post-filter",
-                f"change {model} filter",
-                f"{model} filter washable"
-            ],
-
-            # 吸力损失问题
-            'suction': [
-                f"{model} lost suction",
-                f"{model} no suction",
-                f"{model} weak suction",
-                f"fix {model} suction",
-                f"{model} not picking up dirt",
-                f"restore {model} suction",
-                f"{model} suction power low",
-                f"{model} poor suction",
-                f"improve {model} suction",
-                f"{model} suction problems"
-            ],
-
-            # 电源问题
-            'power': [
-                f"{model} won't turn on",
-                f"{model} not working",
-                f"{model} no power",
-                f"{model} dead",
-                f"fix {model} power",
-                f"{model} won't start",
-                f"{model} power issues",
-                f"{model} not responding",
-                f"repair {model} power",
-                f"{model} startup problems"
-            ]
-        }
-
-        # 检测问题类型并返回对应关键词
-        for problem_type, keywords in problem_keywords_map.items():
-            # 检查描述中是否包含相关关键词
-            type_keywords = problem_type.split('_')
-            if any(kw in desc_lower for kw in type_keywords):
-                return keywords
-
-        # 默认返回通用长尾词
-        return [
-            f"where to buy {model} parts",
-            f"{model} replacement parts",
-            f"{model} not working",
-            f"fix {model} problems",
-            f"{model} repair guide",
-            f"{model} troubleshooting tips",
-            f"{model} maintenance",
-            f"how to repair {model}"
-        ]
-
-    # 生成问题特定的长尾关键词
-    if problem_desc:
-        long_tail_keywords = generate_problem_specific_keywords(problem_desc)
-    else:
-        # 如果没有问题描述，使用通用长尾词
-        # 注意：model 参数已经是完整型号名称
-        long_tail_keywords = [
-            f"where to buy {model} parts",
-            f"{model} replacement parts",
-            f"{model} not working",
-            f"fix {model} problems"
-        ]
+    # 问题特定的长尾关键词（只渲染命中的类型；没有问题描述时使用通用长尾词）
+    # 注意：model 参数已经是完整型号名称
+    long_tail_keywords = TEMPLATES.render_seo_keywords(problem_desc, {"model": model})
 
     # 合并所有关键词（去重）
     all_keywords = base_keywords + long_tail_keywords
@@ -1826,153 +655,332 @@ def generate_seo_keywords(keyword, brand, model, problem_desc=""):
 # 趋势分数计算
 # ============================================
 
+def trend_store_path():
+    """趋势分数库路径（与 DATA_DIR 对应的 .cache/ 下）"""
+    return corpus_index.cache_dir_for(DATA_DIR) / trend_store.DB_NAME
+
 def calculate_trending_score(keyword):
-    """计算关键词的热度分数（模拟）"""
-    # 实际应用中可以从 Google Trends API 或其他数据源获取
-    base_score = 50
+    """
+    关键词的热度分数（0-100）：历史趋势观察的时间衰减分数，从未出现在趋势中的关键词为 0
+    批量生成时由 main() 一次性算好，这里只用于单独调用
+    """
+    try:
+        with trend_store.TrendStore(trend_store_path()) as store:
+            return store.trending_score(keyword)
+    except Exception as e:
+        log(f"⚠️ 趋势分数查询失败: {str(e)}", "WARN")
+        return 0
 
-    # 根据关键词长度调整
-    if len(keyword.split()) <= 3:
-        base_score += 20
+def load_trend_history(limit, exclude=None):
+    """历史趋势中衰减分数最高的 limit 个关键词（分数库不可用时返回空列表）"""
+    try:
+        with trend_store.TrendStore(trend_store_path()) as store:
+            return [kw for kw, _ in store.top(limit, exclude=exclude)]
+    except Exception as e:
+        log(f"⚠️ 趋势分数库读取失败: {str(e)}", "WARN")
+        return []
 
-    # 根据问题类型调整
-    high_traffic_words = ["battery", "charging", "not working", "troubleshooting"]
-    for word in high_traffic_words:
-        if word in keyword.lower():
-            base_score += 15
-            break
+def load_trending_scores(keywords):
+    """一次查询多个关键词的 0-100 趋势分数 {关键词: 分数}"""
+    try:
+        with trend_store.TrendStore(trend_store_path()) as store:
+            return {kw: store.trending_score(kw) for kw in keywords}
+    except Exception as e:
+        log(f"⚠️ 趋势分数查询失败: {str(e)}", "WARN")
+        return {kw: 0 for kw in keywords}
 
-    return min(base_score, 100)
+def keyword_covered(keyword):
+    """关键词对应的指南 slug 是否已存在（与 save_guide 的文件名规则一致）"""
+    brand, model, _ = parse_vacuum_model(keyword)
+    full_model_name = f"{brand} {model}" if model else brand
+    return slug_registry.guide_slug(brand, full_model_name) in slug_registry.get_registry(DATA_DIR)
 
 # ============================================
 # 文件保存
 # ============================================
 
 def save_guide(guide):
-    """保存生成的指南"""
-    brand_slug = guide["brand"].lower().replace(" ", "-").replace("+", "plus")
-    model_clean = guide["model"].lower().replace(guide["brand"].lower(), "").strip()
-    model_slug = model_clean.replace(" ", "-").replace("/", "-").replace("+", "plus").strip("-")
-
-    filename = f"{brand_slug}-{model_slug}.json"
+    """保存生成的指南，成功时返回文件路径，跳过时返回 None"""
+    slug = slug_registry.guide_slug(guide["brand"], guide["model"])
+    filename = f"{slug}.json"
     filepath = DATA_DIR / filename
 
-    if filepath.exists():
+    # 结构不符合 VacuumManual 的指南会让页面构建失败：默认跳过，GUIDE_SCHEMA=warn 时只记录
+    keep, issues = guide_schema.check_guide(guide)
+    errors = guide_schema.errors_only(issues)
+    if errors:
+        log(f"⚠️  {filename} 结构错误: {guide_schema.describe_issues(errors)}", "WARN")
+    if not keep:
+        log(f"⏭️  跳过 {filename}: 结构校验失败")
+        return None
+
+    # 屏蔽型号名后与已有指南几乎相同（模板内容重复）：默认只记录，NEAR_DUPLICATES=skip 时跳过
+    keep, matches = near_duplicates.check_guide(guide, slug, DATA_DIR)
+    if matches:
+        log(f"⚠️  {filename} 与已有指南近似重复: {near_duplicates.describe_matches(matches)}", "WARN")
+    if not keep:
+        log(f"⏭️  跳过 {filename}: 近似重复")
+        return None
+
+    # 注册表检查 slug 重复和语义重复（同品牌 + 型号 + 问题类型），不必逐个 stat 文件
+    claimed, reason = slug_registry.get_registry(DATA_DIR).claim(slug, guide)
+    if not claimed:
+        log(f"⏭️  跳过 {filename}: {reason}")
+        return None
+
+    # 已被其他指南使用的 SEO 关键词改写为长尾词或去掉，避免站内互相争抢同一个搜索词
+    changes = keyword_index.resolve_guide_keywords(guide, slug, DATA_DIR)
+    if changes:
+        log(f"   🔁 {keyword_index.describe_changes(changes)}")
+
+    # 原子独占创建：并行 worker 生成同一文件时只有一个会成功，崩溃也不会留下截断的 JSON
+    try:
+        guide_store.write_guide(filepath, guide, exclusive=True)
+    except FileExistsError:
         log(f"⏭️  文件已存在: {filename}")
-        return False
-
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(guide, f, indent=2, ensure_ascii=False)
+        return None
+    except OSError as e:
+        # 撤销登记，slug 和语义键可以被后续生成再次使用
+        slug_registry.get_registry(DATA_DIR).release(slug, guide)
+        log(f"❌ 写入失败 {filename}: {e}", "ERROR")
+        return None
+    keyword_index.register_guide_keywords(guide, slug, DATA_DIR)
+    near_duplicates.register_guide(guide, slug, DATA_DIR)
 
     log(f"✅ 生成成功: {filename}")
-    return True
+    return filepath
 
 # ============================================
 # Git 自动提交
 # ============================================
 
-def git_commit_changes(message):
-    """自动提交更改到 Git"""
+def git_commit_changes(message, paths):
+    """只提交本次写入的文件并推送（GIT_PUBLISH_COALESCE 可合并多次运行的推送）"""
     try:
-        os.chdir(Path(__file__).parent.parent)
-
-        subprocess.run(['git', 'add', 'data/'], check=True, capture_output=True)
-        subprocess.run(['git', 'commit', '-m', message], check=True, capture_output=True)
-        subprocess.run(['git', 'push'], check=True, capture_output=True)
+        publisher = git_publisher.GitPublisher(Path(__file__).parent.parent, log=log)
+        result = publisher.publish(paths, message)
 
-        log("✅ 已自动提交到 Git")
+        status = "已推送" if result["pushed"] else "已提交，等待合并推送"
+        log(f"✅ Git {status}: {result['files']} 个文件 ({git_publisher.format_timings(result['timings'])})")
         return True
     except Exception as e:
         log(f"⚠️  Git 提交失败: {str(e)}", "WARN")
         return False
 
 # ============================================
-# 主函数
+# 批量生成（进程池）
 # ============================================
 
-def main():
-    """主执行函数"""
-    log("=" * 60)
-    log("🤖 AI 智能内容生成器启动 (🚀 高流量 + 💎 高质量 + 💰 高转化)")
-    log("=" * 60)
+def generate_task(task):
+    """
+    进程池 worker：只生成指南（本地模板渲染），保存由父进程的 save_result() 完成
+    task: (序号, 关键词, 来源, 趋势分数)
+    返回 {"index", "keyword", "guide", "saved", "path", "elapsed", "error"}
+    """
+    index, keyword, trending_source, trending_score = task
+    started = time.perf_counter()
+    result = {"index": index, "keyword": keyword, "guide": None, "saved": False, "path": None,
+              "elapsed": 0.0, "error": None}
+    try:
+        result["guide"] = generate_smart_guide(keyword, trending_source=trending_source,
+                                               trending_score=trending_score)
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed"] = time.perf_counter() - started
+    # worker 可能随时被回收，确保日志已写入
+    LOGGER.flush()
+    return result
 
-    generated = 0
-    skipped = 0
+def save_result(result):
+    """
+    在当前进程保存 generate_task() 生成的指南
+    关键词索引、近似重复索引和 slug 注册表的内存状态都在这一个进程中更新，
+    所以不论 worker 数多少，后面的指南都能看到本次运行中前面保留的关键词
+    """
+    guide = result.pop("guide")
+    if guide is None:
+        return result
+    started = time.perf_counter()
+    try:
+        path = save_guide(guide)
+        result["saved"] = path is not None
+        result["path"] = str(path) if path else None
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed"] += time.perf_counter() - started
+    return result
 
-    # 🚀 第一步：抓取 Google Trends 实时趋势
-    log("\n🔍 步骤 1: 抓取 Google Trends 实时数据...")
-    trending_keywords = fetch_google_trends_rss()
+def generate_and_save(task):
+    return save_result(generate_task(task))
+
+def run_batch(tasks, workers=1):
+    """
+    依次（workers=1）或在进程池中生成，按任务顺序产出结果
+    单篇生成只是本地模板渲染（毫秒级），按块分发以摊薄进程间通信开销；
+    保存（去重检查、关键词处理、写入）在父进程中按结果到达顺序进行
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield generate_and_save(task)
+        return
 
-    # 💾 保存 Google Trends 原始数量（用于诚实标记来源）
-    google_trends_count = len(trending_keywords)
+    chunksize = max(1, len(tasks) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(generate_task, tasks, chunksize=chunksize):
+            yield save_result(result)
+
+def load_keywords_file(path):
+    """读取关键词文件（每行一个，忽略空行和 # 注释）"""
+    keywords = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                keywords.append(line)
+    return keywords
+
+def select_keywords(quota, trending_keywords, extra_keywords=(), history_keywords=(), covered=None):
+    """
+    按优先级凑满配额：Google Trends → 关键词文件 → 历史趋势（按衰减分数）→ 数据库轮转
+    covered(keyword) 为 True 的历史 / 数据库关键词已经生成过，直接跳过
+    返回 [(关键词, 来源)]
+    """
+    selected = []
+    seen = set()
 
-    # 💡 智能关键词选择策略：
-    # - 如果 Google Trends 有相关词，优先使用（高流量）
-    # - 如果不足 3 个，从数据库补充（保证每天 3 篇）
-    needed = 3 - len(trending_keywords)
-    if needed > 0:
-        log(f"📊 从数据库补充 {needed} 个关键词...")
+    def add(keyword, source):
+        key = trend_store.normalize_keyword(keyword)
+        if len(selected) >= quota or key in seen:
+            return
+        if source in ("trend_history", "database") and covered is not None and covered(keyword):
+            return
+        seen.add(key)
+        selected.append((keyword, source))
+
+    for kw in trending_keywords:
+        add(kw, "google_trends")
+    for kw in extra_keywords:
+        add(kw, "manual")
+    for kw in history_keywords:
+        add(kw, "trend_history")
+
+    if len(selected) < quota:
+        log(f"📊 从数据库补充 {quota - len(selected)} 个关键词...")
 
         # 轮转策略：根据一年中的天数计算起始索引
         day_of_year = datetime.now().timetuple().tm_yday
         start_idx = (day_of_year * 3) % len(TRENDING_KEYWORDS)
+        for i in range(len(TRENDING_KEYWORDS)):
+            add(TRENDING_KEYWORDS[(start_idx + i) % len(TRENDING_KEYWORDS)], "database")
 
-        for i in range(needed):
-            idx = (start_idx + i) % len(TRENDING_KEYWORDS)
-            supplement_keyword = TRENDING_KEYWORDS[idx]
-            if supplement_keyword not in trending_keywords:
-                trending_keywords.append(supplement_keyword)
+    return selected
 
-    # 取前 3 个关键词
-    keywords_today = trending_keywords[:3]
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI 智能内容生成器")
+    parser.add_argument("--quota", type=int, default=DAILY_QUOTA, help=f"本次生成的关键词数量（默认 {DAILY_QUOTA}）")
+    parser.add_argument("--workers", type=int, default=1, help="并行 worker 进程数（默认 1）")
+    parser.add_argument("--keywords-file", help="额外的关键词文件（每行一个），用于批量回填")
+    parser.add_argument("--no-trends", action="store_true", help="跳过 Google Trends 抓取")
+    parser.add_argument("--no-commit", action="store_true", help="生成后不自动提交 Git")
+    return parser.parse_args(argv)
 
-    log(f"\n📅 今天是第 {datetime.now().timetuple().tm_yday} 天")
-    log(f"🎯 今天将生成 3 篇文章:")
-    for i, kw in enumerate(keywords_today, 1):
-        # ✅ 诚实标记：根据实际来源显示
-        source = "🔥 Google Trends" if i <= google_trends_count else "📊 数据库"
-        log(f"   {i}. {kw} [{source}]")
+# ============================================
+# 主函数
+# ============================================
 
-    # 处理今天的 3 个关键词
-    for i, keyword in enumerate(keywords_today, 1):
-        log(f"\n[{i}/3] 处理: {keyword}")
+def main(argv=None):
+    """主执行函数"""
+    args = parse_args(argv)
 
-        # ✅ 诚实标记来源：根据是否从 Google Trends 获取来决定
-        trending_source = "google_trends" if i <= google_trends_count else "database"
+    log("=" * 60)
+    log("🤖 AI 智能内容生成器启动 (🚀 高流量 + 💎 高质量 + 💰 高转化)")
+    log("=" * 60)
 
-        try:
-            # 💎🚀💰 使用增强的生成器（包含三大新功能）
-            guide = generate_smart_guide(keyword, trending_source=trending_source)
+    generated = 0
+    skipped = 0
 
-            # 保存文件
-            if save_guide(guide):
-                generated += 1
-                log(f"   ✅ 成功生成并保存")
-            else:
-                skipped += 1
-                log(f"   ⏭️  文件已存在，跳过")
+    # 🚀 第一步：抓取 Google Trends 实时趋势
+    if args.no_trends:
+        trending_keywords = []
+    else:
+        log("\n🔍 步骤 1: 抓取 Google Trends 实时数据...")
+        trending_keywords = fetch_google_trends_rss()
 
-            time.sleep(0.5)
+    extra_keywords = load_keywords_file(args.keywords_file) if args.keywords_file else []
 
-        except Exception as e:
-            log(f"❌ 错误: {str(e)}", "ERROR")
+    # 进程池 fork 之前加载一次注册表和索引，worker 直接继承
+    slug_registry.get_registry(DATA_DIR)
+    if keyword_index.DEFAULT_POLICY != "off":
+        keyword_index.get_index(DATA_DIR)
+    if near_duplicates.DEFAULT_POLICY != "off":
+        near_duplicates.get_index(DATA_DIR)
+
+    # 历史趋势：按时间衰减分数取前几个尚未生成的关键词
+    history_keywords = load_trend_history(args.quota + len(trending_keywords), exclude=keyword_covered)
+
+    # 💡 智能关键词选择策略：
+    # - 如果 Google Trends 有相关词，优先使用（高流量）
+    # - 不足配额时依次从关键词文件、历史趋势、数据库补充
+    selected = select_keywords(args.quota, trending_keywords, extra_keywords, history_keywords, keyword_covered)
+    trend_scores = load_trending_scores([kw for kw, _ in selected])
+    tasks = [(i, kw, source, trend_scores[kw]) for i, (kw, source) in enumerate(selected, 1)]
+    total = len(tasks)
+
+    source_labels = {"google_trends": "🔥 Google Trends", "manual": "📄 关键词文件",
+                     "trend_history": "📈 历史趋势", "database": "📊 数据库"}
+    log(f"\n📅 今天是第 {datetime.now().timetuple().tm_yday} 天")
+    log(f"🎯 本次将生成 {total} 篇文章（{args.workers} 个 worker）:")
+    for i, kw, source, score in tasks:
+        # ✅ 诚实标记：根据实际来源显示
+        log(f"   {i}. {kw} [{source_labels[source]}] 趋势分数 {score}")
+
+    started = time.perf_counter()
+    timings = []
+    generated_keywords = []
+    written_paths = []
+    for done, result in enumerate(run_batch(tasks, args.workers), 1):
+        timings.append(result["elapsed"])
+        if result["error"]:
+            log(f"❌ [{done}/{total}] {result['keyword']}: {result['error']}", "ERROR")
+            skipped += 1
+        elif result["saved"]:
+            generated += 1
+            generated_keywords.append(result["keyword"])
+            written_paths.append(result["path"])
+            log(f"   ✅ [{done}/{total}] {result['keyword']} ({result['elapsed'] * 1000:.1f} ms)")
+        else:
             skipped += 1
-            continue
+            log(f"   ⏭️  [{done}/{total}] {result['keyword']} 文件已存在，跳过 ({result['elapsed'] * 1000:.1f} ms)")
+    wall_time = time.perf_counter() - started
 
     # 最终提交
-    if generated > 0:
-        git_commit_changes(f"🤖 AI 生成内容: {generated} 个新页面")
+    if generated > 0 and not args.no_commit:
+        git_commit_changes(f"🤖 AI 生成内容: {generated} 个新页面", written_paths)
 
     # 总结
     log("\n" + "=" * 60)
     log(f"✅ 完成！")
     log(f"📊 今日生成: {generated} 篇")
     log(f"⏭️  跳过: {skipped} 篇")
+    if timings:
+        timings.sort()
+        log(f"⏱️  总耗时: {wall_time:.2f}s，吞吐 {len(timings) / wall_time:.1f} 篇/s")
+        log(f"⏱️  单篇耗时: 平均 {sum(timings) / len(timings) * 1000:.1f} ms，"
+            f"中位数 {timings[len(timings) // 2] * 1000:.1f} ms，最长 {timings[-1] * 1000:.1f} ms")
     log(f"📅 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     log("=" * 60)
 
-    # 发送 Telegram 通知
-    send_telegram_notification(generated, skipped, keywords_today)
+    # 更新语料统计（JSON + Prometheus textfile；seo-monitor.sh 和通知读取这份结果）
+    try:
+        stats = corpus_stats.update_stats(DATA_DIR)
+        log(f"📈 语料统计: {stats['guides']} 篇，FAQ 覆盖率 {stats['faqs']['coverage']:.1%}，"
+            f"关键词 {stats['keywords']['total']} 个 ({stats['duration_seconds']:.2f}s)")
+    except OSError as e:
+        log(f"⚠️ 语料统计更新失败: {e}", "WARN")
+
+    # 发送 Telegram 通知（退出前最多等待 TELEGRAM_CLOSE_TIMEOUT 秒发送完）
+    send_telegram_notification(generated, skipped, generated_keywords)
+    notifier.close()
 
 if __name__ == "__main__":
     main()
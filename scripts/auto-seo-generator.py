@@ -4,12 +4,22 @@
 每天自动搜索热门关键词并生成新的吸尘器维修指南页面
 """
 
+import hashlib
+import heapq
 import json
 import os
 import sys
 from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
-import time
+
+from log_writer import LogWriter
+import corpus_index
+import guide_schema
+import guide_store
+import keyword_index
+import near_duplicates
+import slug_registry
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -55,6 +65,18 @@ PROBLEM_KEYWORDS = [
     "repair guide"
 ]
 
+# 型号 + 问题组合只针对主要品牌、前几个型号模式和前几个问题
+FOCUS_BRANDS = ["Dyson", "Shark", "Bissell"]
+MODEL_PATTERN_LIMIT = 5
+MODEL_NUMBERS = range(7, 16)  # V7-V15
+MODEL_PROBLEM_LIMIT = 8
+
+# 每次运行处理的关键词数
+KEYWORDS_PER_RUN = 20
+
+# 优先级窗口：堆中最多缓存的候选数（内存上限，与关键词总数无关）
+PRIORITY_WINDOW = 256
+
 # 数据目录
 DATA_DIR = Path(__file__).parent.parent / "data"
 LOG_DIR = Path(__file__).parent.parent / "logs"
@@ -66,64 +88,198 @@ LOG_DIR.mkdir(exist_ok=True)
 # 日志函数
 # ============================================
 
+# 后台线程批量写入，按天轮转（LOG_LEVEL / LOG_FORMAT 等见 log_writer.py）
+LOGGER = LogWriter(LOG_DIR / "seo-generator-{date}.log")
+
 def log(message, level="INFO"):
     """记录日志到文件和控制台"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_message = f"[{timestamp}] [{level}] {message}"
-
-    # 输出到控制台
-    print(log_message)
-
-    # 写入日志文件
-    log_file = LOG_DIR / f"seo-generator-{datetime.now().strftime('%Y%m%d')}.log"
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(log_message + '\n')
+    LOGGER.log(message, level)
 
 # ============================================
-# 关键词生成器
+# 关键词流
 # ============================================
-
-def generate_keyword_combinations():
-    """生成品牌+型号+问题的关键词组合"""
-    keywords = []
-
-    log("开始生成关键词组合...")
-
-    # 生成品牌 + 问题组合
-    for brand in BRANDS:
-        for problem in PROBLEM_KEYWORDS:
-            keyword = f"{brand} {problem}"
-            keywords.append({
-                "keyword": keyword,
-                "search_volume": "estimated",  # 实际应用中可以从 API 获取
-                "type": "brand_problem"
-            })
-
-    # 生成型号 + 问题组合
-    for brand in ["Dyson", "Shark", "Bissell"]:  # 专注主要品牌
-        for pattern in MODEL_PATTERNS[:5]:  # 只取前5个模式
-            for num in range(7, 16):  # V7-V15
-                model = pattern.format(num)
-                for problem in PROBLEM_KEYWORDS[:8]:  # 只取前8个问题
-                    keyword = f"{brand} {model} {problem}"
-                    keywords.append({
-                        "keyword": keyword,
-                        "search_volume": "estimated",
-                        "type": "model_problem"
-                    })
-
-    log(f"生成了 {len(keywords)} 个关键词组合")
-    return keywords
+#
+# 关键词不再一次性生成完整列表，而是按需产出：
+#   1. _iter_sources: 按问题优先级的粗略顺序惰性枚举 (位置, 品牌, 型号, 问题)
+#   2. KeywordStream: 跳过已覆盖的 slug 并去重，经过大小固定的堆按分数重新排序后产出
+#   3. 游标: 记录下次运行从哪个位置继续，每次运行都处理新的组合
+
+def keyword_score(brand, problem_rank, model_rank=None):
+    """分数越高越先生成：问题越靠前（流量越大）、品牌越主流分数越高，具体型号的长尾词略加分"""
+    brand_rank = BRANDS.index(brand) if brand in BRANDS else len(BRANDS)
+    score = 1.0 / (1 + problem_rank) + 0.5 / (1 + brand_rank)
+    if model_rank is not None:
+        score += 0.25 / (1 + model_rank)
+    return round(score, 6)
+
+def keyword_slug(brand, model, problem):
+    return slug_registry.guide_slug(brand, f"{brand} {model}", problem)
+
+def _model_patterns():
+    return MODEL_PATTERNS[:MODEL_PATTERN_LIMIT]
+
+def _block_sizes():
+    """(每个问题的品牌组合数, 前 MODEL_PROBLEM_LIMIT 个问题额外的型号组合数)"""
+    return len(BRANDS), len(FOCUS_BRANDS) * len(_model_patterns()) * len(MODEL_NUMBERS)
+
+def count_sources():
+    """组合总数（直接计算，不需要枚举）"""
+    brand_block, model_block = _block_sizes()
+    model_problems = min(len(PROBLEM_KEYWORDS), MODEL_PROBLEM_LIMIT)
+    return brand_block * len(PROBLEM_KEYWORDS) + model_problems * model_block
+
+def _locate(position):
+    """
+    把位置换算成 (问题排名, 该问题块内的偏移)，不需要枚举
+    前 MODEL_PROBLEM_LIMIT 个问题每块 品牌 + 型号 个组合，其余每块只有品牌组合
+    """
+    brand_block, model_block = _block_sizes()
+    model_problems = min(len(PROBLEM_KEYWORDS), MODEL_PROBLEM_LIMIT)
+    head = model_problems * (brand_block + model_block)
+    if position < head:
+        return divmod(position, brand_block + model_block)
+    problem_rank, offset = divmod(position - head, brand_block)
+    return model_problems + problem_rank, offset
+
+def _iter_sources(start=0):
+    """
+    惰性产出 (品牌, 型号, 问题, 类型, 分数)，从第 start 个组合开始
+    外层按问题排名循环，产出顺序已接近分数顺序，优先级窗口只需做局部调整
+    """
+    patterns = _model_patterns()
+    numbers = list(MODEL_NUMBERS)
+    first_rank, offset = _locate(start) if start > 0 else (0, 0)
+    for problem_rank in range(first_rank, len(PROBLEM_KEYWORDS)):
+        problem = PROBLEM_KEYWORDS[problem_rank]
+        # 只有起始问题需要跳过块内的前 offset 个组合
+        skip, offset = offset, 0
+
+        # 品牌 + 问题
+        for brand in BRANDS[skip:]:
+            yield brand, "Vacuum", problem, "brand_problem", keyword_score(brand, problem_rank)
+        skip = max(0, skip - len(BRANDS))
+
+        # 型号 + 问题
+        if problem_rank >= MODEL_PROBLEM_LIMIT:
+            continue
+        first_brand, rest = divmod(skip, len(patterns) * len(numbers))
+        first_model, first_num = divmod(rest, len(numbers))
+        for brand_i in range(first_brand, len(FOCUS_BRANDS)):
+            brand = FOCUS_BRANDS[brand_i]
+            for model_rank in range(first_model, len(patterns)):
+                pattern = patterns[model_rank]
+                for num in numbers[first_num:]:
+                    yield (brand, pattern.format(num), problem, "model_problem",
+                           keyword_score(brand, problem_rank, model_rank))
+                first_num = 0
+            first_model = 0
+
+def sources_fingerprint():
+    """关键词输入的指纹，输入列表变化后旧游标失效"""
+    inputs = [BRANDS, MODEL_PATTERNS, PROBLEM_KEYWORDS, FOCUS_BRANDS,
+              MODEL_PATTERN_LIMIT, list(MODEL_NUMBERS), MODEL_PROBLEM_LIMIT]
+    return hashlib.blake2b(json.dumps(inputs).encode("utf-8"), digest_size=8).hexdigest()
+
+class KeywordStream:
+    """
+    按优先级产出去重后的关键词 dict，跳过 covered 中已有的 slug
+    从 start 位置开始读取来源，到末尾后回到开头，最多走一圈
+    pending 是上次运行结束时仍在窗口中的候选，会先放回堆中
+
+    迭代结束或中途停止后，position / pending() 就是下次运行的游标
+    """
+
+    def __init__(self, covered=(), start=0, pending=(), window=PRIORITY_WINDOW):
+        self.covered = covered
+        self.total = count_sources()
+        self.start = start if 0 <= start < self.total else 0
+        self.position = self.start
+        self.window = max(1, window)
+        self._restored = [tuple(source) for source in pending]
+        self._heap = []
+        self._seen = set()
+        self._counter = 0
+
+    def _push(self, source):
+        brand, model, problem = source[:3]
+        slug = keyword_slug(brand, model, problem)
+        if slug in self.covered or slug in self._seen:
+            return
+        self._seen.add(slug)
+        self._counter += 1
+        # 分数相同时先进入窗口的先出；heapq 是最小堆，分数取负
+        heapq.heappush(self._heap, (-source[4], self._counter, source, slug))
+
+    def _pop(self):
+        _, _, (brand, model, problem, kind, score), slug = heapq.heappop(self._heap)
+        return {
+            "keyword": f"{brand} {problem}" if kind == "brand_problem" else f"{brand} {model} {problem}",
+            "brand": brand,
+            "model": model,
+            "problem": problem,
+            "slug": slug,
+            "search_volume": "estimated",  # 实际应用中可以从 API 获取
+            "type": kind,
+            "score": score,
+        }
+
+    def pending(self):
+        """窗口中尚未产出的候选（数量不超过 window）"""
+        return [list(entry[2]) for entry in sorted(self._heap)]
+
+    def __iter__(self):
+        for source in self._restored:
+            self._push(source)
+        self._restored = []
+
+        # 从 start 开始绕一圈：起点直接由游标算出，不需要先枚举前面的组合
+        sources = chain(_iter_sources(self.start), islice(_iter_sources(), self.start))
+        for source in sources:
+            self.position = (self.position + 1) % self.total
+            self._push(source)
+            if len(self._heap) > self.window:
+                yield self._pop()
+        while self._heap:
+            yield self._pop()
+
+def cursor_path():
+    return corpus_index.cache_dir_for(DATA_DIR) / "seo-keyword-cursor.json"
+
+def load_cursor():
+    """
+    读取上次运行保存的游标，返回 (位置, 窗口中的候选)
+    输入列表变化或文件损坏时从头开始
+    """
+    try:
+        with open(cursor_path(), 'r', encoding='utf-8') as f:
+            cursor = json.load(f)
+    except (OSError, ValueError):
+        return 0, []
+    if cursor.get("fingerprint") != sources_fingerprint():
+        return 0, []
+    return int(cursor.get("position", 0)), cursor.get("pending", [])
+
+def save_cursor(stream):
+    path = cursor_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 按进程区分临时文件：并发运行时不会互相替换掉对方的临时文件
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"fingerprint": sources_fingerprint(), "position": stream.position,
+                   "pending": stream.pending(), "updated": datetime.now().isoformat()},
+                  f, ensure_ascii=False)
+    os.replace(tmp_path, path)
 
 # ============================================
 # 内容生成器
 # ============================================
 
-def generate_vacuum_guide(brand, model, keyword):
+def generate_vacuum_guide(brand, model, keyword, problem=None):
     """根据关键词自动生成吸尘器维修指南数据"""
 
     # 从关键词中提取问题
-    problem = keyword.replace(brand, "").replace(model, "").strip()
+    if problem is None:
+        problem = keyword.replace(brand, "").replace(model, "").strip()
 
     # 生成 SEO 关键词
     seo_keywords = [
@@ -251,6 +407,7 @@ def generate_vacuum_guide(brand, model, keyword):
         "auto_generated": True,
         "generated_date": datetime.now().isoformat(),
         "source_keyword": keyword,
+        "problem_type": problem.lower(),
         "problems": problems
     }
 
@@ -260,23 +417,56 @@ def generate_vacuum_guide(brand, model, keyword):
 # 文件保存器
 # ============================================
 
-def save_guide_to_json(guide_data):
+def save_guide_to_json(guide_data, slug=None):
     """将生成的指南保存为 JSON 文件"""
-    # 生成文件名
-    brand_slug = guide_data["brand"].lower().replace(" ", "-").replace("+", "plus")
-    model_slug = guide_data["model"].lower().replace(" ", "-").replace("/", "-").replace("+", "plus")
-    filename = f"{brand_slug}-{model_slug}.json"
+    # 生成文件名（统一 slug 规则，型号中重复的品牌名会被去掉）
+    if slug is None:
+        slug = slug_registry.guide_slug(guide_data["brand"], guide_data["model"])
+    filename = f"{slug}.json"
 
     file_path = DATA_DIR / filename
 
-    # 检查文件是否已存在
-    if file_path.exists():
-        log(f"文件已存在，跳过: {filename}")
+    # 结构校验：有 error 时默认跳过（GUIDE_SCHEMA=warn 时只记录）
+    keep, issues = guide_schema.check_guide(guide_data)
+    errors = guide_schema.errors_only(issues)
+    if errors:
+        log(f"{filename} 结构错误: {guide_schema.describe_issues(errors)}", "WARN")
+    if not keep:
+        log(f"跳过 {filename}: 结构校验失败")
+        return False
+
+    # 屏蔽型号名后与已有指南几乎相同：默认只记录，NEAR_DUPLICATES=skip 时跳过
+    keep, matches = near_duplicates.check_guide(guide_data, slug, DATA_DIR)
+    if matches:
+        log(f"{filename} 与已有指南近似重复: {near_duplicates.describe_matches(matches)}", "WARN")
+    if not keep:
+        log(f"跳过 {filename}: 近似重复")
+        return False
+
+    # 检查 slug 重复和语义重复
+    claimed, reason = slug_registry.get_registry(DATA_DIR).claim(slug, guide_data)
+    if not claimed:
+        log(f"跳过 {filename}: {reason}")
         return False
 
+    # 处理已被其他指南使用的 SEO 关键词
+    changes = keyword_index.resolve_guide_keywords(guide_data, slug, DATA_DIR)
+    if changes:
+        log(keyword_index.describe_changes(changes))
+
     # 保存文件
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(guide_data, f, indent=2, ensure_ascii=False)
+    try:
+        guide_store.write_guide(file_path, guide_data, exclusive=True)
+    except FileExistsError:
+        log(f"文件已存在，跳过: {filename}")
+        return False
+    except OSError as e:
+        # 撤销登记，slug 和语义键可以再次使用
+        slug_registry.get_registry(DATA_DIR).release(slug, guide_data)
+        log(f"写入失败 {filename}: {e}", "ERROR")
+        return False
+    keyword_index.register_guide_keywords(guide_data, slug, DATA_DIR)
+    near_duplicates.register_guide(guide_data, slug, DATA_DIR)
 
     log(f"✅ 成功生成: {filename}")
     return True
@@ -291,51 +481,49 @@ def main():
     log("🚀 SEO 自动内容生成器启动")
     log("=" * 60)
 
-    # 生成关键词
-    keywords = generate_keyword_combinations()
+    # 关键词流：跳过已有 slug，从上次的游标继续
+    registry = slug_registry.get_registry(DATA_DIR)
+    start, pending = load_cursor()
+    stream = KeywordStream(covered=registry, start=start, pending=pending)
+    log(f"关键词组合共 {stream.total} 个，从位置 {stream.start} 开始")
 
     # 统计
     generated_count = 0
     skipped_count = 0
+    processed = 0
 
-    # 处理前 20 个关键词（避免一次生成太多）
-    for i, kw in enumerate(keywords[:20], 1):
-        log(f"\n[{i}/{20}] 处理关键词: {kw['keyword']}")
+    # 每次处理 KEYWORDS_PER_RUN 个关键词（避免一次生成太多）
+    for kw in stream:
+        processed += 1
+        log(f"\n[{processed}/{KEYWORDS_PER_RUN}] 处理关键词: {kw['keyword']} (分数 {kw['score']})")
 
         try:
-            # 解析品牌和型号
-            parts = kw['keyword'].split()
-
-            if len(parts) < 2:
-                log(f"⚠️  跳过无效关键词: {kw['keyword']}")
-                skipped_count += 1
-                continue
-
-            brand = parts[0]
-            model = " ".join(parts[1:]).split(" not ")[0].split(" won't")[0].split(" battery")[0].strip()
-
             # 生成指南数据
-            guide_data = generate_vacuum_guide(brand, model, kw['keyword'])
+            guide_data = generate_vacuum_guide(kw['brand'], kw['model'], kw['keyword'], kw['problem'])
 
             # 保存文件
-            if save_guide_to_json(guide_data):
+            if save_guide_to_json(guide_data, kw['slug']):
                 generated_count += 1
             else:
                 skipped_count += 1
 
-            # 避免请求过快
-            time.sleep(0.5)
-
         except Exception as e:
             log(f"❌ 处理关键词时出错: {kw['keyword']}, 错误: {str(e)}", "ERROR")
             skipped_count += 1
-            continue
+
+        if processed >= KEYWORDS_PER_RUN:
+            break
+
+    if processed < KEYWORDS_PER_RUN:
+        log(f"⚠️  所有关键词组合都已覆盖，本次只处理了 {processed} 个")
+    save_cursor(stream)
 
     # 总结
     log("\n" + "=" * 60)
     log(f"✅ 生成完成！")
     log(f"📊 生成文件: {generated_count}")
     log(f"⏭️  跳过文件: {skipped_count}")
+    log(f"⏩ 下次从位置 {stream.position} 继续")
     log(f"📅 运行时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     log("=" * 60)
 
@@ -9,15 +9,24 @@ Output: JSON Data Files (consumed by Next.js)
 Daily Volume: 5-10 Pages
 """
 
-import os
+import argparse
 import sys
-import json
+import math
 import random
-import time
-import subprocess
+from collections import namedtuple
 from datetime import datetime
 from pathlib import Path
 
+from log_writer import LogWriter
+import corpus_stats
+import git_publisher
+import guide_schema
+import guide_store
+import keyword_index
+import near_duplicates
+import notifier
+import slug_registry
+
 # =================CONFIGURATION=================
 PROJECT_ROOT = Path("/Volumes/MOVESPEED/下载/AIcode/vacuum-parts-hub")
 DATA_DIR = PROJECT_ROOT / "data"
@@ -64,21 +73,104 @@ TOPICS = [
     }
 ]
 
-def log(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    formatted_msg = f"[{timestamp}] {message}"
-    print(formatted_msg)
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(formatted_msg + "\n")
+# 单一日志文件，超过 LOG_MAX_BYTES 时按大小轮转
+LOGGER = LogWriter(LOG_FILE, fmt="[{timestamp}] {message}")
+
+def log(message, level="INFO"):
+    LOGGER.log(message, level)
+
+# Slug suffix per topic type ({value} is the chosen problem / part)
+SLUG_SUFFIXES = {
+    "troubleshooting": "{value}",
+    "guide": "replace {value}",
+    "maintenance": "clean {value}"
+}
+# Suffixes written by earlier versions of this script, still counted as taken
+LEGACY_SLUG_SUFFIXES = {
+    "maintenance": "replace {value}"
+}
+# Problem type label for part-based topics, e.g. "HEPA Filter Replacement"
+PART_TOPIC_LABELS = {
+    "guide": "Replacement",
+    "maintenance": "Cleaning"
+}
+
+DEFAULT_DAILY_COUNT = 5
+
+# =================CANDIDATE ENUMERATION=================
+
+Candidate = namedtuple("Candidate", "brand model topic variable value slug legacy_slugs")
+
+def _candidate(brand, model, topic, variable, value):
+    suffix = SLUG_SUFFIXES.get(topic["type"], "{value}").format(value=value)
+    legacy = LEGACY_SLUG_SUFFIXES.get(topic["type"])
+    legacy_slugs = (slug_registry.guide_slug(brand, model, legacy.format(value=value)),) if legacy else ()
+    return Candidate(brand, model, topic, variable, value,
+                     slug_registry.guide_slug(brand, model, suffix), legacy_slugs)
+
+def iter_candidates(seed=None):
+    """
+    Lazily walks brand x model x topic x variable value in a seeded shuffled order.
+    Uses an affine permutation i -> (offset + k * step) mod total, so the full
+    product is never materialized and every combination is visited exactly once.
+    """
+    rng = random.Random(seed)
+    pairs = [(brand, model) for brand, models in BRANDS.items() for model in models]
+    variants = [(topic, variable, value)
+                for topic in TOPICS
+                for variable, values in topic["variables"].items()
+                for value in values]
+    rng.shuffle(pairs)
+    rng.shuffle(variants)
+
+    total = len(pairs) * len(variants)
+    if total == 0:
+        return
+    step = 1
+    if total > 2:
+        step = rng.randrange(1, total)
+        while math.gcd(step, total) != 1:
+            step = rng.randrange(1, total)
+    offset = rng.randrange(total)
+
+    for k in range(total):
+        i = (offset + k * step) % total
+        brand, model = pairs[i // len(variants)]
+        topic, variable, value = variants[i % len(variants)]
+        yield _candidate(brand, model, topic, variable, value)
+
+def iter_new_candidates(taken, seed=None):
+    """Candidates whose slug (or legacy slug) is not in the `taken` set."""
+    for candidate in iter_candidates(seed):
+        if candidate.slug in taken or any(slug in taken for slug in candidate.legacy_slugs):
+            continue
+        yield candidate
+
+def select_candidates(count, taken, seed=None):
+    """
+    Returns (candidates, exhausted): exactly `count` new candidates, or fewer with
+    exhausted=True once every combination is already taken. At most one pass over
+    the combination space, however full the corpus is.
+    """
+    selected = []
+    for candidate in iter_new_candidates(taken, seed):
+        selected.append(candidate)
+        if len(selected) == count:
+            return selected, False
+    return selected, True
 
 # =================CONTENT GENERATION=================
 
-def generate_content(brand, model, topic, title):
+def generate_content(brand, model, topic, title, value):
     """Generates structured JSON content matching the existing schema."""
     
-    # 1. Define the specific problem based on topic
-    problem_type = topic['variables'].get('problem', ['General Issue'])[0] if 'problem' in topic['variables'] else 'Maintenance'
-    part_type = topic['variables'].get('part', ['Parts'])[0] if 'part' in topic['variables'] else 'Part'
+    # 1. Define the specific problem based on topic and the chosen variable value
+    if "problem" in topic["variables"]:
+        problem_type = value
+        part_type = "Part"
+    else:
+        problem_type = f"{value} {PART_TOPIC_LABELS.get(topic['type'], 'Maintenance')}"
+        part_type = value
     
     # 2. Construct SEO Keywords
     keywords = [
@@ -151,54 +243,31 @@ def generate_content(brand, model, topic, title):
 
 # =================GIT & NOTIFICATION=================
 
-def run_shell(command):
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        return True, result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        log(f"❌ Command failed: {command}\nError: {e.stderr}")
-        return False, e.stderr
-
-import urllib.request
-import urllib.parse
-
 def send_telegram_notification(message):
-    token = os.environ.get("TELEGRAM_BOT_TOKEN")
-    chat_id = os.environ.get("TELEGRAM_CHAT_ID")
-    
-    if not token or not chat_id:
+    # Queued and sent by a background worker (scripts/notifier.py): never blocks the run,
+    # coalesces bursts and honors Telegram's retry_after
+    if not notifier.notify(message, parse_mode="Markdown", log=log):
         log("⚠️ Telegram credentials not found. Skipping notification.")
-        return
 
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    headers = {'Content-Type': 'application/json'}
-    data = {
-        "chat_id": chat_id,
-        "text": message,
-        "parse_mode": "Markdown"
-    }
-    
-    try:
-        req = urllib.request.Request(url, data=json.dumps(data).encode('utf-8'), headers=headers)
-        with urllib.request.urlopen(req) as response:
-            if response.getcode() == 200:
-                log("✅ Telegram notification sent.")
-            else:
-                log(f"❌ Failed to send Telegram notification: {response.read().decode('utf-8')}")
-    except Exception as e:
-        log(f"❌ Error sending Telegram notification: {e}")
-
-def git_commit_and_push(generated_files):
+def git_commit_and_push(generated_files, written_paths):
     log("📦 Starting Git Push sequence...")
-    run_shell(f"git add .")
     msg = f"SEO Auto-Gen: {len(generated_files)} new vacuum guides"
-    run_shell(f"git commit -m '{msg}'")
-    success, _ = run_shell("git push")
+    # Stage only the files written in this run (no `git add .`)
+    try:
+        result = git_publisher.GitPublisher(PROJECT_ROOT, log=log).publish(written_paths, msg)
+        success = True
+        log(f"⏱️ Git timings: {git_publisher.format_timings(result['timings'])}")
+    except git_publisher.GitError as e:
+        log(f"❌ {e}")
+        success = False
     
     if success:
-        log("✅ Git Push Successful!")
+        log("✅ Git Push Successful!" if result["pushed"] else "✅ Committed, push deferred (GIT_PUBLISH_COALESCE)")
         # Send Success Notification
         report = f"✅ *Vacuum Parts Hub Auto-SEO Success*\nGenerated {len(generated_files)} new guides:\n" + "\n".join([f"• {f}" for f in generated_files])
+        stats = corpus_stats.load_stats(DATA_DIR)
+        if stats:
+            report += f"\n\nCorpus: {stats['guides']} guides, FAQ coverage {stats['faqs']['coverage']:.0%}"
         send_telegram_notification(report)
     else:
         log("❌ Git Push Failed.")
@@ -208,61 +277,99 @@ def git_commit_and_push(generated_files):
 # =================MAIN EXECUTION=================
 
 def main():
+    parser = argparse.ArgumentParser(description="Vacuum Hub SEO Generator")
+    parser.add_argument("--count", type=int, default=DEFAULT_DAILY_COUNT, help="pages to generate")
+    parser.add_argument("--seed", type=int, help="shuffle seed (random when omitted)")
+    args = parser.parse_args()
+
     log("🚀 Starting Vacuum Hub SEO Generator...")
     
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    registry = slug_registry.get_registry(DATA_DIR)
     
     generated_count = 0
     generated_files = []
+    written_paths = []
     
-    # Generate 5 pages per run
-    while generated_count < 5:
-        # 1. Random Selection
-        brand = random.choice(list(BRANDS.keys()))
-        model = random.choice(BRANDS[brand])
-        topic = random.choice(TOPICS)
-        
-        # 2. Build Filename (Slug)
-        # We start with model name
-        slug_base = f"{model.lower().replace(' ', '-')}"
-        
-        # Add problem suffix
-        problem = topic["variables"].get("problem", ["guide"])[0] 
-        # Or part
-        part = topic["variables"].get("part", [""])[0]
+    # Walk unused combinations until enough pages are written or the space runs out
+    for candidate in iter_new_candidates(registry.slugs, args.seed):
+        if generated_count >= args.count:
+            break
         
-        suffix = problem.lower().replace(' ', '-') if problem != "guide" else f"replace-{part.lower().replace(' ', '-')}"
+        brand, model, topic, value = candidate.brand, candidate.model, candidate.topic, candidate.value
+        title = f"{brand} {model} {value}" # Simple internal title for logging
         
-        slug = f"{brand.lower()}-{slug_base}-{suffix}"
-        
-        # Inject variable for title generation
-        topic['variables']['problem'] = [problem]
-        topic['variables']['part'] = [part]
+        filename = f"{candidate.slug}.json"
+        filepath = DATA_DIR / filename
+            
+        # Generate
+        content_data = generate_content(brand, model, topic, title, value)
         
-        title = f"{brand} {model} {problem}" # Simple internal title for logging
+        # Structure the guide page expects (VacuumManual); only errors are logged,
+        # the "Model - Problem" H1 is intentional here
+        keep, issues = guide_schema.check_guide(content_data)
+        errors = guide_schema.errors_only(issues)
+        if errors:
+            log(f"  ⚠️ {filename} schema errors: {guide_schema.describe_issues(errors)}")
+        if not keep:
+            log(f"  ⏭️ Skipping {filename}: schema validation failed")
+            continue
         
-        filename = f"{slug}.json"
-        filepath = DATA_DIR / filename
+        # Same template text as an existing guide once model names are masked
+        keep, matches = near_duplicates.check_guide(content_data, candidate.slug, DATA_DIR)
+        if matches:
+            log(f"  ⚠️ {filename} near-duplicates: {near_duplicates.describe_matches(matches)}")
+        if not keep:
+            log(f"  ⏭️ Skipping {filename}: near-duplicate")
+            continue
         
-        if filepath.exists():
+        # Skip semantic (brand + model + problem type) duplicates
+        claimed, reason = registry.claim(candidate.slug, content_data)
+        if not claimed:
+            log(f"  ⏭️ Skipping {filename}: {reason}")
             continue
-            
-        # 3. Generate
         log(f"  ✍️ Generating: {title}")
-        content_data = generate_content(brand, model, topic, title)
         
-        # 4. Save
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(content_data, f, indent=2, ensure_ascii=False)
+        # Rewrite or drop SEO keywords other guides already target
+        changes = keyword_index.resolve_guide_keywords(content_data, candidate.slug, DATA_DIR)
+        if changes:
+            reassigned = sum(1 for change in changes.values() if change)
+            log(f"  🔁 {len(changes)} keywords already targeted elsewhere "
+                f"({reassigned} rewritten, {len(changes) - reassigned} dropped)")
+        
+        # Save
+        try:
+            guide_store.write_guide(filepath, content_data, exclusive=True)
+        except FileExistsError:
+            continue
+        except OSError as e:
+            # Give the slug back so a later run can use it
+            registry.release(candidate.slug, content_data)
+            log(f"  ❌ Failed to write {filename}: {e}")
+            continue
+        keyword_index.register_guide_keywords(content_data, candidate.slug, DATA_DIR)
+        near_duplicates.register_guide(content_data, candidate.slug, DATA_DIR)
             
         generated_count += 1
         generated_files.append(title)
-        time.sleep(1)
+        written_paths.append(filepath)
+
+    if generated_count < args.count:
+        log(f"⚠️ Combination space exhausted: only {generated_count}/{args.count} new guides available.")
 
     log(f"🎉 Generated {generated_count} guides.")
+
+    # Refresh corpus stats (JSON + Prometheus textfile read by seo-monitor.sh and the report)
+    try:
+        stats = corpus_stats.update_stats(DATA_DIR)
+        log(f"📈 Corpus: {stats['guides']} guides, FAQ coverage {stats['faqs']['coverage']:.1%}")
+    except OSError as e:
+        log(f"⚠️ Corpus stats update failed: {e}")
     
     if generated_count > 0:
-        git_commit_and_push(generated_files)
+        git_commit_and_push(generated_files, written_paths)
+    # Wait (bounded by TELEGRAM_CLOSE_TIMEOUT) for queued notifications
+    notifier.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+语料打包基准测试
+在临时目录中用 data/ 的指南复制出 --files 篇，测量：
+  - 打包：首次构建、无变化时的增量更新、修改 1% 后的追加、压缩
+  - 冷启动：列出全部 slug、打开后读取第一篇、顺序读取全部指南（逐个文件 vs bundle）
+  - 随机查找：--lookups 次随机 slug 的单次延迟 p50 / p99（逐个文件 open + 解析 vs bundle.get）
+
+以 root 运行时每项冷启动测量前都会清空页缓存（/proc/sys/vm/drop_caches），否则为页缓存已热的情况。
+
+用法: python scripts/bench_corpus_bundle.py [--files 100000] [--lookups 10000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import corpus_bundle
+import guide_store
+from corpus_index import DATA_DIR, EXCLUDED_FILES
+
+def make_corpus(target, count):
+    """把 data/ 中的指南循环复制为 count 个文件"""
+    target.mkdir(parents=True)
+    sources = [guide_store.dumps(guide_store.load_guide(p)) for p in guide_store.iter_guide_paths(DATA_DIR)]
+    for i in range(count):
+        with open(target / f"guide-{i}.json", 'wb') as f:
+            f.write(sources[i % len(sources)])
+
+def drop_caches():
+    """清空页缓存；没有权限时返回 False"""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", 'w') as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+def timed(label, func, cold=False):
+    if cold:
+        drop_caches()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed * 1000:10.1f} ms   {result}")
+    return result
+
+# ============================================
+# 逐个文件（对照组）
+# ============================================
+
+def file_slugs(data_dir):
+    return sorted(name[:-5] for name in os.listdir(data_dir)
+                  if name.endswith(".json") and name not in EXCLUDED_FILES)
+
+def file_get(data_dir, slug):
+    try:
+        return guide_store.load_guide(data_dir / f"{slug}.json")
+    except FileNotFoundError:
+        return None
+
+def file_load_all(data_dir):
+    return sum(1 for _ in guide_store.iter_guides(data_dir))
+
+# ============================================
+# 主函数
+# ============================================
+
+def latencies(func, slugs):
+    timings = []
+    for slug in slugs:
+        start = time.perf_counter()
+        func(slug)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return (f"p50 {timings[len(timings) // 2] * 1e6:7.1f}µs  "
+            f"p99 {timings[int(len(timings) * 0.99)] * 1e6:7.1f}µs  "
+            f"总计 {sum(timings):.2f}s")
+
+def describe(stats):
+    return (f"追加 {stats['appended']}，{stats['bundle_bytes'] / 1e6:.1f}MB，"
+            f"空洞 {stats['dead_bytes'] / 1e6:.1f}MB{'，已压缩' if stats['compacted'] else ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description="语料打包基准测试")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="corpus-bundle-bench-"))
+    try:
+        data_dir = workdir / "data"
+        make_corpus(data_dir, args.files)
+        data_bytes = sum(entry.stat().st_size for entry in os.scandir(data_dir))
+        cold = drop_caches()
+        print(f"📄 {args.files} 篇指南（{data_bytes / 1e6:.1f}MB），"
+              f"{'每项前清空页缓存' if cold else '页缓存已热（非 root，无法清空）'}\n")
+
+        print("打包")
+        timed("首次构建", lambda: describe(corpus_bundle.update_bundle(data_dir)))
+        timed("无变化时更新", lambda: describe(corpus_bundle.update_bundle(data_dir)))
+        for i in range(0, args.files, 100):
+            path = data_dir / f"guide-{i}.json"
+            guide = guide_store.load_guide(path)
+            guide["seo_keywords"] = guide.get("seo_keywords", []) + [f"bench {i}"]
+            guide_store.write_guide(path, guide)
+        timed("修改 1% 后追加", lambda: describe(corpus_bundle.update_bundle(data_dir, compact=False)))
+        timed("压缩", lambda: describe(corpus_bundle.update_bundle(data_dir, compact=True)))
+
+        def bundle_slugs():
+            with corpus_bundle.open_bundle(data_dir) as bundle:
+                return len(list(bundle.slugs()))
+
+        def bundle_first(slug):
+            with corpus_bundle.open_bundle(data_dir) as bundle:
+                return bundle.get(slug)["brand"]
+
+        def bundle_load_all():
+            with corpus_bundle.open_bundle(data_dir) as bundle:
+                return sum(1 for _ in bundle.iter_guides())
+
+        slug = f"guide-{args.files // 2}"
+        print("\n冷启动")
+        timed("列出 slug: 逐个文件", lambda: len(file_slugs(data_dir)), cold)
+        timed("列出 slug: bundle", bundle_slugs, cold)
+        timed("读取一篇: 逐个文件", lambda: file_get(data_dir, slug)["brand"], cold)
+        timed("打开并读取一篇: bundle", lambda: bundle_first(slug), cold)
+        timed("读取全部: 逐个文件", lambda: file_load_all(data_dir), cold)
+        timed("读取全部: bundle", bundle_load_all, cold)
+
+        rng = random.Random(42)
+        lookups = [f"guide-{rng.randrange(args.files)}" for _ in range(args.lookups)]
+        print(f"\n随机查找 {args.lookups} 次（{'冷' if cold else '热'}页缓存开始）")
+        drop_caches()
+        timed("逐个文件", lambda: latencies(lambda s: file_get(data_dir, s), lookups))
+        drop_caches()
+        with corpus_bundle.open_bundle(data_dir) as bundle:
+            timed("bundle", lambda: latencies(bundle.get, lookups))
+            assert all(bundle.get(s) == file_get(data_dir, s) for s in lookups[:1000])
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+语料索引基准测试
+以 data/ 中的真实指南为模板，在临时目录生成 N 篇合成指南，对比:
+  - 全量扫描：glob + 逐个解析 JSON（现有各脚本的做法）
+  - 索引：首次构建、无变化时的增量更新、1% 文件修改后的增量更新、只读 manifest 查询
+
+用法: python scripts/bench_corpus_index.py [--sizes 10000,100000]
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from corpus_index import DATA_DIR, EXCLUDED_FILES, CorpusIndex, update_index
+
+def load_templates():
+    templates = []
+    for path in sorted(DATA_DIR.glob("*.json")):
+        if path.name not in EXCLUDED_FILES:
+            templates.append(path.read_text(encoding='utf-8'))
+    return templates
+
+def build_corpus(directory, size, templates):
+    for i in range(size):
+        with open(directory / f"guide-{i:06d}.json", 'w', encoding='utf-8') as f:
+            f.write(templates[i % len(templates)])
+
+def full_scan(directory):
+    """旧做法：列出 slug、统计数量、筛选品牌都需要解析全部文件"""
+    slugs, dyson = [], 0
+    for path in directory.glob("*.json"):
+        if path.name in EXCLUDED_FILES:
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            guide = json.load(f)
+        slugs.append(path.stem)
+        if (guide.get("brand") or "").lower() == "dyson":
+            dyson += 1
+    return len(slugs), dyson
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def run(size, templates):
+    workdir = Path(tempfile.mkdtemp(prefix="corpus-bench-"))
+    data_dir = workdir / "data"
+    data_dir.mkdir()
+    manifest = workdir / "manifest.json"
+    try:
+        build_corpus(data_dir, size, templates)
+
+        scan_time, (count, dyson) = timed(lambda: full_scan(data_dir))
+        build_time, _ = timed(lambda: update_index(data_dir, manifest))
+        noop_time, (_, noop_stats) = timed(lambda: update_index(data_dir, manifest))
+
+        # 修改 1% 的文件
+        touched = max(1, size // 100)
+        for i in range(touched):
+            path = data_dir / f"guide-{i:06d}.json"
+            path.write_text(path.read_text(encoding='utf-8') + "\n", encoding='utf-8')
+        delta_time, (_, delta_stats) = timed(lambda: update_index(data_dir, manifest))
+
+        def query():
+            index = CorpusIndex.load(manifest)
+            return index.count(), len(index.by_brand("Dyson"))
+        query_time, (index_count, index_dyson) = timed(query)
+
+        assert (index_count, index_dyson) == (count, dyson), "索引结果与全量扫描不一致"
+        assert noop_stats["unchanged"] == size and delta_stats["updated"] == touched
+
+        print(f"\n📚 {size:,} 篇指南（manifest {manifest.stat().st_size / 1024 / 1024:.1f} MB）")
+        print(f"   全量扫描解析           {scan_time * 1000:9.1f} ms")
+        print(f"   首次构建索引           {build_time * 1000:9.1f} ms")
+        print(f"   增量更新（无变化）     {noop_time * 1000:9.1f} ms")
+        print(f"   增量更新（{touched} 个修改） {delta_time * 1000:9.1f} ms")
+        print(f"   读取 manifest 查询     {query_time * 1000:9.1f} ms   "
+              f"⚡ 相比全量扫描 {scan_time / query_time:.1f}x")
+    finally:
+        shutil.rmtree(workdir)
+
+def main():
+    parser = argparse.ArgumentParser(description="语料索引基准测试")
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+
+    templates = load_templates()
+    print(f"📄 模板: {len(templates)} 篇真实指南")
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, templates)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+语料统计基准测试
+在临时目录中用 data/ 的指南复制出 --files 篇，测量：
+  - 旧式统计：顺序 json.load 每个文件，逐项累加（seo-monitor.sh 原来的 grep / python3 -c 的等价做法）
+  - corpus_stats 首次运行（建立语料索引）、再次运行（索引无变化）、修改 1% 文件后的增量运行
+
+用法: python scripts/bench_corpus_stats.py [--files 100000]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import corpus_stats
+import guide_store
+from corpus_index import DATA_DIR, EXCLUDED_FILES
+
+# ============================================
+# 旧式统计（对照组）
+# ============================================
+
+def legacy_stats(data_dir):
+    brands, problem_types, sources = Counter(), Counter(), Counter()
+    keywords = faqs_covered = auto_generated = 0
+    for name in os.listdir(data_dir):
+        if not name.endswith('.json') or name in EXCLUDED_FILES:
+            continue
+        with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        brands[data.get('brand')] += 1
+        problem_types[data.get('problem_type')] += 1
+        sources[data.get('trending_source')] += 1
+        keywords += len(data.get('seo_keywords', []))
+        faqs_covered += bool(data.get('faqs'))
+        auto_generated += data.get('auto_generated') is True
+    return sum(brands.values()), keywords, faqs_covered, auto_generated
+
+# ============================================
+# 主函数
+# ============================================
+
+def make_corpus(target, count):
+    """把 data/ 中的指南循环复制为 count 个文件"""
+    target.mkdir(parents=True)
+    sources = [guide_store.dumps(guide_store.load_guide(p)) for p in guide_store.iter_guide_paths(DATA_DIR)]
+    for i in range(count):
+        with open(target / f"guide-{i}.json", 'wb') as f:
+            f.write(sources[i % len(sources)])
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:8.2f}s   {result}")
+    return result
+
+def summary(stats):
+    return (stats["guides"], stats["keywords"]["total"], stats["faqs"]["guides_with"],
+            stats["auto_generated"], stats["sync"]["parsed"])
+
+def main():
+    parser = argparse.ArgumentParser(description="语料统计基准测试")
+    parser.add_argument("--files", type=int, default=100_000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="corpus-stats-bench-"))
+    try:
+        data_dir = workdir / "data"
+        make_corpus(data_dir, args.files)
+        print(f"📄 {args.files} 篇指南\n"
+              f"{'':<24} {'':>9}   (指南, 关键词, 有 FAQ, AI 生成[, 解析文件数])")
+
+        expected = timed("旧式（顺序解析全部）", lambda: legacy_stats(data_dir))
+        first = timed("corpus_stats 首次运行", lambda: summary(corpus_stats.update_stats(data_dir)))
+        timed("corpus_stats 再次运行", lambda: summary(corpus_stats.update_stats(data_dir)))
+        for i in range(0, args.files, 100):
+            os.utime(data_dir / f"guide-{i}.json")
+        timed("修改 1% 后增量运行", lambda: summary(corpus_stats.update_stats(data_dir)))
+        timed("读取已有结果", lambda: corpus_stats.load_stats(data_dir)["guides"])
+        assert first[:4] == expected, (first, expected)
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Git 发布基准测试 / 本地验证
+在临时目录创建裸仓库作为远端，克隆出带 N 篇已提交指南的工作区，每轮新写入几篇指南后对比:
+  - 原有做法：git add data/ + git commit + git push
+  - GitPublisher：只暂存本轮写入的文件（各阶段耗时）
+并验证合并推送（GIT_PUBLISH_COALESCE）和远端有新提交时的 rebase + 重试
+
+用法: python scripts/bench_git_publisher.py [--corpus 20000] [--files 5]
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from git_publisher import GitPublisher, format_timings
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+def make_clone(remote, path):
+    git(remote.parent, "clone", "-q", str(remote), str(path))
+    git(path, "config", "user.email", "bench@example.com")
+    git(path, "config", "user.name", "bench")
+    return path
+
+def write_guides(data_dir, prefix, count):
+    paths = []
+    for i in range(count):
+        path = data_dir / f"{prefix}-{i:06d}.json"
+        path.write_text(json.dumps({"brand": "Bench", "model": f"{prefix} {i}", "problems": []}, indent=2))
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Git 发布基准测试")
+    parser.add_argument("--corpus", type=int, default=20000, help="已提交的指南数量")
+    parser.add_argument("--files", type=int, default=5, help="每轮新写入的指南数量")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="git-publish-bench-"))
+    try:
+        remote = workdir / "remote.git"
+        git(workdir, "init", "-q", "--bare", "-b", "main", str(remote))
+
+        repo = make_clone(remote, workdir / "repo")
+        git(repo, "checkout", "-q", "-b", "main")
+        data_dir = repo / "data"
+        data_dir.mkdir()
+        write_guides(data_dir, "base", args.corpus)
+        git(repo, "add", "data/")
+        git(repo, "commit", "-q", "-m", "base corpus")
+        git(repo, "push", "-q", "origin", "main")
+        print(f"📚 工作区: {args.corpus} 篇已提交指南，每轮新写入 {args.files} 篇\n")
+
+        # 原有做法
+        write_guides(data_dir, "legacy", args.files)
+        started = time.perf_counter()
+        git(repo, "add", "data/")
+        git(repo, "commit", "-q", "-m", "legacy run")
+        git(repo, "push", "-q", "origin", "main")
+        print(f"git add data/ + commit + push   {(time.perf_counter() - started) * 1000:8.0f} ms")
+
+        # 定向发布
+        publisher = GitPublisher(repo, coalesce=1, backoff=0.05, log=lambda message: None)
+        paths = write_guides(data_dir, "publish", args.files)
+        started = time.perf_counter()
+        result = publisher.publish(paths, "publish run")
+        print(f"GitPublisher                    {(time.perf_counter() - started) * 1000:8.0f} ms   "
+              f"({format_timings(result['timings'])})")
+        assert result["pushed"] and git(repo, "status", "--porcelain") == ""
+        changed = git(repo, "show", "--name-only", "--format=", "HEAD").splitlines()
+        assert changed == [str(p.relative_to(repo)) for p in paths], "提交中包含了多余的文件"
+
+        # 未被列出的改动不会被提交
+        (repo / "untracked.txt").write_text("not published\n")
+        paths = write_guides(data_dir, "selective", 1)
+        publisher.publish(paths, "selective run")
+        assert "untracked.txt" not in git(repo, "show", "--name-only", "--format=", "HEAD")
+        (repo / "untracked.txt").unlink()
+
+        # 合并推送：3 次运行只推送 1 次
+        coalescing = GitPublisher(repo, coalesce=3, backoff=0.05, log=lambda message: None)
+        pushes = [coalescing.publish(write_guides(data_dir, f"coalesce{run}", 1), f"coalesce run {run}")["pushed"]
+                  for run in range(3)]
+        assert pushes == [False, False, True], pushes
+        print(f"\n✅ 合并推送: 3 次运行 → {sum(pushes)} 次 push")
+
+        # 远端有其他提交：第一次推送被拒绝，rebase 后重试成功
+        other = make_clone(remote, workdir / "other")
+        write_guides(other / "data", "other", 1)
+        git(other, "add", "data/")
+        git(other, "commit", "-q", "-m", "concurrent run")
+        git(other, "push", "-q", "origin", "main")
+        result = publisher.publish(write_guides(data_dir, "retry", 1), "retry run")
+        assert result["pushed"]
+        assert git(remote, "rev-parse", "main") == git(repo, "rev-parse", "HEAD")
+        print(f"✅ 远端有新提交时 rebase 后重试推送成功 ({format_timings(result['timings'])})")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+结构校验基准测试
+在临时目录中用 data/ 的指南复制出 --files 篇（每 100 篇中有 1 篇改坏：旧字段名 steps、
+字符串形式的 required_parts），测量：
+  - 单篇 validate()：编译后的校验函数 vs 每次遍历结构定义的解释执行（对照组）
+  - 整个目录：顺序 json.load + 解释执行校验 vs guide_schema.validate_corpus（进程池），单位 文件/s
+
+用法: python scripts/bench_guide_schema.py [--files 100000] [--workers 8]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import guide_schema
+import guide_store
+from corpus_index import DATA_DIR, EXCLUDED_FILES
+
+# ============================================
+# 解释执行的校验（对照组）
+# ============================================
+
+def interpret(schema, value, path=""):
+    """每次调用都重新读取结构定义、拼接路径，和常见的通用 JSON Schema 校验器做法一致"""
+    issues = []
+    expected = guide_schema.TYPES[schema["type"]]
+    if not isinstance(value, expected):
+        return [(guide_schema.ERROR, path, f"应为 {schema['type']}")]
+    if schema["type"] == "string":
+        if schema.get("minLength") and len(value.strip()) < schema["minLength"]:
+            issues.append((guide_schema.ERROR, path, "不能为空"))
+        if "x-warn-pattern" in schema and not re.search(schema["x-warn-pattern"][0], value):
+            issues.append((guide_schema.WARNING, path, schema["x-warn-pattern"][1]))
+    elif schema["type"] == "array":
+        if schema.get("minItems") and len(value) < schema["minItems"]:
+            issues.append((guide_schema.ERROR, path, "项数不足"))
+        for i, item in enumerate(value):
+            if "items" in schema:
+                issues.extend(interpret(schema["items"], item, f"{path}[{i}]"))
+        if "x-unique" in schema:
+            keys = [repr(item.get(schema["x-unique"])) for item in value if isinstance(item, dict)]
+            if len(set(keys)) != len(keys):
+                issues.append((guide_schema.ERROR, path, "重复"))
+    else:
+        for key in schema.get("required", ()):
+            if key not in value:
+                issues.append((guide_schema.ERROR, f"{path}.{key}", "缺少必填字段"))
+        for key in schema.get("x-warn-required", ()):
+            if key not in value:
+                issues.append((guide_schema.WARNING, f"{path}.{key}", "缺少字段"))
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                issues.extend(interpret(sub, value[key], f"{path}.{key}"))
+    return issues
+
+def legacy_corpus(data_dir):
+    """顺序 json.load 每个文件 + 解释执行校验，返回 (文件数, 有 error 的文件数)"""
+    checked = failed = 0
+    for name in os.listdir(data_dir):
+        if not name.endswith('.json') or name in EXCLUDED_FILES:
+            continue
+        with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+            guide = json.load(f)
+        checked += 1
+        failed += any(level == guide_schema.ERROR
+                      for level, _, _ in interpret(guide_schema.VACUUM_MANUAL, guide))
+    return checked, failed
+
+# ============================================
+# 主函数
+# ============================================
+
+def break_guide(guide):
+    """模拟旧生成脚本的输出：steps 字段、字符串形式的配件"""
+    guide = json.loads(json.dumps(guide))
+    problem = guide["problems"][0]
+    problem["steps"] = problem.pop("solution_steps")
+    problem["required_parts"] = [part["name"] for part in problem["required_parts"]]
+    return guide
+
+def make_corpus(target, count):
+    target.mkdir(parents=True)
+    guides = [guide_store.load_guide(p) for p in guide_store.iter_guide_paths(DATA_DIR)]
+    sources = [guide_store.dumps(guide) for guide in guides]
+    broken = [guide_store.dumps(break_guide(guide)) for guide in guides]
+    for i in range(count):
+        with open(target / f"guide-{i}.json", 'wb') as f:
+            f.write((broken if i % 100 == 0 else sources)[i % len(sources)])
+    return guides
+
+def per_guide(label, func, guides, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for guide in guides:
+            func(guide)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / (rounds * len(guides)) * 1e6:8.1f}µs/篇")
+
+def corpus(label, func):
+    start = time.perf_counter()
+    checked, failed = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s   {checked / elapsed:10,.0f} 文件/s   {failed} 个有 error")
+    return checked, failed
+
+def main():
+    parser = argparse.ArgumentParser(description="结构校验基准测试")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="guide-schema-bench-"))
+    try:
+        data_dir = workdir / "data"
+        guides = make_corpus(data_dir, args.files)
+        print(f"📄 {args.files} 篇指南（1% 改坏），{args.workers} 个 worker\n")
+
+        per_guide("解释执行 validate", lambda g: interpret(guide_schema.VACUUM_MANUAL, g), guides, args.rounds)
+        per_guide("编译后 validate", guide_schema.validate, guides, args.rounds)
+        print()
+
+        expected = corpus("旧式（json.load + 解释执行）", lambda: legacy_corpus(data_dir))
+
+        def compiled():
+            checked, problems = guide_schema.validate_corpus(data_dir, args.workers)
+            return checked, sum(bool(guide_schema.errors_only(issues)) for issues in problems.values())
+        result = corpus("guide_schema.validate_corpus", compiled)
+        assert result == expected, (result, expected)
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
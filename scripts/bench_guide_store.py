@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+指南读写吞吐基准测试
+对 data/ 下的全部指南测量:
+  - 读取：json.load 与 guide_store.load_guide（当前后端）
+  - 写入（临时目录）：原有的 open('w') + json.dump、逐个原子写入、批量原子写入、内容未变时跳过
+
+用法: python scripts/bench_guide_store.py [--rounds 5]
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import guide_store
+from corpus_index import DATA_DIR
+
+def timed(func, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def report(label, elapsed, files, size):
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms   {files / elapsed:9.0f} 文件/s   "
+          f"{size / elapsed / 1024 / 1024:7.1f} MB/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="指南读写吞吐基准测试")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = list(guide_store.iter_guide_paths(DATA_DIR))
+    size = sum(p.stat().st_size for p in paths)
+    guides = [(p.name, guide_store.load_guide(p)) for p in paths]
+    print(f"📄 {len(paths)} 篇指南，{size / 1024:.0f} KB，序列化后端: {guide_store.BACKEND}\n")
+
+    def load_stdlib():
+        for p in paths:
+            with open(p, 'r', encoding='utf-8') as f:
+                json.load(f)
+
+    def load_store():
+        for p in paths:
+            guide_store.load_guide(p)
+
+    report("读取 json.load", timed(load_stdlib, args.rounds), len(paths), size)
+    report(f"读取 guide_store ({guide_store.BACKEND})", timed(load_store, args.rounds), len(paths), size)
+    print()
+
+    workdir = Path(tempfile.mkdtemp(prefix="guide-store-bench-"))
+    try:
+        def save_legacy():
+            for name, data in guides:
+                with open(workdir / name, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+
+        def save_each():
+            # 每次都清空，确保真的发生写入
+            for p in workdir.iterdir():
+                p.unlink()
+            for name, data in guides:
+                guide_store.write_guide(workdir / name, data)
+
+        def save_bulk():
+            for p in workdir.iterdir():
+                p.unlink()
+            guide_store.write_guides((workdir / name, data) for name, data in guides)
+
+        def save_unchanged():
+            written = guide_store.write_guides((workdir / name, data) for name, data in guides)
+            assert written == 0
+
+        report("open('w') + json.dump", timed(save_legacy, args.rounds), len(guides), size)
+        report("原子写入（逐个）", timed(save_each, args.rounds), len(guides), size)
+        report("原子写入（批量）", timed(save_bulk, args.rounds), len(guides), size)
+        report("内容未变（跳过写入）", timed(save_unchanged, args.rounds), len(guides), size)
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+关键词互食检查基准测试
+在合成的 10 万篇指南语料上测量：
+  - 倒排索引的构建、保存、加载耗时
+  - taken() / owners() 单次查询 vs 逐篇扫描所有指南的 seo_keywords（没有索引时的做法）
+  - resolve() 处理一篇新指南全部关键词的耗时
+
+用法: python scripts/bench_keyword_index.py [--guides 100000] [--seed 42]
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import model_parser
+from bench_problem_matcher import make_keywords
+from keyword_index import KeywordIndex, guide_keywords, normalize_keyword
+
+BASE_SUFFIXES = ("repair", "troubleshooting", "parts", "manual", "guide")
+
+def make_guides(count, seed):
+    """{slug: seo_keywords}，结构与 ai-content-generator 生成的关键词相同"""
+    guides = {}
+    for i, (keyword, _) in enumerate(make_keywords(count, seed)):
+        brand, model, problem = model_parser.parse_vacuum_model(keyword)
+        full_model = f"{brand} {model}" if model else brand
+        keywords = [keyword] + [f"{full_model} {suffix}" for suffix in BASE_SUFFIXES]
+        keywords += [f"how to fix {full_model}", f"{full_model} {problem} fix", f"{full_model} {problem} cost"]
+        guides[f"guide-{i}"] = keywords
+    return guides
+
+def legacy_owners(guides, keyword):
+    """没有索引：逐篇比较归一化后的关键词"""
+    key = normalize_keyword(keyword)
+    return tuple(slug for slug, keywords in guides.items()
+                 if key in guide_keywords({"seo_keywords": keywords}))
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词互食检查基准测试")
+    parser.add_argument("--guides", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--legacy-queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    guides = make_guides(args.guides, args.seed)
+    total = sum(len(keywords) for keywords in guides.values())
+    print(f"📄 合成语料: {len(guides)} 篇指南，{total} 个关键词\n")
+
+    start = time.perf_counter()
+    index = KeywordIndex()
+    for slug, keywords in guides.items():
+        index.add(slug, keywords, "hash")
+    print(f"{'构建索引':<20} {time.perf_counter() - start:8.3f}s   "
+          f"{index.keyword_count()} 个不同关键词，{index.shared_count()} 个被共用")
+
+    workdir = Path(tempfile.mkdtemp(prefix="keyword-index-bench-"))
+    try:
+        path = workdir / "keyword-index.json"
+        start = time.perf_counter()
+        index.save(path)
+        print(f"{'保存':<20} {time.perf_counter() - start:8.3f}s   {path.stat().st_size / 1024 / 1024:.1f} MB")
+        start = time.perf_counter()
+        loaded = KeywordIndex.load(path)
+        print(f"{'加载（含构建倒排表）':<20} {time.perf_counter() - start:8.3f}s")
+        assert loaded.keyword_count() == index.keyword_count()
+    finally:
+        shutil.rmtree(workdir)
+
+    rng = random.Random(args.seed)
+    pool = [kw for keywords in guides.values() for kw in keywords]
+    queries = [rng.choice(pool) for _ in range(args.queries)]
+
+    print()
+    for label, lookup in (("taken()（索引）", index.taken), ("owners()（索引）", index.owners)):
+        start = time.perf_counter()
+        for keyword in queries:
+            lookup(keyword)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<20} {elapsed / len(queries) * 1e6:10.2f} µs/次")
+
+    legacy_queries = queries[:args.legacy_queries]
+    start = time.perf_counter()
+    for keyword in legacy_queries:
+        assert legacy_owners(guides, keyword) == index.owners(keyword)
+    legacy = (time.perf_counter() - start) / len(legacy_queries)
+    print(f"{'逐篇扫描':<20} {legacy * 1e6:10.0f} µs/次   （抽样 {len(legacy_queries)} 次，结果一致）")
+
+    new_guides = make_guides(2_000, args.seed + 1)
+    start = time.perf_counter()
+    dropped = 0
+    for slug, keywords in new_guides.items():
+        kept, changes = index.resolve(keywords, f"new-{slug}", model=" ".join(keywords[1].split()[:-1]),
+                                      qualifier="battery")
+        dropped += sum(1 for value in changes.values() if value is None)
+    elapsed = time.perf_counter() - start
+    print(f"{'resolve()':<20} {elapsed / len(new_guides) * 1e6:10.2f} µs/篇   "
+          f"（{len(new_guides)} 篇新指南，去掉 {dropped} 个关键词）")
+
+if __name__ == "__main__":
+    main()
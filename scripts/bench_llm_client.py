@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+AI API 调用层基准测试
+在本地启动一个 OpenAI 兼容的替身服务器（固定延迟，按比例随机返回 429 / 503），测量：
+  - 旧式调用：逐个请求，每次新建连接（urllib），不重试
+  - llm_client：长连接 + 并发 + 令牌桶 + 重试，首次运行与再次运行（缓存命中）
+
+用法: python scripts/bench_llm_client.py [--calls 200] [--latency 0.05] [--error-rate 0.05] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import llm_client
+
+# ============================================
+# 替身服务器
+# ============================================
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.05
+    error_rate = 0.0
+    connections = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandInHandler.lock:
+            StandInHandler.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload, headers=()):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with StandInHandler.lock:
+            StandInHandler.requests += 1
+        time.sleep(self.latency)
+        roll = random.random()
+        if roll < self.error_rate / 2:
+            self._reply(429, {"error": {"message": "rate limited"}}, [("Retry-After", "0.05")])
+            return
+        if roll < self.error_rate:
+            self._reply(503, {"error": {"message": "overloaded"}})
+            return
+        prompt = request["messages"][-1]["content"]
+        content = json.dumps({"title": prompt[:40], "description": "stand-in",
+                              "causes": ["Cause 1"], "solutions": ["Solution 1"]})
+        self._reply(200, {"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+# ============================================
+# 旧式调用（对照组）
+# ============================================
+
+def legacy_call(base_url, prompt):
+    """逐个请求，每次新建连接，失败直接放弃"""
+    body = json.dumps({"model": "stand-in", "messages": [{"role": "user", "content": prompt}]}).encode('utf-8')
+    request = urllib.request.Request(f"{base_url}/chat/completions", data=body,
+                                     headers={"Content-Type": "application/json", "Connection": "close"})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(json.loads(response.read())["choices"][0]["message"]["content"])
+    except urllib.error.HTTPError:
+        return None
+
+# ============================================
+# 主函数
+# ============================================
+
+def reset_counters():
+    StandInHandler.connections = 0
+    StandInHandler.requests = 0
+
+def main():
+    parser = argparse.ArgumentParser(description="AI API 调用层基准测试")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0, help="令牌桶每秒请求数（0 表示不限速）")
+    args = parser.parse_args()
+
+    StandInHandler.latency = args.latency
+    StandInHandler.error_rate = args.error_rate
+    server, base_url = start_server()
+    prompts = [f"Write a repair guide for problem #{i}" for i in range(args.calls)]
+    cache_dir = tempfile.mkdtemp(prefix="llm-bench-")
+    print(f"📡 替身服务器 {base_url}：延迟 {args.latency * 1000:.0f}ms，错误率 {args.error_rate:.0%}，"
+          f"{args.calls} 次调用\n")
+
+    try:
+        reset_counters()
+        start = time.perf_counter()
+        results = [legacy_call(base_url, prompt) for prompt in prompts]
+        elapsed = time.perf_counter() - start
+        print(f"{'旧式（逐个、每次新建连接）':<22} {elapsed:7.2f}s  {args.calls / elapsed:7.1f} 次/s  "
+              f"失败 {results.count(None)}  连接 {StandInHandler.connections}")
+
+        for label in ("llm_client 首次运行", "llm_client 再次运行"):
+            reset_counters()
+            client = llm_client.LLMClient(base_url=base_url, api_key="stand-in", model="stand-in",
+                                          concurrency=args.concurrency, rate=args.rate, burst=args.concurrency,
+                                          cache_dir=cache_dir)
+
+            async def run_all():
+                return await asyncio.gather(*(client.chat_json([{"role": "user", "content": prompt}])
+                                              for prompt in prompts), return_exceptions=True)
+
+            start = time.perf_counter()
+            results = asyncio.run(run_all())
+            elapsed = time.perf_counter() - start
+            failed = sum(isinstance(result, Exception) for result in results)
+            print(f"{label:<22} {elapsed:7.2f}s  {args.calls / elapsed:7.1f} 次/s  "
+                  f"失败 {failed}  连接 {StandInHandler.connections}")
+            print(f"{'':<22} {llm_client.describe_summary(client.summary())}")
+            client.close()
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir)
+
+if __name__ == "__main__":
+    main()
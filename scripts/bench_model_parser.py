@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+型号解析基准测试
+解析语料库中所有 source_keyword、热门关键词库以及 auto-seo-generator 的关键词组合，
+统计编译耗时、首次解析耗时和 LRU 缓存命中后的耗时
+
+用法: python scripts/bench_model_parser.py
+"""
+
+import json
+import time
+from pathlib import Path
+
+import model_parser
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+BRANDS = [
+    "Dyson", "Shark", "Bissell", "iRobot", "Roomba",
+    "Hoover", "Eureka", "Miele", "Samsung", "LG",
+    "Tineco", "Roborock", "Ecovacs", "Eufy", "Black+Decker"
+]
+MODEL_PATTERNS = ["V{}", "V{} Absolute", "V{} Animal", "V{} Detect", "{} Series"]
+PROBLEMS = [
+    "not turning on", "not charging", "battery replacement", "filter cleaning",
+    "motor pulsing", "lost suction", "brush not spinning", "making noise"
+]
+
+def collect_keywords():
+    """收集语料库和关键词组合中的全部关键词"""
+    keywords = []
+    for path in sorted(DATA_DIR.glob("*.json")):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict) and data.get("source_keyword"):
+            keywords.append(data["source_keyword"])
+
+    for brand in BRANDS:
+        for problem in PROBLEMS:
+            keywords.append(f"{brand} {problem}")
+        for pattern in MODEL_PATTERNS:
+            for num in range(7, 16):
+                for problem in PROBLEMS:
+                    keywords.append(f"{brand} {pattern.format(num)} {problem}")
+    return keywords
+
+def main():
+    keywords = collect_keywords()
+    print(f"📊 关键词: {len(keywords)} 个（唯一 {len(set(keywords))} 个）\n")
+
+    start = time.perf_counter()
+    model_parser.get_parser()
+    print(f"编译型号表 + data/vacuums.json   {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    start = time.perf_counter()
+    model_parser.parse_many(keywords)
+    print(f"parse_many()（冷缓存）           {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    start = time.perf_counter()
+    model_parser.parse_many(keywords)
+    print(f"parse_many()（LRU 命中）         {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    info = model_parser.parse_vacuum_model.cache_info()
+    print(f"\n🧠 LRU: 命中 {info.hits} / 未命中 {info.misses}")
+
+if __name__ == "__main__":
+    main()
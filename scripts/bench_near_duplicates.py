@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+近似重复检测基准测试
+用问题模板为合成型号生成指南（部分指南随机改写/删除若干步骤），测量：
+  - 签名计算、LSH 建索引、聚类、单篇查询耗时（--guides 篇）
+  - 在前 --exact 篇上与两两精确 Jaccard 比较的耗时和召回率
+
+用法: python scripts/bench_near_duplicates.py [--guides 20000] [--exact 2000] [--seed 42]
+"""
+
+import argparse
+import random
+import time
+from itertools import combinations
+
+import model_parser
+import near_duplicates as nd
+import problem_templates
+from bench_problem_matcher import make_keywords
+from problem_matcher import classify
+
+FILLER = ("check", "the", "seal", "gasket", "clean", "wipe", "inspect", "motor", "reset", "hose",
+          "brush", "filter", "replace", "tighten", "screws", "battery", "dock", "sensor")
+
+def make_guides(count, seed):
+    """[(slug, 指南)]，约一半的指南随机改写 1-4 个步骤或原因"""
+    rng = random.Random(seed)
+    registry = problem_templates.get_registry()
+    guides = []
+    for i, (keyword, _) in enumerate(make_keywords(count, seed)):
+        brand, model, problem = model_parser.parse_vacuum_model(keyword)
+        full_model = f"{brand} {model}" if model else brand
+        problem_data = registry.render_problem(classify(keyword, problem), {
+            "brand": brand, "model": full_model, "display_desc": f"{problem} on your {full_model}"})
+        lines = problem_data["solution_steps"]
+        for _ in range(rng.choice((0, 0, 1, 2, 4))):
+            lines[rng.randrange(len(lines))] = " ".join(rng.choice(FILLER) for _ in range(rng.randint(4, 9)))
+        guides.append((f"guide-{i}", {"brand": brand, "model": full_model, "model_code": model,
+                                      "problems": [problem_data]}))
+    return guides
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="近似重复检测基准测试")
+    parser.add_argument("--guides", type=int, default=20_000)
+    parser.add_argument("--exact", type=int, default=2_000)
+    parser.add_argument("--threshold", type=float, default=nd.DEFAULT_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    guides = make_guides(args.guides, args.seed)
+    print(f"📄 合成语料: {len(guides)} 篇指南，签名 {nd.NUM_BINS} 位 = {nd.BANDS} 段 × {nd.ROWS} 行\n")
+
+    start = time.perf_counter()
+    texts = [(slug, nd.shingles(nd.guide_text(guide))) for slug, guide in guides]
+    shingle_time = time.perf_counter() - start
+    start = time.perf_counter()
+    signatures = [(slug, nd.signature(shingle_set)) for slug, shingle_set in texts]
+    signature_time = time.perf_counter() - start
+    print(f"{'屏蔽型号 + shingle':<18} {shingle_time / len(guides) * 1e6:9.1f} µs/篇")
+    print(f"{'MinHash 签名':<18} {signature_time / len(guides) * 1e6:9.1f} µs/篇")
+
+    start = time.perf_counter()
+    index = nd.NearDuplicateIndex(args.threshold)
+    for slug, sig in signatures:
+        index.add(slug, sig)
+    print(f"{'LSH 建索引':<18} {time.perf_counter() - start:9.3f} s")
+
+    start = time.perf_counter()
+    clusters = index.clusters()
+    print(f"{'聚类':<18} {time.perf_counter() - start:9.3f} s   "
+          f"{len(clusters)} 个簇，共 {sum(c['size'] for c in clusters)} 篇")
+
+    start = time.perf_counter()
+    probes = signatures[:1000]
+    for slug, sig in probes:
+        index.query(sig, exclude=slug, limit=3)
+    print(f"{'单篇查询':<18} {(time.perf_counter() - start) / len(probes) * 1e6:9.1f} µs/篇")
+
+    # 精确对照：前 args.exact 篇两两比较
+    subset = texts[:args.exact]
+    start = time.perf_counter()
+    exact_pairs = {(a, b) for (a, sa), (b, sb) in combinations(subset, 2) if jaccard(sa, sb) >= args.threshold}
+    exact_time = time.perf_counter() - start
+
+    sub_index = nd.NearDuplicateIndex(args.threshold)
+    for slug, sig in signatures[:args.exact]:
+        sub_index.add(slug, sig)
+    start = time.perf_counter()
+    sub_clusters = sub_index.clusters()
+    lsh_time = time.perf_counter() - start
+    cluster_of = {}
+    for cluster in sub_clusters:
+        for slug in [cluster["representative"]] + [slug for slug, _ in cluster["members"]]:
+            cluster_of[slug] = cluster["representative"]
+    found = sum(1 for a, b in exact_pairs if a in cluster_of and cluster_of.get(a) == cluster_of.get(b))
+
+    print(f"\n前 {args.exact} 篇（{args.exact * (args.exact - 1) // 2} 对）:")
+    print(f"{'两两精确 Jaccard':<18} {exact_time:9.3f} s   {len(exact_pairs)} 对 ≥ {args.threshold:.0%}")
+    print(f"{'LSH 聚类':<18} {lsh_time:9.3f} s   召回 {found / max(1, len(exact_pairs)):.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Telegram 通知基准测试
+在本地启动 Bot API 替身服务器（固定延迟；每 --rate-limit-every 个请求返回一次 429 retry_after），测量：
+  - 旧式发送：每条消息阻塞 urllib 请求一次，429 直接失败
+  - notifier：调用方阻塞时间、合并后的请求数、全部送达的耗时
+  - 替身服务器卡住时 close() 的最长等待
+
+用法: python scripts/bench_notifier.py [--messages 20] [--latency 0.3] [--coalesce 0.5]
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import notifier
+
+# ============================================
+# Bot API 替身服务器
+# ============================================
+
+class BotAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.3
+    rate_limit_every = 5
+    retry_after = 1
+    requests = 0
+    delivered = []
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with BotAPIHandler.lock:
+            BotAPIHandler.requests += 1
+            limited = self.rate_limit_every and BotAPIHandler.requests % self.rate_limit_every == 1
+        time.sleep(self.latency)
+        if limited:
+            self._reply(429, {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                              "parameters": {"retry_after": self.retry_after}})
+            return
+        with BotAPIHandler.lock:
+            BotAPIHandler.delivered.append(payload["text"])
+        self._reply(200, {"ok": True, "result": {"message_id": BotAPIHandler.requests}})
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BotAPIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def reset_counters():
+    BotAPIHandler.requests = 0
+    BotAPIHandler.delivered = []
+
+# ============================================
+# 旧式发送（对照组）
+# ============================================
+
+def legacy_send(api_url, message):
+    url = f"{api_url}/botTOKEN/sendMessage"
+    data = json.dumps({"chat_id": "1", "text": message}).encode('utf-8')
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.getcode() == 200
+    except urllib.error.HTTPError:
+        return False
+
+# ============================================
+# 主函数
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Telegram 通知基准测试")
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--coalesce", type=float, default=0.5)
+    parser.add_argument("--rate-limit-every", type=int, default=5)
+    args = parser.parse_args()
+
+    BotAPIHandler.latency = args.latency
+    BotAPIHandler.rate_limit_every = args.rate_limit_every
+    server, api_url = start_server()
+    messages = [f"✅ Generated guide #{i}: shark-nv352-problem-{i}" for i in range(args.messages)]
+    quiet = lambda message, level="INFO": None
+    print(f"📡 Bot API 替身 {api_url}：延迟 {args.latency * 1000:.0f}ms，"
+          f"每 {args.rate_limit_every} 个请求返回一次 429（retry_after {BotAPIHandler.retry_after}s），"
+          f"{args.messages} 条消息\n")
+
+    try:
+        reset_counters()
+        start = time.perf_counter()
+        ok = sum(legacy_send(api_url, message) for message in messages)
+        elapsed = time.perf_counter() - start
+        print(f"{'旧式（逐条阻塞发送）':<16} 调用方阻塞 {elapsed:6.2f}s  请求 {BotAPIHandler.requests:3d}  "
+              f"送达 {ok}/{args.messages} 条")
+
+        reset_counters()
+        instance = notifier.TelegramNotifier("TOKEN", "1", api_url=api_url, coalesce=args.coalesce, log=quiet)
+        start = time.perf_counter()
+        for message in messages:
+            instance.notify(message)
+        blocked = time.perf_counter() - start
+        instance.flush()
+        elapsed = time.perf_counter() - start
+        delivered = sum(text.count("✅ Generated guide") for text in BotAPIHandler.delivered)
+        print(f"{'notifier':<16} 调用方阻塞 {blocked:6.4f}s  请求 {BotAPIHandler.requests:3d}  "
+              f"送达 {delivered}/{args.messages} 条（{len(BotAPIHandler.delivered)} 条摘要，"
+              f"{elapsed:.2f}s 内全部送达）  {instance.stats}")
+        instance.close()
+
+        # 替身服务器卡住：close() 按超时放弃，不会让运行卡在最后
+        reset_counters()
+        BotAPIHandler.latency = 30
+        instance = notifier.TelegramNotifier("TOKEN", "1", api_url=api_url, coalesce=0, log=quiet)
+        instance.notify("stuck")
+        start = time.perf_counter()
+        instance.close(timeout=2)
+        print(f"{'服务器卡住':<16} close(timeout=2) 返回用时 {time.perf_counter() - start:.2f}s")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
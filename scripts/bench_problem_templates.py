@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+问题模板渲染基准测试
+对比旧版做法（每篇指南把所有问题模板和所有 SEO 长尾词列表的 f-string 全部渲染一遍，再取其中一个）
+与模板注册表（懒编译，只渲染选中的类型）在 5 万个合成关键词上的单篇耗时
+
+旧版实现由内置模板生成与原代码相同的 f-string 字典字面量函数，确保对照组开销一致
+
+用法: python scripts/bench_problem_templates.py [--count 50000] [--seed 42]
+"""
+
+import argparse
+import time
+
+import model_parser
+import problem_templates
+from bench_problem_matcher import make_keywords
+from problem_matcher import classify
+
+# ============================================
+# 旧版实现（由模板生成 f-string 字面量，与原代码一致）
+# ============================================
+
+def _literal(node):
+    if isinstance(node, str):
+        return ("f" if problem_templates.placeholders(node) else "") + repr(node)
+    if isinstance(node, list):
+        return "[" + ", ".join(_literal(item) for item in node) + "]"
+    if isinstance(node, dict):
+        return "{" + ", ".join(f"{key!r}: {_literal(value)}" for key, value in node.items()) + "}"
+    return repr(node)
+
+def build_legacy_functions():
+    """返回 (render_all_problems(brand, model, display_desc), render_all_seo(model))"""
+    source = (
+        "def render_all_problems(brand, model, display_desc):\n"
+        f"    return {_literal(problem_templates.PROBLEM_TEMPLATES)}\n"
+        "def render_all_seo(model):\n"
+        f"    return {_literal(problem_templates.SEO_KEYWORD_TEMPLATES)}\n"
+    )
+    namespace = {}
+    exec(compile(source, "<legacy templates>", "exec"), namespace)
+    return namespace["render_all_problems"], namespace["render_all_seo"]
+
+def legacy_generate(render_all_problems, render_all_seo, problem_type, brand, model, display_desc, problem_desc):
+    problem_templates_ = render_all_problems(brand, model, display_desc)
+    problem = problem_templates_.get(problem_type, problem_templates_["general"])
+
+    desc_lower = problem_desc.lower()
+    seo = None
+    for seo_type, keywords in render_all_seo(model).items():
+        if any(kw in desc_lower for kw in seo_type.split('_')):
+            seo = keywords
+            break
+    return problem, seo
+
+def registry_generate(registry, problem_type, brand, model, display_desc, problem_desc):
+    problem = registry.render_problem(problem_type, {"brand": brand, "model": model, "display_desc": display_desc})
+    seo_type = registry.seo_type(problem_desc)
+    seo = registry.render_seo_keywords(problem_desc, {"model": model}) if seo_type else None
+    return problem, seo
+
+# ============================================
+# 主函数
+# ============================================
+
+def prepare(count, seed):
+    """解析和分类不在计时范围内"""
+    items = []
+    for keyword, _ in make_keywords(count, seed):
+        brand, model, problem_desc = model_parser.parse_vacuum_model(keyword)
+        full_model_name = f"{brand} {model}" if model else brand
+        display_desc = f"{problem_desc} on your {full_model_name}"
+        items.append((classify(keyword, problem_desc), brand, full_model_name, display_desc, problem_desc))
+    return items
+
+def bench(label, func, items):
+    start = time.perf_counter()
+    results = [func(*item) for item in items]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s  {elapsed / len(items) * 1e6:8.2f} µs/篇")
+    return results, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="问题模板渲染基准测试")
+    parser.add_argument("--count", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    items = prepare(args.count, args.seed)
+    print(f"📊 合成关键词: {len(items)} 个，问题模板 {len(problem_templates.PROBLEM_TEMPLATES)} 种，"
+          f"SEO 长尾词 {len(problem_templates.SEO_KEYWORD_TEMPLATES)} 种\n")
+
+    render_all_problems, render_all_seo = build_legacy_functions()
+    legacy, legacy_time = bench(
+        "旧版（全部渲染后取一个）",
+        lambda *item: legacy_generate(render_all_problems, render_all_seo, *item),
+        items,
+    )
+
+    start = time.perf_counter()
+    registry = problem_templates.TemplateRegistry()
+    registry.render_problem("general", {"brand": "", "model": "", "display_desc": ""})
+    print(f"{'注册表初始化 + 首次编译':<28} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    new, new_time = bench("注册表（只渲染选中的类型）",
+                          lambda *item: registry_generate(registry, *item), items)
+
+    assert legacy == new, "渲染结果与旧版不一致"
+    print(f"\n✅ 渲染结果与旧版完全一致")
+    print(f"⚡ 加速: {legacy_time / new_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+FAQ 回填基准测试
+在临时目录中用 data/ 的指南复制出 --files 篇（其中一半去掉 faqs），测量：
+  - 旧版 main：逐个完整解析所有文件，顺序生成并写回
+  - 新版首次运行（进程池）、再次运行（按语料索引中的 FAQ 数跳过）、--dry-run
+
+用法: python scripts/bench_retro_fill_faqs.py [--files 100000] [--workers 8]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import guide_store
+import retro_fill_faqs
+from corpus_index import DATA_DIR
+
+# ============================================
+# 旧版实现（保留原样，只把数据目录改为参数，作为对照组）
+# ============================================
+
+def legacy_main(data_dir):
+    files = [f for f in os.listdir(data_dir) if f.endswith('.json') and f not in ['vacuums.json', 'sharks.json', 'bissells.json']]
+    count = 0
+    updates = []
+
+    for filename in files:
+        filepath = data_dir / filename
+        try:
+            data = retro_fill_faqs.load_json(filepath)
+
+            if 'faqs' in data and data['faqs']:
+                continue
+
+            data['faqs'] = retro_fill_faqs.generate_faqs(data)
+
+            updates.append((filepath, data))
+            count += 1
+        except Exception as e:
+            print(f"❌ Error processing {filename}: {e}")
+
+    guide_store.write_guides(updates)
+    return count
+
+# ============================================
+# 主函数
+# ============================================
+
+def make_corpus(target, count):
+    """把 data/ 中的指南循环复制为 count 个文件，偶数序号的去掉 faqs"""
+    target.mkdir(parents=True)
+    sources = [guide_store.load_guide(p) for p in guide_store.iter_guide_paths(DATA_DIR)]
+    sources = [g for g in sources if isinstance(g, dict) and g.get("problems")]
+    for i in range(count):
+        guide = dict(sources[i % len(sources)])
+        if i % 2 == 0:
+            guide.pop("faqs", None)
+        else:
+            guide.setdefault("faqs", [{"question": "q", "answer": "a"}])
+        with open(target / f"guide-{i}.json", 'wb') as f:
+            f.write(guide_store.dumps(guide))
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<26} {elapsed:8.2f}s   {result}")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="FAQ 回填基准测试")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="retro-fill-bench-"))
+    try:
+        legacy_dir, new_dir = workdir / "legacy" / "data", workdir / "new" / "data"
+        make_corpus(legacy_dir, args.files)
+        make_corpus(new_dir, args.files)
+        print(f"📄 {args.files} 篇指南（一半缺少 FAQ），{args.workers} 个 worker\n")
+
+        quiet = ["--workers", str(args.workers)]
+        timed("旧版（顺序、全部解析）", lambda: f"写入 {legacy_main(legacy_dir)} 篇")
+        timed("新版 --dry-run", lambda: dict(retro_fill_faqs.main([str(new_dir), "--dry-run"] + quiet)))
+        timed("新版首次运行", lambda: dict(retro_fill_faqs.main([str(new_dir)] + quiet)))
+        timed("新版再次运行", lambda: dict(retro_fill_faqs.main([str(new_dir)] + quiet)))
+        assert all(guide_store.load_guide(p).get("faqs") for p in guide_store.iter_guide_paths(new_dir))
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+快照提取基准测试
+对比 analyze_trends.py / debug_trends.py 原有的正则组合（整份文档读入内存、每个正则各扫描一遍）
+与流式提取器（分块读取、单次扫描）在 trends_full.html 上的耗时和峰值内存
+
+用法: python scripts/bench_trends_extractor.py [snapshot.html] [--repeat 5]
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import unquote
+
+from trends_extractor import iter_explore_queries, iter_snapshot
+
+DEFAULT_SNAPSHOT = Path(__file__).parent.parent / "trends_full.html"
+
+# 两个调试脚本中原有的正则
+REGEX_BATTERY = [
+    r'\[{[^\]]{20,200}\]',
+    r'\{[^{}]*"title"[^{}]*\}',
+    r'\{[^{}]*"query"[^{}]*\}',
+    r'"title"\s*:\s*"([^"]+)"',
+    r'"query"\s*:\s*"([^"]+)"',
+    r'"text"\s*:\s*"([^"]+)"',
+    r'"([A-Za-z][A-Za-z0-9\s]{5,50})"',
+    r'\["([^"]+)",\d+,\d+',
+    r'\\u003C[^>]*\\u003E([^\\]+)\\u003C',
+    r'/trends/explore\?q=([^"&]+)',
+]
+
+def run_regex_battery(path):
+    html = Path(path).read_text(encoding='utf-8')
+    return sum(len(re.findall(pattern, html)) for pattern in REGEX_BATTERY)
+
+def run_extractor(path):
+    return sum(1 for _ in iter_snapshot(path))
+
+def measure(func, path, repeat):
+    """返回 (最短耗时, 峰值内存, 结果)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(path)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+def main():
+    parser = argparse.ArgumentParser(description="快照提取基准测试")
+    parser.add_argument("snapshot", nargs="?", default=str(DEFAULT_SNAPSHOT))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    size = Path(args.snapshot).stat().st_size
+    print(f"📄 快照: {args.snapshot} ({size / 1024 / 1024:.2f} MB)\n")
+
+    for label, func in [("正则组合（{} 个）".format(len(REGEX_BATTERY)), run_regex_battery),
+                        ("流式提取器", run_extractor)]:
+        elapsed, peak, result = measure(func, args.snapshot, args.repeat)
+        print(f"{label:<16} {elapsed * 1000:9.1f} ms   峰值内存 {peak / 1024 / 1024:7.2f} MB   结果 {result} 项")
+
+    # explore 搜索词必须与旧版 explore 正则的结果一致
+    html = Path(args.snapshot).read_text(encoding='utf-8')
+    legacy = [unquote(q.replace('+', ' ')) for q in re.findall(REGEX_BATTERY[-1], html)]
+    current = list(iter_explore_queries(iter_snapshot(args.snapshot)))
+    assert legacy == current, "explore 搜索词与旧版正则不一致"
+    print(f"\n✅ explore 搜索词一致: {len(current)} 个")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+趋势词相关性过滤基准测试
+模拟每次运行 3 个地区 × 每地区 50 个候选词的工作量，
+对比旧版逐词逐关键词 re.search 与预编译的单次扫描过滤器
+
+用法: python scripts/bench_trends_relevance.py [--runs 2000]
+"""
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from urllib.parse import unquote
+
+from trends_relevance import VACUUM_KEYWORDS, filter_relevant
+
+SNAPSHOT = Path(__file__).parent.parent / "trends_full.html"
+
+EXTRA_TERMS = [
+    "Dyson V15 Detect", "Shark Robot Vacuum Deal", "Roomba Combo J9",
+    "Bissell Carpet Cleaner Recall", "Samsung Galaxy S26", "Lg Oled Tv",
+    "Floor And Decor", "Battery Storage", "Phone Repair Near Me", "Car Parts"
+]
+
+def load_terms(count, seed):
+    """从 trends_full.html 提取 explore 查询，不足部分用吸尘器相关词补齐"""
+    terms = []
+    if SNAPSHOT.exists():
+        html = SNAPSHOT.read_text(encoding='utf-8')
+        for url_encoded in re.findall(r'/trends/explore\?q=([^"&]+)', html):
+            terms.append(unquote(url_encoded.replace('+', ' ')).strip().title())
+    rng = random.Random(seed)
+    while len(terms) < count:
+        terms.append(rng.choice(EXTRA_TERMS))
+    rng.shuffle(terms)
+    return terms[:count]
+
+def legacy_filter(terms):
+    """旧版逻辑：每个词、每个关键词都重新构建并执行一次正则"""
+    related = []
+    for clean_term in terms:
+        term_lower = clean_term.lower()
+        import re
+        is_related = False
+        for kw in VACUUM_KEYWORDS:
+            pattern = r'\b' + re.escape(kw) + r'\b'
+            if re.search(pattern, term_lower):
+                is_related = True
+                break
+        if is_related and clean_term not in related:
+            related.append(clean_term)
+    return related
+
+def main():
+    parser = argparse.ArgumentParser(description="趋势词相关性过滤基准测试")
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    regions = [load_terms(50, args.seed + i) for i in range(3)]
+    print(f"📊 工作量: {len(regions)} 个地区 × 50 个候选词，重复 {args.runs} 次\n")
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        legacy = [legacy_filter(terms) for terms in regions]
+    legacy_time = (time.perf_counter() - start) / args.runs
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        current = [[term for term, _ in filter_relevant(terms)] for terms in regions]
+    current_time = (time.perf_counter() - start) / args.runs
+
+    assert legacy == current, "过滤结果与旧版不一致"
+    print(f"旧版 re.search 循环      {legacy_time * 1e6:9.1f} µs/次运行")
+    print(f"预编译 filter_relevant   {current_time * 1e6:9.1f} µs/次运行")
+    print(f"\n✅ 结果一致，相关词 {sum(len(r) for r in current)} 个")
+    print(f"⚡ 加速: {legacy_time / current_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+语料打包（单文件 bundle + 按 slug 排序的偏移索引）
+站点构建和各个脚本原来逐个打开 data/ 下成千上万个小 JSON 文件。这里把全部指南打包成：
+
+  .cache/corpus.bundle      文件头 + 依次追加的记录，每条记录: <u32 slug 长度><u32 JSON 长度><slug><紧凑 JSON>
+  .cache/corpus.bundle.idx  文件头 + 按 slug（UTF-8 字节序）排序的定长条目 + slug 字符串区
+
+  - 读取方 mmap 两个文件，在索引上二分查找，只解析需要的那一条记录，不必读入整个索引或其他指南
+  - update 按 mtime / 文件大小增量同步：新增和修改的指南追加到 bundle 末尾，旧记录留作空洞，
+    只重写（很小的）索引；空洞超过 BUNDLE_COMPACT_RATIO 时压缩，按 slug 顺序重写 bundle
+  - 两个文件头中有相同的 generation，压缩时更换；读取方发现不一致（正好碰上压缩替换）时重新打开，
+    已经打开的读取方继续使用旧文件，不受影响
+  - lib/vacuum-data.ts 在设置了 GUIDE_BUNDLE 时用同一索引读取（构建前先运行 update）
+
+用法:
+    python scripts/corpus_bundle.py update [--compact] [--full]   # 增量更新 bundle
+    python scripts/corpus_bundle.py get shark-nv352               # 输出一篇指南
+    python scripts/corpus_bundle.py list                          # 列出 bundle 中的 slug
+
+    with corpus_bundle.open_bundle() as bundle:
+        guide = bundle.get("shark-nv352")
+"""
+
+import argparse
+import fcntl
+import mmap
+import os
+import struct
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import guide_store
+from corpus_index import DATA_DIR, EXCLUDED_FILES, cache_dir_for
+
+BUNDLE_NAME = "corpus.bundle"
+INDEX_NAME = "corpus.bundle.idx"
+LOCK_NAME = "corpus.bundle.lock"
+
+# 空洞（被替换或删除的记录）超过 bundle 大小的该比例时压缩
+COMPACT_RATIO = float(os.getenv("BUNDLE_COMPACT_RATIO", "0.5"))
+COMPACT_MIN_BYTES = 1 << 20         # 空洞小于 1MB 时不压缩
+
+BUNDLE_MAGIC = b"VGBUNDL1"
+INDEX_MAGIC = b"VGBIDX01"
+BUNDLE_HEADER = struct.Struct("<8s16s")                 # magic, generation
+INDEX_HEADER = struct.Struct("<8s16sII")                # magic, generation, 条目数, slug 字符串区字节数
+# slug 在字符串区的偏移和长度、JSON 在 bundle 中的偏移和长度、源文件 mtime_ns 和大小
+ENTRY = struct.Struct("<IIQIxxxxqq")
+RECORD_HEADER = struct.Struct("<II")                    # slug 长度, JSON 长度
+
+class BundleError(Exception):
+    """bundle / 索引缺失、损坏或与对方不匹配"""
+
+def bundle_paths(data_dir=DATA_DIR):
+    cache_dir = cache_dir_for(data_dir)
+    return cache_dir / BUNDLE_NAME, cache_dir / INDEX_NAME
+
+# ============================================
+# 读取
+# ============================================
+
+class CorpusBundle:
+    """
+    只读视图：mmap 索引和 bundle，按 slug 二分查找
+    """
+
+    def __init__(self, bundle_path, index_path):
+        self._files = []
+        try:
+            # 二分查找在索引中随机跳转，预读只会多读无用的页；bundle 保留预读，批量查找时相邻记录已在缓存中
+            self._index = self._map(index_path, getattr(mmap, "MADV_RANDOM", None))
+            self._bundle = self._map(bundle_path)
+            if len(self._index) < INDEX_HEADER.size or len(self._bundle) < BUNDLE_HEADER.size:
+                raise BundleError("文件头不完整")
+            magic, generation, self._count, strings_size = INDEX_HEADER.unpack_from(self._index)
+            bundle_magic, bundle_generation = BUNDLE_HEADER.unpack_from(self._bundle)
+            if magic != INDEX_MAGIC or bundle_magic != BUNDLE_MAGIC:
+                raise BundleError("不是 corpus bundle")
+            if generation != bundle_generation:
+                raise BundleError("索引与 bundle 不匹配（正在压缩？）")
+            self._strings = INDEX_HEADER.size + self._count * ENTRY.size
+            if self._strings + strings_size > len(self._index):
+                raise BundleError("索引被截断")
+            self.generation = generation
+        except BaseException:
+            self.close()
+            raise
+
+    def _map(self, path, advice=None):
+        f = open(path, 'rb')
+        self._files.append(f)
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            raise BundleError(f"{path} 为空")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append(mapped)
+        if advice is not None:
+            mapped.madvise(advice)
+        return mapped
+
+    def close(self):
+        for f in reversed(self._files):
+            f.close()
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self._index, INDEX_HEADER.size + i * ENTRY.size)
+
+    def _slug(self, entry):
+        start = self._strings + entry[0]
+        return self._index[start:start + entry[1]]
+
+    def _find(self, slug):
+        key = slug.encode('utf-8')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            current = self._slug(entry)
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return entry
+        return None
+
+    def __contains__(self, slug):
+        return self._find(slug) is not None
+
+    def get_bytes(self, slug):
+        """一篇指南的紧凑 JSON 字节；不存在时返回 None"""
+        entry = self._find(slug)
+        if entry is None:
+            return None
+        return self._bundle[entry[2]:entry[2] + entry[3]]
+
+    def get(self, slug):
+        payload = self.get_bytes(slug)
+        return None if payload is None else guide_store.loads(payload)
+
+    def slugs(self):
+        """按排序依次产出全部 slug"""
+        for entry in self.entries():
+            yield entry[0]
+
+    def entries(self):
+        """依次产出 (slug, JSON 偏移, JSON 长度, mtime_ns, 大小)"""
+        # 顺序遍历时一次读入条目区和字符串区，不逐条访问 mmap
+        strings = self._index[self._strings:]
+        table = self._index[INDEX_HEADER.size:self._strings]
+        for start, length, offset, size, mtime_ns, file_size in ENTRY.iter_unpack(table):
+            yield strings[start:start + length].decode('utf-8'), offset, size, mtime_ns, file_size
+
+    def iter_guides(self):
+        """按 slug 顺序依次产出 (slug, 指南)（压缩后的 bundle 中是顺序读取）"""
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._bundle.madvise(mmap.MADV_SEQUENTIAL)
+        try:
+            for slug, offset, length, _, _ in self.entries():
+                yield slug, guide_store.loads(self._bundle[offset:offset + length])
+        finally:
+            if hasattr(mmap, "MADV_NORMAL") and not self._bundle.closed:
+                self._bundle.madvise(mmap.MADV_NORMAL)
+
+def open_bundle(data_dir=DATA_DIR, retries=3):
+    """打开 data_dir 对应的 bundle；碰上压缩替换文件时重试"""
+    bundle_path, index_path = bundle_paths(data_dir)
+    for attempt in range(retries):
+        try:
+            return CorpusBundle(bundle_path, index_path)
+        except BundleError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(0.05)
+
+# ============================================
+# 写入
+# ============================================
+
+def _atomic_write(path, data):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def encode_index(generation, entries):
+    """entries: {slug: (JSON 偏移, JSON 长度, mtime_ns, 大小)} → 索引文件内容"""
+    keys = sorted((slug.encode('utf-8'), slug) for slug in entries)
+    header_size = INDEX_HEADER.size + len(keys) * ENTRY.size
+    strings_size = sum(len(key) for key, _ in keys)
+    buffer = bytearray(header_size + strings_size)
+    INDEX_HEADER.pack_into(buffer, 0, INDEX_MAGIC, generation, len(keys), strings_size)
+    position = INDEX_HEADER.size
+    string_offset = 0
+    for key, slug in keys:
+        ENTRY.pack_into(buffer, position, string_offset, len(key), *entries[slug])
+        buffer[header_size + string_offset:header_size + string_offset + len(key)] = key
+        position += ENTRY.size
+        string_offset += len(key)
+    return bytes(buffer)
+
+def load_entries(bundle_path, index_path):
+    """现有 bundle 的 (generation, {slug: (偏移, 长度, mtime_ns, 大小)}, bundle 大小)；不可用时返回 None"""
+    try:
+        with CorpusBundle(bundle_path, index_path) as bundle:
+            entries = {slug: rest for slug, *rest in bundle.entries()}
+            bundle_size = len(bundle._bundle)
+            generation = bundle.generation
+    except (OSError, ValueError, BundleError):
+        return None
+    if any(offset + length > bundle_size for offset, length, _, _ in entries.values()):
+        return None
+    return generation, entries, bundle_size
+
+def _record(slug, payload):
+    key = slug.encode('utf-8')
+    return RECORD_HEADER.pack(len(key), len(payload)) + key
+
+def _read_compact(path):
+    """读取指南并转为紧凑 JSON；解析失败时返回 None（不放入 bundle）"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        return guide_store.dumps(guide_store.loads(raw), compact=True)
+    except ValueError:
+        return None
+
+def scan_changes(data_dir, entries):
+    """返回 (新增或修改的 [(slug, 路径, mtime_ns, 大小)], 已删除的 slug, 未变数)"""
+    changed, seen, unchanged = [], set(), 0
+    with os.scandir(data_dir) as items:
+        for item in items:
+            name = item.name
+            if not name.endswith(".json") or name in EXCLUDED_FILES or not item.is_file():
+                continue
+            slug = name[:-5]
+            seen.add(slug)
+            stat = item.stat()
+            entry = entries.get(slug)
+            if entry and entry[2] == stat.st_mtime_ns and entry[3] == stat.st_size:
+                unchanged += 1
+                continue
+            changed.append((slug, item.path, stat.st_mtime_ns, stat.st_size))
+    # 不能按数量判断：同一次更新中既有新增又有删除时两边数量可能相等
+    removed = [slug for slug in entries if slug not in seen]
+    return changed, removed, unchanged
+
+def _write_bundle(path, generation, entries, records):
+    """
+    新建 bundle：records 为 [(slug, JSON, mtime_ns, 大小)]，按顺序写入并填写 entries
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, generation))
+        position = BUNDLE_HEADER.size
+        for slug, payload, mtime_ns, size in records:
+            header = _record(slug, payload)
+            f.write(header)
+            f.write(payload)
+            entries[slug] = (position + len(header), len(payload), mtime_ns, size)
+            position += len(header) + len(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path, position
+
+@contextmanager
+def _locked(cache_dir):
+    """同一时间只有一个进程更新 bundle"""
+    with open(cache_dir / LOCK_NAME, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def update_bundle(data_dir=DATA_DIR, compact=None, full=False):
+    """
+    增量同步 bundle 与 data_dir
+    compact: True 强制压缩，False 不压缩，None 按空洞比例决定
+    返回 {"guides", "appended", "removed", "unchanged", "invalid", "compacted", "bundle_bytes",
+          "dead_bytes", "duration_seconds"}
+    """
+    start = time.perf_counter()
+    data_dir = Path(data_dir)
+    bundle_path, index_path = bundle_paths(data_dir)
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with _locked(bundle_path.parent):
+        existing = None if full else load_entries(bundle_path, index_path)
+        generation, entries, bundle_size = existing or (os.urandom(16), {}, 0)
+        changed, removed, unchanged = scan_changes(data_dir, entries)
+        for slug in removed:
+            del entries[slug]
+
+        records, invalid = [], 0
+        for slug, path, mtime_ns, size in changed:
+            try:
+                payload = _read_compact(path)
+            except FileNotFoundError:
+                # 扫描后被删除
+                entries.pop(slug, None)
+                continue
+            if payload is None:
+                invalid += 1
+                entries.pop(slug, None)
+                continue
+            records.append((slug, payload, mtime_ns, size))
+
+        if existing is None:
+            tmp_path, bundle_size = _write_bundle(bundle_path, generation, entries, records)
+            os.replace(tmp_path, bundle_path)
+        elif records:
+            # 追加到末尾；已打开的读取方只访问自己索引中的旧偏移，不受影响
+            with open(bundle_path, 'r+b') as f:
+                f.seek(bundle_size)
+                for slug, payload, mtime_ns, size in records:
+                    header = _record(slug, payload)
+                    f.write(header)
+                    f.write(payload)
+                    entries[slug] = (bundle_size + len(header), len(payload), mtime_ns, size)
+                    bundle_size += len(header) + len(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+        live = sum(RECORD_HEADER.size + len(slug.encode('utf-8')) + entry[1] for slug, entry in entries.items())
+        dead = bundle_size - BUNDLE_HEADER.size - live
+        if compact is None:
+            compact = dead >= COMPACT_MIN_BYTES and dead > bundle_size * COMPACT_RATIO
+        compacted = False
+        if compact and existing is not None:
+            bundle_size = compact_bundle(bundle_path, index_path, entries)
+            compacted, dead = True, 0
+        elif existing is None or records or removed or invalid:
+            _atomic_write(index_path, encode_index(generation, entries))
+
+    return {"guides": len(entries), "appended": len(records), "removed": len(removed),
+            "unchanged": unchanged, "invalid": invalid, "compacted": compacted,
+            "bundle_bytes": bundle_size, "dead_bytes": dead,
+            "duration_seconds": round(time.perf_counter() - start, 3)}
+
+def compact_bundle(bundle_path, index_path, entries):
+    """
+    按 slug 顺序重写 bundle（去掉空洞），更换 generation；entries 原地更新为新偏移
+    返回新 bundle 大小
+    """
+    generation = os.urandom(16)
+    with open(bundle_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            records = [(slug, mapped[offset:offset + length], mtime_ns, size)
+                       for slug, (offset, length, mtime_ns, size) in sorted(entries.items())]
+        finally:
+            mapped.close()
+    tmp_path, bundle_size = _write_bundle(bundle_path, generation, entries, records)
+    # 先替换 bundle 再替换索引：中间打开的读取方看到 generation 不一致，会重试
+    os.replace(tmp_path, bundle_path)
+    _atomic_write(index_path, encode_index(generation, entries))
+    return bundle_size
+
+# ============================================
+# 主函数
+# ============================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="语料打包（单文件 bundle + 偏移索引）")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    sub = parser.add_subparsers(dest="command", required=True)
+    update = sub.add_parser("update", help="增量更新 bundle")
+    update.add_argument("--compact", action="store_true", help="强制压缩")
+    update.add_argument("--full", action="store_true", help="忽略现有 bundle，全部重建")
+    get = sub.add_parser("get", help="输出一篇指南")
+    get.add_argument("slug")
+    sub.add_parser("list", help="列出 bundle 中的 slug")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "update":
+        stats = update_bundle(args.data_dir, compact=True if args.compact else None, full=args.full)
+        print(f"📦 {stats['guides']} 篇指南: 追加 {stats['appended']}，删除 {stats['removed']}，"
+              f"未变 {stats['unchanged']}，无法解析 {stats['invalid']}"
+              f"{'，已压缩' if stats['compacted'] else ''}；"
+              f"{stats['bundle_bytes'] / 1e6:.1f}MB（空洞 {stats['dead_bytes'] / 1e6:.1f}MB），"
+              f"{stats['duration_seconds']:.2f}s")
+        return 0
+
+    try:
+        bundle = open_bundle(args.data_dir)
+    except (OSError, BundleError) as e:
+        print(f"❌ 无法打开 bundle（先运行 update）: {e}", file=sys.stderr)
+        return 1
+    with bundle:
+        if args.command == "list":
+            for slug in bundle.slugs():
+                print(slug)
+            return 0
+        payload = bundle.get_bytes(args.slug)
+        if payload is None:
+            print(f"❌ bundle 中没有 {args.slug}", file=sys.stderr)
+            return 1
+        sys.stdout.buffer.write(guide_store.dumps(guide_store.loads(payload)) + b"\n")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+维修指南语料索引（manifest）
+把 data/ 下每篇指南的摘要信息保存在一个紧凑的 JSON 文件中，
+列出 slug、统计数量、按品牌筛选等操作只需读取这一个文件，不必重新扫描并解析整个目录
+
+增量更新：只重新解析 mtime / 文件大小发生变化的文件，已删除的文件从索引中移除
+
+用法:
+    python scripts/corpus_index.py update        # 增量更新索引
+    python scripts/corpus_index.py count         # 指南总数
+    python scripts/corpus_index.py slugs         # 列出所有 slug
+    python scripts/corpus_index.py brand Dyson   # 某个品牌的指南
+    python scripts/corpus_index.py brands        # 各品牌数量
+"""
+
+import gc
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+MANIFEST_NAME = "corpus-manifest.json"
+MANIFEST_PATH = PROJECT_ROOT / ".cache" / MANIFEST_NAME
+
+MANIFEST_VERSION = 4
+
+# manifest 按列存储：字段名只写一次，每篇指南一行
+# keywords / faqs 是数量；valid 为 False 表示文件无法解析为 JSON 对象
+FIELDS = ("slug", "brand", "model", "problem_ids", "problem_type", "trending_source",
+          "generated_date", "keywords", "faqs", "auto_generated", "valid", "hash", "mtime", "size")
+
+# 聚合数据文件，不是单个型号的维修指南（与 lib/vacuum-data.ts 的排除列表一致）
+EXCLUDED_FILES = {"vacuums.json", "sharks.json", "bissells.json"}
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def summarize_guide(slug, data, stat):
+    """从指南 JSON 提取索引字段；无法解析的文件也会记录（brand 为 None），便于排查"""
+    try:
+        guide = json.loads(data)
+    except ValueError:
+        guide = None
+    valid = isinstance(guide, dict)
+    if not valid:
+        guide = {}
+
+    problems = guide.get("problems") if isinstance(guide.get("problems"), list) else []
+    keywords = guide.get("seo_keywords")
+    faqs = guide.get("faqs")
+    return {
+        "slug": slug,
+        "brand": guide.get("brand"),
+        "model": guide.get("model"),
+        "problem_ids": [p.get("id") for p in problems if isinstance(p, dict)],
+        "problem_type": guide.get("problem_type"),
+        "trending_source": guide.get("trending_source"),
+        "generated_date": guide.get("generated_date"),
+        "keywords": len(keywords) if isinstance(keywords, list) else 0,
+        "faqs": len(faqs) if isinstance(faqs, list) else 0,
+        "auto_generated": guide.get("auto_generated") is True,
+        "valid": valid,
+        "hash": content_hash(data),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+_SLUG, _BRAND = FIELDS.index("slug"), FIELDS.index("brand")
+_MTIME, _SIZE = FIELDS.index("mtime"), FIELDS.index("size")
+
+class CorpusIndex:
+    """
+    内存中的索引：slug -> 行（按 FIELDS 顺序的列表）
+    行只在需要时才转换为 dict，统计数量和列出 slug 不必为每篇指南构建 dict
+    """
+
+    def __init__(self, rows=None):
+        self.rows = rows or {}
+        self._brands = None
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH):
+        """读取 manifest；文件不存在或版本不符时返回空索引"""
+        # 解析时会创建大量小对象，暂停 GC 避免反复触发分代回收
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("fields") != list(FIELDS):
+            return cls()
+        return cls({row[_SLUG]: row for row in manifest["rows"]})
+
+    def save(self, path=MANIFEST_PATH):
+        """原子写入：先写临时文件再替换，读者不会看到写了一半的 manifest"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 按进程区分临时文件：并发保存时不会互相替换掉对方的临时文件
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "fields": FIELDS, "rows": list(self.rows.values())}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    # ---------- 查询 ----------
+
+    def count(self):
+        return len(self.rows)
+
+    def slugs(self):
+        return sorted(self.rows)
+
+    def get(self, slug):
+        row = self.rows.get(slug)
+        return dict(zip(FIELDS, row)) if row is not None else None
+
+    def __contains__(self, slug):
+        return slug in self.rows
+
+    def entries(self):
+        for row in self.rows.values():
+            yield dict(zip(FIELDS, row))
+
+    def by_brand(self, brand):
+        """某个品牌的指南（不区分大小写）"""
+        if self._brands is None:
+            self._brands = {}
+            for row in self.rows.values():
+                self._brands.setdefault((row[_BRAND] or "").lower(), []).append(row)
+        return [dict(zip(FIELDS, row)) for row in self._brands.get(brand.lower(), [])]
+
+    def brand_counts(self):
+        return Counter(row[_BRAND] for row in self.rows.values())
+
+    # ---------- 增量更新 ----------
+
+    def update(self, data_dir=DATA_DIR):
+        """
+        与 data_dir 同步，只重新解析新增或修改过的文件
+        返回 {"added", "updated", "removed", "unchanged"}
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        seen = set()
+
+        with os.scandir(data_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(".json") or name in EXCLUDED_FILES or not entry.is_file():
+                    continue
+                slug = name[:-5]
+                seen.add(slug)
+
+                stat = entry.stat()
+                old = self.rows.get(slug)
+                if old and old[_MTIME] == stat.st_mtime_ns and old[_SIZE] == stat.st_size:
+                    stats["unchanged"] += 1
+                    continue
+
+                with open(entry.path, 'rb') as f:
+                    data = f.read()
+                summary = summarize_guide(slug, data, stat)
+                self.rows[slug] = [summary[field] for field in FIELDS]
+                stats["updated" if old else "added"] += 1
+
+        if len(seen) != len(self.rows):
+            for slug in [slug for slug in self.rows if slug not in seen]:
+                del self.rows[slug]
+                stats["removed"] += 1
+
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            self._brands = None
+        return stats
+
+def cache_dir_for(data_dir):
+    """数据目录对应的缓存目录（与 data/ 同级的 .cache/）"""
+    return Path(data_dir).parent / ".cache"
+
+def update_index(data_dir=DATA_DIR, manifest_path=None, full=False):
+    """加载 manifest，增量同步 data_dir，有变化时写回；返回 (索引, 统计)；full 时忽略已有 manifest 全部重新解析"""
+    if manifest_path is None:
+        manifest_path = cache_dir_for(data_dir) / MANIFEST_NAME
+    index = CorpusIndex() if full else CorpusIndex.load(manifest_path)
+    stats = index.update(data_dir)
+    if stats["added"] or stats["updated"] or stats["removed"] or not Path(manifest_path).exists():
+        index.save(manifest_path)
+    return index, stats
+
+# ============================================
+# 主函数
+# ============================================
+
+def main():
+    args = sys.argv[1:] or ["update"]
+    command = args[0]
+
+    index, stats = update_index()
+
+    if command == "update":
+        print(f"✅ 索引已更新: {index.count()} 篇指南 "
+              f"(新增 {stats['added']}, 修改 {stats['updated']}, "
+              f"删除 {stats['removed']}, 未变 {stats['unchanged']})")
+    elif command == "count":
+        print(index.count())
+    elif command == "slugs":
+        print("\n".join(index.slugs()))
+    elif command == "brand" and len(args) > 1:
+        for entry in sorted(index.by_brand(args[1]), key=lambda e: e["slug"]):
+            print(f"{entry['slug']}\t{entry['model']}\t{entry['problem_type'] or '-'}")
+    elif command == "brands":
+        for brand, count in index.brand_counts().most_common():
+            print(f"{brand}\t{count}")
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
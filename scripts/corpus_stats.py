@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+语料统计
+根据语料索引（corpus_index）的摘要行计算运行报告和监控需要的指标：各品牌 / problem_type /
+trending_source 的指南数、SEO 关键词数、FAQ 覆盖率、AI 生成数、按日期的生成数、最近修改的文件。
+
+  - 不再单独扫描目录：corpus_index.update_index() 只重新解析 mtime / 文件大小变化的文件，
+    这里只汇总它的行
+  - 结果写入 .cache/corpus-stats.json 和 Prometheus textfile（.cache/corpus-stats.prom，
+    CORPUS_STATS_PROM 可以指向 node_exporter 的 textfile 目录）
+  - seo-monitor.sh 和 Telegram 通知读取这份结果，不再自己扫描目录
+
+用法:
+    python scripts/corpus_stats.py update [--full]     # 增量更新并写出结果
+    python scripts/corpus_stats.py report              # 读取已有结果（不存在时先计算），输出 TSV
+    python scripts/corpus_stats.py get faqs.coverage   # 读取单个指标
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+
+import corpus_index
+import guide_store
+from corpus_index import DATA_DIR, FIELDS, cache_dir_for
+
+STATS_NAME = "corpus-stats.json"
+PROM_NAME = "corpus-stats.prom"
+
+# 汇总用到的索引列
+_columns = itemgetter(*(FIELDS.index(field) for field in (
+    "valid", "brand", "problem_type", "trending_source", "keywords", "problem_ids",
+    "faqs", "auto_generated", "generated_date")))
+_SLUG, _MTIME = FIELDS.index("slug"), FIELDS.index("mtime")
+
+LATEST_COUNT = 5
+METRIC_PREFIX = "vacuum"
+
+def stats_paths(data_dir=DATA_DIR):
+    cache_dir = cache_dir_for(data_dir)
+    prom_path = os.getenv("CORPUS_STATS_PROM") or cache_dir / PROM_NAME
+    return cache_dir / STATS_NAME, Path(prom_path)
+
+def _atomic_write(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 按进程区分临时文件：并发更新时不会互相替换掉对方的临时文件
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# ============================================
+# 汇总与输出
+# ============================================
+
+def _label(value):
+    return value if isinstance(value, str) and value else "unknown"
+
+def aggregate(rows):
+    """语料索引的行（corpus_index.CorpusIndex.rows）→ 统计结果 dict（可以直接写成 JSON）"""
+    by_brand, by_problem_type, by_source = Counter(), Counter(), Counter()
+    brand_keywords, brand_faqs, by_date = Counter(), Counter(), Counter()
+    keywords = problems = faqs = covered = auto_generated = invalid = 0
+    no_keywords = 0
+    for row in rows.values():
+        (valid, brand, problem_type, source, kw_count, problem_ids,
+         faq_count, auto, date) = _columns(row)
+        if not valid:
+            invalid += 1
+            continue
+        brand = _label(brand)
+        by_brand[brand] += 1
+        by_problem_type[_label(problem_type)] += 1
+        by_source[_label(source)] += 1
+        keywords += kw_count
+        brand_keywords[brand] += kw_count
+        no_keywords += kw_count == 0
+        problems += len(problem_ids)
+        faqs += faq_count
+        if faq_count:
+            covered += 1
+            brand_faqs[brand] += 1
+        auto_generated += auto
+        if isinstance(date, str) and date:
+            by_date[date[:10]] += 1
+
+    guides = sum(by_brand.values())
+    latest = heapq.nlargest(LATEST_COUNT, rows.values(), key=itemgetter(_MTIME))
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "guides": guides,
+        "invalid_files": invalid,
+        "auto_generated": auto_generated,
+        "problems": problems,
+        "by_brand": dict(by_brand.most_common()),
+        "by_problem_type": dict(by_problem_type.most_common()),
+        "by_trending_source": dict(by_source.most_common()),
+        "by_generated_date": dict(sorted(by_date.items())),
+        "keywords": {
+            "total": keywords,
+            "average": round(keywords / guides, 2) if guides else 0.0,
+            "guides_without": no_keywords,
+            "by_brand": dict(brand_keywords.most_common()),
+        },
+        "faqs": {
+            "total": faqs,
+            "guides_with": covered,
+            "coverage": round(covered / guides, 4) if guides else 0.0,
+            "by_brand": {brand: round(brand_faqs[brand] / count, 4) for brand, count in by_brand.most_common()},
+        },
+        "latest": [f"{row[_SLUG]}.json" for row in latest],
+    }
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def to_prometheus(stats):
+    """Prometheus textfile 格式（node_exporter textfile collector）"""
+    lines = []
+
+    def metric(name, help_text, samples):
+        name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    metric("guides", "Repair guides in data/", [({}, stats["guides"])])
+    metric("guides_invalid", "Guide files that could not be parsed", [({}, stats["invalid_files"])])
+    metric("guides_auto_generated", "Guides marked auto_generated", [({}, stats["auto_generated"])])
+    metric("problems", "Problems across all guides", [({}, stats["problems"])])
+    metric("guides_by_brand", "Guides per brand",
+           [({"brand": brand}, count) for brand, count in stats["by_brand"].items()])
+    metric("guides_by_problem_type", "Guides per problem_type",
+           [({"problem_type": value}, count) for value, count in stats["by_problem_type"].items()])
+    metric("guides_by_trending_source", "Guides per trending_source",
+           [({"source": value}, count) for value, count in stats["by_trending_source"].items()])
+    metric("seo_keywords", "SEO keywords across all guides", [({}, stats["keywords"]["total"])])
+    metric("guides_without_seo_keywords", "Guides with no SEO keywords", [({}, stats["keywords"]["guides_without"])])
+    metric("faqs", "FAQ entries across all guides", [({}, stats["faqs"]["total"])])
+    metric("guides_with_faqs", "Guides with at least one FAQ", [({}, stats["faqs"]["guides_with"])])
+    metric("faq_coverage_ratio", "Share of guides with FAQs", [({}, stats["faqs"]["coverage"])])
+    metric("faq_coverage_ratio_by_brand", "Share of guides with FAQs per brand",
+           [({"brand": brand}, ratio) for brand, ratio in stats["faqs"]["by_brand"].items()])
+    metric("corpus_stats_timestamp_seconds", "When these statistics were computed",
+           [({}, int(datetime.fromisoformat(stats["generated_at"]).timestamp()))])
+    metric("corpus_stats_duration_seconds", "Time taken to compute these statistics",
+           [({}, stats.get("duration_seconds", 0))])
+    return "\n".join(lines) + "\n"
+
+def update_stats(data_dir=DATA_DIR, full=False):
+    """增量更新语料索引，计算并写出 JSON / Prometheus 结果；返回统计 dict"""
+    start = time.perf_counter()
+    json_path, prom_path = stats_paths(data_dir)
+    index, index_stats = corpus_index.update_index(data_dir, full=full)
+    sync = {"parsed": index_stats["added"] + index_stats["updated"],
+            "removed": index_stats["removed"], "unchanged": index_stats["unchanged"]}
+
+    # 没有文件变化时沿用上次的汇总结果，只刷新时间戳
+    stats = None if full or sync["parsed"] or sync["removed"] else load_stats(data_dir)
+    if stats is None:
+        stats = aggregate(index.rows)
+    stats["generated_at"] = datetime.now().isoformat(timespec="seconds")
+    stats["duration_seconds"] = round(time.perf_counter() - start, 3)
+    stats["sync"] = sync
+    _atomic_write(json_path, json.dumps(stats, ensure_ascii=False, indent=2).encode('utf-8'))
+    _atomic_write(prom_path, to_prometheus(stats).encode('utf-8'))
+    return stats
+
+def load_stats(data_dir=DATA_DIR):
+    """读取已写出的统计结果；不存在时返回 None"""
+    json_path = stats_paths(data_dir)[0]
+    try:
+        with open(json_path, 'rb') as f:
+            return guide_store.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+def get_stats(data_dir=DATA_DIR, refresh=False):
+    """已有结果；不存在或 refresh 时重新计算"""
+    stats = None if refresh else load_stats(data_dir)
+    return stats if stats is not None else update_stats(data_dir)
+
+def lookup(stats, key):
+    """按点分路径取值，例如 faqs.coverage、by_brand.Dyson"""
+    value = stats
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+def report_lines(stats):
+    """seo-monitor.sh 使用的 TSV：section<TAB>key<TAB>value"""
+    yield f"total\tguides\t{stats['guides']}"
+    yield f"total\tauto_generated\t{stats['auto_generated']}"
+    yield f"total\ttoday\t{stats['by_generated_date'].get(datetime.now().strftime('%Y-%m-%d'), 0)}"
+    yield f"total\tgenerated_at\t{stats['generated_at']}"
+    for brand, count in stats["by_brand"].items():
+        yield f"brand\t{brand}\t{count}"
+    for value, count in stats["by_problem_type"].items():
+        yield f"problem_type\t{value}\t{count}"
+    for value, count in stats["by_trending_source"].items():
+        yield f"trending_source\t{value}\t{count}"
+    yield f"keywords\ttotal\t{stats['keywords']['total']}"
+    yield f"keywords\taverage\t{stats['keywords']['average']}"
+    yield f"faqs\tguides_with\t{stats['faqs']['guides_with']}"
+    yield f"faqs\tcoverage\t{stats['faqs']['coverage'] * 100:.1f}%"
+    for name in stats["latest"]:
+        yield f"latest\t{name}\t"
+
+# ============================================
+# 主函数
+# ============================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="语料统计")
+    parser.add_argument("command", nargs="?", default="update", choices=["update", "report", "get", "json"])
+    parser.add_argument("key", nargs="?", help="get 的点分路径，例如 faqs.coverage")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--full", action="store_true", help="忽略语料索引，重新解析所有文件")
+    parser.add_argument("--refresh", action="store_true", help="report/get/json 前先增量更新")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    data_dir = Path(args.data_dir)
+
+    if args.command == "update":
+        stats = update_stats(data_dir, args.full)
+        sync = stats["sync"]
+        print(f"✅ 统计已更新: {stats['guides']} 篇指南，FAQ 覆盖率 {stats['faqs']['coverage']:.1%}，"
+              f"关键词 {stats['keywords']['total']} 个 "
+              f"(解析 {sync['parsed']}, 删除 {sync['removed']}, 未变 {sync['unchanged']}, "
+              f"{stats['duration_seconds']:.2f}s)")
+        return 0
+
+    stats = get_stats(data_dir, args.refresh)
+    if args.command == "report":
+        print("\n".join(report_lines(stats)))
+    elif args.command == "json":
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    else:
+        value = lookup(stats, args.key or "")
+        if value is None:
+            return 1
+        print(json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
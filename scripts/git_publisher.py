@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+定向 Git 发布
+只提交本次运行实际写入的文件，不再 `git add data/` / `git add .` 扫描整个工作区：
+
+  1. stage: 在临时索引中 read-tree HEAD，再用 update-index 加入明确的路径列表，write-tree
+  2. commit: commit-tree + update-ref（用户自己暂存的改动不会被带进提交）
+  3. push: 失败时指数退避重试；远端有新提交时先 pull --rebase 再推送
+
+GIT_PUBLISH_COALESCE=N 时本地累计 N 个未推送的提交才推送一次（多次运行合并为一次 push）
+
+本地测试（裸仓库作为远端）:
+    python scripts/bench_git_publisher.py
+"""
+
+import os
+import random
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_REMOTE = "origin"
+PUSH_RETRIES = 4
+PUSH_BACKOFF = 2.0         # 秒，第 n 次重试等待 backoff * 2^(n-1)（带随机抖动）
+
+class GitError(Exception):
+    pass
+
+class GitPublisher:
+    """
+    publish(paths, message) 返回:
+        {"committed": 提交 sha 或 None, "pushed": bool, "files": 文件数, "timings": {阶段: 秒}}
+    """
+
+    def __init__(self, repo_dir=PROJECT_ROOT, remote=DEFAULT_REMOTE, branch=None, coalesce=None,
+                 retries=PUSH_RETRIES, backoff=PUSH_BACKOFF, log=print):
+        self.repo_dir = Path(repo_dir).resolve()
+        self.remote = remote
+        self.branch = branch
+        if coalesce is None:
+            coalesce = int(os.environ.get("GIT_PUBLISH_COALESCE", "1"))
+        self.coalesce = max(1, coalesce)
+        self.retries = retries
+        self.backoff = backoff
+        self.log = log
+
+    def _git(self, *args, env=None, input=None, check=True):
+        result = subprocess.run(["git", *args], cwd=self.repo_dir, env=env, input=input,
+                                capture_output=True, text=True)
+        if check and result.returncode != 0:
+            raise GitError(f"git {' '.join(args)} 失败: {result.stderr.strip()}")
+        return result
+
+    def _current_branch(self):
+        if self.branch is None:
+            self.branch = self._git("symbolic-ref", "--short", "HEAD").stdout.strip()
+        return self.branch
+
+    def _head(self):
+        result = self._git("rev-parse", "--verify", "-q", "HEAD", check=False)
+        return result.stdout.strip() or None
+
+    # ---------- stage + commit ----------
+
+    def _relative_paths(self, paths):
+        rel_paths = []
+        for path in paths:
+            path = Path(path)
+            if not path.is_absolute():
+                path = self.repo_dir / path
+            rel_paths.append(os.path.relpath(path.resolve(), self.repo_dir))
+        return rel_paths
+
+    def stage(self, rel_paths, head):
+        """在临时索引中以 HEAD 为基础加入 rel_paths，返回 tree sha"""
+        fd, index_path = tempfile.mkstemp(prefix="publish-index-", dir=self._git_dir())
+        os.close(fd)
+        os.unlink(index_path)
+        env = dict(os.environ, GIT_INDEX_FILE=index_path)
+        try:
+            if head:
+                self._git("read-tree", head, env=env)
+            self._git("update-index", "--add", "--remove", "-z", "--stdin",
+                      env=env, input="\0".join(rel_paths) + "\0")
+            return self._git("write-tree", env=env).stdout.strip()
+        finally:
+            if os.path.exists(index_path):
+                os.unlink(index_path)
+
+    def commit_tree(self, tree, head, message, rel_paths):
+        """tree 与 HEAD 相同时返回 None，否则创建提交并更新分支"""
+        if head and tree == self._git("rev-parse", f"{head}^{{tree}}").stdout.strip():
+            return None
+
+        parents = ["-p", head] if head else []
+        sha = self._git("commit-tree", tree, *parents, "-m", message).stdout.strip()
+        # 以旧值为条件更新分支，防止期间有其他提交被覆盖
+        self._git("update-ref", "-m", f"publish: {message}", "HEAD", sha, head or "")
+        # 让真实索引中这些路径与新提交一致，git status 不会再显示为改动
+        self._git("update-index", "--add", "--remove", "-z", "--stdin",
+                  input="\0".join(rel_paths) + "\0", check=False)
+        return sha
+
+    def commit(self, paths, message):
+        """只提交 paths 中的文件（新增、修改或删除），没有变化时返回 None"""
+        rel_paths = self._relative_paths(paths)
+        if not rel_paths:
+            return None
+        head = self._head()
+        return self.commit_tree(self.stage(rel_paths, head), head, message, rel_paths)
+
+    def _git_dir(self):
+        git_dir = Path(self._git("rev-parse", "--git-dir").stdout.strip())
+        return str(git_dir if git_dir.is_absolute() else self.repo_dir / git_dir)
+
+    # ---------- push ----------
+
+    def unpushed_count(self):
+        branch = self._current_branch()
+        upstream = f"refs/remotes/{self.remote}/{branch}"
+        if self._git("rev-parse", "--verify", "-q", upstream, check=False).returncode != 0:
+            return int(self._git("rev-list", "--count", "HEAD").stdout.strip())
+        return int(self._git("rev-list", "--count", f"{upstream}..HEAD").stdout.strip())
+
+    def push(self, force=False):
+        """
+        推送当前分支；未推送的提交少于 coalesce 个时跳过（force=True 强制推送）
+        返回是否推送成功（跳过时返回 False）
+        """
+        pending = self.unpushed_count()
+        if pending == 0:
+            return False
+        if pending < self.coalesce and not force:
+            self.log(f"⏸️  本地累计 {pending}/{self.coalesce} 个提交，暂不推送")
+            return False
+
+        branch = self._current_branch()
+        for attempt in range(1, self.retries + 2):
+            result = self._git("push", self.remote, f"HEAD:refs/heads/{branch}", check=False)
+            if result.returncode == 0:
+                return True
+
+            error = result.stderr.strip()
+            if attempt > self.retries:
+                raise GitError(f"推送失败（已重试 {self.retries} 次）: {error}")
+
+            if "non-fast-forward" in error or "fetch first" in error or "rejected" in error:
+                # 远端有新提交：本次提交只包含新写入的文件，rebase 一般不会冲突
+                rebase = self._git("pull", "--rebase", "--autostash", "--quiet",
+                                   self.remote, branch, check=False)
+                if rebase.returncode != 0:
+                    self._git("rebase", "--abort", check=False)
+                    raise GitError(f"rebase 失败: {rebase.stderr.strip()}")
+
+            delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            self.log(f"⚠️  推送失败，{delay:.1f}s 后重试 ({attempt}/{self.retries}): {error.splitlines()[-1] if error else ''}")
+            time.sleep(delay)
+
+    # ---------- 发布 ----------
+
+    def publish(self, paths, message, push=True):
+        rel_paths = self._relative_paths(paths)
+        timings = {}
+        sha = None
+
+        if rel_paths:
+            started = time.perf_counter()
+            head = self._head()
+            tree = self.stage(rel_paths, head)
+            timings["stage"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            sha = self.commit_tree(tree, head, message, rel_paths)
+            timings["commit"] = time.perf_counter() - started
+
+        pushed = False
+        if push:
+            started = time.perf_counter()
+            pushed = self.push()
+            timings["push"] = time.perf_counter() - started
+
+        return {"committed": sha, "pushed": pushed, "files": len(rel_paths), "timings": timings}
+
+def format_timings(timings):
+    return ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in timings.items())
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+维修指南结构校验（lib/vacuum-data.ts 的 VacuumManual）
+四个生成脚本产出的结构不完全一致，坏文件原来要到 Next 构建时才暴露。这里：
+
+  - VACUUM_MANUAL 用 JSON Schema 的一个子集描述结构（type / required / properties / items /
+    minLength / minItems / pattern），另加几个扩展：x-warn-required（缺少时只警告）、
+    x-warn-pattern（不匹配时警告）、x-renamed（旧字段名）、x-unique（数组元素的某个字段不能重复）
+  - compile_schema() 把结构定义编译成嵌套的校验函数，每个进程只编译一次；
+    合法文档不产生任何中间对象，只在出错时拼接路径
+  - error: 页面渲染会出错的问题（缺少 solution_steps、required_parts 为字符串、problem id 重复等）
+    warning: 接口声明了但页面能容忍的问题（缺少 image_url、model 中带问题描述等）
+  - validate(guide) 供生成脚本保存前调用；命令行并行校验整个 data/，逐文件报告
+
+用法:
+    python scripts/guide_schema.py                    # 校验 data/，有 error 时退出码为 1
+    python scripts/guide_schema.py data --warnings    # 同时列出 warning
+    python scripts/guide_schema.py --json             # 每个有问题的文件输出一行 JSON
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import guide_store
+from corpus_index import DATA_DIR, EXCLUDED_FILES
+
+# 保存前校验失败时: skip（不写入）、warn（只记录）或 off
+DEFAULT_POLICY = os.getenv("GUIDE_SCHEMA", "skip").lower()
+
+CHUNK_SIZE = 512
+QUEUE_DEPTH = 4
+POOL_THRESHOLD = 2000       # 文件少于该数时在当前进程中校验
+
+ERROR, WARNING = "error", "warning"
+
+# ============================================
+# 结构定义（与 lib/vacuum-data.ts 保持一致）
+# ============================================
+
+NON_EMPTY_STRING = {"type": "string", "minLength": 1}
+STRING_LIST = {"type": "array", "items": {"type": "string"}}
+SLUG_PATTERN = r"^[a-z0-9]+(?:-[a-z0-9]+)*$"
+
+VACUUM_PART = {
+    "type": "object",
+    "required": ["name", "search_query"],
+    "properties": {
+        "name": NON_EMPTY_STRING,
+        "search_query": NON_EMPTY_STRING,
+    },
+}
+
+PROBLEM = {
+    "type": "object",
+    "required": ["id", "title", "description", "possible_causes", "solution_steps", "required_parts"],
+    "x-renamed": {"steps": "solution_steps"},
+    "properties": {
+        # id 是页面路由 /guide/[model]/[problem] 的一段
+        "id": {"type": "string", "minLength": 1,
+               "x-warn-pattern": [SLUG_PATTERN, "不是 URL slug 格式（小写字母、数字和 -）"]},
+        "title": NON_EMPTY_STRING,
+        "description": {"type": "string"},
+        "possible_causes": STRING_LIST,
+        "solution_steps": {"type": "array", "minItems": 1, "items": {"type": "string"}},
+        "required_parts": {"type": "array", "items": VACUUM_PART},
+    },
+}
+
+FAQ = {
+    "type": "object",
+    "required": ["question", "answer"],
+    "properties": {
+        "question": NON_EMPTY_STRING,
+        "answer": NON_EMPTY_STRING,
+    },
+}
+
+VACUUM_MANUAL = {
+    "type": "object",
+    "required": ["brand", "model", "problems"],
+    # 接口声明为必填，但页面缺少时仍能渲染
+    "x-warn-required": ["image_url", "manual_pdf", "seo_keywords"],
+    "properties": {
+        "brand": NON_EMPTY_STRING,
+        "model": {"type": "string", "minLength": 1,
+                  "x-warn-pattern": [r"^(?!.*\s-\s)", "包含问题描述（\"X - Problem\"），不是单纯的型号"]},
+        "image_url": {"type": "string"},
+        "manual_pdf": {"type": "string"},
+        "seo_keywords": STRING_LIST,
+        "problems": {"type": "array", "minItems": 1, "items": PROBLEM, "x-unique": "id"},
+        "faqs": {"type": "array", "items": FAQ},
+    },
+}
+
+# ============================================
+# 编译
+# ============================================
+
+TYPES = {"string": str, "array": list, "object": dict, "boolean": bool}
+TYPE_NAMES = {str: "string", list: "array", dict: "object", bool: "boolean", int: "integer",
+              float: "number", type(None): "null"}
+
+_MISSING = object()
+
+def _type_error(kind, value, path=""):
+    actual = TYPE_NAMES.get(type(value), type(value).__name__)
+    return (ERROR, path, f"应为 {kind}，实际为 {actual}")
+
+def _compile(schema):
+    """
+    返回 (期望的 Python 类型, 内容校验函数或 None)
+    类型由上一层直接 isinstance 检查，没有其他约束的字段不需要再调用任何函数
+    """
+    kind = schema["type"]
+    checks = []
+
+    if kind == "string":
+        min_length = schema.get("minLength")
+        if min_length:
+            def check_length(value):
+                if len(value.strip()) < min_length:
+                    return [(ERROR, "", "不能为空")]
+            checks.append(check_length)
+        if "pattern" in schema:
+            pattern = re.compile(schema["pattern"])
+            def check_pattern(value):
+                if not pattern.search(value):
+                    return [(ERROR, "", f"不匹配 {pattern.pattern}")]
+            checks.append(check_pattern)
+        if "x-warn-pattern" in schema:
+            warn_pattern, message = re.compile(schema["x-warn-pattern"][0]), schema["x-warn-pattern"][1]
+            def check_warn_pattern(value):
+                if not warn_pattern.search(value):
+                    return [(WARNING, "", f"{message}: {value!r}")]
+            checks.append(check_warn_pattern)
+
+    elif kind == "array":
+        min_items = schema.get("minItems")
+        if min_items:
+            def check_min_items(value):
+                if len(value) < min_items:
+                    return [(ERROR, "", f"至少需要 {min_items} 项")]
+            checks.append(check_min_items)
+        if "items" in schema:
+            item_kind = schema["items"]["type"]
+            item_type, item_content = _compile(schema["items"])
+            if item_content is None:
+                # 只约束类型（例如字符串数组）：先整体扫一遍，出错时才逐项定位
+                def check_items(value):
+                    for item in value:
+                        if not isinstance(item, item_type):
+                            break
+                    else:
+                        return None
+                    return [_type_error(item_kind, item, f"[{i}]")
+                            for i, item in enumerate(value) if not isinstance(item, item_type)]
+            else:
+                def check_items(value):
+                    issues = None
+                    for i, item in enumerate(value):
+                        if not isinstance(item, item_type):
+                            found = [_type_error(item_kind, item)]
+                        else:
+                            found = item_content(item)
+                            if not found:
+                                continue
+                        issues = issues or []
+                        issues.extend((level, f"[{i}]{path}", message) for level, path, message in found)
+                    return issues
+            checks.append(check_items)
+        if "x-unique" in schema:
+            field = schema["x-unique"]
+            def check_unique(value):
+                keys = [repr(item.get(field)) for item in value if isinstance(item, dict)]
+                if len(set(keys)) == len(keys):
+                    return None
+                duplicates = [key for key, count in Counter(keys).items() if count > 1]
+                return [(ERROR, "", f"{field} 重复: {', '.join(duplicates)}")]
+            checks.append(check_unique)
+
+    elif kind == "object":
+        properties = [(key, sub["type"], *_compile(sub)) for key, sub in schema.get("properties", {}).items()]
+        required = tuple(schema.get("required", ()))
+        warn_required = tuple(schema.get("x-warn-required", ()))
+        required_set, warn_required_set = frozenset(required), frozenset(warn_required)
+        renamed = schema.get("x-renamed", {})
+
+        def check_object(value):
+            issues = None
+            keys = value.keys()
+            if not required_set <= keys:
+                issues = []
+                for key in required:
+                    if key not in value:
+                        old = next((old for old, new in renamed.items() if new == key and old in value), None)
+                        hint = f"（使用了旧字段名 {old}）" if old else ""
+                        issues.append((ERROR, f".{key}", f"缺少必填字段{hint}"))
+            if not warn_required_set <= keys:
+                issues = issues or []
+                issues.extend((WARNING, f".{key}", "缺少字段（VacuumManual 声明为必填）")
+                              for key in warn_required if key not in value)
+            for key, sub_kind, sub_type, sub_content in properties:
+                item = value.get(key, _MISSING)
+                if item is _MISSING:
+                    continue
+                if not isinstance(item, sub_type):
+                    found = [_type_error(sub_kind, item)]
+                elif sub_content is None:
+                    continue
+                else:
+                    found = sub_content(item)
+                    if not found:
+                        continue
+                issues = issues or []
+                issues.extend((level, f".{key}{path}", message) for level, path, message in found)
+            return issues
+        checks.append(check_object)
+
+    if not checks:
+        return TYPES[kind], None
+    if len(checks) == 1:
+        return TYPES[kind], checks[0]
+
+    def check_all(value):
+        issues = None
+        for check in checks:
+            found = check(value)
+            if found:
+                issues = issues or []
+                issues.extend(found)
+        return issues
+    return TYPES[kind], check_all
+
+def compile_schema(schema):
+    """
+    结构定义 → 校验函数 check(value)
+    check 返回 None（没有问题）或 [(级别, 相对路径, 说明)]；相对路径以 "." 或 "[" 开头
+    """
+    kind = schema["type"]
+    expected, content = _compile(schema)
+
+    def check(value):
+        if not isinstance(value, expected):
+            return [_type_error(kind, value)]
+        return content(value) if content else None
+    return check
+
+_validator = None
+
+def get_validator():
+    """编译好的 VacuumManual 校验函数（每个进程编译一次）"""
+    global _validator
+    if _validator is None:
+        _validator = compile_schema(VACUUM_MANUAL)
+    return _validator
+
+def validate(guide):
+    """
+    校验一篇指南，返回 [(级别, 路径, 说明)]，没有问题时为空列表
+    路径形如 problems[0].required_parts[1].name
+    """
+    found = get_validator()(guide)
+    if not found:
+        return []
+    return [(level, path.lstrip("."), message) for level, path, message in found]
+
+def errors_only(issues):
+    return [issue for issue in issues if issue[0] == ERROR]
+
+def describe_issues(issues, limit=3):
+    text = "; ".join(f"{path or '(root)'}: {message}" for _, path, message in issues[:limit])
+    return text + (f" …(共 {len(issues)} 项)" if len(issues) > limit else "")
+
+def check_guide(guide, policy=None):
+    """
+    生成脚本保存前调用：返回 (是否保存, 问题列表)
+    policy: skip（有 error 时不保存）、warn（只返回问题）或 off（不校验），默认 GUIDE_SCHEMA
+    """
+    policy = policy or DEFAULT_POLICY
+    if policy == "off":
+        return True, []
+    issues = validate(guide)
+    keep = policy != "skip" or not errors_only(issues)
+    return keep, issues
+
+# ============================================
+# 整个目录
+# ============================================
+
+def validate_file(path):
+    try:
+        with open(path, 'rb') as f:
+            guide = guide_store.loads(f.read())
+    except OSError as e:
+        return [(ERROR, "", f"无法读取: {e}")]
+    except ValueError as e:
+        return [(ERROR, "", f"JSON 解析失败: {e}")]
+    return validate(guide)
+
+def validate_chunk(data_dir, names):
+    """返回 (校验的文件数, [(文件名, 问题列表)])，只包含有问题的文件（在 worker 进程中执行）"""
+    data_dir = Path(data_dir)
+    results = []
+    for name in names:
+        issues = validate_file(data_dir / name)
+        if issues:
+            results.append((name, issues))
+    return len(names), results
+
+def run_chunks(data_dir, chunks, workers):
+    """依次产出各块结果，同时在途的块不超过 workers * QUEUE_DEPTH"""
+    if workers <= 1:
+        for names in chunks:
+            yield validate_chunk(data_dir, names)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for names in chunks:
+            pending.append(executor.submit(validate_chunk, str(data_dir), names))
+            if len(pending) >= workers * QUEUE_DEPTH:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def validate_corpus(data_dir=DATA_DIR, workers=None):
+    """
+    并行校验 data_dir 下所有指南
+    返回 (校验的文件数, {文件名: 问题列表})
+    """
+    names = sorted(name for name in os.listdir(data_dir)
+                   if name.endswith(".json") and name not in EXCLUDED_FILES)
+    workers = workers or os.cpu_count() or 1
+    if len(names) < POOL_THRESHOLD:
+        workers = 1
+    chunks = [names[i:i + CHUNK_SIZE] for i in range(0, len(names), CHUNK_SIZE)]
+    checked, problems = 0, {}
+    for count, results in run_chunks(data_dir, chunks, workers):
+        checked += count
+        problems.update(results)
+    return checked, problems
+
+# ============================================
+# 主函数
+# ============================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="维修指南结构校验（VacuumManual）")
+    parser.add_argument("data_dir", nargs="?", default=str(DATA_DIR))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--warnings", action="store_true", help="同时列出 warning")
+    parser.add_argument("--json", action="store_true", help="每个有问题的文件输出一行 JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    checked, problems = validate_corpus(Path(args.data_dir), args.workers)
+    elapsed = time.perf_counter() - start
+
+    error_files = warning_files = 0
+    messages = Counter()
+    for name in sorted(problems):
+        issues = problems[name]
+        errors = errors_only(issues)
+        error_files += bool(errors)
+        warning_files += len(errors) < len(issues)
+        for level, _, message in issues:
+            messages[(level, message.split(":")[0])] += 1
+        shown = issues if args.warnings else errors
+        if not shown:
+            continue
+        if args.json:
+            print(json.dumps({"file": name, "issues": [{"level": level, "path": path, "message": message}
+                                                       for level, path, message in shown]}, ensure_ascii=False))
+            continue
+        print(f"❌ {name}" if errors else f"⚠️  {name}")
+        for level, path, message in shown:
+            print(f"    {'error  ' if level == ERROR else 'warning'} {path or '(root)'}: {message}")
+
+    if not args.json:
+        print(f"\n📄 校验 {checked} 个文件: {error_files} 个有 error，{warning_files} 个有 warning "
+              f"({elapsed:.2f}s，{checked / elapsed if elapsed else 0:,.0f} 个/s)")
+        for (level, message), count in messages.most_common(10):
+            print(f"    {count:6d} × {level}: {message}")
+    return 1 if error_files else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+指南 JSON 的统一读写层
+生成脚本、retro_fill_faqs.py、process_manual.py 都通过这里读写 data/*.json：
+
+  - 原子写入：先写同目录下的临时文件并 fsync，再 os.replace 到目标路径，
+    写到一半崩溃也不会留下截断的 JSON（否则 Next 构建会失败）
+  - 内容不变时跳过写入：序列化结果与现有文件字节相同则不动文件（mtime 不变，增量索引也不会重新解析）
+  - 批量写入：write_guides() 写完所有文件后只对目录 fsync 一次
+  - 序列化后端：安装了 orjson 时使用 orjson，否则使用标准库 json（GUIDE_JSON_BACKEND=json 可强制使用标准库）
+
+输出格式默认与原来的 json.dump(indent=2, ensure_ascii=False) 一致；
+GUIDE_JSON_COMPACT=1 时输出紧凑格式（体积更小，但会改写所有被保存的文件）
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from corpus_index import EXCLUDED_FILES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if os.environ.get("GUIDE_JSON_BACKEND", "").lower() == "json":
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+# mkstemp 创建的文件权限是 0600，替换后应与普通 open() 创建的文件一致
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+COMPACT = os.environ.get("GUIDE_JSON_COMPACT", "").lower() in ("1", "true", "yes")
+
+# ============================================
+# 序列化
+# ============================================
+
+def dumps(data, compact=None):
+    """序列化为 UTF-8 字节"""
+    compact = COMPACT if compact is None else compact
+    if orjson:
+        return orjson.dumps(data) if compact else orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+def loads(data):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def load_guide(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def iter_guide_paths(data_dir):
+    """data_dir 下所有维修指南文件（排除聚合文件）"""
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.name not in EXCLUDED_FILES and entry.is_file():
+                yield Path(entry.path)
+
+def iter_guides(data_dir):
+    """依次产出 (路径, 指南)"""
+    for path in iter_guide_paths(data_dir):
+        yield path, load_guide(path)
+
+# ============================================
+# 原子写入
+# ============================================
+
+def _unchanged(path, payload):
+    try:
+        if os.path.getsize(path) != len(payload):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == payload
+    except FileNotFoundError:
+        return False
+
+def _write_temp(path, payload):
+    """在目标目录写入临时文件并 fsync，返回临时文件路径"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), 0o666 & ~_UMASK)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+def _commit(tmp_path, path, exclusive):
+    """
+    把临时文件移动到目标路径
+    exclusive=True 时用 os.link 创建（目标已存在则抛出 FileExistsError，与 open(..., 'x') 一致）
+    """
+    try:
+        if exclusive:
+            os.link(tmp_path, path)
+            os.unlink(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def fsync_dir(directory):
+    """让目录项（新建 / 重命名）也落盘"""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_guide(path, data, exclusive=False):
+    """
+    原子写入单个指南
+    返回 True 表示写入了文件，False 表示内容未变而跳过
+    exclusive=True 用于新生成的指南：目标已存在时抛出 FileExistsError
+    """
+    return write_guides([(path, data)], exclusive=exclusive) == 1
+
+def write_guides(items, exclusive=False):
+    """
+    批量原子写入 [(路径, 指南)]，所有文件替换完成后每个目录只 fsync 一次
+    返回实际写入的文件数
+    """
+    written = 0
+    directories = set()
+    try:
+        for path, data in items:
+            path = Path(path)
+            payload = dumps(data)
+            if not exclusive and _unchanged(path, payload):
+                continue
+            _commit(_write_temp(path, payload), path, exclusive)
+            directories.add(path.parent)
+            written += 1
+    finally:
+        # 中途出错时，已经替换的文件也要落盘
+        for directory in directories:
+            fsync_dir(directory)
+    return written
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+SEO 关键词倒排索引（关键词互食检测）
+每篇指南的 seo_keywords 有 10-20 个，其中 "{model} repair"、"{model} manual" 这类通用词
+很容易被多篇指南同时使用，导致站内页面互相争抢同一个搜索词。这里维护：
+
+  归一化关键词 -> 使用它的指南 slug 列表
+
+  - 增量构建：跟随语料索引（corpus_index）同步，只重新读取内容 hash 变化的文件，
+    结果缓存在 .cache/keyword-index.json
+  - 查询是内存中的 dict 查找，每个关键词 O(1)，10 万篇指南时生成阶段的检查也不会变慢
+  - 生成时 resolve() 去掉（或改写为带问题描述的长尾词）已被其他指南使用的关键词
+  - report 列出被最多指南共用的关键词和重叠最多的指南对
+
+KEYWORD_COLLISIONS 环境变量控制生成时的处理方式：
+    reassign（默认）  冲突的关键词在型号后插入问题描述改写为长尾词，改写后仍冲突则去掉
+    drop              直接去掉冲突的关键词
+    off               不检查
+
+用法:
+    python scripts/keyword_index.py update             # 增量更新索引
+    python scripts/keyword_index.py owners "dyson v8 repair"
+    python scripts/keyword_index.py report 20          # 共用最多的关键词 / 重叠最多的指南对
+"""
+
+import json
+import os
+import re
+import sys
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+
+import corpus_index
+import guide_store
+
+INDEX_NAME = "keyword-index.json"
+INDEX_VERSION = 1
+
+POLICIES = ("reassign", "drop", "off")
+DEFAULT_POLICY = os.environ.get("KEYWORD_COLLISIONS", "reassign").lower()
+
+# 统计指南对重叠时跳过被太多指南共用的关键词（两两组合数是平方级的，这类词在关键词报告里已经列出）
+PAIR_OWNER_LIMIT = 200
+
+_SEPARATORS = re.compile(r"[^\w+']+")
+
+def normalize_keyword(keyword):
+    """小写，弯撇号统一为直撇号，标点和连续空白合并为一个空格（保留 "+" 以区分 j7 / j7+）"""
+    text = str(keyword).lower().replace("’", "'")
+    return " ".join(_SEPARATORS.sub(" ", text).split())
+
+def guide_keywords(guide):
+    """指南中的归一化关键词（去重，保持顺序）"""
+    keywords = guide.get("seo_keywords") if isinstance(guide, dict) else None
+    if not isinstance(keywords, list):
+        return []
+    return list(dict.fromkeys(key for key in map(normalize_keyword, keywords) if key))
+
+def qualify(keyword, model, qualifier):
+    """
+    在关键词中的型号名之后插入限定词（问题描述），例如
+    "Dyson V8 repair" + "battery dying" -> "Dyson V8 battery dying repair"
+    关键词不含型号名或已经包含限定词时返回 None
+    """
+    if not model or not qualifier:
+        return None
+    lower = keyword.lower()
+    if qualifier.lower() in lower:
+        return None
+    pos = lower.find(model.lower())
+    if pos < 0:
+        return None
+    end = pos + len(model)
+    return f"{keyword[:end]} {qualifier}{keyword[end:]}"
+
+class KeywordIndex:
+    """
+    rows: slug -> [内容 hash, [归一化关键词]]（持久化的部分）
+    owners: 归一化关键词 -> {slug: None}（加载时由 rows 构建；dict 保持登记顺序，增删都是 O(1)）
+    """
+
+    def __init__(self, rows=None):
+        self.rows = rows or {}
+        self._owners = {}
+        for slug, (_, keywords) in self.rows.items():
+            self._link(slug, keywords)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'rb') as f:
+                data = guide_store.loads(f.read())
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != INDEX_VERSION:
+            return cls()
+        return cls(data["rows"])
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 按进程区分临时文件：并发保存时不会互相替换掉对方的临时文件
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "rows": self.rows}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _link(self, slug, keywords):
+        for key in keywords:
+            owners = self._owners.get(key)
+            if owners is None:
+                self._owners[key] = {slug: None}
+            else:
+                owners[slug] = None
+
+    def _unlink(self, slug):
+        row = self.rows.pop(slug, None)
+        if row is None:
+            return
+        for key in row[1]:
+            owners = self._owners.get(key)
+            if owners and slug in owners:
+                del owners[slug]
+                if not owners:
+                    del self._owners[key]
+
+    # ---------- 更新 ----------
+
+    def add(self, slug, keywords, content_hash=None):
+        """登记（或替换）一篇指南的关键词，例如刚生成、尚未出现在语料索引中的指南"""
+        self._unlink(slug)
+        keys = list(dict.fromkeys(key for key in map(normalize_keyword, keywords) if key))
+        self.rows[slug] = [content_hash, keys]
+        self._link(slug, keys)
+
+    def sync(self, corpus, data_dir):
+        """
+        与语料索引同步：只读取内容 hash 变化的文件，删除已不存在的指南
+        返回 {"added", "updated", "removed", "unchanged"}
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        data_dir = Path(data_dir)
+        for entry in corpus.entries():
+            slug, digest = entry["slug"], entry["hash"]
+            row = self.rows.get(slug)
+            if row is not None and row[0] == digest:
+                stats["unchanged"] += 1
+                continue
+            try:
+                guide = guide_store.load_guide(data_dir / f"{slug}.json")
+            except (OSError, ValueError):
+                guide = None
+            self.add(slug, [] if guide is None else guide_keywords(guide), digest)
+            stats["updated" if row is not None else "added"] += 1
+
+        if len(self.rows) != corpus.count():
+            for slug in [slug for slug in self.rows if slug not in corpus]:
+                self._unlink(slug)
+                stats["removed"] += 1
+        return stats
+
+    # ---------- 查询 ----------
+
+    def owners(self, keyword):
+        """已经使用该关键词的指南 slug（O(1)）"""
+        return tuple(self._owners.get(normalize_keyword(keyword), ()))
+
+    def __contains__(self, keyword):
+        return normalize_keyword(keyword) in self._owners
+
+    def collisions(self, keywords, slug=None):
+        """{关键词: 其他指南 slug}，只包含已被 slug 以外的指南使用的关键词"""
+        found = {}
+        for keyword in keywords:
+            others = [owner for owner in self._owners.get(normalize_keyword(keyword), ()) if owner != slug]
+            if others:
+                found[keyword] = others
+        return found
+
+    def resolve(self, keywords, slug, model=None, qualifier=None, policy=None):
+        """
+        生成时处理冲突的关键词，返回 (保留的关键词, {冲突关键词: 处理结果})
+          - 第一个关键词是指南本身的目标词，始终保留（整篇重复由 slug 注册表负责）
+          - reassign: 冲突词用 qualify() 改写为长尾词，改写后仍冲突则去掉
+          - drop: 去掉冲突词
+        处理结果为改写后的关键词，去掉时为 None
+        """
+        policy = DEFAULT_POLICY if policy is None else policy
+        if policy == "off" or not keywords:
+            return list(keywords), {}
+
+        kept, seen, changes = [], set(), {}
+        for i, keyword in enumerate(keywords):
+            key = normalize_keyword(keyword)
+            if not key or key in seen:
+                continue
+            if i == 0 or not self._taken(key, slug):
+                seen.add(key)
+                kept.append(keyword)
+                continue
+            replacement = qualify(keyword, model, qualifier) if policy == "reassign" else None
+            replacement_key = normalize_keyword(replacement) if replacement else None
+            if replacement_key and replacement_key not in seen and not self._taken(replacement_key, slug):
+                seen.add(replacement_key)
+                kept.append(replacement)
+                changes[keyword] = replacement
+            else:
+                changes[keyword] = None
+        return kept, changes
+
+    def taken(self, keyword, slug=None):
+        """关键词是否已被 slug 以外的指南使用（O(1)，不复制 owner 列表）"""
+        return self._taken(normalize_keyword(keyword), slug)
+
+    def _taken(self, key, slug):
+        owners = self._owners.get(key)
+        if not owners:
+            return False
+        return len(owners) > 1 or slug not in owners
+
+    # ---------- 报告 ----------
+
+    def keyword_count(self):
+        return len(self._owners)
+
+    def worst_keywords(self, limit=20):
+        """被最多指南共用的关键词 [(关键词, [slug])]"""
+        shared = [(key, list(owners)) for key, owners in self._owners.items() if len(owners) > 1]
+        shared.sort(key=lambda item: (-len(item[1]), item[0]))
+        return shared[:limit]
+
+    def worst_pairs(self, limit=20, owner_limit=PAIR_OWNER_LIMIT):
+        """共用关键词最多的指南对 [((slug_a, slug_b), 共用数)]"""
+        pairs = Counter()
+        for owners in self._owners.values():
+            if 1 < len(owners) <= owner_limit:
+                pairs.update(combinations(sorted(owners), 2))
+        return pairs.most_common(limit)
+
+    def shared_count(self):
+        """被两篇及以上指南共用的关键词数"""
+        return sum(1 for owners in self._owners.values() if len(owners) > 1)
+
+def index_path_for(data_dir):
+    return corpus_index.cache_dir_for(data_dir) / INDEX_NAME
+
+def update_index(data_dir=corpus_index.DATA_DIR, index_path=None):
+    """加载关键词索引，随语料索引增量同步，有变化时写回；返回 (索引, 统计)"""
+    index_path = index_path_for(data_dir) if index_path is None else index_path
+    corpus, _ = corpus_index.update_index(data_dir)
+    index = KeywordIndex.load(index_path)
+    stats = index.sync(corpus, data_dir)
+    if stats["added"] or stats["updated"] or stats["removed"] or not Path(index_path).exists():
+        index.save(index_path)
+    return index, stats
+
+_indexes = {}
+
+def get_index(data_dir=corpus_index.DATA_DIR):
+    """每次运行只加载一次的关键词索引（按数据目录缓存）"""
+    data_dir = Path(data_dir)
+    if data_dir not in _indexes:
+        _indexes[data_dir], _ = update_index(data_dir)
+    return _indexes[data_dir]
+
+def resolve_guide_keywords(guide, slug, data_dir=corpus_index.DATA_DIR, qualifier=None, policy=None):
+    """
+    生成脚本保存指南前调用：就地替换 guide["seo_keywords"]，返回 {冲突关键词: 处理结果}
+    改写用的限定词默认取 problem_description，没有时取 problem_type
+    这里不登记关键词，写入成功后再调用 register_guide_keywords()
+    """
+    policy = DEFAULT_POLICY if policy is None else policy
+    keywords = guide.get("seo_keywords") or []
+    if policy == "off" or not keywords:
+        return {}
+    index = get_index(data_dir)
+    model = str(guide.get("model") or "").split(" - ")[0]
+    if qualifier is None:
+        qualifier = guide.get("problem_description") or guide.get("problem_type")
+    kept, changes = index.resolve(keywords, slug, model=model, qualifier=qualifier, policy=policy)
+    guide["seo_keywords"] = kept
+    return changes
+
+def register_guide_keywords(guide, slug, data_dir=corpus_index.DATA_DIR, policy=None):
+    """指南写入后登记关键词，同一次运行中后生成的指南也能看到"""
+    policy = DEFAULT_POLICY if policy is None else policy
+    if policy != "off":
+        get_index(data_dir).add(slug, guide.get("seo_keywords") or [])
+
+def describe_changes(changes):
+    """日志用的简短描述"""
+    reassigned = sum(1 for value in changes.values() if value)
+    return f"{len(changes)} 个关键词已被其他指南使用（改写 {reassigned}，去掉 {len(changes) - reassigned}）"
+
+# ============================================
+# 主函数
+# ============================================
+
+def main():
+    args = sys.argv[1:] or ["update"]
+    command = args[0]
+
+    index, stats = update_index()
+
+    if command == "update":
+        print(f"✅ 关键词索引已更新: {len(index.rows)} 篇指南，{index.keyword_count()} 个关键词 "
+              f"(新增 {stats['added']}, 修改 {stats['updated']}, "
+              f"删除 {stats['removed']}, 未变 {stats['unchanged']})")
+    elif command == "owners" and len(args) > 1:
+        for slug in index.owners(" ".join(args[1:])):
+            print(slug)
+    elif command == "report":
+        limit = int(args[1]) if len(args) > 1 else 20
+        print(f"📊 {len(index.rows)} 篇指南，{index.keyword_count()} 个关键词，"
+              f"{index.shared_count()} 个被多篇指南共用\n")
+        print("🔁 共用最多的关键词:")
+        for key, owners in index.worst_keywords(limit):
+            print(f"  {len(owners):4d}  {key}  ({', '.join(owners[:5])}{' ...' if len(owners) > 5 else ''})")
+        print("\n👥 重叠最多的指南对:")
+        for (a, b), shared in index.worst_pairs(limit):
+            print(f"  {shared:4d}  {a}  <->  {b}")
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
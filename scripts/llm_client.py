@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+OpenAI 兼容接口的调用层（call_ai_api、process_manual 共用）
+
+  - 长连接：每个并发槽位一个 http.client 连接，请求结束后放回连接池复用（keep-alive），
+    服务器关闭空闲连接时自动重连
+  - asyncio 客户端：信号量限制同时进行的请求数，令牌桶限制每秒请求数
+  - 429 / 5xx / 连接错误按指数退避加随机抖动重试，服务器给出 Retry-After 时以它为准
+  - 响应按请求内容（模型 + 消息 + 参数）的 hash 缓存在 .cache/llm-responses/，
+    解析失败的响应不写缓存
+  - 记录每次请求的网络耗时、重试次数和缓存命中率（summary() / describe_summary()）
+
+接口地址 OPENAI_BASE_URL 可以指向本地替身服务器做压测（scripts/bench_llm_client.py）。
+同步代码通过 run_sync() 在后台事件循环线程中执行协程。
+"""
+
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import guide_store
+from corpus_index import DATA_DIR, cache_dir_for
+
+BASE_URL = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", "5"))     # 令牌桶：平均每秒请求数（0 表示不限速）
+BURST = int(os.getenv("LLM_BURST", "10"))                    # 令牌桶容量：允许的瞬时突发请求数
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+CACHE_DIR = cache_dir_for(DATA_DIR) / "llm-responses"
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+class LLMError(Exception):
+    """请求最终失败（不可重试的状态码、重试用尽或响应无法解析）"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+# ============================================
+# 响应缓存
+# ============================================
+
+def request_key(request):
+    """请求内容的 hash（模型、消息、参数都参与），作为缓存文件名"""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+def load_cached(cache_dir, key):
+    try:
+        with open(Path(cache_dir) / f"{key}.json", 'rb') as f:
+            return guide_store.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+def save_cached(cache_dir, key, data):
+    path = Path(cache_dir) / f"{key}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(guide_store.dumps(data))
+    os.replace(tmp_path, path)
+
+# ============================================
+# 连接池与限速
+# ============================================
+
+class ConnectionPool:
+    """
+    http.client 连接池（阻塞调用，在线程池中执行）
+    连接用完放回池中复用；服务器声明关闭或出错的连接关闭后下次使用时自动重连
+    """
+
+    def __init__(self, base_url, size, timeout=TIMEOUT):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(self._new())
+
+    def _new(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _send(self, conn, path, body, headers):
+        if conn.sock is None:
+            self.opened += 1
+        conn.request("POST", self.prefix + path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        if response.will_close:
+            conn.close()
+        return response.status, response.headers, data
+
+    def post(self, path, body, headers):
+        """返回 (状态码, 响应头, 响应体)；连接错误抛出 OSError / http.client.HTTPException"""
+        conn = self._idle.get()
+        try:
+            reused = conn.sock is not None
+            try:
+                return self._send(conn, path, body, headers)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                # 复用的空闲连接已被服务器关闭：重连一次
+                return self._send(conn, path, body, headers)
+        except BaseException:
+            conn.close()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+class TokenBucket:
+    """令牌桶：平均每秒 rate 个请求，最多突发 burst 个；rate <= 0 时不限速"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def retry_after_header(headers):
+    value = headers.get("Retry-After") if headers else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+def backoff_delay(attempt, retry_after=None):
+    """第 attempt 次重试前的等待：full jitter 指数退避；有 Retry-After 时不短于它"""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    return max(delay, retry_after) if retry_after is not None else delay
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+# ============================================
+# 客户端
+# ============================================
+
+class LLMClient:
+    """
+    一个实例只在一个事件循环中使用（同步代码用 run_sync()）
+    """
+
+    def __init__(self, base_url=None, api_key=None, model=None, concurrency=CONCURRENCY,
+                 rate=RATE_PER_SEC, burst=BURST, max_retries=MAX_RETRIES, timeout=TIMEOUT,
+                 cache_dir=CACHE_DIR):
+        self.base_url = base_url or BASE_URL
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")
+        self.model = model or MODEL
+        self.max_retries = max_retries
+        self.cache_dir = cache_dir
+        self.concurrency = max(1, concurrency)
+        self.pool = ConnectionPool(self.base_url, self.concurrency, timeout)
+        self.headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"}
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="llm")
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = TokenBucket(rate, burst)
+        self.latencies = []
+        self.stats = {"calls": 0, "cache_hits": 0, "requests": 0, "retries": 0, "failed": 0}
+
+    def build_request(self, messages, model=None, **params):
+        request = {"model": model or self.model, "messages": messages}
+        request.update(params)
+        return request
+
+    async def _attempt(self, body):
+        await self._bucket.acquire()
+        async with self._semaphore:
+            self.stats["requests"] += 1
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            try:
+                return await loop.run_in_executor(self._executor, self.pool.post, "/chat/completions", body, self.headers)
+            finally:
+                # 只计网络往返，不含排队和退避等待
+                self.latencies.append(time.perf_counter() - start)
+
+    async def complete(self, request, parse=None, max_retries=None):
+        """
+        返回模型回复的文本；给出 parse 时返回 parse(文本)，parse 抛出 ValueError 时视为失败且不写缓存
+        """
+        self.stats["calls"] += 1
+        key = request_key(request) if self.cache_dir else None
+        cached = load_cached(self.cache_dir, key) if key else None
+        if cached is not None and isinstance(cached.get("content"), str):
+            try:
+                result = parse(cached["content"]) if parse else cached["content"]
+            except ValueError:
+                pass
+            else:
+                self.stats["cache_hits"] += 1
+                return result
+
+        retries = self.max_retries if max_retries is None else max_retries
+        body = json.dumps(request, ensure_ascii=False).encode('utf-8')
+        for attempt in range(retries + 1):
+            retry_after = None
+            try:
+                status, headers, data = await self._attempt(body)
+            except (OSError, http.client.HTTPException) as e:
+                error = LLMError(f"连接失败: {e!r}")
+            else:
+                if status == 200:
+                    break
+                error = LLMError(f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}", status)
+                if status not in RETRY_STATUSES:
+                    self.stats["failed"] += 1
+                    raise error
+                retry_after = retry_after_header(headers)
+            if attempt == retries:
+                self.stats["failed"] += 1
+                raise error
+            self.stats["retries"] += 1
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+        try:
+            content = json.loads(data)["choices"][0]["message"]["content"] or ""
+            result = parse(content) if parse else content
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            self.stats["failed"] += 1
+            raise LLMError(f"无法解析的响应: {e!r}") from e
+        if key:
+            save_cached(self.cache_dir, key, {"content": content})
+        return result
+
+    async def chat(self, messages, model=None, parse=None, max_retries=None, **params):
+        return await self.complete(self.build_request(messages, model, **params), parse, max_retries)
+
+    async def chat_json(self, messages, model=None, max_retries=None, **params):
+        """JSON 模式；回复不是 JSON 对象时抛出 LLMError"""
+        params.setdefault("response_format", {"type": "json_object"})
+        return await self.chat(messages, model, parse_json_object, max_retries, **params)
+
+    def summary(self):
+        calls = self.stats["calls"]
+        return dict(self.stats,
+                    hit_rate=self.stats["cache_hits"] / calls if calls else 0.0,
+                    connections=self.pool.opened,
+                    p50=percentile(self.latencies, 0.5),
+                    p95=percentile(self.latencies, 0.95),
+                    max=max(self.latencies, default=0.0))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.pool.close()
+
+def parse_json_object(content):
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("回复不是 JSON 对象")
+    return data
+
+def describe_summary(summary):
+    return (f"AI 调用 {summary['calls']} 次，缓存命中 {summary['cache_hits']}（{summary['hit_rate']:.0%}），"
+            f"请求 {summary['requests']} 次（重试 {summary['retries']}，失败 {summary['failed']}，"
+            f"新建连接 {summary['connections']}），耗时 p50 {summary['p50'] * 1000:.0f}ms "
+            f"p95 {summary['p95'] * 1000:.0f}ms max {summary['max'] * 1000:.0f}ms")
+
+# ============================================
+# 同步调用
+# ============================================
+
+_loop = None
+_loop_pid = None
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+def _background_loop():
+    global _loop, _loop_pid
+    with _lock:
+        # fork 出的子进程没有父进程的后台线程，需要重新创建
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="llm-loop", daemon=True).start()
+        return _loop
+
+def run_sync(coro):
+    """在后台事件循环中执行协程并等待结果（可以在多个线程中同时调用）"""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+def get_client():
+    """按环境变量配置的默认客户端（每个进程一个，供 run_sync 使用）"""
+    global _client, _client_pid
+    loop = _background_loop()
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            async def create():
+                return LLMClient()
+            # 在后台循环中创建，信号量等绑定到该循环
+            _client = asyncio.run_coroutine_threadsafe(create(), loop).result()
+            _client_pid = os.getpid()
+        return _client
+
+def configured():
+    return bool(os.getenv("OPENAI_API_KEY"))
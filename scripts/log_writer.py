@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+生成脚本共用的日志后端
+控制台输出仍在调用线程中立即打印；文件写入交给后台线程，
+消息先进入队列，再按批写入、统一 flush，文件句柄在整个运行期间保持打开
+
+- 级别过滤: LOG_LEVEL=debug|info|warn|error（默认 info，DEBUG 不再总是写入）
+- 按天轮转: 文件名模板中的 {date} 在日期变化时自动切换到新文件
+- 按大小轮转: LOG_MAX_BYTES 超过后滚动为 .1.gz、.2.gz …（保留 LOG_BACKUP_COUNT 个）
+- 旧文件压缩: 超过 LOG_COMPRESS_AFTER_DAYS 天的按天日志压缩为 .gz
+- JSON 行输出: LOG_FORMAT=json 时日志文件每行一个 JSON 对象（控制台格式不变）
+
+用法:
+    from log_writer import LogWriter
+    LOGGER = LogWriter(LOG_DIR / "ai-generator-{date}.log")
+    LOGGER.log("开始生成", "INFO")
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARN": 30, "WARNING": 30, "ERROR": 40}
+
+# 与各脚本原有 log() 相同的格式
+DEFAULT_FORMAT = "[{timestamp}] [{level}] {message}"
+
+DATE_FORMAT = "%Y%m%d"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+FLUSH_INTERVAL = 0.5      # 秒，后台线程最长等待多久写一次
+BATCH_SIZE = 256          # 每批最多写入的消息数
+
+_STOP = object()
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def _level_value(level):
+    return LEVELS.get(str(level).upper(), LEVELS["INFO"])
+
+class _Clock:
+    """同一秒内复用已格式化的时间戳和日期"""
+
+    def __init__(self):
+        self._second = None
+        self.timestamp = ""
+        self.date = ""
+
+    def now(self):
+        second = int(time.time())
+        if second != self._second:
+            current = datetime.fromtimestamp(second)
+            self._second = second
+            self.timestamp = current.strftime(TIMESTAMP_FORMAT)
+            self.date = current.strftime(DATE_FORMAT)
+        return self.timestamp, self.date
+
+class LogWriter:
+    """
+    队列 + 后台写线程的日志器
+    path 可以包含 {date}（按天轮转），例如 logs/seo-generator-{date}.log
+    """
+
+    def __init__(self, path, fmt=DEFAULT_FORMAT, level=None, json_lines=None,
+                 max_bytes=None, backup_count=None, compress_after_days=None,
+                 console=True, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE):
+        self.template = str(path)
+        self.fmt = fmt
+        self.min_level = _level_value(level or os.environ.get("LOG_LEVEL", "info"))
+        if json_lines is None:
+            json_lines = os.environ.get("LOG_FORMAT", "text").lower() == "json"
+        self.json_lines = json_lines
+        self.max_bytes = max_bytes if max_bytes is not None else _env_int("LOG_MAX_BYTES", 0)
+        self.backup_count = backup_count if backup_count is not None else _env_int("LOG_BACKUP_COUNT", 5)
+        if compress_after_days is None:
+            compress_after_days = _env_int("LOG_COMPRESS_AFTER_DAYS", 7)
+        self.compress_after_days = compress_after_days
+        self.console = console
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._clock = _Clock()
+        Path(self.template).parent.mkdir(parents=True, exist_ok=True)
+        self._start()
+        atexit.register(self.close)
+        if hasattr(os, "register_at_fork"):
+            # 写线程不会随 fork 复制到子进程（例如进程池 worker），需要重新启动
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue = queue.Queue()
+        self._file = None
+        self._file_path = None
+        self._file_size = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- 调用线程 ----------
+
+    def log(self, message, level="INFO"):
+        if _level_value(level) < self.min_level:
+            return
+        timestamp, date = self._clock.now()
+        line = self.fmt.format(timestamp=timestamp, level=level, message=message)
+        if self.console:
+            print(line)
+        if self._closed:
+            return
+        if self.json_lines:
+            line = json.dumps({"time": timestamp, "level": level, "message": str(message)},
+                              ensure_ascii=False)
+        self._queue.put((date, line))
+
+    def flush(self):
+        """阻塞直到队列中已有的消息全部写入磁盘"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    # ---------- 后台线程 ----------
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # 等待一小段时间，把同一时段的消息攒成一批
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _STOP and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or isinstance(item, threading.Event):
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            self._write_batch(batch)
+            if batch[-1] is _STOP:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write_batch(self, batch):
+        events = []
+        for item in batch:
+            if item is _STOP:
+                continue
+            if isinstance(item, threading.Event):
+                events.append(item)
+                continue
+            date, line = item
+            try:
+                self._write_line(date, line)
+            except OSError as e:
+                print(f"[log_writer] 写入日志失败: {e}")
+        if self._file:
+            self._file.flush()
+        for event in events:
+            event.set()
+
+    def _write_line(self, date, line):
+        path = self.template.format(date=date)
+        if path != self._file_path:
+            self._open(path)
+
+        data = line + "\n"
+        size = len(data.encode("utf-8"))
+        if self.max_bytes and self._file_size and self._file_size + size > self.max_bytes:
+            self._rotate_by_size()
+        self._file.write(data)
+        self._file_size += size
+
+    def _open(self, path):
+        if self._file:
+            self._file.close()
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_path = path
+        self._file_size = self._file.tell()
+        if "{date}" in self.template:
+            self._compress_old_days()
+
+    def _rotate_by_size(self):
+        """app.log -> app.log.1.gz，已有的备份依次后移"""
+        self._file.close()
+        base = self._file_path
+        for index in range(self.backup_count - 1, 0, -1):
+            older = Path(f"{base}.{index}.gz")
+            if older.exists():
+                older.replace(f"{base}.{index + 1}.gz")
+        if self.backup_count > 0:
+            _gzip_file(Path(base), Path(f"{base}.1.gz"))
+        else:
+            Path(base).unlink()
+        self._file = open(base, "a", encoding="utf-8")
+        self._file_size = 0
+
+    def _compress_old_days(self):
+        """压缩超过 compress_after_days 天的按天日志（最近几天保持纯文本，方便 cat / grep）"""
+        if self.compress_after_days <= 0:
+            return
+        template = Path(self.template)
+        prefix, _, suffix = template.name.partition("{date}")
+        pattern = re.compile(re.escape(prefix) + r"(\d{8})" + re.escape(suffix) + "$")
+        cutoff = (datetime.now() - timedelta(days=self.compress_after_days)).strftime(DATE_FORMAT)
+        for path in template.parent.glob(f"{prefix}*{suffix}"):
+            match = pattern.match(path.name)
+            if match and match.group(1) < cutoff:
+                _gzip_file(path, path.with_name(path.name + ".gz"))
+
+def _gzip_file(source, target):
+    with open(source, "rb") as src, gzip.open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    source.unlink()
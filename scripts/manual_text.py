@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+说明书 PDF 文本提取
+process_manual 原来把所有页面拼成一个字符串（逐页 +=，平方级复制；没有文字层的页面
+extract_text() 返回 None 时直接崩溃），再截取前 15000 个字符交给模型，故障排除章节常常被截掉。这里：
+
+  - iter_pages() 逐页产出 (页码, 文本)，没有文字层的页面文本为空字符串，处理完的页面释放缓存
+  - score_page() 按故障排除 / 错误代码相关的标题、词语和错误代码格式给页面打分
+  - select_pages() 只保留得分高的页面（及其后一页，章节常跨页），超出字符预算时按分数取舍，
+    再按页码顺序拼接；没有页面得分时退回到从头截取
+  - 提取结果按 PDF 内容 hash 缓存在 .cache/manual-text/，同一本说明书再次处理不必重新解析
+
+用法:
+    python scripts/manual_text.py Shark_NV352.pdf            # 打印选中的页面和得分
+    python scripts/manual_text.py Shark_NV352.pdf --budget 20000 --text
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import corpus_index
+
+CACHE_DIR = corpus_index.cache_dir_for(corpus_index.DATA_DIR) / "manual-text"
+# 提取逻辑变化时递增，旧缓存自动失效
+EXTRACTOR_VERSION = 1
+
+DEFAULT_BUDGET = 15000      # 交给模型的字符数上限（与原来的截断长度一致）
+MIN_SCORE = 3.0
+
+# (正则, 权重)：标题类命中一次就足以选中页面，普通词语需要多次出现
+SCORE_RULES = [
+    (re.compile(r"\btrouble\s*-?\s*shooting\b", re.I), 6.0),
+    (re.compile(r"\bproblem\s+solving\b|\bbefore\s+(?:you\s+)?call(?:ing)?\s+(?:for\s+)?service\b", re.I), 6.0),
+    (re.compile(r"\berror\s+codes?\b|\bfault\s+codes?\b|\bwarning\s+lights?\b", re.I), 5.0),
+    (re.compile(r"\b(?:possible\s+)?causes?\b|\bsolutions?\b|\bremed(?:y|ies)\b", re.I), 1.5),
+    (re.compile(r"\b(?:problem|symptom|issue)s?\b", re.I), 1.0),
+    (re.compile(r"\b(?:flash(?:es|ing)?|blink(?:s|ing)?|beep(?:s|ing)?)\b", re.I), 1.0),
+    (re.compile(r"\b(?:not|won'?t|doesn'?t|does\s+not|will\s+not)\s+"
+                r"(?:work|start|charge|pick|spin|turn|run|power|suction|dock)", re.I), 1.5),
+    (re.compile(r"\b(?:clogged|blocked|blockage|jammed|tangled|overheat(?:ed|ing)?)\b", re.I), 1.0),
+    # 错误代码本身：E1、E-23、Error 5、F07
+    (re.compile(r"\b(?:E|F)-?\d{1,3}\b|\berror\s+\d{1,3}\b", re.I), 1.5),
+]
+
+# 单页在同一条规则上最多计分的次数（避免一页反复出现的页眉把分数拉得过高）
+MAX_HITS_PER_RULE = 5
+
+# ============================================
+# 页面提取
+# ============================================
+
+def iter_pdf_pages(pdf_path):
+    """逐页产出 (页码, 文本)，页码从 1 开始；没有文字层的页面返回空字符串"""
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        for number, page in enumerate(pdf.pages, 1):
+            try:
+                text = page.extract_text() or ""
+            finally:
+                # 释放已解析的页面对象，长说明书不会把所有页面留在内存中
+                page.flush_cache()
+            yield number, text
+
+def pdf_hash(pdf_path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(pdf_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_path_for(digest, cache_dir=CACHE_DIR):
+    return Path(cache_dir) / f"{digest}.json"
+
+def _load_cached(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("version") != EXTRACTOR_VERSION:
+        return None
+    return [(number, text) for number, text in cached["pages"]]
+
+def _save_cached(path, pages):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 按进程区分临时文件：并发更新时不会互相替换掉对方的临时文件
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": EXTRACTOR_VERSION, "pages": pages}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def iter_pages(pdf_path, cache_dir=CACHE_DIR):
+    """
+    逐页产出 (页码, 文本)
+    缓存命中时直接读缓存；否则边解析边产出，全部页面读完后写入缓存（中途停止迭代时不写缓存）
+    """
+    path = cache_path_for(pdf_hash(pdf_path), cache_dir) if cache_dir else None
+    cached = _load_cached(path) if path else None
+    if cached is not None:
+        yield from cached
+        return
+
+    pages = []
+    for number, text in iter_pdf_pages(pdf_path):
+        pages.append((number, text))
+        yield number, text
+    if path:
+        _save_cached(path, pages)
+
+# ============================================
+# 页面打分与选择
+# ============================================
+
+def score_page(text):
+    """故障排除相关程度；空白页为 0"""
+    if not text or not text.strip():
+        return 0.0
+    score = 0.0
+    for pattern, weight in SCORE_RULES:
+        hits = 0
+        for _ in pattern.finditer(text):
+            hits += 1
+            if hits >= MAX_HITS_PER_RULE:
+                break
+        score += hits * weight
+    return score
+
+def select_pages(pages, budget=DEFAULT_BUDGET, min_score=MIN_SCORE):
+    """
+    pages: 可迭代的 (页码, 文本)，可以是生成器
+    返回按页码排序的 [(页码, 文本, 分数)]，总字符数不超过 budget
+    """
+    scored = []
+    previous_selected = False
+    for number, text in pages:
+        text = text.strip()
+        if not text:
+            previous_selected = False
+            continue
+        score = score_page(text)
+        selected = score >= min_score
+        # 凭自身得分选中的页面，其下一页也保留（故障排除表常常跨页，续页上没有标题）
+        if not selected and previous_selected:
+            score, selected = min_score, True
+            previous_selected = False
+        else:
+            previous_selected = selected
+        scored.append((number, text, score, selected))
+
+    chosen = [item for item in scored if item[3]]
+    if not chosen:
+        # 没有页面达到 min_score：退回到从第一页开始按页码顺序截取，直到用完预算（最后一页截断）
+        kept, used = [], 0
+        for number, text, score, _ in scored:
+            if used >= budget:
+                break
+            text = text[:budget - used]
+            kept.append((number, text, score))
+            used += len(text)
+        return kept
+
+    if sum(len(item[1]) for item in chosen) > budget:
+        kept, used = [], 0
+        for item in sorted(chosen, key=lambda item: (-item[2], item[0])):
+            if used + len(item[1]) > budget:
+                if used == 0:
+                    # 第一页就超出预算时截断该页，不至于什么都不返回
+                    kept.append((item[0], item[1][:budget], item[2], True))
+                    used = budget
+                continue
+            kept.append(item)
+            used += len(item[1])
+        chosen = kept
+
+    return [(number, text, score) for number, text, score, _ in sorted(chosen, key=lambda item: item[0])]
+
+def join_pages(selected):
+    """按页拼接，页之间标注页码，便于模型对照原说明书"""
+    return "\n\n".join(f"[Page {number}]\n{text}" for number, text, _ in selected)
+
+def extract_relevant_text(pdf_path, budget=DEFAULT_BUDGET, cache_dir=CACHE_DIR):
+    """说明书中与故障排除相关的文本（不超过 budget 个字符，页码标注不计入）"""
+    return join_pages(select_pages(iter_pages(pdf_path, cache_dir), budget))
+
+# ============================================
+# 主函数
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="说明书 PDF 故障排除页面提取")
+    parser.add_argument("pdf")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET)
+    parser.add_argument("--text", action="store_true", help="输出选中的文本")
+    args = parser.parse_args()
+
+    selected = select_pages(iter_pages(args.pdf), args.budget)
+    if args.text:
+        print(join_pages(selected))
+        return
+    total = sum(len(text) for _, text, _ in selected)
+    print(f"📄 选中 {len(selected)} 页，{total} 个字符（预算 {args.budget}）")
+    for number, text, score in selected:
+        print(f"  第 {number:3d} 页  得分 {score:5.1f}  {len(text):6d} 字符  {text[:60]!r}")
+
+if __name__ == "__main__":
+    main()
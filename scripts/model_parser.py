@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+吸尘器型号解析器
+把品牌/型号别名表一次性编译成按 token 匹配的 trie，
+从左到右单次扫描关键词，取最长匹配的型号
+
+返回值格式与旧版 parse_vacuum_model 一致: (brand, model, problem_description)
+注意: model 字段不包含品牌前缀，例如 "Miele C1" 返回 brand="Miele", model="C1"
+
+与旧版逐品牌 if/elif 的结果差异（均为有意的改变，model 变化时 guide_slug 也随之变化）:
+  - data/vacuums.json 中的型号参与最长匹配，包括旧版已支持的品牌:
+    "Dyson V15 Detect battery" → "V15 Detect"（旧版 "V15"），
+    "Dyson V11 Torque Drive …" → "V11 Torque Drive"（旧版 "V11"），
+    "Dyson V8 Absolute …" → "V8 Absolute"，"Dyson Ball Animal 2 …" → "Ball Animal 2"（旧版 "Vacuum"）
+  - 品牌和型号不区分大小写: "Shark ION …" → "Ion"，"Shark rocket …" → "Rocket"，
+    "Bissell CrossWave …" → "Crosswave"（旧版 "Cleaner"，或在 "CrossWave Pet Pro" 中误取 "Pet"），
+    "Bissell pet hair …" → "Pet Hair Eraser"
+  - 型号不必紧跟在品牌之后: "Samsung Bespoke Jet …" → "Jet"；"Samsung Jet 60 …" → "Jet"，
+    "60" 留在问题描述中（旧版两者都是 "Vacuum"）
+  - 旧版落到默认 "Vacuum" 的 Roborock、Ecovacs、Eufy、Hoover 现在解析出型号（"Roborock S5 Max …" → "S5"）
+  - "Pet Hair Eraser …" 的问题描述不再以多余的 "Eraser" 开头
+"""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+VACUUMS_FILE = DATA_DIR / "vacuums.json"
+
+# ============================================
+# 品牌型号表
+# ============================================
+# models:   型号别名（多个 token 用空格分隔），匹配后原样作为 model
+# aliases:  别名 → 标准型号名称
+# fallback: 没有匹配到型号时使用的默认型号
+#
+# 特殊 token:
+#   *           匹配任意一个 token，输出时保留原文（例如 Roomba "i 7"）
+#   {500-1000}  匹配该范围内的整数 token，输出时保留原文
+
+MODEL_TABLE = {
+    "Dyson": {
+        "fallback": "Vacuum",
+        "models": [
+            "V7", "V8", "V10", "V11", "V12", "V15", "V7+", "V8+", "V10+",
+            "Cyclone", "Digital",
+            "Cyclone V7", "Cyclone V8", "Cyclone V10", "Cyclone V11", "Cyclone V12", "Cyclone V15",
+            "Digital V7", "Digital V8", "Digital V10", "Digital V11", "Digital V12", "Digital V15"
+        ]
+    },
+    "Shark": {
+        "fallback": "Vacuum",
+        "models": ["Navigator", "Rocket", "Apex", "Ion", "Vertex", "Rotator", "Stratos"]
+    },
+    "Bissell": {
+        "fallback": "Cleaner",
+        "models": ["Crosswave", "Little", "Little Green", "ProHeat", "SpotClean", "Pet", "PowerForce"],
+        "aliases": {
+            "Pet Hair": "Pet Hair Eraser",
+            "Pet Hair Eraser": "Pet Hair Eraser"
+        }
+    },
+    "Roomba": {
+        "fallback": "Robot Vacuum",
+        "models": ["i *", "e *", "s *", "j *", "{500-1000}"]
+    },
+    "Roborock": {
+        "fallback": "Vacuum",
+        "models": ["S4", "S5", "S6", "S7", "S8", "Q5", "Q7", "E4"]
+    },
+    "Ecovacs": {
+        "fallback": "Vacuum",
+        "models": ["Deebot", "Ozmo", "N79", "S5", "S6", "S7"]
+    },
+    "Eufy": {
+        "fallback": "Vacuum",
+        "models": ["RoboVac", "HomeVac", "11S", "30C", "G30"]
+    },
+    "Hoover": {
+        "fallback": "Vacuum",
+        "models": ["WindTunnel", "PowerDrive", "React", "ONE", "Legacy"]
+    },
+    "Samsung": {
+        "fallback": "Vacuum",
+        "models": ["Jet", "Jet 70", "Jet 75", "Jet 90", "Jet Stick", "Jet Cordless"]
+    },
+    "Miele": {
+        "fallback": "Vacuum",
+        "models": ["C1", "C2", "C3", "Complete", "Classic", "Full"]
+    },
+    "Tineco": {
+        "fallback": "Cleaner",
+        "models": ["iFloor *", "Dry", "Wet", "Smart"]
+    }
+}
+
+DEFAULT_FALLBACK = "Vacuum"
+
+_RANGE_TOKEN = re.compile(r'^\{(\d+)-(\d+)\}$')
+
+# ============================================
+# Token trie
+# ============================================
+
+class _Node:
+    __slots__ = ("children", "ranges", "wildcard", "model")
+
+    def __init__(self):
+        self.children = {}   # 小写 token → _Node
+        self.ranges = []     # [(low, high, _Node)]
+        self.wildcard = None
+        self.model = None    # 终结节点: 标准型号模板（token 列表，None 表示保留原文）
+
+
+class ModelParser:
+    """编译后的品牌/型号解析器"""
+
+    def __init__(self, table=MODEL_TABLE, extra_sources=()):
+        self._brands = {}    # 小写品牌 → (品牌名, 型号 trie 根节点, fallback)
+        for brand, spec in table.items():
+            self._add_brand(brand, spec.get("fallback", DEFAULT_FALLBACK))
+            for model in spec.get("models", []):
+                self.add_model(brand, model)
+            for alias, model in spec.get("aliases", {}).items():
+                self.add_model(brand, alias, model)
+
+        for source in extra_sources:
+            self.load_aliases(source)
+
+    def _add_brand(self, brand, fallback=DEFAULT_FALLBACK):
+        key = brand.lower()
+        if key not in self._brands:
+            self._brands[key] = (brand, _Node(), fallback)
+        return self._brands[key]
+
+    def add_model(self, brand, alias, model=None):
+        """注册一个型号别名；model 为空时别名本身就是标准型号"""
+        _, root, _ = self._add_brand(brand)
+        alias_tokens = alias.split()
+        model_tokens = (model or alias).split()
+
+        node = root
+        for token in alias_tokens:
+            range_match = _RANGE_TOKEN.match(token)
+            if token == "*":
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+                node = node.wildcard
+            elif range_match:
+                low, high = int(range_match.group(1)), int(range_match.group(2))
+                for r_low, r_high, child in node.ranges:
+                    if (r_low, r_high) == (low, high):
+                        node = child
+                        break
+                else:
+                    child = _Node()
+                    node.ranges.append((low, high, child))
+                    node = child
+            else:
+                node = node.children.setdefault(token.lower(), _Node())
+
+        # 模板中与别名通配位置对应的 token 输出时保留原文
+        if model is None:
+            node.model = [None if t == "*" or _RANGE_TOKEN.match(t) else t for t in model_tokens]
+        else:
+            node.model = model_tokens
+
+    def load_aliases(self, path):
+        """
+        从 data/vacuums.json 这类文件加载额外的型号别名
+        每个条目需要 brand 和 model 字段，可选 aliases 列表
+        """
+        path = Path(path)
+        if not path.exists():
+            return 0
+
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+
+        count = 0
+        for entry in entries:
+            brand = entry.get("brand")
+            model = entry.get("model")
+            if not brand or not model:
+                continue
+            self.add_model(brand, model)
+            count += 1
+            for alias in entry.get("aliases", []):
+                self.add_model(brand, alias, model)
+                count += 1
+        return count
+
+    def _match(self, node, parts, start):
+        """从 start 位置开始做最长匹配，返回 (结束位置, 型号)；没有匹配返回 None"""
+        best = None
+        stack = [(node, start)]
+        while stack:
+            current, pos = stack.pop()
+            if current.model is not None and pos > start:
+                if best is None or pos > best[0]:
+                    matched = parts[start:pos]
+                    model = " ".join(
+                        matched[i] if token is None else token
+                        for i, token in enumerate(current.model)
+                    )
+                    best = (pos, model)
+            if pos >= len(parts):
+                continue
+
+            token = parts[pos]
+            # 优先级: 字面量 > 数字范围 > 通配符（后入栈先出栈，长度相同时字面量胜出）
+            if current.wildcard is not None:
+                stack.append((current.wildcard, pos + 1))
+            if current.ranges and token.isdigit():
+                value = int(token)
+                for low, high, child in current.ranges:
+                    if low <= value <= high:
+                        stack.append((child, pos + 1))
+            child = current.children.get(token.lower())
+            if child is not None:
+                stack.append((child, pos + 1))
+        return best
+
+    def parse(self, keyword):
+        """解析单个关键词，返回 (brand, model, problem_description)"""
+        parts = keyword.split()
+        brand = parts[0] if parts else "Unknown"
+
+        entry = self._brands.get(brand.lower())
+        model = ""
+        problem_desc = ""
+
+        if entry is None:
+            model = DEFAULT_FALLBACK
+            problem_desc = " ".join(parts[1:])
+        else:
+            brand, root, fallback = entry
+            for i in range(1, len(parts)):
+                matched = self._match(root, parts, i)
+                if matched:
+                    end, model = matched
+                    problem_desc = " ".join(parts[end:])
+                    break
+            if not model:
+                model = fallback
+                problem_desc = " ".join(parts[1:])
+
+        # 清理问题描述
+        problem_desc = problem_desc.strip() or keyword
+        return brand, model, problem_desc
+
+    def parse_many(self, keywords):
+        """批量解析，同一批次内重复的关键词只解析一次"""
+        cache = {}
+        results = []
+        for kw in keywords:
+            if kw not in cache:
+                cache[kw] = self.parse(kw)
+            results.append(cache[kw])
+        return results
+
+# ============================================
+# 默认解析器（首次使用时编译，附带 data/vacuums.json 中的型号）
+# ============================================
+
+_default_parser = None
+
+def get_parser():
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = ModelParser(extra_sources=[VACUUMS_FILE])
+    return _default_parser
+
+@lru_cache(maxsize=65536)
+def parse_vacuum_model(keyword):
+    """解析吸尘器型号信息（带 LRU 缓存）"""
+    return get_parser().parse(keyword)
+
+def parse_many(keywords):
+    """批量解析关键词，结果经 LRU 缓存复用"""
+    return [parse_vacuum_model(kw) for kw in keywords]
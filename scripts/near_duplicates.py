@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+近似重复指南检测（MinHash + LSH 分桶）
+generate_problem_by_type、auto_seo_vacuum.generate_content、retro_fill_faqs.generate_faqs 都在填同一套模板，
+data/ 中很多文件只有型号名不同。两两比较是 O(n²)，这里改为：
+
+  1. 取每篇指南的问题标题、可能原因、解决步骤，把品牌和型号名替换为占位词后切成 3 词 shingle
+  2. MinHash 签名：单次排列哈希（one-permutation hashing）——每个 shingle 只哈希一次，
+     按低位分到 NUM_BINS 个桶、桶内取最小值，空桶向右借用相邻桶的值（densification），
+     效果等同于 NUM_BINS 个独立哈希函数的 MinHash，但每篇只需 O(shingle 数) 次运算
+  3. LSH：签名切成 BANDS 段，任一段完全相同的指南进入同一个候选桶，只在桶内比较，
+     桶内用少量“代表”比较，避免模板完全相同的大桶退化为两两比较
+  4. 候选对估计相似度 ≥ 阈值的合并为簇（并查集），输出簇成员及与代表的相似度
+
+签名按内容 hash 缓存在 .cache/near-duplicates.sqlite，跟随语料索引增量更新。
+生成脚本保存新指南前调用 check_guide()，写入后调用 register_guide()；NEAR_DUPLICATES 环境变量控制处理方式：
+    warn（默认）  只记录日志
+    skip          跳过近似重复的指南
+    off           不检查
+
+用法:
+    python scripts/near_duplicates.py update                 # 增量更新签名
+    python scripts/near_duplicates.py report [--threshold 0.8] [--json clusters.json]
+    python scripts/near_duplicates.py check data/dyson-v8.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from array import array
+from pathlib import Path
+
+import corpus_index
+import guide_store
+
+DB_NAME = "near-duplicates.sqlite"
+
+NUM_BINS = 128
+BANDS = 16
+ROWS = NUM_BINS // BANDS
+SHINGLE_SIZE = 3
+# (1/BANDS)^(1/ROWS) ≈ 0.71：相似度高于此值的指南对大概率至少共享一个段
+DEFAULT_THRESHOLD = 0.8
+# 每个候选桶内最多保留的代表数（桶内成员只与代表比较）
+BUCKET_LEADERS = 8
+
+POLICIES = ("warn", "skip", "off")
+DEFAULT_POLICY = os.environ.get("NEAR_DUPLICATES", "warn").lower()
+
+MASK = "§"
+_BIN_MASK = NUM_BINS - 1
+_VALUE_MAX = 0xFFFFFFFF
+# 空桶借用相邻桶时按距离混入的常数，距离不同时借来的值不会相同
+_BORROW_MIX = 0x9E3779B1
+_BAND_BYTES = ROWS * 4
+
+_WORD = re.compile(r"[a-z0-9§]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    slug TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,   -- 语料索引中的内容 hash
+    sig  BLOB             -- NUM_BINS 个 uint32；没有可比较文本的指南为 NULL
+);
+"""
+
+# ============================================
+# 文本与签名
+# ============================================
+
+def model_names(guide):
+    """需要屏蔽的名称：品牌、完整型号（去掉 " - 问题" 部分）、去掉品牌的型号、model_code"""
+    brand = str(guide.get("brand") or "").strip()
+    model = str(guide.get("model") or "").split(" - ")[0].strip()
+    names = {brand, model, str(guide.get("model_code") or "").strip()}
+    if brand and model.lower().startswith(brand.lower() + " "):
+        names.add(model[len(brand):].strip())
+    return sorted((name for name in names if name), key=len, reverse=True)
+
+def mask_names(text, names):
+    if not names:
+        return text
+    pattern = re.compile("|".join(re.escape(name) for name in names), re.IGNORECASE)
+    return pattern.sub(MASK, text)
+
+def guide_text(guide):
+    """问题标题 + 可能原因 + 解决步骤（process_manual 生成的 steps 也计入），型号名已屏蔽"""
+    parts = []
+    for problem in guide.get("problems") or []:
+        if not isinstance(problem, dict):
+            continue
+        parts.append(str(problem.get("title") or ""))
+        for field in ("possible_causes", "solution_steps", "steps"):
+            items = problem.get(field)
+            if isinstance(items, list):
+                parts.extend(str(item) for item in items if isinstance(item, str))
+    return mask_names("\n".join(parts), model_names(guide))
+
+def shingles(text, size=SHINGLE_SIZE):
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _hash64(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+def signature(shingle_set):
+    """单次排列 MinHash 签名（bytes，NUM_BINS 个 uint32）；没有 shingle 时返回 None"""
+    if not shingle_set:
+        return None
+    bins = [None] * NUM_BINS
+    for shingle in shingle_set:
+        h = _hash64(shingle)
+        b, value = h & _BIN_MASK, h >> 32
+        current = bins[b]
+        if current is None or value < current:
+            bins[b] = value
+
+    # densification：空桶取右侧（循环）第一个非空桶的值，按距离混合
+    if None in bins:
+        original = bins[:]
+        for i in range(NUM_BINS):
+            if original[i] is not None:
+                continue
+            distance = 1
+            while original[(i + distance) % NUM_BINS] is None:
+                distance += 1
+            bins[i] = (original[(i + distance) % NUM_BINS] ^ (distance * _BORROW_MIX)) & _VALUE_MAX
+    return array("I", bins).tobytes()
+
+def guide_signature(guide):
+    return signature(shingles(guide_text(guide)))
+
+# 每个 32 位槽的最低位
+_LANE_LOW_BITS = int.from_bytes(array("I", [1] * NUM_BINS).tobytes(), "little")
+
+def similarity(sig_a, sig_b):
+    """
+    签名估计的 Jaccard 相似度（相同位置取值相同的比例）
+    整个签名作为一个大整数异或，每个 32 位槽的所有位折叠到最低位，统计非零槽数，
+    不必在 Python 中逐个比较 NUM_BINS 个值
+    """
+    diff = int.from_bytes(sig_a, "little") ^ int.from_bytes(sig_b, "little")
+    for shift in (16, 8, 4, 2, 1):
+        diff |= diff >> shift
+    return (NUM_BINS - (diff & _LANE_LOW_BITS).bit_count()) / NUM_BINS
+
+def bands(sig):
+    """LSH 分段键：(段号, 该段字节)"""
+    return [(band, sig[band * _BAND_BYTES:(band + 1) * _BAND_BYTES]) for band in range(BANDS)]
+
+# ============================================
+# 索引
+# ============================================
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        root = item
+        while parent != root:
+            root, parent = parent, self.parent[parent]
+        # 路径压缩
+        while item != root:
+            item, self.parent[item] = self.parent[item], root
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # 较小的作为根，结果与处理顺序无关
+            if rb < ra:
+                ra, rb = rb, ra
+            self.parent[rb] = ra
+
+class NearDuplicateIndex:
+    """
+    slug -> 签名；签名 -> {slug}；LSH 候选桶 (段号, 段字节) -> {签名}
+    屏蔽型号后完全相同的模板指南签名也相同，候选桶中只存一份，比较次数按不同的签名数计算
+    （dict 保持登记顺序，增删都是 O(1)）
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.signatures = {}
+        self.members = {}
+        self.buckets = {}
+
+    def add(self, slug, sig):
+        if slug in self.signatures:
+            self.remove(slug)
+        if sig is None:
+            return
+        self.signatures[slug] = sig
+        members = self.members.get(sig)
+        if members is None:
+            members = self.members[sig] = {}
+            for key in bands(sig):
+                self.buckets.setdefault(key, {})[sig] = None
+        members[slug] = None
+
+    def remove(self, slug):
+        sig = self.signatures.pop(slug, None)
+        if sig is None:
+            return
+        members = self.members[sig]
+        del members[slug]
+        if members:
+            return
+        del self.members[sig]
+        for key in bands(sig):
+            bucket = self.buckets.get(key)
+            if bucket and sig in bucket:
+                del bucket[sig]
+                if not bucket:
+                    del self.buckets[key]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    # ---------- 查询 ----------
+
+    def query(self, sig, exclude=None, limit=10, threshold=None):
+        """与 sig 近似重复的已有指南 [(slug, 相似度)]，按相似度从高到低，最多 limit 个"""
+        threshold = self.threshold if threshold is None else threshold
+        if sig is None:
+            return []
+        found, checked = {}, set()
+        for key in bands(sig):
+            for other in self.buckets.get(key, ()):
+                if other in checked:
+                    continue
+                checked.add(other)
+                score = similarity(sig, other)
+                if score < threshold:
+                    continue
+                for slug in self.members[other]:
+                    if slug != exclude:
+                        found[slug] = score
+                        if len(found) >= limit:
+                            break
+                if len(found) >= limit:
+                    return sorted(found.items(), key=lambda item: (-item[1], item[0]))
+        return sorted(found.items(), key=lambda item: (-item[1], item[0]))
+
+    def query_guide(self, guide, exclude=None, limit=10):
+        return self.query(guide_signature(guide), exclude=exclude, limit=limit)
+
+    def clusters(self, threshold=None, leaders=BUCKET_LEADERS):
+        """
+        近似重复簇 [{"representative", "size", "members": [(slug, 与代表的相似度)]}]，按大小从大到小
+        在不同的签名之间聚类：每个候选桶内的签名只与最多 leaders 个代表比较，
+        总比较次数与签名数近似线性；签名相同的指南直接属于同一簇
+        """
+        threshold = self.threshold if threshold is None else threshold
+        groups = _UnionFind()
+        # 同一对签名会出现在多个段的桶中：已在同一簇的直接跳过，只记住比较失败的对
+        rejected = set()
+        for bucket in self.buckets.values():
+            if len(bucket) < 2:
+                continue
+            bucket_leaders = []
+            for sig in bucket:
+                for leader in bucket_leaders:
+                    if groups.find(leader) == groups.find(sig):
+                        break
+                    pair = (leader, sig)
+                    if pair in rejected:
+                        continue
+                    if similarity(leader, sig) >= threshold:
+                        groups.union(leader, sig)
+                        break
+                    rejected.add(pair)
+                else:
+                    if len(bucket_leaders) < leaders:
+                        bucket_leaders.append(sig)
+
+        by_root = {}
+        for sig, members in self.members.items():
+            by_root.setdefault(groups.find(sig), []).extend(members)
+
+        result = []
+        for slugs in by_root.values():
+            if len(slugs) < 2:
+                continue
+            root = min(slugs)
+            root_sig = self.signatures[root]
+            scored = sorted(((slug, similarity(root_sig, self.signatures[slug]))
+                             for slug in slugs if slug != root),
+                            key=lambda item: (-item[1], item[0]))
+            result.append({"representative": root, "size": len(slugs), "members": scored})
+        result.sort(key=lambda cluster: (-cluster["size"], cluster["representative"]))
+        return result
+
+# ============================================
+# 签名缓存（SQLite）
+# ============================================
+
+def db_path_for(data_dir):
+    return corpus_index.cache_dir_for(data_dir) / DB_NAME
+
+def update_index(data_dir=corpus_index.DATA_DIR, db_path=None, threshold=DEFAULT_THRESHOLD):
+    """
+    随语料索引增量更新签名缓存（只为内容 hash 变化的文件重新计算），返回 (索引, 统计)
+    """
+    data_dir = Path(data_dir)
+    db_path = db_path_for(data_dir) if db_path is None else db_path
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    corpus, _ = corpus_index.update_index(data_dir)
+
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.executescript(SCHEMA)
+        cached = {slug: (digest, sig) for slug, digest, sig in conn.execute("SELECT slug, hash, sig FROM signatures")}
+        index = NearDuplicateIndex(threshold)
+        changed, removed = [], []
+
+        for entry in corpus.entries():
+            slug, digest = entry["slug"], entry["hash"]
+            row = cached.pop(slug, None)
+            if row is not None and row[0] == digest:
+                index.add(slug, row[1])
+                stats["unchanged"] += 1
+                continue
+            try:
+                sig = guide_signature(guide_store.load_guide(data_dir / f"{slug}.json"))
+            except (OSError, ValueError, AttributeError):
+                sig = None
+            index.add(slug, sig)
+            changed.append((slug, digest, sig))
+            stats["updated" if row is not None else "added"] += 1
+
+        removed = list(cached)
+        stats["removed"] = len(removed)
+        if changed or removed:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO signatures (slug, hash, sig) VALUES (?, ?, ?)", changed)
+                conn.executemany("DELETE FROM signatures WHERE slug = ?", [(slug,) for slug in removed])
+    finally:
+        conn.close()
+    return index, stats
+
+_indexes = {}
+
+def get_index(data_dir=corpus_index.DATA_DIR):
+    """每次运行只加载一次的索引（按数据目录缓存）"""
+    data_dir = Path(data_dir)
+    if data_dir not in _indexes:
+        _indexes[data_dir], _ = update_index(data_dir)
+    return _indexes[data_dir]
+
+def check_guide(guide, slug, data_dir=corpus_index.DATA_DIR, policy=None, limit=3):
+    """
+    生成脚本保存前调用：返回 (是否保存, [(近似重复的 slug, 相似度)])
+    应在 slug 注册表登记之前调用，跳过的指南不会占用 slug
+    """
+    policy = DEFAULT_POLICY if policy is None else policy
+    if policy == "off":
+        return True, []
+    matches = get_index(data_dir).query_guide(guide, exclude=slug, limit=limit)
+    return not (matches and policy == "skip"), matches
+
+def register_guide(guide, slug, data_dir=corpus_index.DATA_DIR, policy=None):
+    """指南写入后登记签名，同一次运行中后生成的指南也能看到"""
+    policy = DEFAULT_POLICY if policy is None else policy
+    if policy != "off":
+        get_index(data_dir).add(slug, guide_signature(guide))
+
+def describe_matches(matches):
+    return ", ".join(f"{slug} ({score:.0%})" for slug, score in matches)
+
+# ============================================
+# 主函数
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="近似重复指南检测")
+    parser.add_argument("command", nargs="?", default="update", choices=("update", "report", "check"))
+    parser.add_argument("paths", nargs="*", help="check: 要检查的指南 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--limit", type=int, default=20, help="report: 显示的簇数")
+    parser.add_argument("--json", help="report: 把全部簇写入该 JSON 文件")
+    args = parser.parse_args()
+
+    index, stats = update_index(threshold=args.threshold)
+
+    if args.command == "update":
+        print(f"✅ 签名已更新: {len(index)} 篇指南 "
+              f"(新增 {stats['added']}, 修改 {stats['updated']}, "
+              f"删除 {stats['removed']}, 未变 {stats['unchanged']})")
+    elif args.command == "report":
+        clusters = index.clusters()
+        duplicated = sum(cluster["size"] for cluster in clusters)
+        print(f"📊 {len(index)} 篇指南，{len(clusters)} 个近似重复簇，共 {duplicated} 篇"
+              f"（相似度 ≥ {args.threshold:.0%}）\n")
+        for cluster in clusters[:args.limit]:
+            print(f"🔁 {cluster['representative']}  ({cluster['size']} 篇)")
+            for slug, score in cluster["members"][:10]:
+                print(f"     {score:5.0%}  {slug}")
+            if len(cluster["members"]) > 10:
+                print(f"     ... 另外 {len(cluster['members']) - 10} 篇")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(clusters, f, ensure_ascii=False, indent=2)
+            print(f"\n📝 已写入 {args.json}")
+    elif args.command == "check":
+        if not args.paths:
+            parser.error("check 需要指定指南文件")
+        for path in args.paths:
+            matches = index.query_guide(guide_store.load_guide(path), exclude=Path(path).stem)
+            print(f"{path}: {describe_matches(matches) if matches else '无近似重复'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+生成脚本共用的 Telegram 通知
+原来 ai-content-generator 每条消息 requests.post 一次，auto_seo_vacuum 用没有超时的 urllib 阻塞发送，
+都不处理 429 的 retry_after，Bot API 响应慢时整个运行卡在最后一步。这里：
+
+  - notify() 只把消息放入队列，立即返回；后台线程通过一个长连接发送
+  - 短时间内的多条消息（TELEGRAM_COALESCE_SECONDS 内）合并成一条摘要，超过 4096 字符时分段
+  - 429 按响应中的 parameters.retry_after 等待后重发；5xx / 连接错误按退避重试；
+    Markdown 解析失败（400）时改为纯文本重发
+  - 进程退出时最多等待 TELEGRAM_CLOSE_TIMEOUT 秒把队列发完，不会无限阻塞
+
+TELEGRAM_API_URL 可以指向本地替身服务器（scripts/bench_notifier.py）。
+
+用法:
+    import notifier
+    notifier.notify("✅ 生成完成", log=log)                     # 未配置 token/chat_id 时返回 False
+    notifier.notify("*Auto-SEO* done", parse_mode="Markdown", log=log)
+    notifier.close()                                            # 可选，退出时也会自动调用
+"""
+
+import atexit
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+
+import llm_client
+
+API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+COALESCE_SECONDS = float(os.getenv("TELEGRAM_COALESCE_SECONDS", "2"))
+CLOSE_TIMEOUT = float(os.getenv("TELEGRAM_CLOSE_TIMEOUT", "15"))
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+MAX_MESSAGE_CHARS = 4096            # Telegram 单条消息上限
+DIGEST_SEPARATOR = "\n\n"
+
+_STOP = object()
+
+def _print_log(message, level="INFO"):
+    print(f"[{level}] {message}")
+
+def split_message(text, limit=MAX_MESSAGE_CHARS):
+    """超长文本按行切成不超过 limit 的多段（单行仍超长时硬切）"""
+    if len(text) <= limit:
+        return [text]
+    parts, current = [], ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + 1 + len(line) > limit:
+            parts.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        parts.append(current)
+    return parts
+
+def build_digests(messages, limit=MAX_MESSAGE_CHARS):
+    """
+    messages: [(文本, parse_mode)]，按 parse_mode 分组合并（保持首次出现的顺序）
+    返回 [(摘要文本, parse_mode)]，每段不超过 limit
+    """
+    groups = {}
+    for text, parse_mode in messages:
+        groups.setdefault(parse_mode, []).extend(split_message(text, limit))
+    digests = []
+    for parse_mode, texts in groups.items():
+        current = ""
+        for text in texts:
+            if current and len(current) + len(DIGEST_SEPARATOR) + len(text) > limit:
+                digests.append((current, parse_mode))
+                current = text
+            else:
+                current = f"{current}{DIGEST_SEPARATOR}{text}" if current else text
+        if current:
+            digests.append((current, parse_mode))
+    return digests
+
+class TelegramNotifier:
+    """
+    队列 + 后台发送线程
+    """
+
+    def __init__(self, token, chat_id, api_url=API_URL, coalesce=COALESCE_SECONDS,
+                 timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES, log=None):
+        self.token = token
+        self.chat_id = chat_id
+        self.api_url = api_url.rstrip('/')
+        self.coalesce = coalesce
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.log = log or _print_log
+        self.stats = {"queued": 0, "sent": 0, "requests": 0, "retries": 0, "dropped": 0}
+        self._start()
+        atexit.register(self.close)
+        if hasattr(os, "register_at_fork"):
+            # 发送线程不会随 fork 复制到子进程，需要重新启动
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue = queue.Queue()
+        self._closed = False
+        self._pool = llm_client.ConnectionPool(self.api_url, 1, self.timeout)
+        self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+        self._thread.start()
+
+    # ---------- 调用线程 ----------
+
+    def notify(self, text, parse_mode=None):
+        if self._closed or not text:
+            return False
+        self.stats["queued"] += 1
+        self._queue.put((text, parse_mode))
+        return True
+
+    def flush(self, timeout=None):
+        """等待队列中已有的消息发送完（或放弃）；超时返回 False"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.log(f"⚠️ Telegram 通知 {timeout:.0f}s 内未发送完，放弃剩余消息", "WARN")
+        self._pool.close()
+
+    # ---------- 后台线程 ----------
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # 等待一小段时间，把同一时段的消息合并成一条摘要
+            deadline = time.monotonic() + self.coalesce
+            while item is not _STOP and not isinstance(item, threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            messages = [item for item in batch if isinstance(item, tuple)]
+            try:
+                for text, parse_mode in build_digests(messages):
+                    self._send(text, parse_mode)
+            except Exception as e:
+                # 发送线程不能因为意外错误退出，否则之后的通知都会被静默丢弃
+                self.stats["dropped"] += len(messages)
+                self.log(f"⚠️ Telegram 通知发送出错: {e!r}", "WARN")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if batch[-1] is _STOP:
+                return
+
+    def _post(self, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.stats["requests"] += 1
+        status, headers, data = self._pool.post(f"/bot{self.token}/sendMessage", body,
+                                                {"Content-Type": "application/json"})
+        try:
+            result = json.loads(data)
+        except ValueError:
+            result = {}
+        if not isinstance(result, dict):
+            # 代理等返回的非对象 JSON（列表、字符串）
+            result = {}
+        return status, headers, result
+
+    def _send(self, text, parse_mode):
+        payload = {"chat_id": self.chat_id, "text": text}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+        attempt = 0
+        while True:
+            try:
+                status, headers, result = self._post(payload)
+            except (OSError, http.client.HTTPException) as e:
+                status, headers, result = None, None, {"description": repr(e)}
+
+            if status == 200 and result.get("ok", True):
+                self.stats["sent"] += 1
+                self.log("✅ Telegram 通知发送成功")
+                return True
+            if status == 400 and "parse_mode" in payload:
+                # Markdown 实体解析失败（例如文件名中的下划线）：改为纯文本
+                payload.pop("parse_mode")
+                continue
+
+            retryable = status is None or status == 429 or status >= 500
+            if not retryable or attempt >= self.max_retries:
+                self.stats["dropped"] += 1
+                self.log(f"⚠️ Telegram 通知发送失败: {status} {result.get('description', '')}", "WARN")
+                return False
+            retry_after = (result.get("parameters") or {}).get("retry_after")
+            if retry_after is None:
+                retry_after = llm_client.retry_after_header(headers)
+            attempt += 1
+            self.stats["retries"] += 1
+            time.sleep(llm_client.backoff_delay(attempt - 1, retry_after))
+
+# ============================================
+# 默认实例
+# ============================================
+
+_notifier = None
+_lock = threading.Lock()
+
+def get_notifier(log=None):
+    """按 TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID 创建的通知器；未配置时返回 None"""
+    global _notifier
+    with _lock:
+        if _notifier is None:
+            token = os.environ.get("TELEGRAM_BOT_TOKEN")
+            chat_id = os.environ.get("TELEGRAM_CHAT_ID")
+            if not token or not chat_id:
+                return None
+            _notifier = TelegramNotifier(token, chat_id, log=log)
+        return _notifier
+
+def notify(text, parse_mode=None, log=None):
+    """放入发送队列后立即返回；未配置 Telegram 时返回 False"""
+    instance = get_notifier(log)
+    return instance.notify(text, parse_mode) if instance else False
+
+def close(timeout=CLOSE_TIMEOUT):
+    if _notifier is not None:
+        _notifier.close(timeout)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+问题类型匹配器
+把 detect_problem_type 的检测规则一次性编译成 Aho-Corasick 自动机，
+每个字符串只扫描一遍即可得到最高优先级的问题类型
+"""
+
+# ============================================
+# 检测规则（按优先级排序，越靠前越优先）
+# ============================================
+
+DETECTION_RULES = [
+    # 电池相关问题
+    (['battery', 'batteries', 'battery life', 'dead battery', 'replace battery'], 'battery'),
+    (['battery replacement', 'swap battery', 'change battery'], 'battery'),
+
+    # 充电相关问题
+    (['charging', 'charger', 'won\'t charge', 'not charging', 'charge indicator'], 'charging'),
+    (['charging problems', 'charging issues', 'charge port'], 'charging'),
+
+    # 错误代码
+    (['error', 'error code', 'error codes', 'flashing', 'beeping'], 'error_codes'),
+
+    # 吸力问题
+    (['suction', 'losing suction', 'low suction', 'no suction', 'weak suction'], 'suction'),
+    (['suction power', 'poor suction', 'suction problems'], 'suction'),
+
+    # 电源/开关问题
+    (['not working', 'won\'t turn on', 'won\'t start', 'won\'t power', 'power issues'], 'power'),
+    (['dead', 'no power', 'won\'t work', 'not starting'], 'power'),
+
+    # 刷毛相关问题
+    (['brush', 'brush roll', 'brushroll', 'brush not spinning'], 'brush'),
+    (['roller', 'rotating brush', 'spinning brush'], 'brush'),
+
+    # 滤网问题
+    (['filter', 'filters', 'filter cleaning', 'clogged filter'], 'filter'),
+    (['filter replacement', 'change filter', 'dirty filter'], 'filter'),
+
+    # 配件/附件问题
+    (['attachment', 'attachments', 'tools', 'accessories', 'wand', 'hose'], 'attachment'),
+    (['attachment issues', 'loose attachment', 'broken attachment'], 'attachment'),
+
+    # 电机问题
+    (['motor', 'motor replacement', 'burnt motor', 'motor noise'], 'motor'),
+    (['loud noise', 'grinding noise', 'screaming'], 'motor'),
+
+    # 皮带问题
+    (['belt', 'belt replacement', 'broken belt', 'drive belt'], 'belt'),
+    (['belt slip', 'loose belt'], 'belt'),
+
+    # WiFi/连接问题
+    (['wifi', 'wi-fi', 'connecting', 'connection', 'network'], 'connectivity'),
+    (['app', 'connection lost', 'won\'t connect'], 'connectivity'),
+
+    # 泄漏问题
+    (['leaking', 'leak', 'spitting', 'spraying'], 'leak'),
+
+    # 脉动问题
+    (['pulsing', 'pulse', 'surging'], 'pulsing'),
+
+    # 噪音问题
+    (['noise', 'noisy', 'loud', 'sound'], 'noise'),
+
+    # 加热问题
+    (['heating', 'heat', 'hot water', 'steam'], 'heating'),
+
+    # 地图问题（机器人吸尘器）
+    (['mapping', 'map', 'navigation', 'lost', 'stuck'], 'mapping')
+]
+
+DEFAULT_PROBLEM_TYPE = 'general'
+
+# 用作 keyword 与 problem_desc 之间的分隔符，保证模式不会跨越两段文本
+_SEPARATOR = '\x00'
+
+# ============================================
+# Aho-Corasick 自动机
+# ============================================
+
+class ProblemMatcher:
+    """
+    编译后的多模式匹配器
+    每个模式记录它所在规则的最小下标（优先级），
+    扫描时取命中模式中优先级最高（下标最小）的规则
+    """
+
+    def __init__(self, rules=DETECTION_RULES, default=DEFAULT_PROBLEM_TYPE):
+        self.rules = [(list(keywords), problem_type) for keywords, problem_type in rules]
+        self.default = default
+        self._no_match = len(self.rules)
+        self._build()
+
+    def _build(self):
+        """构建 trie、失败指针，并展开为完整的状态转移表"""
+        goto = [{}]
+        output = [self._no_match]
+
+        for priority, (keywords, _) in enumerate(self.rules):
+            for kw in keywords:
+                state = 0
+                for ch in kw.lower():
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        output.append(self._no_match)
+                    state = nxt
+                output[state] = min(output[state], priority)
+
+        # BFS 计算失败指针，同时把失败链上的最优优先级合并进来
+        fail = [0] * len(goto)
+        order = []
+        queue = list(goto[0].values())
+        while queue:
+            order.extend(queue)
+            next_queue = []
+            for state in queue:
+                for ch, nxt in goto[state].items():
+                    f = fail[state]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    fail[nxt] = goto[f].get(ch, 0)
+                    output[nxt] = min(output[nxt], output[fail[nxt]])
+                    next_queue.append(nxt)
+            queue = next_queue
+
+        # 展开为 DFA：每个状态直接给出所有出现过字符的下一状态，扫描时无需回溯
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        for state in order:
+            table = dict(delta[fail[state]])
+            table.update(goto[state])
+            delta[state] = table
+
+        self._delta = delta
+        self._output = output
+
+    def scan(self, text):
+        """扫描一次字符串，返回命中的最高优先级（未命中返回规则数）"""
+        delta = self._delta
+        output = self._output
+        best = self._no_match
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            priority = output[state]
+            if priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return best
+
+    def classify(self, keyword, problem_desc=""):
+        """返回与 detect_problem_type 完全一致的问题类型"""
+        keyword_lower = keyword.lower()
+        desc_lower = problem_desc.lower()
+
+        # problem_desc 通常就是 keyword 的一部分，此时只需扫描 keyword
+        if desc_lower in keyword_lower:
+            text = keyword_lower
+        else:
+            text = keyword_lower + _SEPARATOR + desc_lower
+
+        priority = self.scan(text)
+        if priority == self._no_match:
+            return self.default
+        return self.rules[priority][1]
+
+    def classify_many(self, keywords):
+        """
+        批量分类
+        keywords 中的元素可以是关键词字符串，也可以是 (keyword, problem_desc) 元组；
+        同一批次内重复出现的输入只计算一次
+        """
+        results = []
+        seen = {}
+        for item in keywords:
+            if isinstance(item, str):
+                key = (item, "")
+            else:
+                key = tuple(item)
+            problem_type = seen.get(key)
+            if problem_type is None:
+                problem_type = self.classify(*key)
+                seen[key] = problem_type
+            results.append(problem_type)
+        return results
+
+# 默认匹配器（模块加载时编译一次）
+DEFAULT_MATCHER = ProblemMatcher()
+
+def classify(keyword, problem_desc=""):
+    """使用默认匹配器检测问题类型"""
+    return DEFAULT_MATCHER.classify(keyword, problem_desc)
+
+def classify_many(keywords):
+    """使用默认匹配器批量检测问题类型"""
+    return DEFAULT_MATCHER.classify_many(keywords)
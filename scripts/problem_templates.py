@@ -0,0 +1,1182 @@
+#!/usr/bin/env python3
+"""
+问题模板注册表
+generate_problem_by_type、动态 CTA、E-E-A-T 人设和 SEO 长尾词原来每次调用都把所有模板的
+f-string 渲染一遍，再只取其中一个。这里把模板保存为带占位符的普通字符串：
+
+  - 首次使用某个类型时才编译（编译结果缓存），之后只渲染被选中的那一个
+  - 编译时检查占位符，模板中出现未知占位符会直接报错，而不是生成时才 KeyError
+  - PROBLEM_TEMPLATE_FILES 环境变量可以指定额外的 JSON 模板文件（多个用 os.pathsep 分隔），
+    新增或覆盖问题类型不需要修改代码，格式见 TemplateRegistry.load_file
+
+占位符:
+    问题模板      {brand} {model} {display_desc}
+    CTA           {model} {code}
+    人设开场白    {brand} {model} {problem}
+    SEO 长尾词    {model}
+"""
+
+import json
+import os
+import string
+
+from problem_matcher import DETECTION_RULES, DEFAULT_MATCHER, ProblemMatcher
+
+PROBLEM_FIELDS = frozenset({"brand", "model", "display_desc"})
+CTA_FIELDS = frozenset({"model", "code"})
+OPENING_FIELDS = frozenset({"brand", "model", "problem"})
+SEO_FIELDS = frozenset({"model"})
+
+DEFAULT_TYPE = "general"
+DEFAULT_PERSONA = "tech_expert"
+
+# ============================================
+# 💎 高质量 (Quality) - E-E-A-T 人设
+# ============================================
+
+PERSONAS = {
+    "tech_expert": {
+        "name": "技术专家",
+        "tone": "专业、分析性、经验丰富",
+        "openings": [
+            "Last weekend, I spent 4 hours troubleshooting a {model}...",
+            "After testing 15 different {brand} units, I've found the pattern...",
+            "I've been repairing vacuum cleaners for 12 years, and here's what most people get wrong about {problem}...",
+            "Let me walk you through the exact repair process I use in my shop...",
+            "The service manual doesn't tell you this, but here's the real fix..."
+        ],
+        "phrases": [
+            "Based on my technical analysis...",
+            "The root cause is almost always...",
+            "Here's the professional solution...",
+            "Most DIY tutorials miss this critical step...",
+            "I've seen this issue hundreds of times..."
+        ]
+    },
+    "frustrated_user": {
+        "name": "愤怒用户",
+        "tone": "直接、情绪化、痛点共鸣",
+        "openings": [
+            "I was about to throw my {model} against the wall...",
+            "It happened AGAIN. Right in the middle of cleaning...",
+            "I'm so done with this {problem} issue. Here's how I finally fixed it...",
+            "After 3 repair shops couldn't fix it, I figured it out myself...",
+            "Warning: Don't make the same mistake I did with my {model}..."
+        ],
+        "phrases": [
+            "Here's what actually works (trust me, I tried everything)...",
+            "Skip the nonsense, here's the fix...",
+            "This will save you hours of frustration...",
+            "Why isn't this in the manual?!",
+            "Finally, a solution that actually lasts..."
+        ]
+    },
+    "product_analyst": {
+        "name": "产品分析师",
+        "tone": "客观、数据驱动、比较分析",
+        "openings": [
+            "In my comprehensive testing of 8 vacuum models...",
+            "After analyzing 500+ user complaints about {model}...",
+            "Let's cut through the marketing hype and look at the real data...",
+            "I've compared {brand} against 12 competitors, here's what stands out...",
+            "The design flaw behind this {problem} issue is actually fascinating..."
+        ],
+        "phrases": [
+            "The data clearly shows...",
+            "Based on extensive testing...",
+            "This is a known design limitation...",
+            "Here's the cost-benefit analysis...",
+            "Industry standards suggest..."
+        ]
+    }
+}
+
+# 问题类型 -> 人设
+PERSONA_MAPPING = {
+    "battery": "tech_expert",      # 电池问题用技术专家
+    "charging": "tech_expert",     # 充电问题用技术专家
+    "motor": "tech_expert",        # 电机问题用技术专家
+    "error_codes": "tech_expert",  # 错误代码用技术专家
+    "not_working": "frustrated_user",  # 无法工作用愤怒用户
+    "pulsing": "frustrated_user",  # 脉冲问题用愤怒用户
+    "leaking": "frustrated_user",  # 漏水用愤怒用户
+    "brush": "product_analyst",    # 刷头问题用分析师
+    "filter": "product_analyst",   # 滤网用分析师
+    "suction": "product_analyst",  # 吸力用分析师
+    "general": "tech_expert"       # 默认用技术专家
+}
+
+# ============================================
+# 💰 高转化 (Conversion) - 动态 CTA（根据问题类型和痛点定制）
+# ============================================
+
+DYNAMIC_CTAS = {
+    "battery": {
+        "urgency": "high",
+        "cta_text": "⚡ Stop Waiting - Fix Your {model} Battery Today",
+        "cta_subtext": "Don't let a dead battery ruin your cleaning routine. Professional replacement ready to ship.",
+        "color": "red",
+        "icon": "🔋",
+        "pain_point": "Your vacuum won't hold a charge"
+    },
+    "charging": {
+        "urgency": "high",
+        "cta_text": "🔌 Fix Charging Issues - Get Your {model} Working Again",
+        "cta_subtext": "Stop dealing with the frustration of a vacuum that won't charge. We have the solution.",
+        "color": "orange",
+        "icon": "⚡",
+        "pain_point": "Your vacuum won't charge properly"
+    },
+    "not_charging": {
+        "urgency": "critical",
+        "cta_text": "🚨 Don't Wait - Your {model} Needs This Fix Now",
+        "cta_subtext": "Every day without your vacuum is a day your home isn't clean. Fast shipping available.",
+        "color": "red",
+        "icon": "⏰",
+        "pain_point": "Complete charging failure"
+    },
+    "brush": {
+        "urgency": "medium",
+        "cta_text": "🔄 Restore Full Cleaning Power - Replace Your Brush",
+        "cta_subtext": "A worn brush won't clean anything. Get genuine replacement for maximum performance.",
+        "color": "blue",
+        "icon": "🧹",
+        "pain_point": "Poor cleaning performance"
+    },
+    "filter": {
+        "urgency": "medium",
+        "cta_text": "🌬️ Breathe Easy - Replace Clogged Filters Today",
+        "cta_subtext": "Dirty filters reduce suction and damage your motor. Protect your investment.",
+        "color": "green",
+        "icon": "✨",
+        "pain_point": "Reduced suction and air quality"
+    },
+    "motor": {
+        "urgency": "high",
+        "cta_text": "💪 Professional Motor Replacement - Don't Risk Further Damage",
+        "cta_subtext": "A failing motor can destroy your vacuum. Expert replacement service available.",
+        "color": "red",
+        "icon": "⚙️",
+        "pain_point": "Motor failure or strange noises"
+    },
+    "suction": {
+        "urgency": "medium",
+        "cta_text": "📈 Restore Maximum Suction - Professional Parts Ready",
+        "cta_subtext": "Weak suction? We have the exact parts to restore your {model}'s power.",
+        "color": "blue",
+        "icon": "💨",
+        "pain_point": "Weak suction power"
+    },
+    "error_codes": {
+        "urgency": "high",
+        "cta_text": "🔧 Decoding Error {code}? We Have the Solution",
+        "cta_subtext": "Don't let mysterious error codes stop you. Expert diagnostics and parts available.",
+        "color": "orange",
+        "icon": "❓",
+        "pain_point": "Confusing error messages"
+    },
+    "attachment": {
+        "urgency": "low",
+        "cta_text": "🔗 Fix Attachment Issues - Get Your Tools Working",
+        "cta_subtext": "Loose or broken attachments? We have genuine replacements ready to ship.",
+        "color": "blue",
+        "icon": "🛠️",
+        "pain_point": "Attachments not working properly"
+    },
+    "belt": {
+        "urgency": "high",
+        "cta_text": "⚙️ Replace Worn Belt - Restore Full Performance",
+        "cta_subtext": "A broken belt means no cleaning. Fast replacement service available.",
+        "color": "orange",
+        "icon": "🔧",
+        "pain_point": "Brush not spinning"
+    },
+    "leaking": {
+        "urgency": "high",
+        "cta_text": "🛑 Stop the Leak - Fix Your {model} Now",
+        "cta_subtext": "Water damage can destroy your vacuum. Quick fixes available.",
+        "color": "red",
+        "icon": "💧",
+        "pain_point": "Water or liquid leaking"
+    },
+    "pulsing": {
+        "urgency": "high",
+        "cta_text": "⚡ Fix Pulsing Issue - Stop the Annoying On-Off Cycle",
+        "cta_subtext": "Pulsing means a sensor or blockage issue. We have the parts to fix it permanently.",
+        "color": "orange",
+        "icon": "📳",
+        "pain_point": "Vacuum keeps pulsing on and off"
+    },
+    "noise": {
+        "urgency": "medium",
+        "cta_text": "🔇 Silence Strange Noises - Protect Your Vacuum",
+        "cta_subtext": "Unusual noises mean wear or damage. Fix it before it becomes a costly repair.",
+        "color": "yellow",
+        "icon": "🔊",
+        "pain_point": "Loud or unusual noises"
+    },
+    "heating": {
+        "urgency": "high",
+        "cta_text": "🌡️ Overheating? Fix It Before Permanent Damage",
+        "cta_subtext": "Overheating can kill your motor. Quick diagnosis and repair available.",
+        "color": "red",
+        "icon": "🔥",
+        "pain_point": "Vacuum getting too hot"
+    },
+    "connectivity": {
+        "urgency": "low",
+        "cta_text": "📶 Fix Connection Issues - Get Smart Features Working",
+        "cta_subtext": "WiFi or app problems? We can help restore your smart vacuum's features.",
+        "color": "blue",
+        "icon": "📱",
+        "pain_point": "Can't connect to app or WiFi"
+    },
+    "mapping": {
+        "urgency": "low",
+        "cta_text": "🗺️ Fix Navigation Issues - Restore Smart Cleaning",
+        "cta_subtext": "Mapping problems? We have sensors and parts to get your robot vacuum back on track.",
+        "color": "blue",
+        "icon": "🤖",
+        "pain_point": "Robot vacuum navigation problems"
+    },
+    "general": {
+        "urgency": "low",
+        "cta_text": "🔧 Get Your {model} Running Like New",
+        "cta_subtext": "Whatever the issue, we have the parts and expertise to help.",
+        "color": "blue",
+        "icon": "✅",
+        "pain_point": "General performance issues"
+    }
+}
+
+# ============================================
+# 问题模板
+# ============================================
+
+PROBLEM_TEMPLATES = {
+    "battery": {
+        "id": "battery-replacement",
+        "title": "How to Replace {model} Battery",
+        "description": "Step-by-step guide to replace the battery in your {model}. Restore runtime and performance with a new battery.",
+        "possible_causes": [
+            "Battery has degraded after 2-3 years of regular use",
+            "Battery cells have failed due to age or heat",
+            "Battery is not holding charge for more than 10 minutes",
+            "Charging cycles have exceeded the battery's lifespan",
+            "Battery has been stored at low charge for extended periods"
+        ],
+        "solution_steps": [
+            "Purchase a genuine replacement battery compatible with {model}",
+            "Power off the vacuum completely and remove from charger",
+            "Locate the battery compartment on your {model} (typically on the rear or bottom panel)",
+            "Use a suitable screwdriver to remove the battery cover screws",
+            "Carefully disconnect the old battery connector, noting the polarity",
+            "Remove the old battery and inspect the compartment for any damage",
+            "Install the new battery, ensuring correct polarity (+ and - alignment)",
+            "Secure the battery compartment cover and tighten all screws",
+            "Charge your {model} for 4-6 hours before the first use"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Battery",
+                "search_query": "{model} battery"
+            }
+        ]
+    },
+    "charging": {
+        "id": "charging-issues",
+        "title": "Charging Problems & Solutions",
+        "description": "Troubleshooting and fixing charging issues with {brand} {model}.",
+        "possible_causes": [
+            "Dirty charging contacts",
+            "Faulty charger or docking station",
+            "Battery cannot accept charge anymore",
+            "Charging port damage"
+        ],
+        "solution_steps": [
+            "Clean the metal contacts on both vacuum and charger",
+            "Try a different power outlet",
+            "Check if the charger LED indicator is working",
+            "Inspect the charging port for debris or damage",
+            "Test with a different charger if available",
+            "If charger is faulty, replace with genuine {brand} charger"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Charger",
+                "search_query": "{model} charger replacement"
+            }
+        ]
+    },
+    "filter": {
+        "id": "filter-maintenance",
+        "title": "Filter Cleaning & Replacement",
+        "description": "Proper filter maintenance for optimal performance of {brand} {model}.",
+        "possible_causes": [
+            "Filter is clogged with dust and debris",
+            "Filter hasn't been cleaned recently",
+            "Filter is damaged or torn",
+            "Using wrong filter type"
+        ],
+        "solution_steps": [
+            "Check the filter indicator light (if available)",
+            "Remove the pre-filter and post-filter",
+            "Tap the filter to remove loose dust",
+            "Rinse with cold water only (no soap)",
+            "Shake gently and let air dry for 24 hours",
+            "Replace if filter is damaged or performance doesn't improve"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Filter",
+                "search_query": "{model} filter"
+            }
+        ]
+    },
+    "power": {
+        "id": "power-issues",
+        "title": "Vacuum Won't Turn On or Start",
+        "description": "Diagnosing why your {brand} {model} won't power on.",
+        "possible_causes": [
+            "Battery is completely drained",
+            "Battery is dead and needs replacement",
+            "Power button malfunction",
+            "Internal electrical fault"
+        ],
+        "solution_steps": [
+            "Charge the vacuum for at least 4 hours",
+            "Check all connections are secure",
+            "Test the power button responsiveness",
+            "Look for any error lights or beeps",
+            "If completely dead, battery replacement is likely needed"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Diagnostic Tool",
+                "search_query": "{model} troubleshooting"
+            }
+        ]
+    },
+    "brush": {
+        "id": "brush-roll-issues",
+        "title": "Brush Roll Not Spinning",
+        "description": "Fixing brush roll problems on {brand} {model}.",
+        "possible_causes": [
+            "Debris tangled around brush roll",
+            "Brush roll belt is broken",
+            "Motor for brush roll failed",
+            "Obstruction preventing rotation"
+        ],
+        "solution_steps": [
+            "Turn off and unplug the vacuum",
+            "Remove the brush roll cover",
+            "Clean all hair and debris from brush roll",
+            "Check the belt for wear or damage",
+            "Test brush roll motor (if applicable)",
+            "Replace belt or brush roll if needed"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Brush Roll",
+                "search_query": "{model} brush roll replacement"
+            }
+        ]
+    },
+    "suction": {
+        "id": "low-suction",
+        "title": "Loss of Suction Power",
+        "description": "Restoring suction power to your {brand} {model}.",
+        "possible_causes": [
+            "Clogged filters or dust bin",
+            "Blockage in the wand or hose",
+            "Brush roll not spinning",
+            "Dust bin is overfilled"
+        ],
+        "solution_steps": [
+            "Empty the dust bin completely",
+            "Clean or replace all filters",
+            "Check for blockages in the vacuum head",
+            "Inspect the wand and hose for clogs",
+            "Remove any debris from the air pathways",
+            "Test suction after each step"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Filter",
+                "search_query": "{model} suction problem"
+            }
+        ]
+    },
+    "connectivity": {
+        "id": "wifi-connectivity",
+        "title": "WiFi & App Connection Issues",
+        "description": "Fixing connectivity problems with {brand} {model}.",
+        "possible_causes": [
+            "WiFi network changed",
+            "App needs update",
+            "Firmware outdated",
+            "Router interference"
+        ],
+        "solution_steps": [
+            "Ensure vacuum is in WiFi coverage area",
+            "Update the companion app to latest version",
+            "Reset vacuum's WiFi connection",
+            "Restart your router",
+            "Reconnect through the app step by step",
+            "Update vacuum firmware if available"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} App",
+                "search_query": "{model} app download"
+            }
+        ]
+    },
+    "error_codes": {
+        "id": "error-codes-troubleshooting",
+        "title": "{model} Error Codes Explained",
+        "description": "Understanding and resolving error codes on your {model}. Complete error code reference with solutions.",
+        "possible_causes": [
+            "Brush roll obstruction detected by sensors",
+            "Battery communication failure",
+            "Motor overload or overheating",
+            "Filter clogged or not properly installed",
+            "Internal sensor malfunction",
+            "PCB board error detected"
+        ],
+        "solution_steps": [
+            "Turn off your {model} and wait 30 seconds",
+            "Check for any visible obstructions in the brush roll area",
+            "Remove and clean all filters thoroughly",
+            "Ensure the dust bin is properly installed and not overfilled",
+            "Check battery connections and terminals for corrosion",
+            "Look up the specific error code in the user manual",
+            "If error persists after troubleshooting, contact {brand} support",
+            "Consider resetting the vacuum by removing the battery for 1 minute"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Filter",
+                "search_query": "{model} filter"
+            },
+            {
+                "name": "{model} Brush Roll",
+                "search_query": "{model} brush roll"
+            }
+        ]
+    },
+    "attachment": {
+        "id": "attachment-troubleshooting",
+        "title": "{model} Attachment & Accessory Problems",
+        "description": "Solving issues with attachments, tools, and accessories for your {model}. Fix loose or malfunctioning attachments.",
+        "possible_causes": [
+            "Attachment not properly locked into place",
+            "Connection mechanism is dirty or damaged",
+            "Accessory release button is stuck or broken",
+            "Wand or hose is clogged with debris",
+            "Electrical contacts are dirty or corroded",
+            "Attachment motor has failed"
+        ],
+        "solution_steps": [
+            "Remove all attachments from your {model} and inspect them",
+            "Clean the connection points with a dry cloth",
+            "Check the release mechanism for debris or damage",
+            "Test each attachment individually to identify the problematic one",
+            "Lubricate moving parts if applicable (check manual first)",
+            "Ensure attachments are fully clicked into position",
+            "Inspect the electrical contacts for corrosion or dirt",
+            "Replace the attachment if the issue persists after cleaning"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Attachment",
+                "search_query": "{model} attachment"
+            },
+            {
+                "name": "{model} Wand or Hose",
+                "search_query": "{model} wand hose"
+            }
+        ]
+    },
+    "motor": {
+        "id": "motor-replacement",
+        "title": "How to Replace {model} Motor",
+        "description": "Complete motor replacement guide for {model}. Fix loud noises, burning smells, or complete motor failure.",
+        "possible_causes": [
+            "Motor bearings have worn out after years of use",
+            "Motor has overheated and windings are damaged",
+            "Foreign object damaged the motor fan or impeller",
+            "Water or liquid damage to motor electronics",
+            "Electrical surge or short circuit burned motor",
+            "Brushes have worn down (for brushed motors)"
+        ],
+        "solution_steps": [
+            "Confirm the motor is the issue on your {model} (listen for unusual sounds)",
+            "Purchase a compatible replacement motor specific to {model}",
+            "Remove the battery and any external covers",
+            "Document all wire connections with photos before disconnecting",
+            "Carefully disconnect all motor electrical connectors",
+            "Remove mounting screws securing the motor housing",
+            "Lift out the old motor from your {model} carefully",
+            "Install the new motor and reconnect all wires matching your photos",
+            "Reassemble in reverse order and test operation"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Motor",
+                "search_query": "{model} motor"
+            },
+            {
+                "name": "Motor Wiring Harness",
+                "search_query": "{model} wire harness"
+            }
+        ]
+    },
+    "belt": {
+        "id": "belt-replacement",
+        "title": "How to Replace {model} Belt",
+        "description": "Step-by-step belt replacement guide for {model}. Fix brush roll not spinning or loss of cleaning power.",
+        "possible_causes": [
+            "Belt has stretched or worn over time",
+            "Belt has broken due to age or obstruction",
+            "Belt slipped off the pulley due to debris",
+            "Belt melted from motor friction or overheating",
+            "Brush roll seized causing belt failure",
+            "Poor maintenance led to premature belt wear"
+        ],
+        "solution_steps": [
+            "Purchase the correct replacement belt for {model}",
+            "Remove the battery and bottom plate from {model}",
+            "Remove the brush roll and set aside",
+            "Clean any debris or hair from the pulley area",
+            "Remove the old belt from both motor and brush roll pulleys",
+            "Install the new belt, ensuring proper tension",
+            "Verify the belt sits correctly in the pulley grooves",
+            "Reinstall the brush roll and test rotation",
+            "Reassemble the vacuum and test operation"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Belt",
+                "search_query": "{model} belt"
+            },
+            {
+                "name": "Brush Roll (recommended to replace together)",
+                "search_query": "{model} brush roll"
+            }
+        ]
+    },
+    "leak": {
+        "id": "leak-troubleshooting",
+        "title": "{model} Leaking Water or Solution",
+        "description": "Fixing leak issues on your {model}. Stop water or cleaning solution from dripping during use.",
+        "possible_causes": [
+            "Dirty tank cap seal or O-ring is damaged",
+            "Crack in the clean or dirty water tank",
+            "Overfilled tank causing overflow during operation",
+            "Loose hose connection inside the vacuum",
+            "Damaged spray nozzle or valve",
+            "Seal degraded on the brush nozzle assembly"
+        ],
+        "solution_steps": [
+            "Empty both tanks from your {model} completely",
+            "Inspect tank caps for damaged or missing seals",
+            "Check both clean and dirty tanks for cracks or damage",
+            "Examine all hose connections for tightness",
+            "Test the spray trigger to see if it leaks continuously",
+            "Clean the spray nozzle with warm water to remove clogs",
+            "Replace the tank cap or nozzle assembly if damaged",
+            "Ensure tanks are not filled above the MAX line"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Tank Cap",
+                "search_query": "{model} tank cap"
+            },
+            {
+                "name": "{model} Spray Nozzle",
+                "search_query": "{model} spray nozzle"
+            }
+        ]
+    },
+    "pulsing": {
+        "id": "pulsing-troubleshooting",
+        "title": "{model} Pulsing or Surging Power",
+        "description": "Fixing pulsing, surging, or inconsistent power on your {model}. Understand why power fluctuates and how to resolve it.",
+        "possible_causes": [
+            "Dirty or clogged filters causing airflow restriction",
+            "Bin is overfilled restricting airflow",
+            "Brush roll is obstructed causing resistance changes",
+            "Motor is failing and power delivery is inconsistent",
+            "PCB board issue causing voltage fluctuations",
+            "Battery is failing and cannot deliver consistent power"
+        ],
+        "solution_steps": [
+            "Empty and clean the dust bin on your {model}",
+            "Remove and clean all filters (let them dry completely for 24 hours)",
+            "Clean the brush roll and remove any tangled hair or debris",
+            "Check for any blockages in the air pathways",
+            "Test with a fully charged battery to rule out power issues",
+            "If pulsing continues, the motor or PCB may need replacement",
+            "Contact {brand} support if the issue persists after cleaning"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Filter",
+                "search_query": "{model} filter"
+            },
+            {
+                "name": "{model} Replacement Motor",
+                "search_query": "{model} motor"
+            }
+        ]
+    },
+    "noise": {
+        "id": "noise-troubleshooting",
+        "title": "{model} Making Loud or Unusual Noises",
+        "description": "Diagnosing and fixing loud noises from your {model}. Grinding, screaming, rattling, or high-pitched sounds explained.",
+        "possible_causes": [
+            "Debris caught in the brush roll or impeller",
+            "Worn-out bearings in the motor or brush roll",
+            "Broken or damaged belt flopping around",
+            "Loose screws or components vibrating",
+            "Stone or hard object damaging internal parts",
+            "Motor armature rubbing against the housing"
+        ],
+        "solution_steps": [
+            "Turn off your {model} immediately to prevent further damage",
+            "Remove the brush roll and clean thoroughly",
+            "Inspect the belt for signs of wear or damage",
+            "Check for any loose screws or components and tighten",
+            "Run the vacuum without the brush head to isolate the noise source",
+            "If noise comes from the main body, the motor may be failing",
+            "Contact manufacturer support for repair if motor related",
+            "Consider professional repair service for complex mechanical issues"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Brush Roll",
+                "search_query": "{model} brush roll"
+            },
+            {
+                "name": "{model} Belt",
+                "search_query": "{model} belt"
+            }
+        ]
+    },
+    "heating": {
+        "id": "heating-troubleshooting",
+        "title": "{model} Not Heating Properly",
+        "description": "Fixing heating issues on your {model}. Restore steam or hot water cleaning functionality.",
+        "possible_causes": [
+            "Heating element has burned out or failed",
+            "Thermal fuse has blown due to overheating",
+            "PCB board issue preventing heater activation",
+            "Water tank is empty or not properly seated",
+            "Scale or mineral buildup blocking heating element",
+            "Pump failure preventing water circulation to heater"
+        ],
+        "solution_steps": [
+            "Ensure the water tank on your {model} is filled",
+            "Check that the tank is properly seated and detected",
+            "Clean the heating element with vinegar to remove scale buildup",
+            "Inspect the thermal fuse for continuity",
+            "Test the heater with a multimeter for power supply",
+            "Check all electrical connections to the heating element",
+            "Replace the heating element or thermal fuse if defective",
+            "Run a descaling cycle if available on your model"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Heating Element",
+                "search_query": "{model} heater"
+            },
+            {
+                "name": "{model} Thermal Fuse",
+                "search_query": "{model} thermal fuse"
+            }
+        ]
+    },
+    "mapping": {
+        "id": "mapping-troubleshooting",
+        "title": "{model} Navigation & Mapping Problems",
+        "description": "Fixing mapping, navigation, and getting lost issues on your {model}. Restore proper cleaning path coverage.",
+        "possible_causes": [
+            "Wheel encoders are dirty or obstructed",
+            "Bumper sensors are not detecting obstacles properly",
+            "Cliff sensors are dirty or miscalibrated",
+            "Firmware needs updating for better navigation",
+            "Battery low causing navigation failures",
+            "Home base location has moved or is obstructed"
+        ],
+        "solution_steps": [
+            "Clean all wheels and encoders on your {model} with a dry cloth",
+            "Wipe the bumper sensors and cliff sensors with a damp microfiber cloth",
+            "Perform a factory reset on your {model} (this will clear the map)",
+            "Update to the latest firmware for improved navigation algorithms",
+            "Clear the home base area of obstacles",
+            "Let your {model} complete a full mapping cycle in a small room first",
+            "Ensure adequate lighting for better camera and sensor performance",
+            "Check wheel performance - stuck wheels cause mapping errors"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Wheel Assembly",
+                "search_query": "{model} wheel"
+            },
+            {
+                "name": "{model} Sensor Array",
+                "search_query": "{model} sensors"
+            }
+        ]
+    },
+    "general": {
+        "id": "general-troubleshooting",
+        "title": "How to Fix {display_desc}",
+        "description": "Complete troubleshooting and repair guide for {display_desc}. Diagnostic steps, common problems, and professional solutions to restore your {model} to optimal performance.",
+        "possible_causes": [
+            "Normal wear and tear on {model} components",
+            "Lack of regular maintenance and cleaning",
+            "Specific part failure or degradation",
+            "Usage beyond recommended capacity",
+            "Environmental factors (dust, moisture, temperature)",
+            "Age-related performance decline"
+        ],
+        "solution_steps": [
+            "Identify the specific issue with your {model} - note any unusual sounds, lights, or behaviors",
+            "Consult the official user manual for model-specific troubleshooting guidance",
+            "Perform basic diagnostics: check filters, inspect brush rolls, test battery performance",
+            "Clean all accessible parts of your {model} including filters, brush rolls, and dust bins",
+            "Ensure proper charging and battery health for cordless models",
+            "Inspect for visible damage, blockages, or worn parts that may need replacement",
+            "Test the vacuum after each troubleshooting step to isolate the problem",
+            "If the issue persists, consider professional repair service or replacement parts for your {model}",
+            "Contact manufacturer support for warranty service or authorized repair centers"
+        ],
+        "required_parts": [
+            {
+                "name": "{model} Replacement Parts",
+                "search_query": "{model} parts"
+            },
+            {
+                "name": "{model} Maintenance Kit",
+                "search_query": "{model} filter"
+            }
+        ]
+    }
+}
+
+# ============================================
+# SEO 长尾词（问题类型 -> 高流量长尾词）
+# ============================================
+# 按顺序检查问题描述中是否包含类型名（按 '_' 拆开）中的任意一段，取第一个命中的类型
+
+SEO_KEYWORD_TEMPLATES = {
+    # 电池问题
+    'battery': [
+        "{model} battery replacement",
+        "{model} battery not holding charge",
+        "replace {model} battery",
+        "{model} battery life",
+        "where to buy {model} battery",
+        "{model} dead battery",
+        "how long does {model} battery last",
+        "{model} battery cost",
+        "{model} won't hold charge",
+        "{model} battery indicator"
+    ],
+
+    # 充电问题
+    'charging': [
+        "{model} not charging",
+        "{model} charger problems",
+        "{model} won't charge",
+        "{model} charging light flashing",
+        "replace {model} charger",
+        "{model} charging dock issues",
+        "{model} battery not charging",
+        "fix {model} charging problems",
+        "{model} charge indicator",
+        "{model} charging slowly"
+    ],
+
+    # 错误代码
+    'error_codes': [
+        "{model} error codes",
+        "{model} error code list",
+        "{model} flashing red light",
+        "{model} beeping",
+        "{model} error codes manual",
+        "troubleshoot {model} error codes",
+        "{model} error codes repair",
+        "what does {model} error code mean",
+        "{model} error codes not working",
+        "fix {model} error codes"
+    ],
+
+    # 配件/附件问题
+    'attachment': [
+        "{model} attachment not working",
+        "{model} accessories problems",
+        "{model} tools not fitting",
+        "{model} attachment falls off",
+        "replace {model} attachment",
+        "{model} wand problems",
+        "{model} hose replacement",
+        "where to buy {model} attachments",
+        "{model} attachment compatibility",
+        "fix {model} attachment issues"
+    ],
+
+    # 电机问题
+    'motor': [
+        "{model} motor replacement",
+        "{model} motor noise",
+        "{model} motor burning smell",
+        "{model} motor not spinning",
+        "replace {model} motor",
+        "{model} motor repair cost",
+        "how to replace {model} motor",
+        "{model} motor problems",
+        "{model} motor failure",
+        "fix {model} motor"
+    ],
+
+    # 皮带问题
+    'belt': [
+        "{model} belt replacement",
+        "{model} broken belt",
+        "{model} belt slipping",
+        "replace {model} belt",
+        "where to buy {model} belt",
+        "how to change {model} belt",
+        "{model} belt problems",
+        "fix {model} belt",
+        "{model} belt size",
+        "{model} drive belt"
+    ],
+
+    # 漏水问题
+    'leak': [
+        "{model} leaking water",
+        "{model} leaking dirty water",
+        "{model} water tank leaking",
+        "fix {model} leak",
+        "{model} leaking from bottom",
+        "{model} seal replacement",
+        "where is {model} leaking from",
+        "{model} tank cap problems",
+        "repair {model} water leak",
+        "stop {model} leaking"
+    ],
+
+    # 吸力脉动问题
+    'pulsing': [
+        "{model} pulsing",
+        "{model} suction pulsating",
+        "{model} revving up and down",
+        "fix {model} pulsing",
+        "{model} not constant suction",
+        "{model} surging",
+        "why does {model} pulse",
+        "{model} pulsing and stopping",
+        "troubleshoot {model} pulsing",
+        "stop {model} from pulsing"
+    ],
+
+    # 噪音问题
+    'noise': [
+        "{model} making loud noise",
+        "{model} rattling noise",
+        "{model} whistling sound",
+        "{model} high pitched noise",
+        "fix {model} noise",
+        "{model} strange sounds",
+        "{model} clicking noise",
+        "{model} grinding noise",
+        "why is {model} so loud",
+        "reduce {model} noise"
+    ],
+
+    # 过热问题
+    'heating': [
+        "{model} overheating",
+        "{model} getting hot",
+        "{model} burning smell",
+        "fix {model} overheating",
+        "{model} shuts off when hot",
+        "{model} thermal protection",
+        "{model} too hot to touch",
+        "{model} heat issues",
+        "prevent {model} overheating",
+        "{model} temperature warning"
+    ],
+
+    # 导航/映射问题
+    'mapping': [
+        "{model} mapping problems",
+        "{model} not mapping house",
+        "{model} lost map",
+        "{model} navigation issues",
+        "reset {model} map",
+        "{model} not cleaning in straight lines",
+        "{model} mapping errors",
+        "fix {model} navigation",
+        "{model} can't find home",
+        "{model} cleaning pattern problems"
+    ],
+
+    # 连接性问题
+    'connectivity': [
+        "{model} not connecting to wifi",
+        "{model} app not working",
+        "{model} bluetooth problems",
+        "{model} offline",
+        "fix {model} connection",
+        "{model} can't connect to phone",
+        "{model} network issues",
+        "{model} app connection failed",
+        "troubleshoot {model} connectivity",
+        "reconnect {model} to wifi"
+    ],
+
+    # 刷条问题
+    'brushroll': [
+        "{model} brush roll not spinning",
+        "{model} brush roll replacement",
+        "{model} brush bar stuck",
+        "clean {model} brush roll",
+        "{model} bristles worn",
+        "replace {model} brush roll",
+        "{model} brush roll removal",
+        "fix {model} brush roll",
+        "{model} roller not turning",
+        "install {model} brush roll"
+    ],
+
+    # 滤网问题
+    'filter': [
+        "{model} filter replacement",
+        "{model} filter cleaning",
+        "{model} hepa filter",
+        "where to buy {model} filters",
+        "clean {model} filter",
+        "{model} filter indicator",
+        "{model} pre-filter",
+        "{model} post-filter",
+        "change {model} filter",
+        "{model} filter washable"
+    ],
+
+    # 吸力损失问题
+    'suction': [
+        "{model} lost suction",
+        "{model} no suction",
+        "{model} weak suction",
+        "fix {model} suction",
+        "{model} not picking up dirt",
+        "restore {model} suction",
+        "{model} suction power low",
+        "{model} poor suction",
+        "improve {model} suction",
+        "{model} suction problems"
+    ],
+
+    # 电源问题
+    'power': [
+        "{model} won't turn on",
+        "{model} not working",
+        "{model} no power",
+        "{model} dead",
+        "fix {model} power",
+        "{model} won't start",
+        "{model} power issues",
+        "{model} not responding",
+        "repair {model} power",
+        "{model} startup problems"
+    ]
+}
+
+# 没有命中任何类型时的通用长尾词
+DEFAULT_SEO_KEYWORDS = [
+    "where to buy {model} parts",
+    "{model} replacement parts",
+    "{model} not working",
+    "fix {model} problems",
+    "{model} repair guide",
+    "{model} troubleshooting tips",
+    "{model} maintenance",
+    "how to repair {model}"
+]
+
+# 没有问题描述时的通用长尾词
+GENERIC_SEO_KEYWORDS = [
+    "where to buy {model} parts",
+    "{model} replacement parts",
+    "{model} not working",
+    "fix {model} problems"
+]
+
+# ============================================
+# 模板编译
+# ============================================
+
+_FORMATTER = string.Formatter()
+
+def placeholders(text):
+    """字符串中的占位符名称"""
+    return {field for _, field, _, _ in _FORMATTER.parse(text) if field is not None}
+
+def _constant(value):
+    return lambda ctx: value
+
+def compile_template(node, fields, where="template"):
+    """
+    把模板（dict / list / str 的嵌套结构）编译为 render(ctx) 函数
+    不含占位符的字符串直接返回原对象；含占位符的字符串用 str.format_map 渲染
+    """
+    if isinstance(node, str):
+        names = placeholders(node)
+        if not names:
+            return _constant(node)
+        unknown = names - fields
+        if unknown:
+            raise ValueError(f"{where}: 未知占位符 {', '.join(sorted(unknown))}（可用: {', '.join(sorted(fields))}）")
+        return node.format_map
+    if isinstance(node, list):
+        parts = [compile_template(item, fields, f"{where}[{i}]") for i, item in enumerate(node)]
+        return lambda ctx: [part(ctx) for part in parts]
+    if isinstance(node, dict):
+        items = [(key, compile_template(value, fields, f"{where}.{key}")) for key, value in node.items()]
+        return lambda ctx: {key: part(ctx) for key, part in items}
+    return _constant(node)
+
+# ============================================
+# 注册表
+# ============================================
+
+class TemplateRegistry:
+    """
+    模板按 (种类, 名称) 懒编译并缓存；load_file() 加载的外部模板覆盖同名内置模板
+    """
+
+    def __init__(self, files=()):
+        self.problems = dict(PROBLEM_TEMPLATES)
+        self.ctas = dict(DYNAMIC_CTAS)
+        self.personas = dict(PERSONAS)
+        self.persona_mapping = dict(PERSONA_MAPPING)
+        self.seo_keywords = dict(SEO_KEYWORD_TEMPLATES)
+        self.detection = []         # 外部文件中的检测规则 [(关键词列表, 问题类型)]
+        self._compiled = {}
+        self._seo_order = None
+        self._matcher = None
+        for path in files:
+            self.load_file(path)
+
+    def load_file(self, path):
+        """
+        加载 JSON 模板文件，各部分都可省略:
+            {
+              "problems":        {"类型": {问题模板，结构同 PROBLEM_TEMPLATES}},
+              "ctas":            {"类型": {CTA，结构同 DYNAMIC_CTAS}},
+              "personas":        {"人设": {"name", "tone", "openings", "phrases"}},
+              "persona_mapping": {"类型": "人设"},
+              "seo_keywords":    {"类型": ["{model} ...", ...]},
+              "detection":       {"类型": ["触发短语", ...]}
+            }
+        detection 中的规则优先于内置规则；文件中的模板加载时即编译，占位符错误会立即报出
+        返回加载的条目数
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        sections = (("problems", self.problems, PROBLEM_FIELDS),
+                    ("ctas", self.ctas, CTA_FIELDS),
+                    ("seo_keywords", self.seo_keywords, SEO_FIELDS))
+        count = 0
+        for section, target, fields in sections:
+            for name, template in data.get(section, {}).items():
+                compile_template(template, fields, f"{path}: {section}.{name}")
+                target[name] = template
+                count += 1
+        for name, persona in data.get("personas", {}).items():
+            for i, opening in enumerate(persona.get("openings", [])):
+                compile_template(opening, OPENING_FIELDS, f"{path}: personas.{name}.openings[{i}]")
+            self.personas[name] = persona
+            count += 1
+        self.persona_mapping.update(data.get("persona_mapping", {}))
+        for problem_type, phrases in data.get("detection", {}).items():
+            self.detection.append((list(phrases), problem_type))
+            count += 1
+
+        self._compiled.clear()
+        self._seo_order = None
+        self._matcher = None
+        return count
+
+    def _get(self, kind, name, template, fields):
+        key = (kind, name)
+        render = self._compiled.get(key)
+        if render is None:
+            render = self._compiled[key] = compile_template(template, fields, f"{kind}.{name}")
+        return render
+
+    # ---------- 问题类型检测 ----------
+
+    def classify(self, keyword, problem_desc=""):
+        """问题类型检测；外部文件没有检测规则时直接使用 problem_matcher 的默认匹配器"""
+        if self._matcher is None:
+            self._matcher = ProblemMatcher(self.detection + DETECTION_RULES) if self.detection else DEFAULT_MATCHER
+        return self._matcher.classify(keyword, problem_desc)
+
+    # ---------- 渲染 ----------
+
+    def render_problem(self, problem_type, ctx):
+        """渲染一个问题模板（未知类型使用 general），每次返回新的 dict"""
+        if problem_type not in self.problems:
+            problem_type = DEFAULT_TYPE
+        return self._get("problems", problem_type, self.problems[problem_type], PROBLEM_FIELDS)(ctx)
+
+    def render_cta(self, problem_type, ctx):
+        if problem_type not in self.ctas:
+            problem_type = DEFAULT_TYPE
+        return self._get("ctas", problem_type, self.ctas[problem_type], CTA_FIELDS)(ctx)
+
+    def persona_for(self, problem_type):
+        """返回 (人设名称, 人设配置)；openings 是未渲染的模板，选中后用 render_opening 渲染"""
+        name = self.persona_mapping.get(problem_type, DEFAULT_PERSONA)
+        if name not in self.personas:
+            name = DEFAULT_PERSONA
+        return name, self.personas[name]
+
+    def render_opening(self, template, ctx):
+        return self._get("openings", template, template, OPENING_FIELDS)(ctx)
+
+    def seo_type(self, problem_desc):
+        """问题描述对应的 SEO 长尾词类型，没有命中时返回 None"""
+        if self._seo_order is None:
+            self._seo_order = [(name, name.split('_')) for name in self.seo_keywords]
+        desc_lower = problem_desc.lower()
+        for name, parts in self._seo_order:
+            if any(part in desc_lower for part in parts):
+                return name
+        return None
+
+    def render_seo_keywords(self, problem_desc, ctx):
+        """只渲染命中类型的长尾词列表"""
+        if not problem_desc:
+            return self._get("seo", None, GENERIC_SEO_KEYWORDS, SEO_FIELDS)(ctx)
+        name = self.seo_type(problem_desc)
+        if name is None:
+            return self._get("seo", "", DEFAULT_SEO_KEYWORDS, SEO_FIELDS)(ctx)
+        return self._get("seo", name, self.seo_keywords[name], SEO_FIELDS)(ctx)
+
+_registry = None
+
+def get_registry():
+    """默认注册表：内置模板 + PROBLEM_TEMPLATE_FILES 环境变量指定的文件（首次使用时加载）"""
+    global _registry
+    if _registry is None:
+        files = [p for p in os.environ.get("PROBLEM_TEMPLATE_FILES", "").split(os.pathsep) if p]
+        _registry = TemplateRegistry(files)
+    return _registry
@@ -1,87 +1,354 @@
-import pdfplumber
-import json
-from openai import OpenAI
+#!/usr/bin/env python3
+"""
+说明书 PDF → 维修指南 JSON
+原来每本说明书只发一个巨大的提示词（长说明书的内容被截掉），返回的原始文本直接落盘，
+重新运行时又要为同样的请求付一次费。现在分成 map-reduce 两步：
+
+  - map: 故障排除相关页面（manual_text）按 token 预算切块，各块并发请求模型抽取问题，
+    并发数由信号量限制
+  - reduce: 合并各块的问题并去重（标题相近的问题合并原因/步骤/配件），整理成网站使用的
+    VacuumManual 结构（lib/vacuum-data.ts：solution_steps、required_parts 为 {name, search_query}）
+
+请求通过 llm_client 发送（长连接、限速、重试），模型响应按请求内容（模型 + 提示词 + 参数）的
+hash 缓存在 .cache/llm-responses/，同一本说明书再次处理时不再重复请求。API 密钥只从环境变量
+OPENAI_API_KEY 读取，OPENAI_BASE_URL 可以指向兼容接口或本地替身服务器。
+
+用法:
+    python scripts/process_manual.py Shark_NV352.pdf --brand Shark --model "Navigator Lift-Away NV352"
+    python scripts/process_manual.py manual.pdf --brand Bissell --model 2306 --concurrency 8 --dry-run
+"""
+
+import argparse
+import asyncio
 import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import guide_schema
+import guide_store
+import llm_client
+import manual_text
+from corpus_index import DATA_DIR
+
+MODEL = os.getenv("MANUAL_LLM_MODEL", "gpt-3.5-turbo-16k")
+CHUNK_TOKENS = int(os.getenv("MANUAL_CHUNK_TOKENS", "3000"))       # 每块说明书文本的 token 预算
+CONCURRENCY = int(os.getenv("MANUAL_LLM_CONCURRENCY", "4"))         # 同时进行的模型请求数
+MAX_MANUAL_CHARS = 120_000      # 送入 map 阶段的相关页面总字符数上限
+CHARS_PER_TOKEN = 4             # 英文说明书的粗略估算，够用来装箱
+REQUEST_TIMEOUT = 120
+RESPONSE_CACHE_DIR = llm_client.CACHE_DIR
+
+MAX_SEO_KEYWORDS = 8
+# 标题去重时忽略的词
+TITLE_STOPWORDS = {"the", "a", "an", "is", "are", "not", "no", "does", "doesn't", "won't", "will",
+                   "to", "of", "on", "or", "and", "my", "your", "vacuum", "cleaner", "properly"}
+TITLE_SIMILARITY = 0.6
+
+# ============================================
+# 切块
+# ============================================
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _split_text(text, max_chars):
+    """超过 max_chars 的页面按行切开（单行仍超长时硬切）"""
+    if len(text) <= max_chars:
+        return [text]
+    pieces, current = [], ""
+    for line in text.splitlines():
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + 1 + len(line) > max_chars:
+            pieces.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_pages(selected, chunk_tokens=CHUNK_TOKENS):
+    """
+    selected: manual_text.select_pages() 的结果 [(页码, 文本, 分数)]
+    按页码顺序装箱，每块估算 token 数不超过 chunk_tokens；返回 [[(页码, 文本, 分数)]]
+    """
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    chunks, current, used = [], [], 0
+    for number, text, score in selected:
+        for piece in _split_text(text, max_chars):
+            cost = estimate_tokens(piece)
+            if current and used + cost > chunk_tokens:
+                chunks.append(current)
+                current, used = [], 0
+            current.append((number, piece, score))
+            used += cost
+    if current:
+        chunks.append(current)
+    return chunks
 
-# 这里填你的 OpenAI Key，或者设置环境变量 OPENAI_API_KEY
-client = OpenAI(api_key="sk-xxxxxxxxx") 
-
-def extract_text_from_pdf(pdf_path):
-    """从PDF中提取所有文本"""
-    text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            # 简单的清洗，去掉页眉页脚
-            text += page.extract_text() + "\n"
-    return text
-
-def analyze_with_gpt(raw_text, brand, model):
-    """把乱糟糟的文本喂给 GPT，让它拉出这就是我们要的 JSON"""
-    
-    # 提示词工程 (Prompt Engineering) - 这是核心资产
-    prompt = f"""
+# ============================================
+# map: 逐块抽取问题
+# ============================================
+
+def build_prompt(excerpt, brand, model, part, total):
+    """提示词工程 (Prompt Engineering) - 这是核心资产"""
+    return f"""
     You are a professional vacuum cleaner repair expert.
-    I have the raw text from the user manual of a {brand} {model}.
-    
-    Your goal is to extract the "Troubleshooting" or "Problem Solving" section and structure it into JSON.
-    
+    Below is part {part} of {total} of the troubleshooting-related pages from the user manual of a {brand} {model}
+    (each page starts with its [Page N] label).
+
+    Your goal is to extract every troubleshooting problem described in THIS excerpt and structure it into JSON.
+
     Requirements:
     1. Identify specific problems (e.g., "Vacuum not picking up debris", "Brush roll not spinning").
-    2. Extract the symptoms and solution steps.
+    2. Extract the possible causes and solution steps.
     3. Suggest parts that might need replacement (e.g., Filter, Belt, Hose) based on the solution.
     4. Improve the language to be SEO-friendly and clear.
-    
+    5. If the excerpt contains no troubleshooting content, return an empty "problems" list.
+
     Return ONLY valid JSON with this structure:
     {{
-      "brand": "{brand}",
-      "model": "{model}",
       "problems": [
         {{
-          "id": "slug-style-id-for-url", 
+          "id": "slug-style-id-for-url",
           "title": "Problem Title",
           "description": "Short description of the issue.",
           "possible_causes": ["Cause 1", "Cause 2"],
-          "steps": ["Step 1", "Step 2", "Step 3"],
-          "required_parts": ["Filter", "Belt"] 
+          "solution_steps": ["Step 1", "Step 2", "Step 3"],
+          "required_parts": ["Filter", "Belt"]
         }}
       ]
     }}
-    
-    Here is the manual text (truncated for token limit if needed):
-    {raw_text[:15000]} 
+
+    Manual excerpt:
+    {excerpt}
+    """
+
+def build_request(prompt, model=MODEL):
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.2,
+        "response_format": {"type": "json_object"},
+    }
+
+def parse_problems(content):
+    data = llm_client.parse_json_object(content)
+    if not isinstance(data.get("problems"), list):
+        raise ValueError("回复中没有 problems 列表")
+    return data
+
+def make_client(concurrency=CONCURRENCY, cache_dir=RESPONSE_CACHE_DIR, timeout=REQUEST_TIMEOUT):
+    """密钥和接口地址只从环境变量（OPENAI_API_KEY / OPENAI_BASE_URL）读取"""
+    if not llm_client.configured():
+        raise RuntimeError("未设置 OPENAI_API_KEY（本地替身服务器可以填任意值）")
+    return llm_client.LLMClient(concurrency=concurrency, timeout=timeout, cache_dir=cache_dir)
+
+async def extract_chunk(client, request):
+    """单块的抽取结果 {"problems": [...]}；请求失败或返回非法 JSON 时为 None（不写缓存）"""
+    try:
+        return await client.complete(request, parse_problems)
+    except llm_client.LLMError as e:
+        print(f"  ⚠️ {e}")
+        return None
+
+# ============================================
+# reduce: 合并去重
+# ============================================
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-')
+
+def _text_key(text):
+    return " ".join(re.findall(r"[a-z0-9']+", text.lower()))
+
+def _title_tokens(title):
+    return {token for token in re.findall(r"[a-z0-9']+", title.lower()) if token not in TITLE_STOPWORDS}
+
+def _string_list(value):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if isinstance(item, (str, int, float)) and str(item).strip()]
+
+def _part_objects(value, brand, model):
+    """字符串或 {name, search_query} 统一成网站使用的 VacuumPart"""
+    if isinstance(value, (str, dict)):
+        value = [value]
+    parts = []
+    for part in value if isinstance(value, list) else []:
+        if isinstance(part, dict):
+            name = str(part.get("name") or "").strip()
+            query = str(part.get("search_query") or "").strip()
+        else:
+            name, query = str(part).strip(), ""
+        if name:
+            parts.append({"name": name, "search_query": query or f"{brand} {model} {name}"})
+    return parts
+
+def normalize_problem(problem, brand, model):
+    """模型返回的问题整理成 lib/vacuum-data.ts 的 Problem；没有标题时返回 None"""
+    if not isinstance(problem, dict):
+        return None
+    title = str(problem.get("title") or "").strip()
+    if not title:
+        return None
+    return {
+        "id": slugify(problem.get("id") or title) or slugify(title),
+        "title": title,
+        "description": str(problem.get("description") or "").strip(),
+        "possible_causes": _string_list(problem.get("possible_causes")),
+        # 旧提示词使用 steps
+        "solution_steps": _string_list(problem.get("solution_steps") or problem.get("steps")),
+        "required_parts": _part_objects(problem.get("required_parts") or [], brand, model),
+    }
+
+def _merge_into(target, problem):
+    for field in ("possible_causes", "solution_steps"):
+        seen = {_text_key(item) for item in target[field]}
+        for item in problem[field]:
+            if _text_key(item) not in seen:
+                seen.add(_text_key(item))
+                target[field].append(item)
+    names = {_text_key(part["name"]) for part in target["required_parts"]}
+    for part in problem["required_parts"]:
+        if _text_key(part["name"]) not in names:
+            names.add(_text_key(part["name"]))
+            target["required_parts"].append(part)
+    if len(problem["description"]) > len(target["description"]):
+        target["description"] = problem["description"]
+
+def merge_problems(results, brand, model, threshold=TITLE_SIMILARITY):
+    """
+    results: 各块的抽取结果（按块顺序，失败的块为 None）
+    同 id 或标题词集合 Jaccard ≥ threshold 的问题合并为一个，保持首次出现的顺序
+    """
+    merged, token_sets, by_id = [], [], {}
+    for result in results:
+        for raw in (result or {}).get("problems", []):
+            problem = normalize_problem(raw, brand, model)
+            if problem is None:
+                continue
+            tokens = _title_tokens(problem["title"])
+            match = by_id.get(problem["id"])
+            if match is None and tokens:
+                for i, other in enumerate(token_sets):
+                    if len(tokens & other) / len(tokens | other) >= threshold:
+                        match = i
+                        break
+            if match is not None:
+                _merge_into(merged[match], problem)
+                continue
+            by_id.setdefault(problem["id"], len(merged))
+            merged.append(problem)
+            token_sets.append(tokens)
+
+    # 合并后 id 仍可能重复（标题不同但模型给了同一个 id）
+    used = {}
+    for problem in merged:
+        base = problem["id"] or "problem"
+        used[base] = used.get(base, 0) + 1
+        if used[base] > 1:
+            problem["id"] = f"{base}-{used[base]}"
+    return merged
+
+def build_guide(brand, model, problems, pdf_path):
+    return {
+        "brand": brand,
+        "model": model,
+        "image_url": "",
+        "manual_pdf": Path(pdf_path).name,
+        "seo_keywords": [f"{brand} {model} {p['title']}" for p in problems[:MAX_SEO_KEYWORDS]],
+        "problems": problems,
+    }
+
+# ============================================
+# 流程
+# ============================================
+
+async def analyze_manual(selected, brand, model, client=None, chunk_tokens=CHUNK_TOKENS, llm_model=MODEL):
+    """
+    selected: manual_text.select_pages() 的结果
+    client: llm_client.LLMClient（并发数、限速、重试、响应缓存由它负责），默认按环境变量创建
+    返回 (合并后的问题列表, 调用统计)
     """
-    
-    # 如果说明书特别长，可能需要只截取 Troubleshooting 的部分，或者用 GPT-4-Turbo/128k 模型
-    
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo-16k", # 或者 gpt-4-turbo
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2,
-        response_format={ "type": "json_object" }
-    )
-    
-    return response.choices[0].message.content
+    chunks = chunk_pages(selected, chunk_tokens)
+    requests = [build_request(build_prompt(manual_text.join_pages(chunk), brand, model, i, len(chunks)), llm_model)
+                for i, chunk in enumerate(chunks, 1)]
+    client = client or make_client()
+    results = await asyncio.gather(*(extract_chunk(client, request) for request in requests))
+    return merge_problems(results, brand, model), dict(client.summary(), chunks=len(chunks))
+
+def extract_text_from_pdf(pdf_path, budget=manual_text.DEFAULT_BUDGET):
+    """
+    从PDF中提取故障排除相关页面的文本（不超过 budget 个字符）
+    逐页读取并打分，只保留故障排除 / 错误代码相关的页面；结果按 PDF 内容 hash 缓存
+    """
+    return manual_text.extract_relevant_text(pdf_path, budget)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="说明书 PDF → 维修指南 JSON（map-reduce）")
+    parser.add_argument("pdf", nargs="?", default="Shark_NV352.pdf")
+    parser.add_argument("--brand", default="Shark")
+    parser.add_argument("--model", default="Navigator Lift-Away NV352")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--chunk-tokens", type=int, default=CHUNK_TOKENS)
+    parser.add_argument("--max-chars", type=int, default=MAX_MANUAL_CHARS, help="送入模型的相关页面总字符数上限")
+    parser.add_argument("--no-cache", action="store_true", help="不读写模型响应缓存")
+    parser.add_argument("--dry-run", action="store_true", help="只打印结果，不写入 data/")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print(f"正在读取 {args.pdf}...")
+    selected = manual_text.select_pages(manual_text.iter_pages(args.pdf), args.max_chars)
+    print(f"选中 {len(selected)} 页故障排除相关内容")
+
+    print("正在调用 AI 进行清洗...")
+    start = time.perf_counter()
+
+    async def run():
+        client = make_client(args.concurrency, None if args.no_cache else RESPONSE_CACHE_DIR)
+        try:
+            return await analyze_manual(selected, args.brand, args.model, client, args.chunk_tokens)
+        finally:
+            client.close()
+
+    problems, stats = asyncio.run(run())
+    print(f"{stats['chunks']} 块，{llm_client.describe_summary(stats)}")
+    print(f"合并后 {len(problems)} 个问题，用时 {time.perf_counter() - start:.1f}s")
+
+    if not problems:
+        # 没有抽取到问题时不覆盖 data/ 中已有的文件
+        print("❌ 没有抽取到任何问题，未写入")
+        return 1
+
+    guide = build_guide(args.brand, args.model, problems, args.pdf)
+    issues = guide_schema.validate(guide)
+    for level, path, message in issues:
+        print(f"{'❌' if level == guide_schema.ERROR else '⚠️ '} {path or '(root)'}: {message}")
+    if args.dry_run:
+        print(guide_store.dumps(guide).decode('utf-8'))
+        return 0
+
+    if guide_schema.errors_only(issues):
+        print("❌ 结构校验失败，未写入")
+        return 1
+
+    output_path = DATA_DIR / f"{slugify(args.brand)}-{slugify(args.model)}.json"
+    guide_store.write_guide(output_path, guide)
+    print(f"成功！数据已保存到 {output_path}")
+    return 0
 
 # --- 执行主程序 ---
 if __name__ == "__main__":
-    # 1. 你的 PDF 路径 (把下载的 PDF 放在这里)
-    pdf_file = "Shark_NV352.pdf" 
-    brand_name = "Shark"
-    model_name = "Navigator Lift-Away NV352"
-    
-    print(f"正在读取 {pdf_file}...")
-    text_content = extract_text_from_pdf(pdf_file)
-    
-    print("正在调用 AI 进行清洗 (这可能需要几秒钟)...")
-    json_output = analyze_with_gpt(text_content, brand_name, model_name)
-    
-    # 2. 保存结果
-    output_filename = f"../data/{brand_name.lower()}-{model_name.replace(' ', '-').lower()}.json"
-    
-    # 确保 data 目录存在
-    os.makedirs("../data", exist_ok=True)
-    
-    with open(output_filename, "w", encoding="utf-8") as f:
-        f.write(json_output)
-        
-    print(f"成功！数据已保存到 {output_filename}")
+    sys.exit(main())
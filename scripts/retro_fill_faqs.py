@@ -1,19 +1,33 @@
+"""
+Back-fills FAQs into guides that have none.
+
+The corpus index (corpus_index, .cache/corpus-manifest.json) records the FAQ
+count of every guide and only re-parses files whose mtime / size changed, so
+guides that already have FAQs are skipped without being opened. The rest are
+handed to a process pool in chunks (bounded number in flight) and only guides
+that actually gained FAQs are rewritten, atomically.
+
+Usage:
+    python scripts/retro_fill_faqs.py [data_dir] [--workers N] [--dry-run] [--full]
+"""
+
+import argparse
 import os
-import json
 import random
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Paths
-base_dir = Path("/Volumes/MOVESPEED/下载/AIcode/vacuum-parts-hub")
-data_dir = base_dir / "data"
+import corpus_index
+import guide_store
 
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+CHUNK_SIZE = 256        # files per worker task (amortizes IPC and directory fsyncs)
+QUEUE_DEPTH = 4         # chunks in flight per worker
+PROGRESS_EVERY = 1000
 
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def load_json(filepath):
+    return guide_store.load_guide(filepath)
 
 def generate_faqs(data):
     brand = data.get('brand', 'Generic')
@@ -51,35 +65,114 @@ def generate_faqs(data):
         }
     ]
 
-def main():
-    print(f"🧹 Starting retro-fill for VacuumHub data in {data_dir}...")
-    
-    files = [f for f in os.listdir(data_dir) if f.endswith('.json') and f not in ['vacuums.json', 'sharks.json', 'bissells.json']]
-    count = 0
-    
-    for filename in files:
-        filepath = data_dir / filename
+def missing_faqs(index, full=False):
+    """
+    Yields the filenames of indexed guides without FAQs (every guide when full),
+    without opening any file
+    """
+    faqs = corpus_index.FIELDS.index("faqs")
+    for slug, row in index.rows.items():
+        if full or not row[faqs]:
+            yield f"{slug}.json"
+
+def fill_chunk(data_dir, names, dry_run=False):
+    """
+    Worker: adds FAQs to the guides in names that have none.
+    Returns [(filename, status)], status is one of "has_faqs", "added", "error: ..."
+    """
+    data_dir = Path(data_dir)
+    results, updates = [], []
+    for name in names:
+        path = data_dir / name
         try:
-            data = load_json(filepath)
-            
-            # Check if FAQs already exist
-            if 'faqs' in data and data['faqs']:
-                # print(f"Skipping {filename} (FAQs exist)")
+            data = load_json(path)
+            if data.get('faqs'):
+                results.append([name, "has_faqs"])
                 continue
-                
-            # Generate and inject FAQs
             data['faqs'] = generate_faqs(data)
-            
-            # Save back
-            save_json(filepath, data)
-            count += 1
-            if count % 50 == 0:
-                print(f"✅ Processed {count} files...")
-                
+            updates.append((path, data))
+            results.append([name, "added"])
+        except Exception as e:
+            results.append([name, f"error: {e}"])
+
+    if updates and not dry_run:
+        # Atomic writes, one directory fsync per chunk; unchanged bytes are not rewritten
+        try:
+            guide_store.write_guides(updates)
         except Exception as e:
-            print(f"❌ Error processing {filename}: {e}")
+            for result in results:
+                if result[1] == "added":
+                    result[1] = f"error: {e}"
+    return results
+
+def _init_worker():
+    # Forked workers inherit the parent's random state; reseed so FAQ answers differ
+    random.seed()
+
+def run_chunks(data_dir, chunks, workers, dry_run):
+    """Yields chunk results, at most workers * QUEUE_DEPTH chunks in flight"""
+    if workers <= 1:
+        for names in chunks:
+            yield fill_chunk(data_dir, names, dry_run)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for names in chunks:
+            pending.append(executor.submit(fill_chunk, str(data_dir), names, dry_run))
+            if len(pending) >= workers * QUEUE_DEPTH:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Back-fill FAQs into guides that have none")
+    parser.add_argument("data_dir", nargs="?", default=str(corpus_index.DATA_DIR),
+                        help="guide directory (default: the repo's data/)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--full", action="store_true", help="ignore the indexed FAQ counts and open every file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    data_dir = Path(args.data_dir)
+    started = time.perf_counter()
+    print(f"🧹 Starting retro-fill for VacuumHub data in {data_dir}{' (dry run)' if args.dry_run else ''}...")
+
+    index, _ = corpus_index.update_index(data_dir)
+    counts = Counter()
+    candidates = list(missing_faqs(index, args.full))
+    counts["skipped"] = index.count() - len(candidates)
+
+    for results in run_chunks(data_dir, chunked(candidates, args.chunk_size), args.workers, args.dry_run):
+        before = counts["added"]
+        for name, status in results:
+            if status.startswith("error"):
+                counts["errors"] += 1
+                print(f"❌ Error processing {name}: {status[7:]}")
+                continue
+            counts[status] += 1
+        if counts["added"] // PROGRESS_EVERY > before // PROGRESS_EVERY:
+            print(f"✅ Processed {counts['added']} files...")
 
-    print(f"🎉 Complete! Added FAQs to {count} files.")
+    elapsed = time.perf_counter() - started
+    verb = "Would add" if args.dry_run else "Added"
+    print(f"🎉 Complete! {verb} FAQs to {counts['added']} files "
+          f"({counts['has_faqs']} already had FAQs, {counts['skipped']} skipped via the corpus index, "
+          f"{counts['errors']} errors) in {elapsed:.2f}s")
+    return counts
 
 if __name__ == "__main__":
     main()
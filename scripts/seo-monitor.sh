@@ -20,29 +20,37 @@ echo -e "${BLUE}📊 SEO 内容监控报告${NC}"
 echo -e "${BLUE}======================================${NC}"
 echo ""
 
-# 统计文件数量
-TOTAL_FILES=$(find "$DATA_DIR" -name "*.json" -not -name "vacuums.json" -not -name "sharks.json" -not -name "bissells.json" | wc -l)
+# 读取预先计算的语料统计（生成脚本每次运行结束时更新；不存在时计算一次）
+# 每行: section<TAB>key<TAB>value，见 scripts/corpus_stats.py
+STATS=$(python3 "$SCRIPT_DIR/corpus_stats.py" report)
+
+stat_value() {
+    printf '%s\n' "$STATS" | awk -F'\t' -v s="$1" -v k="$2" '$1 == s && $2 == k { print $3; exit }'
+}
+
+stat_section() {
+    printf '%s\n' "$STATS" | awk -F'\t' -v s="$1" '$1 == s { print $2 "\t" $3 }'
+}
+
+TOTAL_FILES=$(stat_value total guides)
 
 echo -e "${GREEN}📁 总维修指南数: $TOTAL_FILES${NC}"
+echo -e "   统计时间: $(stat_value total generated_at)"
 
 # 统计各品牌数量
 echo ""
 echo -e "${BLUE}📊 各品牌内容统计:${NC}"
 echo ""
 
-for brand in dyson shark bissell irobot hoover miele roborock eufy tineco; do
-    count=$(find "$DATA_DIR" -name "${brand}-*.json" | wc -l)
-    if [ $count -gt 0 ]; then
-        echo -e "  ${GREEN}✓${NC} $(echo "$brand" | sed 's/.*/\U&/')${NC}: $count 个指南"
-    fi
+stat_section brand | while IFS=$'\t' read -r brand count; do
+    echo -e "  ${GREEN}✓${NC} ${brand}${NC}: $count 个指南"
 done
 
 # 最新生成的文件
 echo ""
 echo -e "${BLUE}📝 最新生成的 5 个文件:${NC}"
 echo ""
-ls -t "$DATA_DIR"/*.json 2>/dev/null | grep -v -E "(vacuums|sharks|bissells)\.json" | head -5 | while read file; do
-    filename=$(basename "$file")
+stat_section latest | while IFS=$'\t' read -r filename _; do
     echo "  📄 $filename"
 done
 
@@ -51,27 +59,24 @@ echo ""
 echo -e "${BLUE}🤖 AI 生成内容统计:${NC}"
 echo ""
 
-AUTO_GEN=$(grep -l '"auto_generated": true' "$DATA_DIR"/*.json 2>/dev/null | wc -l)
-echo -e "  ${GREEN}✓${NC} AI 生成: $AUTO_GEN 个"
-
-# 检查今日生成
-TODAY=$(date +%Y-%m-%d)
-TODAY_COUNT=$(grep -l "\"generated_date\": \"$TODAY" "$DATA_DIR"/*.json 2>/dev/null | wc -l)
-echo -e "  ${GREEN}✓${NC} 今日新增: $TODAY_COUNT 个"
+echo -e "  ${GREEN}✓${NC} AI 生成: $(stat_value total auto_generated) 个"
+echo -e "  ${GREEN}✓${NC} 今日新增: $(stat_value total today) 个"
 
-# 预估页面覆盖率
+# 关键词与 FAQ 覆盖
 echo ""
-echo -e "${BLUE}📈 SEO 覆盖率估算:${NC}"
+echo -e "${BLUE}📈 SEO 覆盖率:${NC}"
 echo ""
 
-# 读取一个示例文件，提取关键词数量
-SAMPLE_FILE=$(find "$DATA_DIR" -name "*.json" -not -name "vacuums.json" | head -1)
-if [ -n "$SAMPLE_FILE" ]; then
-    KEYWORDS=$(python3 -c "import json; data=json.load(open('$SAMPLE_FILE')); print(len(data.get('seo_keywords', [])))" 2>/dev/null || echo "5")
-    TOTAL_KEYWORDS=$((TOTAL_FILES * KEYWORDS))
-    echo -e "  ${GREEN}✓${NC} 总关键词数: ~$TOTAL_KEYWORDS 个"
-    echo -e "  ${GREEN}✓${NC} 每页平均: $KEYWORDS 个关键词"
-fi
+echo -e "  ${GREEN}✓${NC} 总关键词数: $(stat_value keywords total) 个"
+echo -e "  ${GREEN}✓${NC} 每页平均: $(stat_value keywords average) 个关键词"
+echo -e "  ${GREEN}✓${NC} FAQ 覆盖率: $(stat_value faqs coverage)（$(stat_value faqs guides_with) 篇）"
+
+echo ""
+echo -e "${BLUE}📊 趋势来源:${NC}"
+echo ""
+stat_section trending_source | while IFS=$'\t' read -r source count; do
+    echo -e "  ${GREEN}✓${NC} ${source}: $count 个"
+done
 
 echo ""
 echo -e "${BLUE}======================================${NC}"
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+共享 slug 注册表
+三个生成脚本共用同一个 slugify 规则和同一份已占用 slug 集合：
+  - 启动时从语料索引（corpus_index）一次性加载，之后的检查都是内存中的 O(1) 查找
+  - 除了 slug 重复，还检测语义重复：同一品牌 + 型号 + 问题类型已经以另一个 slug 存在
+  - 多个进程同时生成时，通过锁文件串行化“检查 + 登记”，并用日志文件同步彼此新登记的 slug
+  - 日志中的登记带有时间和 PID：写入失败时调用 release() 撤销；进程崩溃留下的登记
+    在 PID 已退出或超过 SLUG_CLAIM_TTL 秒后的下一次加载时丢弃，不会永久占用 slug
+
+用法:
+    from slug_registry import get_registry, guide_slug
+    slug = guide_slug(guide["brand"], guide["model"])
+    ok, reason = get_registry().claim(slug, guide)
+"""
+
+import fcntl
+import os
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import corpus_index
+
+LOCK_NAME = "slug-registry.lock"
+JOURNAL_NAME = "slug-registry.journal"
+
+# 登记后文件一直没有出现在 data/ 中的最长保留时间（秒）
+CLAIM_TTL = float(os.getenv("SLUG_CLAIM_TTL", "3600"))
+RELEASED = "release"
+
+# ============================================
+# slug 规则
+# ============================================
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+def slugify(text):
+    """统一的 slug 规则：小写，'+' 写作 plus，撇号直接去掉，其余非字母数字连续字符合并为 '-'"""
+    text = str(text or "").lower().replace("+", "plus").replace("'", "").replace("’", "")
+    return _NON_ALNUM.sub("-", text).strip("-")
+
+def strip_brand(brand, model):
+    """去掉型号开头重复的品牌名（例如 "Dyson V8" -> "V8"）"""
+    model = str(model or "").strip()
+    brand = str(brand or "").strip()
+    while brand and model.lower().startswith(brand.lower() + " "):
+        model = model[len(brand):].strip()
+    return model
+
+def guide_slug(brand, model, suffix=None):
+    """指南文件名（不含 .json）：品牌-型号[-后缀]"""
+    parts = [slugify(brand), slugify(strip_brand(brand, model)), slugify(suffix)]
+    return "-".join(part for part in parts if part)
+
+def semantic_key(brand, model, problem_type=None, problem_ids=()):
+    """
+    语义键：(品牌, 型号, 问题类型)
+    型号中 " - " 之后的页面标题部分不计入；没有 problem_type 时用第一个问题的 id
+    """
+    model = strip_brand(brand, model).split(" - ")[0]
+    kind = problem_type or next((pid for pid in problem_ids if pid), None)
+    return (slugify(brand), slugify(model), slugify(kind))
+
+def guide_key(guide):
+    problems = guide.get("problems") or []
+    ids = [p.get("id") for p in problems if isinstance(p, dict)]
+    return semantic_key(guide.get("brand"), guide.get("model"), guide.get("problem_type"), ids)
+
+# ============================================
+# 注册表
+# ============================================
+
+class SlugRegistry:
+    """已占用 slug 及其语义键的内存集合"""
+
+    def __init__(self, data_dir=corpus_index.DATA_DIR):
+        self.data_dir = Path(data_dir)
+        cache_dir = corpus_index.cache_dir_for(self.data_dir)
+        self.lock_path = cache_dir / LOCK_NAME
+        self.journal_path = cache_dir / JOURNAL_NAME
+        self.slugs = set()
+        self.keys = {}              # 语义键 -> slug
+        self._journal_offset = 0
+        self._journal_inode = None
+
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        index, _ = corpus_index.update_index(self.data_dir)
+        for entry in index.entries():
+            self._add(entry["slug"], semantic_key(entry["brand"], entry["model"],
+                                                  entry["problem_type"], entry["problem_ids"]))
+        # 文件已落盘的登记不再需要保留在日志中
+        with self._locked():
+            self._compact_journal()
+
+    def _add(self, slug, key):
+        self.slugs.add(slug)
+        # 已有的语义重复（历史数据）保留第一个
+        if key[2]:
+            self.keys.setdefault(key, slug)
+
+    def _remove(self, slug, key):
+        self.slugs.discard(slug)
+        if self.keys.get(key) == slug:
+            del self.keys[key]
+
+    def __contains__(self, slug):
+        return slug in self.slugs
+
+    def conflict(self, slug, key):
+        """返回冲突原因，没有冲突时返回 None"""
+        if slug in self.slugs:
+            return f"slug 已存在: {slug}"
+        existing = self.keys.get(key) if key[2] else None
+        if existing and existing != slug:
+            return f"与 {existing} 语义重复（{' / '.join(key)}）"
+        return None
+
+    def claim(self, slug, guide):
+        """
+        在锁内同步其他进程的登记、检查冲突并登记 slug
+        返回 (是否成功, 冲突原因)
+        调用方仍应以 'x' 模式创建文件，防止注册表加载后被其他工具直接写入的情况
+        """
+        key = guide_key(guide)
+        with self._locked():
+            self._sync_journal()
+            reason = self.conflict(slug, key)
+            if reason:
+                return False, reason
+            self._add(slug, key)
+            self._append_journal((slug,) + key + (f"{time.time():.0f}", str(os.getpid())))
+        return True, None
+
+    def release(self, slug, guide):
+        """撤销 claim()（之后写入失败时调用），slug 和语义键可以再次使用"""
+        key = guide_key(guide)
+        with self._locked():
+            self._sync_journal()
+            self._remove(slug, key)
+            self._append_journal((slug,) + key + (f"{time.time():.0f}", str(os.getpid()), RELEASED))
+
+    # ---------- 锁文件与日志 ----------
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append_journal(self, fields):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write("\t".join(fields) + "\n")
+            self._journal_offset = f.tell()
+            self._journal_inode = os.fstat(f.fileno()).st_ino
+
+    def _apply(self, fields):
+        """应用一行日志：登记或撤销（旧格式的行只有 slug + 语义键）"""
+        if len(fields) == 7 and fields[6] == RELEASED:
+            self._remove(fields[0], tuple(fields[1:4]))
+        elif len(fields) in (4, 6):
+            self._add(fields[0], tuple(fields[1:4]))
+
+    def _sync_journal(self):
+        """读取其他进程追加的登记（日志被压缩替换过时从头重读，_add 是幂等的）"""
+        try:
+            stat = self.journal_path.stat()
+        except FileNotFoundError:
+            self._journal_offset = 0
+            return
+        if stat.st_ino != self._journal_inode or stat.st_size < self._journal_offset:
+            self._journal_inode = stat.st_ino
+            self._journal_offset = 0
+        if stat.st_size == self._journal_offset:
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            f.seek(self._journal_offset)
+            for line in f:
+                self._apply(line.rstrip("\n").split("\t"))
+            self._journal_offset = f.tell()
+
+    def _compact_journal(self):
+        """
+        读入日志，只保留尚未出现在 data/ 中、仍在进行的登记（其他进程正在生成的）：
+        已撤销的、登记进程已退出的、超过 CLAIM_TTL 的都丢弃
+        """
+        self._journal_offset = 0
+        if not self.journal_path.exists():
+            return
+        pending = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) == 7 and fields[6] == RELEASED:
+                    pending.pop(fields[0], None)
+                elif len(fields) in (4, 6) and fields[0] not in self.slugs:
+                    pending[fields[0]] = (line, fields)
+        now = time.time()
+        kept = []
+        for line, fields in pending.values():
+            # 旧格式的行没有时间和 PID，按已过期处理
+            if len(fields) == 6 and now - float(fields[4]) < CLAIM_TTL and _pid_alive(int(fields[5])):
+                kept.append(line)
+                self._add(fields[0], tuple(fields[1:4]))
+        tmp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+            self._journal_offset = f.tell()
+            self._journal_inode = os.fstat(f.fileno()).st_ino
+        os.replace(tmp_path, self.journal_path)
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+_registries = {}
+
+def get_registry(data_dir=corpus_index.DATA_DIR):
+    """每次运行只加载一次的注册表（按数据目录缓存）"""
+    data_dir = Path(data_dir)
+    if data_dir not in _registries:
+        _registries[data_dir] = SlugRegistry(data_dir)
+    return _registries[data_dir]
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+关键词趋势分数库（SQLite）
+记录每次从 Google Trends 观察到的关键词 (keyword, region, ts, rank)，跨运行累积历史：
+
+  - 分数 = Σ (1 / rank) × 0.5 ^ (距今天数 / 半衰期)，排名越靠前、出现越频繁、越新分数越高
+  - 指数衰减可以拆开：Σ w·e^(-λ(now-ts)) = e^(-λ(now-T0)) × Σ w·e^(λ(ts-T0))
+    keyword_scores 表按关键词累加后一项（T0 是固定的基准时间），记录观察时 O(1) 更新，
+    查询时所有关键词只需乘同一个系数，不必重新扫描观察记录
+  - 所有关键词衰减顺序相同，top(k) 直接沿累加值索引取前 K 个
+  - trending_score() 把衰减分数映射为指南中的 0-100 分
+
+数据库默认位于 .cache/trend-scores.sqlite（TRENDS_HALF_LIFE_DAYS 调整半衰期，默认 7 天，
+修改后会从观察记录重建累加值）
+
+用法:
+    python scripts/trend_store.py top 20     # 当前分数最高的 20 个关键词
+    python scripts/trend_store.py prune      # 删除已衰减到可以忽略的旧观察记录
+"""
+
+import math
+import os
+import sqlite3
+import sys
+import time
+
+import corpus_index
+
+DB_NAME = "trend-scores.sqlite"
+DB_PATH = corpus_index.cache_dir_for(corpus_index.DATA_DIR) / DB_NAME
+
+HALF_LIFE_DAYS = float(os.environ.get("TRENDS_HALF_LIFE_DAYS", "7"))
+# 衰减到 2^-10（约千分之一）以下的观察记录可以删除
+MAX_HALF_LIVES = 10
+# e^(λ(ts-T0)) 超过 e^REBASE_EXPONENT 时把基准时间移到现在，避免浮点溢出
+REBASE_EXPONENT = 500
+# trending_score = 100 × (1 - e^(-分数 / SCORE_SCALE))：一次排名第一的新观察约 63 分
+SCORE_SCALE = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    key     TEXT    NOT NULL,   -- 归一化后的关键词（小写、合并空白）
+    keyword TEXT    NOT NULL,   -- 原始关键词
+    region  TEXT    NOT NULL,
+    ts      REAL    NOT NULL,   -- Unix 时间戳（秒）
+    rank    INTEGER NOT NULL    -- 在该地区趋势列表中的排名（从 1 开始）
+);
+CREATE INDEX IF NOT EXISTS observations_ts ON observations (ts);
+
+CREATE TABLE IF NOT EXISTS keyword_scores (
+    key     TEXT PRIMARY KEY,
+    keyword TEXT    NOT NULL,
+    acc     REAL    NOT NULL,   -- Σ e^(λ(ts-T0)) / rank
+    hits    INTEGER NOT NULL,
+    last_ts REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS keyword_scores_acc ON keyword_scores (acc DESC);
+
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO keyword_scores (key, keyword, acc, hits, last_ts) VALUES (?, ?, ?, 1, ?)
+ON CONFLICT (key) DO UPDATE SET
+    acc = acc + excluded.acc,
+    hits = hits + 1,
+    last_ts = MAX(last_ts, excluded.last_ts)
+"""
+
+REBUILD_SQL = """
+INSERT INTO keyword_scores (key, keyword, acc, hits, last_ts)
+SELECT key, MIN(keyword), SUM(exp(:decay * (ts - :epoch)) / rank), COUNT(*), MAX(ts)
+FROM observations
+GROUP BY key
+"""
+
+def normalize_keyword(keyword):
+    return " ".join(str(keyword).lower().split())
+
+def to_trending_score(score):
+    """衰减分数 -> 0-100 的 trending_score"""
+    return int(round(100 * (1 - math.exp(-max(score, 0.0) / SCORE_SCALE))))
+
+class TrendStore:
+    """
+    scores() / top() 返回的分数都是衰减后的原始分数；
+    写入指南时用 trending_score() 得到 0-100 分
+    """
+
+    def __init__(self, path=DB_PATH, half_life_days=HALF_LIFE_DAYS):
+        self.path = path
+        self.half_life_days = half_life_days
+        self.decay = math.log(2) / (half_life_days * 86400)
+        if str(path) != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        # 未启用数学函数编译选项的 SQLite 没有 exp()，用 Python 实现补上
+        try:
+            self.conn.execute("SELECT exp(0)")
+        except sqlite3.OperationalError:
+            self.conn.create_function("exp", 1, math.exp, deterministic=True)
+
+        meta = dict(self.conn.execute("SELECT name, value FROM meta"))
+        self.epoch = meta.get("epoch")
+        if self.epoch is None:
+            self._set_epoch(time.time())
+        if meta.get("half_life_days") != half_life_days:
+            self.rebuild()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _set_epoch(self, epoch):
+        self.epoch = epoch
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('epoch', ?)", (epoch,))
+
+    def _factor(self, now):
+        """累加值 -> 当前分数的系数 e^(-λ(now-T0))"""
+        return math.exp(-self.decay * (now - self.epoch))
+
+    # ---------- 写入 ----------
+
+    def record(self, observations, ts=None):
+        """
+        批量记录观察 [(keyword, region, rank)]，观察记录和累加值在同一个事务中更新
+        返回写入条数
+        """
+        ts = time.time() if ts is None else ts
+        if self.decay * (ts - self.epoch) > REBASE_EXPONENT:
+            self.rebase(ts)
+
+        rows = [(normalize_keyword(keyword), keyword, region, ts, max(1, int(rank)))
+                for keyword, region, rank in observations if keyword]
+        weight = math.exp(self.decay * (ts - self.epoch))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO observations (key, keyword, region, ts, rank) VALUES (?, ?, ?, ?, ?)", rows)
+            self.conn.executemany(UPSERT_SQL, [(key, keyword, weight / rank, ts)
+                                               for key, keyword, _, _, rank in rows])
+        return len(rows)
+
+    def rebase(self, now):
+        """把基准时间移到 now，累加值整体乘以 e^(-λ(now-T0))"""
+        with self.conn:
+            self.conn.execute("UPDATE keyword_scores SET acc = acc * ?", (self._factor(now),))
+        self._set_epoch(now)
+
+    def rebuild(self):
+        """从观察记录重建累加值（半衰期改变时）"""
+        with self.conn:
+            self.conn.execute("DELETE FROM keyword_scores")
+            self.conn.execute(REBUILD_SQL, {"decay": self.decay, "epoch": self.epoch})
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('half_life_days', ?)",
+                              (self.half_life_days,))
+
+    def prune(self, now=None):
+        """
+        删除衰减到可以忽略的观察记录，返回删除条数
+        累加值不受影响（这些观察的贡献本来就已接近 0）
+        """
+        now = time.time() if now is None else now
+        cutoff = now - self.half_life_days * MAX_HALF_LIVES * 86400
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM observations WHERE ts < ?", (cutoff,))
+        return cursor.rowcount
+
+    # ---------- 查询 ----------
+
+    def scores(self, now=None):
+        """所有关键词的衰减分数 {归一化关键词: 分数}"""
+        factor = self._factor(time.time() if now is None else now)
+        return dict(self.conn.execute("SELECT key, acc * ? FROM keyword_scores", (factor,)))
+
+    def score(self, keyword, now=None):
+        row = self.conn.execute("SELECT acc FROM keyword_scores WHERE key = ?",
+                                (normalize_keyword(keyword),)).fetchone()
+        return row[0] * self._factor(time.time() if now is None else now) if row else 0.0
+
+    def trending_score(self, keyword, now=None):
+        return to_trending_score(self.score(keyword, now))
+
+    def top(self, k, now=None, exclude=None):
+        """
+        分数最高的 k 个关键词 [(keyword, 分数)]，按分数从高到低
+        exclude(keyword) 返回 True 的关键词跳过（例如已经生成过的），沿索引继续往下取
+        """
+        factor = self._factor(time.time() if now is None else now)
+        top = []
+        if k <= 0:
+            return top
+        for keyword, acc in self.conn.execute("SELECT keyword, acc FROM keyword_scores ORDER BY acc DESC"):
+            if exclude is not None and exclude(keyword):
+                continue
+            top.append((keyword, acc * factor))
+            if len(top) >= k:
+                break
+        return top
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+# ============================================
+# 主函数
+# ============================================
+
+def main():
+    args = sys.argv[1:] or ["top"]
+    command = args[0]
+
+    with TrendStore() as store:
+        if command == "top":
+            k = int(args[1]) if len(args) > 1 else 20
+            for keyword, score in store.top(k):
+                print(f"{to_trending_score(score):3d}  {score:8.3f}  {keyword}")
+        elif command == "prune":
+            print(f"🧹 删除 {store.prune()} 条过期观察，剩余 {store.count()} 条")
+        else:
+            print(__doc__)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Google Trends 页面流式提取器
+增量分词：分块读取 HTML，只识别关心的标签（a / div / tr，跳过 script / style），
+只扫描一遍文档，以生成器的形式依次产出 explore 搜索词、趋势标题和搜索量
+
+既可以解析实时抓取的 page.content()，也可以回放保存的快照:
+    python scripts/trends_extractor.py trends_full.html
+"""
+
+import html
+import re
+import sys
+from collections import deque
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+CHUNK_SIZE = 64 * 1024
+
+# 趋势表格中各字段所在元素的 class（Google 页面改版时只需修改这里）
+TITLE_CLASS = "mZ3RIc"
+TRAFFIC_CLASS = "lqv0Cb"
+
+EXPLORE_PATH = "/trends/explore"
+
+TAG_PATTERN = re.compile(r'<(/?)(a|div|tr|script|style)\b([^>]*)>', re.IGNORECASE)
+ATTR_PATTERN = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+# ============================================
+# 增量分词器
+# ============================================
+
+def _attrs(raw):
+    return {m.group(1).lower(): html.unescape(m.group(2) if m.group(2) is not None else m.group(3))
+            for m in ATTR_PATTERN.finditer(raw)}
+
+class TrendsTokenizer:
+    """
+    增量分词器
+    每次 feed() 之后，解析出的事件放在 events 队列中，由调用方取走；
+    未处理完的尾部（可能是被切断的标签）留到下一块继续
+
+    事件格式:
+        {"type": "explore", "query": ..., "row": 行号或 None}
+        {"type": "trend", "row": ..., "title": ..., "traffic": ..., "queries": [...]}
+    """
+
+    def __init__(self):
+        self.events = deque()
+        self._buffer = ""
+        self._raw_end = None      # 正在跳过的 script/style 结束标签
+        self._row = None          # 当前趋势行
+        self._tr_depth = 0
+        self._div_depth = 0
+        self._capture = None      # (字段名, 开始时的 div 深度)
+        self._text = []
+
+    def feed(self, data):
+        self._buffer += data
+        self._process(final=False)
+
+    def close(self):
+        self._process(final=True)
+
+    def _process(self, final):
+        buf = self._buffer
+        pos = 0
+
+        while True:
+            if self._raw_end is not None:
+                end = buf.find(self._raw_end, pos)
+                if end < 0:
+                    # 结束标签可能被切断，保留可能的前缀
+                    pos = max(pos, len(buf) - len(self._raw_end))
+                    break
+                pos = end + len(self._raw_end)
+                self._raw_end = None
+
+            m = TAG_PATTERN.search(buf, pos)
+            # 标签可能跨块：最后一个 '<' 之后的内容留到下一块
+            if m is None or (not final and buf.find('<', m.end()) < 0 and buf.rfind('<') > m.start()):
+                if self._capture is not None:
+                    cut = len(buf) if final else max(pos, buf.rfind('<'))
+                    self._text.append(buf[pos:cut])
+                    pos = cut
+                elif not final:
+                    pos = max(pos, buf.rfind('<'))
+                else:
+                    pos = len(buf)
+                break
+
+            if self._capture is not None:
+                self._text.append(buf[pos:m.start()])
+            pos = m.end()
+            self._handle_tag(m.group(1) == '/', m.group(2).lower(), m.group(3))
+
+        self._buffer = buf[pos:]
+
+    def _handle_tag(self, closing, tag, raw):
+        if tag in ("script", "style"):
+            if not closing and not raw.rstrip().endswith('/'):
+                self._raw_end = f"</{tag}"
+            return
+
+        if tag == "tr":
+            if closing:
+                if self._row is not None and self._row["_depth"] == self._tr_depth:
+                    row = self._row
+                    del row["_depth"]
+                    self.events.append(row)
+                    self._row = None
+                    self._capture = None
+                self._tr_depth -= 1
+            else:
+                self._tr_depth += 1
+                if self._row is None and "data-row-id" in raw:
+                    self._row = {"type": "trend", "row": _attrs(raw).get("data-row-id"), "title": None,
+                                 "traffic": None, "queries": [], "_depth": self._tr_depth}
+
+        elif tag == "a":
+            if not closing and EXPLORE_PATH in raw:
+                attrs = _attrs(raw)
+                href = attrs.get("href") or attrs.get("ng-href") or ""
+                query = parse_qs(urlparse(href).query).get("q")
+                if query and query[0].strip():
+                    self._emit_query(query[0])
+
+        elif tag == "div":
+            if closing:
+                if self._capture is not None and self._capture[1] == self._div_depth:
+                    field = self._capture[0]
+                    self._row[field] = html.unescape("".join(self._text)).strip() or None
+                    self._capture = None
+                self._div_depth -= 1
+            else:
+                self._div_depth += 1
+                if self._row is not None and self._capture is None and (
+                        TITLE_CLASS in raw or TRAFFIC_CLASS in raw):
+                    classes = _attrs(raw).get("class", "").split()
+                    if TITLE_CLASS in classes:
+                        self._capture = ("title", self._div_depth)
+                    elif TRAFFIC_CLASS in classes:
+                        self._capture = ("traffic", self._div_depth)
+                    self._text = []
+
+    def _emit_query(self, query):
+        row_id = None
+        if self._row is not None:
+            row_id = self._row["row"]
+            self._row["queries"].append(query)
+        self.events.append({"type": "explore", "query": query, "row": row_id})
+
+# ============================================
+# 生成器接口
+# ============================================
+
+def iter_events(chunks):
+    """逐块解析 HTML 文本，按文档顺序产出事件"""
+    parser = TrendsTokenizer()
+    for chunk in chunks:
+        parser.feed(chunk)
+        while parser.events:
+            yield parser.events.popleft()
+    parser.close()
+    while parser.events:
+        yield parser.events.popleft()
+
+def iter_file_chunks(path, chunk_size=CHUNK_SIZE):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def iter_snapshot(path, chunk_size=CHUNK_SIZE):
+    """流式解析保存的快照文件"""
+    return iter_events(iter_file_chunks(path, chunk_size))
+
+def iter_html(html, chunk_size=CHUNK_SIZE):
+    """解析内存中的 HTML（例如 page.content() 的返回值）"""
+    return iter_events(html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+
+def iter_explore_queries(events):
+    for event in events:
+        if event["type"] == "explore":
+            yield event["query"]
+
+def iter_trends(events):
+    for event in events:
+        if event["type"] == "trend":
+            yield event
+
+# ============================================
+# 主函数（回放快照）
+# ============================================
+
+def main():
+    path = Path(sys.argv[1] if len(sys.argv) > 1 else "trends_full.html")
+    queries = 0
+    for event in iter_snapshot(path):
+        if event["type"] == "explore":
+            queries += 1
+        else:
+            related = ", ".join(event["queries"][:3])
+            print(f"#{event['row']:>3} {event['title']!s:<40} {event['traffic'] or '-':>6}  {related}")
+    print(f"\n✅ explore 搜索词: {queries} 个")
+
+if __name__ == "__main__":
+    main()
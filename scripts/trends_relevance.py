@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Google Trends 搜索词相关性过滤
+把吸尘器关键词编译成一个带单词边界的正则（只编译一次），
+一次调用过滤整批候选词，并返回每个词命中的吸尘器关键词
+"""
+
+import re
+from bisect import bisect_right
+
+# 吸尘器相关关键词列表
+VACUUM_KEYWORDS = [
+    'vacuum', 'dyson', 'shark', 'hoover', 'bissell', 'roomba',
+    'robot', 'cleaner', 'suction', 'carpet', 'floor',
+    'miele', 'samsung', 'tineco', 'lg', 'electrolux',
+    'battery', 'charging', 'repair', 'parts', 'filter'
+]
+
+# ============================================
+# 相关性引擎
+# ============================================
+
+class RelevanceFilter:
+    """
+    单词边界匹配的相关性过滤器
+    所有关键词合并成一个 \\b(?:kw1|kw2|...)\\b 正则，
+    批量过滤时把候选词拼接成一段文本，只扫描一遍
+    """
+
+    def __init__(self, keywords=VACUUM_KEYWORDS):
+        self.keywords = [kw.lower() for kw in keywords]
+        # 长的关键词放前面，保证多词关键词优先于其中的单词
+        alternation = "|".join(
+            re.escape(kw) for kw in sorted(set(self.keywords), key=len, reverse=True)
+        )
+        self.pattern = re.compile(r'\b(?:' + alternation + r')\b')
+
+    def match(self, term):
+        """返回 term 命中的关键词（按出现顺序去重），未命中返回空列表"""
+        return list(dict.fromkeys(self.pattern.findall(term.lower())))
+
+    def is_relevant(self, term):
+        return self.pattern.search(term.lower()) is not None
+
+    def filter(self, terms):
+        """
+        批量过滤候选词
+        返回 [(term, matched_keywords), ...]，保持原顺序，重复的词只保留第一次
+        """
+        unique_terms = list(dict.fromkeys(t for t in terms if t))
+        if not unique_terms:
+            return []
+
+        # 用换行拼接（关键词中不含换行，且换行两侧天然构成单词边界）
+        lowered = [term.lower() for term in unique_terms]
+        starts = []
+        offset = 0
+        for term in lowered:
+            starts.append(offset)
+            offset += len(term) + 1
+        text = "\n".join(lowered)
+
+        matched = {}
+        for m in self.pattern.finditer(text):
+            idx = bisect_right(starts, m.start()) - 1
+            matched.setdefault(idx, {})[m.group(0)] = None
+
+        return [(unique_terms[idx], list(matched[idx])) for idx in sorted(matched)]
+
+# 默认过滤器（模块加载时编译一次）
+DEFAULT_FILTER = RelevanceFilter()
+
+def match_terms(term):
+    return DEFAULT_FILTER.match(term)
+
+def filter_relevant(terms):
+    return DEFAULT_FILTER.filter(terms)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Google Trends 并发抓取
+每个地区一个独立的浏览器上下文，使用 Playwright 异步 API 并发访问，
+等待 explore 链接 / 趋势条目出现即开始提取，不再依赖固定的 sleep
+
+本地测试（用保存的快照代替真实页面）:
+    python scripts/trends_scraper.py --snapshot trends_full.html --regions US,GB,CA
+"""
+
+import argparse
+import asyncio
+import http.server
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+import trends_extractor
+
+# ============================================
+# 配置
+# ============================================
+
+TRENDS_URL_TEMPLATE = "https://trends.google.com/trends/trendingsearches/daily?geo={region}"
+DEFAULT_REGIONS = ['US', 'GB', 'CA']
+DEFAULT_TIMEOUT_MS = 30000
+
+# 页面渲染出任意一个即认为趋势数据已就绪
+READY_SELECTOR = ", ".join([
+    'a[href*="/trends/explore"]',
+    'a[ng-href*="explore"]',
+    'tr[data-row-id]',
+    'div.feed-item',
+    'md-list-item'
+])
+
+# 选择器补充方法使用的选择器
+FALLBACK_SELECTORS = [
+    'a[ng-href*="explore"]',
+    'div.feed-item',
+    'md-list-item',
+    'span[ng-bind]',
+    '[class*="feed-list"]',
+    '[class*="trending-search"]'
+]
+
+# ============================================
+# 提取函数
+# ============================================
+
+def extract_explore_terms(html, limit=50):
+    """从 explore URLs 提取搜索词（流式解析 + 清理）"""
+    terms = []
+    queries = trends_extractor.iter_explore_queries(trends_extractor.iter_html(html))
+    for query in islice(queries, limit):
+        clean_term = query.strip().title()
+        if clean_term and len(clean_term) < 100:
+            terms.append(clean_term)
+    return terms
+
+def clean_selector_texts(texts, limit=30):
+    """选择器文本只取第一行，过滤空文本和过长文本"""
+    cleaned = []
+    for text in texts[:limit]:
+        if text and len(text) < 100:
+            clean_text = text.strip().split('\n')[0].strip()
+            if clean_text:
+                cleaned.append(clean_text)
+    return cleaned
+
+# ============================================
+# 并发抓取
+# ============================================
+
+async def scrape_region(browser, region, url_template=TRENDS_URL_TEMPLATE,
+                        timeout_ms=DEFAULT_TIMEOUT_MS, block_external=False):
+    """
+    抓取单个地区
+    返回 {"region", "url_terms", "selector_terms", "elapsed", "error"}
+    """
+    started = time.perf_counter()
+    result = {"region": region, "url_terms": [], "selector_terms": [], "elapsed": 0.0, "error": None}
+    url = url_template.format(region=region)
+
+    context = await browser.new_context()
+    try:
+        if block_external:
+            # 快照测试时只允许访问快照所在的主机，避免页面脚本请求外网
+            allowed_host = urlparse(url).netloc
+
+            async def route_handler(route):
+                if urlparse(route.request.url).netloc == allowed_host:
+                    await route.continue_()
+                else:
+                    await route.abort()
+
+            await context.route("**/*", route_handler)
+
+        page = await context.new_page()
+        page.set_default_timeout(timeout_ms)
+        await page.goto(url, wait_until='domcontentloaded', timeout=timeout_ms)
+
+        # 事件驱动等待：趋势链接或条目出现即可
+        try:
+            await page.wait_for_selector(READY_SELECTOR, state='attached', timeout=timeout_ms)
+        except PlaywrightTimeout:
+            result["error"] = "等待趋势条目超时"
+
+        html_content = await page.content()
+        result["url_terms"] = extract_explore_terms(html_content)
+
+        for selector in FALLBACK_SELECTORS:
+            try:
+                texts = await page.locator(selector).all_inner_texts()
+            except Exception:
+                continue
+            result["selector_terms"].extend(clean_selector_texts(texts))
+
+    except PlaywrightTimeout:
+        result["error"] = "页面加载超时"
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        await context.close()
+        result["elapsed"] = time.perf_counter() - started
+
+    return result
+
+async def scrape_regions(regions=None, url_template=TRENDS_URL_TEMPLATE,
+                         timeout_ms=DEFAULT_TIMEOUT_MS, block_external=False):
+    """并发抓取多个地区，按 regions 的顺序返回结果列表"""
+    regions = list(regions or DEFAULT_REGIONS)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            # 每个地区额外留出余量，整体仍受单地区超时约束
+            region_timeout = timeout_ms / 1000 * 2
+
+            async def guarded(region):
+                try:
+                    return await asyncio.wait_for(
+                        scrape_region(browser, region, url_template, timeout_ms, block_external),
+                        timeout=region_timeout
+                    )
+                except asyncio.TimeoutError:
+                    return {"region": region, "url_terms": [], "selector_terms": [],
+                            "elapsed": region_timeout, "error": "地区抓取超时"}
+
+            return await asyncio.gather(*(guarded(region) for region in regions))
+        finally:
+            await browser.close()
+
+def fetch_regions(regions=None, url_template=TRENDS_URL_TEMPLATE,
+                  timeout_ms=DEFAULT_TIMEOUT_MS, block_external=False):
+    """同步入口：在新的事件循环中并发抓取所有地区"""
+    return asyncio.run(scrape_regions(regions, url_template, timeout_ms, block_external))
+
+# ============================================
+# 本地快照服务器（测试用）
+# ============================================
+
+@contextmanager
+def serve_snapshot(snapshot_path, host="127.0.0.1", port=0):
+    """
+    在后台线程启动 HTTP 服务器，任意路径都返回同一个快照文件
+    返回可直接传给 fetch_regions 的 url_template
+    """
+    content = Path(snapshot_path).read_bytes()
+
+    class SnapshotHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), SnapshotHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}/trends/trendingsearches/daily?geo={{region}}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+# ============================================
+# 主函数
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="并发抓取 Google Trends 各地区趋势")
+    parser.add_argument("--regions", default=",".join(DEFAULT_REGIONS), help="逗号分隔的地区代码")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT_MS, help="单地区超时（毫秒）")
+    parser.add_argument("--url-template", default=TRENDS_URL_TEMPLATE)
+    parser.add_argument("--snapshot", help="使用本地 HTML 快照代替真实页面")
+    args = parser.parse_args()
+
+    regions = [r.strip() for r in args.regions.split(",") if r.strip()]
+
+    started = time.perf_counter()
+    if args.snapshot:
+        with serve_snapshot(args.snapshot) as url_template:
+            results = fetch_regions(regions, url_template, args.timeout, block_external=True)
+    else:
+        results = fetch_regions(regions, args.url_template, args.timeout)
+
+    for result in results:
+        status = f"⚠️ {result['error']}" if result["error"] else "✅"
+        print(f"{status} {result['region']}: {len(result['url_terms'])} 个 explore 词, "
+              f"{len(result['selector_terms'])} 个选择器文本, {result['elapsed']:.2f}s")
+        for term in result["url_terms"][:5]:
+            print(f"   • {term}")
+    print(f"\n⏱️ 总耗时: {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()